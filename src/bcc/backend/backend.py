@@ -7,10 +7,10 @@ from .modules.trace_export_core import build_trace_export
 
 
 @module(name="LinxCoreBackend")
-def build_backend(m: Circuit, *, mem_bytes: int = (1 << 20)) -> None:
+def build_backend(m: Circuit, *, mem_bytes: int = (1 << 20), mdp_entries: int = 0) -> None:
     # Canonical backend composition lives in the trace-export path, which owns
     # the packed-bank interfaces used by the current pyc4 hierarchy.
-    build_trace_export(m, mem_bytes=mem_bytes)
+    build_trace_export(m, mem_bytes=mem_bytes, mdp_entries=mdp_entries)
 
 
 def build_bcc_ooo(m: Circuit, *, mem_bytes: int, params=None) -> BccOooExports:
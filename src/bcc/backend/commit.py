@@ -156,12 +156,10 @@ def build_commit_ctrl_stage(m: Circuit, *, commit_w: int = 4, rob_w: int = 6) ->
     state_flush_pending = m.input("state_flush_pending", width=1)
     state_replay_pending = m.input("state_replay_pending", width=1)
     state_replay_store_rob = m.input("state_replay_store_rob", width=rob_w)
-    state_replay_pc = m.input("state_replay_pc", width=64)
 
     replay_redirect_fire = m.input("replay_redirect_fire", width=1)
     replay_set = m.input("replay_set", width=1)
     replay_set_store_rob = m.input("replay_set_store_rob", width=rob_w)
-    replay_set_pc = m.input("replay_set_pc", width=64)
 
     commit_fires = []
     rob_ops = []
@@ -185,7 +183,6 @@ def build_commit_ctrl_stage(m: Circuit, *, commit_w: int = 4, rob_w: int = 6) ->
     replay_pending_next = replay_redirect_fire._select_internal(c(0, width=1), replay_pending_next)
     replay_pending_next = replay_set._select_internal(c(1, width=1), replay_pending_next)
     replay_store_rob_next = replay_set._select_internal(replay_set_store_rob, state_replay_store_rob)
-    replay_pc_next = replay_set._select_internal(replay_set_pc, state_replay_pc)
 
     halt_set = mmio_exit
     for slot in range(commit_w):
@@ -199,5 +196,4 @@ def build_commit_ctrl_stage(m: Circuit, *, commit_w: int = 4, rob_w: int = 6) ->
     m.output("flush_pending_next", flush_pending_next)
     m.output("replay_pending_next", replay_pending_next)
     m.output("replay_store_rob_next", replay_store_rob_next)
-    m.output("replay_pc_next", replay_pc_next)
     m.output("halt_set", halt_set)
@@ -234,7 +234,6 @@ def build_commit_select_stage(
 
     state_replay_pending = m.input("state_replay_pending", width=1)
     state_replay_store_rob = m.input("state_replay_store_rob", width=rob_w)
-    state_replay_pc = m.input("state_replay_pc", width=64)
 
     commit_idxs = []
     rob_pcs = []
@@ -414,7 +413,6 @@ def build_commit_select_stage(
         fret_redirect = effect_fire & is_fret & (~redirect)
         pc_next = ret_ra_val if fret_redirect else pc_next
         redirect = redirect | fret_redirect
-        pc_next = state_replay_pc if replay_redirect else pc_next
         redirect = redirect | replay_redirect
         commit_next_pcs.append(pc_next)
 
@@ -1076,7 +1074,6 @@ def build_bcc_ooo(m: Circuit, *, mem_bytes: int, params: OooParams | None = None
         "state_br_corr_checkpoint_id": state.br_corr_checkpoint_id.out(),
         "state_replay_pending": state.replay_pending.out(),
         "state_replay_store_rob": state.replay_store_rob.out(),
-        "state_replay_pc": state.replay_pc.out(),
         "rob_value_target_proven_pack": m.concat(*reversed(rob_value_target_provens)),
     }
     for slot in range(p.commit_w):
@@ -1445,7 +1442,6 @@ def build_bcc_ooo(m: Circuit, *, mem_bytes: int, params: OooParams | None = None
     # LSU violation replay state (updated after wb metadata is formed).
     replay_set = consts.zero1
     replay_set_store_rob = state.replay_store_rob.out()
-    replay_set_pc = state.replay_pc.out()
     lsu_violation_detected = consts.zero1
 
     # --- template macro engine (FENTRY/FEXIT/FRET.*) ---
@@ -1684,10 +1680,9 @@ def build_bcc_ooo(m: Circuit, *, mem_bytes: int, params: OooParams | None = None
 
     # LSU violation detection (owned by ROB bank hierarchy): if an older store
     # resolves to the same address as a younger already-executed load, request
-    # replay from that load PC.
+    # a replay that restarts right after that store.
     lsu_violation_hit = rob_bank["lsu_violation_hit"]
     lsu_violation_store_rob = rob_bank["lsu_violation_store_rob"]
-    lsu_violation_pc = rob_bank["lsu_violation_pc"]
 
     set_this = lsu_violation_hit & (~state.replay_pending.out()) & (~replay_set)
     # NOTE: this engine is still evaluated via Python during JIT compilation
@@ -1695,7 +1690,6 @@ def build_bcc_ooo(m: Circuit, *, mem_bytes: int, params: OooParams | None = None
     # wires; use explicit mux ops.
     replay_set = set_this._select_internal(consts.one1, replay_set)
     replay_set_store_rob = set_this._select_internal(lsu_violation_store_rob, replay_set_store_rob)
-    replay_set_pc = set_this._select_internal(lsu_violation_pc, replay_set_pc)
     lsu_violation_detected = replay_set
 
     # --- dispatch decode stage ---
@@ -2269,11 +2263,9 @@ def build_bcc_ooo(m: Circuit, *, mem_bytes: int, params: OooParams | None = None
         "state_flush_pending": state.flush_pending.out(),
         "state_replay_pending": state.replay_pending.out(),
         "state_replay_store_rob": state.replay_store_rob.out(),
-        "state_replay_pc": state.replay_pc.out(),
         "replay_redirect_fire": replay_redirect_fire,
         "replay_set": replay_set,
         "replay_set_store_rob": replay_set_store_rob,
-        "replay_set_pc": replay_set_pc,
     }
     for slot in range(p.commit_w):
         commit_ctrl_args[f"commit_fire{slot}"] = commit_fires[slot]
@@ -2291,7 +2283,6 @@ def build_bcc_ooo(m: Circuit, *, mem_bytes: int, params: OooParams | None = None
     state.flush_pending.set(commit_ctrl["flush_pending_next"])
     state.replay_pending.set(commit_ctrl["replay_pending_next"])
     state.replay_store_rob.set(commit_ctrl["replay_store_rob_next"])
-    state.replay_pc.set(commit_ctrl["replay_pc_next"])
     trap_ctrl_args = {
         "do_flush": do_flush,
         "state_trap_pending": state.trap_pending.out(),
@@ -94,3 +94,136 @@ def alloc_from_free_mask(m: Circuit, *, free_mask: Wire, width: int, tag_width:
         tag = take._select_internal(u(tag_width, i), tag)
         onehot = take._select_internal(u(width, 1 << i), onehot)
     return valid, tag, onehot
+
+
+def _mux2(m: Circuit, sel: Wire, when_true: Wire, when_false: Wire) -> Wire:
+    """`when_true if sel else when_false`, without Python control flow on `sel`."""
+    return mux_by_uindex(m, idx=sel, items=[when_false, when_true], default=when_false)
+
+
+@function
+def select_oldest(m: Circuit, *, ready: list[Wire], ages: list[Wire], width: int, idx_w: int) -> tuple[list, list]:
+    """Pick up to `width` ready entries with the smallest age, oldest first.
+
+    Each slot is a balanced tournament over `(ready, age, index)`: a pair keeps
+    its right side only when that side is ready and strictly younger-valued,
+    so ties resolve to the lower index exactly like a linear first-wins scan.
+    Depth is log2(len(ready)) compare/select levels per slot instead of one
+    per entry. Later slots drop the previous winner with a single index
+    compare per entry rather than re-checking every earlier slot.
+    """
+
+    n = int(len(ready))
+    valids: list = []
+    idxs: list = []
+    if n <= 0:
+        return valids, idxs
+
+    cand = list(ready)
+    for _slot in range(int(width)):
+        stage = [(cand[i], ages[i], u(idx_w, i)) for i in range(n)]
+        while len(stage) > 1:
+            nxt = []
+            for j in range(0, len(stage) - 1, 2):
+                a_v, a_age, a_idx = stage[j]
+                b_v, b_age, b_idx = stage[j + 1]
+                # Same rule as mux_by_uindex: no Python control flow on i1 Wires.
+                take_b = b_v & ((~a_v) | (b_age < a_age))
+                nxt.append((a_v | b_v, _mux2(m, take_b, b_age, a_age), _mux2(m, take_b, b_idx, a_idx)))
+            if len(stage) & 1:
+                nxt.append(stage[-1])
+            stage = nxt
+        v, _age, idx = stage[0]
+        valids.append(v)
+        idxs.append(idx)
+        if n == 1:
+            cand = [cand[0] & (~v)]
+        else:
+            cand = [cand[i] & (~(v & (idx == u(idx_w, i)))) for i in range(n)]
+    return valids, idxs
+
+
+@function
+def store_forward_bytes(
+    m: Circuit,
+    *,
+    load_addr: Wire,
+    store_valid: Wire,
+    store_addr: Wire,
+    store_size: Wire,
+    store_data: Wire,
+) -> tuple[list, list]:
+    """Bytes one store supplies to the 8-byte window starting at `load_addr`.
+
+    Window byte k is covered when `0 <= load_addr + k - store_addr < store_size`
+    and then carries store byte `load_addr + k - store_addr`, so partial and
+    misaligned overlaps are handled per byte. Only the low five bits of the
+    address difference feed the per-byte adders; the upper bits just have to
+    be a sign extension (difference within [-16, 15]).
+    """
+    diff = load_addr - store_addr
+    diff_hi = diff[4:64]
+    near = store_valid & ((diff_hi == u(60, 0)) | (diff_hi == u(60, (1 << 60) - 1)))
+    diff_lo = diff[0:5]
+    size5 = m.cat(u(1, 0), store_size)
+    st_bytes = [store_data[8 * j : 8 * j + 8] for j in range(8)]
+    covers: list = []
+    data: list = []
+    for k in range(8):
+        pos = diff_lo + u(5, k)
+        covers.append(near & (pos < size5))
+        data.append(mux_by_uindex(m, idx=pos[0:3], items=st_bytes, default=u(8, 0)))
+    return covers, data
+
+
+@function
+def merge_youngest_bytes(m: Circuit, *, covers: list[list], data: list[list], ages: list[Wire]) -> tuple[Wire, Wire]:
+    """Merge per-store window bytes, keeping the youngest covering store per byte.
+
+    `covers[i]` / `data[i]` are the per-byte lists from `store_forward_bytes`
+    for store i and `ages[i]` orders stores (larger is younger). Each byte is a
+    balanced tournament like `select_oldest`, carrying the byte itself instead
+    of an index. Returns the 8-bit covered mask and the 64-bit merged window.
+    """
+    n = int(len(ages))
+    mask_bits: list = []
+    out_bytes: list = []
+    for k in range(8):
+        if n <= 0:
+            mask_bits.append(u(1, 0))
+            out_bytes.append(u(8, 0))
+            continue
+        stage = [(covers[i][k], ages[i], data[i][k]) for i in range(n)]
+        while len(stage) > 1:
+            nxt = []
+            for j in range(0, len(stage) - 1, 2):
+                a_v, a_age, a_byte = stage[j]
+                b_v, b_age, b_byte = stage[j + 1]
+                take_b = b_v & ((~a_v) | (a_age < b_age))
+                nxt.append((a_v | b_v, _mux2(m, take_b, b_age, a_age), _mux2(m, take_b, b_byte, a_byte)))
+            if len(stage) & 1:
+                nxt.append(stage[-1])
+            stage = nxt
+        v, _age, byte = stage[0]
+        mask_bits.append(v)
+        out_bytes.append(_mux2(m, v, byte, u(8, 0)))
+    return m.concat(*reversed(mask_bits)), m.concat(*reversed(out_bytes))
+
+
+@function
+def load_byte_mask(m: Circuit, *, size: Wire) -> Wire:
+    """Window bytes read by a load of `size` bytes (1, 2, 4 or 8)."""
+    mask = u(8, 0)
+    mask = _mux2(m, size == u(4, 1), u(8, 0x01), mask)
+    mask = _mux2(m, size == u(4, 2), u(8, 0x03), mask)
+    mask = _mux2(m, size == u(4, 4), u(8, 0x0F), mask)
+    mask = _mux2(m, size == u(4, 8), u(8, 0xFF), mask)
+    return mask
+
+
+@function
+def byte_ranges_overlap(m: Circuit, *, a_addr: Wire, a_size: Wire, b_addr: Wire, b_size: Wire) -> Wire:
+    """True when `[a_addr, a_addr + a_size)` and `[b_addr, b_addr + b_size)` share a byte."""
+    a_in_b = (a_addr - b_addr) < m.cat(u(60, 0), b_size)
+    b_in_a = (b_addr - a_addr) < m.cat(u(60, 0), a_size)
+    return a_in_b | b_in_a
@@ -4,7 +4,7 @@ from functools import partial
 
 from pycircuit import Circuit, function, module, u
 
-from .helpers import mask_bit
+from .helpers import mask_bit, select_oldest
 from .lsu import is_load_op, is_store_op
 
 
@@ -12,52 +12,22 @@ from .lsu import is_load_op, is_store_op
 def pick_oldest(m: Circuit, *, p, consts, can_issue: list, iq, width: int, sub_head):
     # TODO: remove this legacy IQ-struct picker once all callers use
     # pick_oldest_from_arrays.
-    issue_valids = []
-    issue_idxs = []
-    for slot in range(width):
-        v = consts.zero1
-        idx = u(p.iq_w, 0)
-        best_age = u(p.rob_w, (1 << p.rob_w) - 1)
-        for i in range(p.iq_depth):
-            cidx = u(p.iq_w, i)
-            exclude = consts.zero1
-            for prev in range(slot):
-                exclude = exclude | (issue_valids[prev] & (issue_idxs[prev] == cidx))
-            cand = can_issue[i] & (~exclude)
-            age = iq.rob[i].out() + sub_head
-            better = (~v) | (age < best_age)
-            take = cand & better
-            v = take._select_internal(consts.one1, v)
-            idx = take._select_internal(cidx, idx)
-            best_age = take._select_internal(age, best_age)
-        issue_valids.append(v)
-        issue_idxs.append(idx)
-    return issue_valids, issue_idxs
+    return pick_oldest_from_arrays(
+        m,
+        p=p,
+        consts=consts,
+        can_issue=can_issue,
+        rob_tags=[iq.rob[i].out() for i in range(p.iq_depth)],
+        width=width,
+        sub_head=sub_head,
+    )
 
 
 @function
 def pick_oldest_from_arrays(m: Circuit, *, p, consts, can_issue: list, rob_tags: list, width: int, sub_head):
-    issue_valids = []
-    issue_idxs = []
-    for slot in range(width):
-        v = consts.zero1
-        idx = u(p.iq_w, 0)
-        best_age = u(p.rob_w, (1 << p.rob_w) - 1)
-        for i in range(p.iq_depth):
-            cidx = u(p.iq_w, i)
-            exclude = consts.zero1
-            for prev in range(slot):
-                exclude = exclude | (issue_valids[prev] & (issue_idxs[prev] == cidx))
-            cand = can_issue[i] & (~exclude)
-            age = rob_tags[i] + sub_head
-            better = (~v) | (age < best_age)
-            take = cand & better
-            v = take._select_internal(consts.one1, v)
-            idx = take._select_internal(cidx, idx)
-            best_age = take._select_internal(age, best_age)
-        issue_valids.append(v)
-        issue_idxs.append(idx)
-    return issue_valids, issue_idxs
+    # NOTE: `consts` is kept for call-site stability; the tree anchors on its inputs.
+    ages = [rob_tags[i] + sub_head for i in range(p.iq_depth)]
+    return select_oldest(m, ready=can_issue[: p.iq_depth], ages=ages, width=width, idx_w=p.iq_w)
 
 
 @module(name="LinxCoreIssuePicker")
@@ -75,42 +45,19 @@ def build_issue_picker(
         raise ValueError("iq_depth must be > 0")
     if width <= 0:
         raise ValueError("width must be > 0")
+    if iq_depth > (1 << iq_w):
+        raise ValueError("iq_w too narrow for iq_depth")
 
     sub_head = m.input("sub_head", width=rob_w)
 
     can_issue = []
-    rob_tags = []
+    ages = []
     for i in range(iq_depth):
         can_issue.append(m.input(f"can_issue{i}", width=1))
-        rob_tags.append(m.input(f"rob_tag{i}", width=rob_w))
-
-    # Local const anchors (avoid m.const in this module).
-    zero1 = can_issue[0] & 0
-    one1 = ~zero1
+        ages.append(m.input(f"rob_tag{i}", width=rob_w) + sub_head)
 
-    issue_valids = []
-    issue_idxs = []
-    for slot in range(width):
-        v = zero1
-        # Note: JIT `if <wire>:` phi construction requires assigned variables to
-        # be Wire/int/bool (LiteralValue is not allowed as a phi base).
-        idx = zero1 + u(iq_w, 0)
-        best_age = (sub_head & 0) + u(rob_w, (1 << rob_w) - 1)
-        for i in range(iq_depth):
-            cidx = u(iq_w, i)
-            exclude = zero1
-            for prev in range(slot):
-                exclude = exclude | (issue_valids[prev] & (issue_idxs[prev] == cidx))
-            cand = can_issue[i] & (~exclude)
-            age = rob_tags[i] + sub_head
-            better = (~v) | (age < best_age)
-            take = cand & better
-            if take:
-                v = one1
-                idx = cidx
-                best_age = age
-        issue_valids.append(v)
-        issue_idxs.append(idx)
+    # Tournament tree: log2(iq_depth) compare levels per slot.
+    issue_valids, issue_idxs = select_oldest(m, ready=can_issue, ages=ages, width=width, idx_w=iq_w)
 
     for slot in range(width):
         m.output(f"issue_valid{slot}", issue_valids[slot])
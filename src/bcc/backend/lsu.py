@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pycircuit import Circuit, function, module, u
 
+from .helpers import load_byte_mask, merge_youngest_bytes, mux_by_uindex, store_forward_bytes
 from common.isa import (
     OP_C_LDI,
     OP_C_LWI,
@@ -103,35 +104,63 @@ def build_lsu_stage(
     rob_w: int = 6,
     sq_entries: int = 32,
     sq_w: int = 5,
+    mdp_en: int = 0,
 ) -> None:
+    """Lane-0 load/store issue gate and store-to-load forwarding.
+
+    Forwarding is byte-granular over every store older than the load: the
+    ROB scan's merged in-flight stores, the store committing this cycle and
+    the committed store buffer, youngest first in that order (buffer entries
+    are ordered by distance from `stbuf_head`). A load whose bytes are all
+    covered forwards; one that is only partly covered must wait for the
+    overlapping stores to drain instead of reading stale memory.
+
+    Without `mdp_en` a load waits for every older unresolved store. With it, a
+    load waits while `LinxCoreLsuMdp` predicts a dependence on a store that is
+    still unresolved, and also while any older store is between issue and
+    writeback (`older_store_inflight_lane0`, from `LinxCoreLsuStoreInflight`).
+    It speculates only past stores still in the issue queue: those reach the
+    ROB violation check after the load is done, so a wrong guess is caught
+    and replayed.
+    """
     if rob_w <= 0:
         raise ValueError("rob_w must be > 0")
     if sq_entries <= 0:
         raise ValueError("sq_entries must be > 0")
     if sq_w <= 0:
         raise ValueError("sq_w must be > 0")
+    if sq_entries > (1 << sq_w):
+        raise ValueError("sq_entries must fit in sq_w index bits")
 
     issue_fire_lane0_raw = m.input("issue_fire_lane0_raw", width=1)
     ex0_is_load = m.input("ex0_is_load", width=1)
     ex0_is_store = m.input("ex0_is_store", width=1)
     ex0_addr = m.input("ex0_addr", width=64)
+    ex0_size = m.input("ex0_size", width=4)
     ex0_lsid = m.input("ex0_lsid", width=32)
     lsid_issue_ptr = m.input("lsid_issue_ptr", width=32)
     commit_store_fire = m.input("commit_store_fire", width=1)
     commit_store_addr = m.input("commit_store_addr", width=64)
     commit_store_data = m.input("commit_store_data", width=64)
+    commit_store_size = m.input("commit_store_size", width=4)
 
     rob_older_store_pending_lane0 = m.input("rob_older_store_pending_lane0", width=1)
-    rob_forward_hit_lane0 = m.input("rob_forward_hit_lane0", width=1)
+    rob_mdp_store_pending_lane0 = m.input("rob_mdp_store_pending_lane0", width=1)
+    mdp_pred_valid_lane0 = m.input("mdp_pred_valid_lane0", width=1)
+    older_store_inflight_lane0 = m.input("older_store_inflight_lane0", width=1)
+    rob_forward_mask_lane0 = m.input("rob_forward_mask_lane0", width=8)
     rob_forward_data_lane0 = m.input("rob_forward_data_lane0", width=64)
 
+    stbuf_head = m.input("stbuf_head", width=sq_w)
     stbuf_valid = []
     stbuf_addr = []
     stbuf_data = []
+    stbuf_size = []
     for i in range(int(sq_entries)):
         stbuf_valid.append(m.input(f"stbuf_valid{i}", width=1))
         stbuf_addr.append(m.input(f"stbuf_addr{i}", width=64))
         stbuf_data.append(m.input(f"stbuf_data{i}", width=64))
+        stbuf_size.append(m.input(f"stbuf_size{i}", width=4))
 
     lsu_mem_fire_raw = issue_fire_lane0_raw & (ex0_is_load | ex0_is_store)
     lsu_load_fire_raw = issue_fire_lane0_raw & ex0_is_load
@@ -142,25 +171,67 @@ def build_lsu_stage(
 
     lsu_older_store_pending_lane0 = rob_older_store_pending_lane0
 
-    commit_store_match_lane0 = lsu_load_fire_raw & commit_store_fire & (commit_store_addr == ex0_addr)
-    stbuf_forward_hit_lane0 = u(1, 0)
-    stbuf_forward_data_lane0 = u(64, 0)
+    stbuf_covers = []
+    stbuf_bytes = []
+    stbuf_ages = []
     for i in range(int(sq_entries)):
-        hit = lsu_load_fire_raw & stbuf_valid[i] & (stbuf_addr[i] == ex0_addr)
-        stbuf_forward_hit_lane0 = stbuf_forward_hit_lane0 | hit
-        stbuf_forward_data_lane0 = hit._select_internal(stbuf_data[i], stbuf_forward_data_lane0)
-
-    lsu_forward_hit_lane0 = u(1, 0)
-    lsu_forward_data_lane0 = u(64, 0)
-    fwd_hit = [rob_forward_hit_lane0, stbuf_forward_hit_lane0, commit_store_match_lane0]
-    fwd_data = [rob_forward_data_lane0, stbuf_forward_data_lane0, commit_store_data]
-    for i in range(3):
-        hit = fwd_hit[i]
-        lsu_forward_hit_lane0 = lsu_forward_hit_lane0 | hit
-        lsu_forward_data_lane0 = hit._select_internal(fwd_data[i], lsu_forward_data_lane0)
-
-    lsu_block_lane0 = lsu_lsid_block_lane0 | (lsu_load_fire_raw & lsu_older_store_pending_lane0)
+        covers, data = store_forward_bytes(
+            m,
+            load_addr=ex0_addr,
+            store_valid=lsu_load_fire_raw & stbuf_valid[i],
+            store_addr=stbuf_addr[i],
+            store_size=stbuf_size[i],
+            store_data=stbuf_data[i],
+        )
+        stbuf_covers.append(covers)
+        stbuf_bytes.append(data)
+        stbuf_ages.append(u(sq_w, i) - stbuf_head)
+    stbuf_forward_mask_lane0, stbuf_forward_data_lane0 = merge_youngest_bytes(
+        m, covers=stbuf_covers, data=stbuf_bytes, ages=stbuf_ages
+    )
+    commit_covers, commit_bytes = store_forward_bytes(
+        m,
+        load_addr=ex0_addr,
+        store_valid=lsu_load_fire_raw & commit_store_fire,
+        store_addr=commit_store_addr,
+        store_size=commit_store_size,
+        store_data=commit_store_data,
+    )
+
+    # Per byte: in-flight ROB stores are younger than the committing store,
+    # which is younger than everything already in the store buffer.
+    fwd_mask_bits = []
+    fwd_bytes = []
+    for k in range(8):
+        rob_cov = rob_forward_mask_lane0[k]
+        stbuf_cov = stbuf_forward_mask_lane0[k]
+        byte = stbuf_forward_data_lane0[8 * k : 8 * k + 8]
+        byte = commit_bytes[k] if commit_covers[k] else byte
+        byte = rob_forward_data_lane0[8 * k : 8 * k + 8] if rob_cov else byte
+        fwd_mask_bits.append(rob_cov | commit_covers[k] | stbuf_cov)
+        fwd_bytes.append(byte)
+    lsu_forward_mask_lane0 = m.concat(*reversed(fwd_mask_bits))
+    lsu_forward_data_lane0 = m.concat(*reversed(fwd_bytes))
+
+    load_need_lane0 = load_byte_mask(m, size=ex0_size)
+    load_covered_lane0 = lsu_forward_mask_lane0 & load_need_lane0
+    lsu_forward_hit_lane0 = lsu_load_fire_raw & (load_covered_lane0 == load_need_lane0)
+    lsu_forward_partial_lane0 = lsu_load_fire_raw & (load_covered_lane0 != u(8, 0)) & (~lsu_forward_hit_lane0)
+
+    if mdp_en:
+        lsu_mdp_wait_lane0 = lsu_load_fire_raw & mdp_pred_valid_lane0 & rob_mdp_store_pending_lane0
+        # The violation check runs once, at the store's writeback, against
+        # loads that are already done. A store that issued before this load
+        # writes back before the load is done and would never see it, so the
+        # load may only pass stores that have not issued yet.
+        lsu_store_wait_lane0 = lsu_mdp_wait_lane0 | (lsu_load_fire_raw & older_store_inflight_lane0)
+    else:
+        lsu_mdp_wait_lane0 = u(1, 0)
+        lsu_store_wait_lane0 = lsu_load_fire_raw & lsu_older_store_pending_lane0
+
+    lsu_block_lane0 = lsu_lsid_block_lane0 | lsu_store_wait_lane0 | lsu_forward_partial_lane0
     issue_fire_lane0_eff = issue_fire_lane0_raw & (~lsu_block_lane0)
+    lsu_spec_issue_lane0 = issue_fire_lane0_eff & ex0_is_load & lsu_older_store_pending_lane0
     lsu_lsid_issue_advance = issue_fire_lane0_eff & (ex0_is_load | ex0_is_store)
 
     m.output("lsu_mem_fire_raw", lsu_mem_fire_raw)
@@ -168,8 +239,124 @@ def build_lsu_stage(
     m.output("lsu_lsid_block_lane0", lsu_lsid_block_lane0)
     m.output("lsu_older_store_pending_lane0", lsu_older_store_pending_lane0)
     m.output("lsu_forward_hit_lane0", lsu_forward_hit_lane0)
+    m.output("lsu_forward_partial_lane0", lsu_forward_partial_lane0)
+    m.output("lsu_forward_mask_lane0", lsu_forward_mask_lane0)
     m.output("lsu_forward_data_lane0", lsu_forward_data_lane0)
     m.output("lsu_block_lane0", lsu_block_lane0)
+    m.output("lsu_mdp_wait_lane0", lsu_mdp_wait_lane0)
+    m.output("lsu_spec_issue_lane0", lsu_spec_issue_lane0)
     m.output("issue_fire_lane0_eff", issue_fire_lane0_eff)
     m.output("lsu_lsid_issue_advance", lsu_lsid_issue_advance)
     m.output("lsid_issue_next", ex0_lsid + u(32, 1))
+
+
+@module(name="LinxCoreLsuStoreInflight")
+def build_lsu_store_inflight(
+    m: Circuit,
+    *,
+    rob_w: int = 6,
+    store_slots: int = 6,
+) -> None:
+    """Whether a store older than the lane-0 load is issued but not written back.
+
+    Each `st_valid{i}`/`st_rob{i}` pair is one store issuing this cycle or
+    sitting in an execution-pipe stage; age is the ROB distance from
+    `rob_head`.
+    """
+    if rob_w <= 0:
+        raise ValueError("rob_w must be > 0")
+    if store_slots <= 0:
+        raise ValueError("store_slots must be > 0")
+
+    rob_head = m.input("rob_head", width=rob_w)
+    ld_rob = m.input("ld_rob", width=rob_w)
+    ld_age = ld_rob - rob_head
+
+    older = u(1, 0)
+    for i in range(int(store_slots)):
+        st_valid = m.input(f"st_valid{i}", width=1)
+        st_rob = m.input(f"st_rob{i}", width=rob_w)
+        older = older | (st_valid & (st_rob - rob_head).ult(ld_age))
+
+    m.output("older_store_inflight", older)
+
+
+@module(name="LinxCoreLsuMdp")
+def build_lsu_mdp(
+    m: Circuit,
+    *,
+    rob_w: int = 6,
+    mdp_entries: int = 64,
+    mdp_tag_w: int = 10,
+    mdp_clear_w: int = 16,
+) -> None:
+    """Store-distance memory-dependence predictor for the lane-0 load.
+
+    A direct-mapped table indexed by load PC records, for loads that caused an
+    ordering violation, the ROB distance back to the store they read from. A
+    load that hits predicts a dependence on the store at that distance
+    (`mdp_pred_store_rob`); every other load may issue past older unresolved
+    stores. Each violation replay (re)trains the load's entry, and the whole
+    table is cleared every `2**mdp_clear_w` cycles so stale dependences age
+    out, as with store-set tables.
+    """
+    if rob_w <= 0:
+        raise ValueError("rob_w must be > 0")
+    if mdp_entries < 2 or (mdp_entries & (mdp_entries - 1)):
+        raise ValueError("mdp_entries must be a power of two >= 2")
+    if mdp_tag_w <= 0:
+        raise ValueError("mdp_tag_w must be > 0")
+    if mdp_clear_w <= 0 or mdp_clear_w > 32:
+        raise ValueError("mdp_clear_w must be in [1, 32]")
+    idx_w = (mdp_entries - 1).bit_length()
+    # Instructions are 2-byte aligned; bit 0 never distinguishes loads.
+    idx_lo = 1
+    tag_lo = idx_lo + idx_w
+    if tag_lo + mdp_tag_w > 64:
+        raise ValueError("mdp_entries/mdp_tag_w exceed the 64-bit PC")
+
+    clk = m.clock("clk")
+    rst = m.reset("rst")
+
+    ld_valid = m.input("ld_valid", width=1)
+    ld_pc = m.input("ld_pc", width=64)
+    ld_rob = m.input("ld_rob", width=rob_w)
+    train_valid = m.input("train_valid", width=1)
+    train_pc = m.input("train_pc", width=64)
+    train_load_rob = m.input("train_load_rob", width=rob_w)
+    train_store_rob = m.input("train_store_rob", width=rob_w)
+
+    with m.scope("mdp"):
+        ent_valid = []
+        ent_tag = []
+        ent_dist = []
+        for i in range(mdp_entries):
+            ent_valid.append(m.out(f"valid{i}", clk=clk, rst=rst, width=1, init=u(1, 0), en=u(1, 1)))
+            ent_tag.append(m.out(f"tag{i}", clk=clk, rst=rst, width=mdp_tag_w, init=u(mdp_tag_w, 0), en=u(1, 1)))
+            ent_dist.append(m.out(f"dist{i}", clk=clk, rst=rst, width=rob_w, init=u(rob_w, 0), en=u(1, 1)))
+        clear_ctr = m.out("clear_ctr", clk=clk, rst=rst, width=mdp_clear_w, init=u(mdp_clear_w, 0), en=u(1, 1))
+
+    ld_idx = ld_pc[idx_lo:tag_lo]
+    ld_tag = ld_pc[tag_lo : tag_lo + mdp_tag_w]
+    hit_valid = mux_by_uindex(m, idx=ld_idx, items=ent_valid, default=u(1, 0))
+    hit_tag = mux_by_uindex(m, idx=ld_idx, items=ent_tag, default=u(mdp_tag_w, 0))
+    hit_dist = mux_by_uindex(m, idx=ld_idx, items=ent_dist, default=u(rob_w, 0))
+    pred_valid = ld_valid & hit_valid & (hit_tag == ld_tag)
+    pred_store_rob = ld_rob - hit_dist
+
+    train_idx = train_pc[idx_lo:tag_lo]
+    train_tag = train_pc[tag_lo : tag_lo + mdp_tag_w]
+    train_dist = train_load_rob - train_store_rob
+    clear_all = clear_ctr.out() == u(mdp_clear_w, (1 << mdp_clear_w) - 1)
+    for i in range(mdp_entries):
+        do_train = train_valid & (train_idx == u(idx_w, i))
+        v_next = ent_valid[i].out()
+        v_next = u(1, 0) if clear_all else v_next
+        v_next = u(1, 1) if do_train else v_next
+        ent_valid[i].set(v_next)
+        ent_tag[i].set(train_tag, when=do_train)
+        ent_dist[i].set(train_dist, when=do_train)
+    clear_ctr.set(clear_ctr.out() + u(mdp_clear_w, 1))
+
+    m.output("mdp_pred_valid", pred_valid)
+    m.output("mdp_pred_store_rob", pred_store_rob)
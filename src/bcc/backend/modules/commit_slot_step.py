@@ -77,7 +77,6 @@ COMMIT_SLOT_INPUT_FIELD_SPECS = (
     ("br_corr_checkpoint_id", 6),
     ("replay_pending", 1),
     ("replay_store_rob", 6),
-    ("replay_pc", 64),
     ("ret_ra_val", 64),
     ("macro_saved_ra", 64),
     ("brob_active_allocated", 1),
@@ -216,7 +215,6 @@ def build_commit_slot_step(m: Circuit) -> None:
     br_corr_checkpoint_id = fields["br_corr_checkpoint_id"]
     replay_pending = fields["replay_pending"]
     replay_store_rob = fields["replay_store_rob"]
-    replay_pc = fields["replay_pc"]
     ret_ra_val = fields["ret_ra_val"]
     macro_saved_ra = fields["macro_saved_ra"]
     brob_active_allocated = fields["brob_active_allocated"]
@@ -331,13 +329,14 @@ def build_commit_slot_step(m: Circuit) -> None:
 
     is_halt = _op_is(m, op, OP_EBREAK, OP_INVALID)
     redirect_pre = effect_pre & ((is_boundary & br_take_eff) | is_bstart_mid)
+    # An ordering-violation replay restarts right after the violated store:
+    # everything younger (including the load that read stale data) refetches.
     replay_redirect_pre = effect_pre & rob_is_store & replay_pending & commit_idx.__eq__(replay_store_rob)
     replay_redirect_fire = replay_redirect_pre._select_internal(c(1, width=1), replay_redirect_fire)
 
     fret_redirect = effect_pre & is_fret & (~redirect_pre)
     pc_next = fret_redirect._select_internal(fret_target, pc_next)
     redirect_pre = redirect_pre | fret_redirect
-    pc_next = replay_redirect_pre._select_internal(replay_pc, pc_next)
     redirect_pre = redirect_pre | replay_redirect_pre
 
     fire = fire_pre & ((~rob_is_store) | ((~commit_store_seen) & stbuf_has_space))
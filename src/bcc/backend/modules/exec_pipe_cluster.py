@@ -11,6 +11,9 @@ def _pack_bus(m: Circuit, values):
     return m.concat(*reversed(values))
 
 
+EXEC_PIPE_STAGES = ("p1", "i1", "i2", "e1", "w1", "w2")
+
+
 @module(name="LinxCoreBackendExecPipe")
 def build_backend_exec_pipe(
     m: Circuit,
@@ -35,7 +38,7 @@ def build_backend_exec_pipe(
     issue_pack = m.input("issue_pack", width=issue_w * issue_bundle_w)
     aux_in_pack = m.input("aux_in_pack", width=22 + 64)
 
-    stage_names = ("p1", "i1", "i2", "e1", "w1", "w2")
+    stage_names = EXEC_PIPE_STAGES
     field_widths = {
         "uid": 64,
         "pc": 64,
@@ -138,6 +141,7 @@ def build_backend_exec_pipe(
             m.output(f"probe_{stage}_uid_{slot}", regs[stage]["uid"][slot].out())
             m.output(f"probe_{stage}_pc_{slot}", regs[stage]["pc"][slot].out())
             m.output(f"probe_{stage}_rob_{slot}", regs[stage]["rob"][slot].out())
+            m.output(f"{stage}_store_{slot}_o", regs[stage]["valid"][slot].out() & regs[stage]["is_store"][slot].out())
 
     # I2 is the sole IQ release witness.  It is qualified by the same flush
     # rule used by the I2->E1 transfer so a cancelled attempt stays resident.
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pycircuit import Circuit, module
 
-from ..helpers import mask_bit
+from ..helpers import mask_bit, mux_by_uindex, select_oldest
 
 
 def _pack_lsb_first(m: Circuit, values):
@@ -232,24 +232,13 @@ def build_iq_bank_top(
         sp_rdy = mask_bit(m, mask=ready_mask, idx=srcp[i].out(), width=pregs)
         can_issue.append(valid[i].out() & (~inflight_mask.out().slice(lsb=i, width=1)) & sl_rdy & sr_rdy & sp_rdy)
 
-    pick_valid = []
-    pick_idx = []
-    for slot in range(issue_w):
-        v = c(0, width=1)
-        idx = c(0, width=iq_w)
-        best_age = c((1 << rob_w) - 1, width=rob_w)
-        for i in range(iq_depth):
-            cand_idx = c(i, width=iq_w)
-            exclude = c(0, width=1)
-            for prev in range(slot):
-                exclude = exclude | (pick_valid[prev] & pick_idx[prev].__eq__(cand_idx))
-            age = rob[i].out() + sub_head
-            take = can_issue[i] & (~exclude) & ((~v) | (age < best_age))
-            v = take._select_internal(c(1, width=1), v)
-            idx = take._select_internal(cand_idx, idx)
-            best_age = take._select_internal(age, best_age)
-        pick_valid.append(v)
-        pick_idx.append(idx)
+    pick_valid, pick_idx = select_oldest(
+        m,
+        ready=can_issue,
+        ages=[rob[i].out() + sub_head for i in range(iq_depth)],
+        width=issue_w,
+        idx_w=iq_w,
+    )
 
     observe = m.new(
         build_iq_bank_observe,
@@ -366,30 +355,18 @@ def build_iq_bank_top(
     for slot in range(issue_w):
         idx = pick_idx[slot]
         pick_valid_o = pick_valid[slot]
-        pick_rob_o = c(0, width=rob_w)
-        pick_op_o = c(0, width=12)
-        pick_pc_o = c(0, width=64)
-        pick_imm_o = c(0, width=64)
-        pick_srcl_o = c(0, width=ptag_w)
-        pick_srcr_o = c(0, width=ptag_w)
-        pick_srcr_type_o = c(0, width=2)
-        pick_shamt_o = c(0, width=6)
-        pick_srcp_o = c(0, width=ptag_w)
-        pick_pdst_o = c(0, width=ptag_w)
-        pick_has_dst_o = c(0, width=1)
-        for i in range(iq_depth):
-            hit = idx.__eq__(c(i, width=iq_w))
-            pick_rob_o = hit._select_internal(rob[i].out(), pick_rob_o)
-            pick_op_o = hit._select_internal(op[i].out(), pick_op_o)
-            pick_pc_o = hit._select_internal(pc[i].out(), pick_pc_o)
-            pick_imm_o = hit._select_internal(imm[i].out(), pick_imm_o)
-            pick_srcl_o = hit._select_internal(srcl[i].out(), pick_srcl_o)
-            pick_srcr_o = hit._select_internal(srcr[i].out(), pick_srcr_o)
-            pick_srcr_type_o = hit._select_internal(srcr_type[i].out(), pick_srcr_type_o)
-            pick_shamt_o = hit._select_internal(shamt[i].out(), pick_shamt_o)
-            pick_srcp_o = hit._select_internal(srcp[i].out(), pick_srcp_o)
-            pick_pdst_o = hit._select_internal(pdst[i].out(), pick_pdst_o)
-            pick_has_dst_o = hit._select_internal(has_dst[i].out(), pick_has_dst_o)
+        # Balanced mux trees keep the payload read log-depth in iq_depth.
+        pick_rob_o = mux_by_uindex(m, idx=idx, items=rob, default=c(0, width=rob_w))
+        pick_op_o = mux_by_uindex(m, idx=idx, items=op, default=c(0, width=12))
+        pick_pc_o = mux_by_uindex(m, idx=idx, items=pc, default=c(0, width=64))
+        pick_imm_o = mux_by_uindex(m, idx=idx, items=imm, default=c(0, width=64))
+        pick_srcl_o = mux_by_uindex(m, idx=idx, items=srcl, default=c(0, width=ptag_w))
+        pick_srcr_o = mux_by_uindex(m, idx=idx, items=srcr, default=c(0, width=ptag_w))
+        pick_srcr_type_o = mux_by_uindex(m, idx=idx, items=srcr_type, default=c(0, width=2))
+        pick_shamt_o = mux_by_uindex(m, idx=idx, items=shamt, default=c(0, width=6))
+        pick_srcp_o = mux_by_uindex(m, idx=idx, items=srcp, default=c(0, width=ptag_w))
+        pick_pdst_o = mux_by_uindex(m, idx=idx, items=pdst, default=c(0, width=ptag_w))
+        pick_has_dst_o = mux_by_uindex(m, idx=idx, items=has_dst, default=c(0, width=1))
         m.output(f"issue_pick_valid{slot}_o", pick_valid_o)
         m.output(f"issue_pick_idx{slot}_o", idx)
         m.output(f"issue_pick_rob{slot}_o", pick_rob_o)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from pycircuit import Circuit, module
+from pycircuit import Circuit, module, u
 
 from common.isa import BK_COND, BK_RET, TRAP_BRU_RECOVERY_NOT_BSTART
 from common.util import make_consts
+from ..helpers import byte_ranges_overlap
 
 
 @module(name="LinxCorePreciseTrapControlStage")
@@ -310,35 +311,41 @@ def build_lsu_violation_detect_stage(
     rob_depth: int = 64,
     rob_w: int = 6,
 ) -> None:
-    c = m.const
-
     replay_pending = m.input("replay_pending", width=1)
+    replay_store_rob = m.input("replay_store_rob", width=rob_w)
     sub_head = m.input("sub_head", width=rob_w)
 
     store_fires = []
     store_robs = []
     store_addrs = []
+    store_sizes = []
     for slot in range(issue_w):
         store_fires.append(m.input(f"store_fire{slot}", width=1))
         store_robs.append(m.input(f"store_rob{slot}", width=rob_w))
         store_addrs.append(m.input(f"store_addr{slot}", width=64))
+        store_sizes.append(m.input(f"store_size{slot}", width=4))
 
     rob_valid = []
     rob_done = []
     rob_is_load = []
     rob_load_addr = []
+    rob_load_size = []
     rob_pc = []
     for i in range(rob_depth):
         rob_valid.append(m.input(f"rob_valid{i}", width=1))
         rob_done.append(m.input(f"rob_done{i}", width=1))
         rob_is_load.append(m.input(f"rob_is_load{i}", width=1))
         rob_load_addr.append(m.input(f"rob_load_addr{i}", width=64))
+        rob_load_size.append(m.input(f"rob_load_size{i}", width=4))
         rob_pc.append(m.input(f"rob_pc{i}", width=64))
 
-    replay_set = c(0, width=1)
-    replay_set_store_rob = c(0, width=rob_w)
-    replay_set_pc = c(0, width=64)
-    max_age = c((1 << rob_w) - 1, width=rob_w)
+    replay_set = u(1, 0)
+    replay_set_store_rob = u(rob_w, 0)
+    replay_set_load_rob = u(rob_w, 0)
+    replay_set_pc = u(64, 0)
+    replay_set_dist = u(rob_w, 0)
+    replay_pending_dist = replay_store_rob + sub_head
+    max_age = u(rob_w, (1 << rob_w) - 1)
 
     for slot in range(issue_w):
         st_fire = store_fires[slot]
@@ -346,27 +353,42 @@ def build_lsu_violation_detect_stage(
         st_addr = store_addrs[slot]
         st_dist = st_rob + sub_head
 
-        hit = c(0, width=1)
-        hit_pc = c(0, width=64)
+        hit = u(1, 0)
+        hit_pc = u(64, 0)
+        hit_rob = u(rob_w, 0)
         hit_age = max_age
         for i in range(rob_depth):
-            idx = c(i, width=rob_w)
+            idx = u(rob_w, i)
             dist = idx + sub_head
             younger = st_dist.ult(dist)
             ld_done = rob_valid[i] & rob_done[i] & rob_is_load[i]
-            addr_match = rob_load_addr[i].__eq__(st_addr)
-            cand = st_fire & ld_done & younger & addr_match
+            overlap = byte_ranges_overlap(
+                m,
+                a_addr=rob_load_addr[i],
+                a_size=rob_load_size[i],
+                b_addr=st_addr,
+                b_size=store_sizes[slot],
+            )
+            cand = st_fire & ld_done & younger & overlap
             better = (~hit) | dist.ult(hit_age)
             take = cand & better
-            hit = take._select_internal(c(1, width=1), hit)
-            hit_age = take._select_internal(dist, hit_age)
-            hit_pc = take._select_internal(rob_pc[i], hit_pc)
-
-        set_this = hit & (~replay_pending) & (~replay_set)
-        replay_set = set_this._select_internal(c(1, width=1), replay_set)
-        replay_set_store_rob = set_this._select_internal(st_rob, replay_set_store_rob)
-        replay_set_pc = set_this._select_internal(hit_pc, replay_set_pc)
+            hit = u(1, 1) if take else hit
+            hit_age = dist if take else hit_age
+            hit_pc = rob_pc[i] if take else hit_pc
+            hit_rob = idx if take else hit_rob
+
+        # Replay restarts after the violated store, so the oldest violating
+        # store wins: its restart also covers any younger pending replay.
+        older_than_pending = (~replay_pending) | st_dist.ult(replay_pending_dist)
+        older_than_set = (~replay_set) | st_dist.ult(replay_set_dist)
+        set_this = hit & older_than_pending & older_than_set
+        replay_set = u(1, 1) if set_this else replay_set
+        replay_set_store_rob = st_rob if set_this else replay_set_store_rob
+        replay_set_load_rob = hit_rob if set_this else replay_set_load_rob
+        replay_set_pc = hit_pc if set_this else replay_set_pc
+        replay_set_dist = st_dist if set_this else replay_set_dist
 
     m.output("replay_set", replay_set)
     m.output("replay_set_store_rob", replay_set_store_rob)
+    m.output("replay_set_load_rob", replay_set_load_rob)
     m.output("replay_set_pc", replay_set_pc)
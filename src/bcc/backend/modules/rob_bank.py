@@ -3,7 +3,7 @@ from __future__ import annotations
 from pycircuit import Circuit, const, function, module, spec
 
 from common.util import make_consts
-from ..helpers import onehot_from_tag
+from ..helpers import merge_youngest_bytes, onehot_from_tag, store_forward_bytes
 from .index_mux import banked_mux_by_uindex
 from .recovery_checks import build_lsu_violation_detect_stage
 from ..rob import (
@@ -448,6 +448,8 @@ def build_rob_lsu_store_scan_stage(
     ex0_is_load = m.input("ex0_is_load", width=1)
     ex0_addr = m.input("ex0_addr", width=64)
     ex0_rob = m.input("ex0_rob", width=rob_w)
+    ex0_mdp_pred_valid = m.input("ex0_mdp_pred_valid", width=1)
+    ex0_mdp_pred_store_rob = m.input("ex0_mdp_pred_store_rob", width=rob_w)
     sub_head = m.input("sub_head", width=rob_w)
 
     rob_valid = [m.input(f"rob_valid{i}", width=1) for i in range(rob_depth)]
@@ -455,13 +457,18 @@ def build_rob_lsu_store_scan_stage(
     rob_is_store = [m.input(f"rob_is_store{i}", width=1) for i in range(rob_depth)]
     rob_store_addr = [m.input(f"rob_store_addr{i}", width=64) for i in range(rob_depth)]
     rob_store_data = [m.input(f"rob_store_data{i}", width=64) for i in range(rob_depth)]
+    rob_store_size = [m.input(f"rob_store_size{i}", width=4) for i in range(rob_depth)]
 
     lsu_load_fire_raw = issue_fire_lane0_raw & ex0_is_load
     lsu_load_dist = ex0_rob + sub_head
     older_store_pending = c(0, width=1)
-    forward_hit = c(0, width=1)
-    forward_data = c(0, width=64)
+    pred_store_pending = c(0, width=1)
+    fwd_covers = []
+    fwd_bytes = []
+    fwd_ages = []
 
+    # Byte-granular CAM over every older executed store; per byte the
+    # youngest covering store wins (age = distance from the ROB head).
     for i in range(rob_depth):
         idx = c(i, width=rob_w)
         dist = idx + sub_head
@@ -469,13 +476,26 @@ def build_rob_lsu_store_scan_stage(
         st = rob_valid[i] & rob_is_store[i] & older
         st_pending = st & (~rob_done[i])
         st_ready = st & rob_done[i]
-        st_match = st_ready & rob_store_addr[i].__eq__(ex0_addr)
         older_store_pending = older_store_pending | (lsu_load_fire_raw & st_pending)
-        forward_hit = forward_hit | (lsu_load_fire_raw & st_match)
-        forward_data = (lsu_load_fire_raw & st_match)._select_internal(rob_store_data[i], forward_data)
+        pred_hit = ex0_mdp_pred_valid & idx.__eq__(ex0_mdp_pred_store_rob)
+        pred_store_pending = pred_store_pending | (lsu_load_fire_raw & st_pending & pred_hit)
+        covers, data = store_forward_bytes(
+            m,
+            load_addr=ex0_addr,
+            store_valid=lsu_load_fire_raw & st_ready,
+            store_addr=rob_store_addr[i],
+            store_size=rob_store_size[i],
+            store_data=rob_store_data[i],
+        )
+        fwd_covers.append(covers)
+        fwd_bytes.append(data)
+        fwd_ages.append(dist)
+    forward_mask, forward_data = merge_youngest_bytes(m, covers=fwd_covers, data=fwd_bytes, ages=fwd_ages)
 
     m.output("older_store_pending_o", older_store_pending)
-    m.output("forward_hit_o", forward_hit)
+    m.output("pred_store_pending_o", pred_store_pending)
+    m.output("forward_hit_o", forward_mask != c(0, width=8))
+    m.output("forward_mask_o", forward_mask)
     m.output("forward_data_o", forward_data)
 
 
@@ -1375,10 +1395,13 @@ def build_rob_bank_top(
         width=issue_w * wb_slot_width,
     )
     replay_pending = m.input("replay_pending", width=1)
+    replay_store_rob = m.input("replay_store_rob", width=rob_w)
     issue_fire_lane0_raw = m.input("issue_fire_lane0_raw", width=1)
     ex0_is_load = m.input("ex0_is_load", width=1)
     ex0_addr = m.input("ex0_addr", width=64)
     ex0_rob = m.input("ex0_rob", width=rob_w)
+    ex0_mdp_pred_valid = m.input("ex0_mdp_pred_valid", width=1)
+    ex0_mdp_pred_store_rob = m.input("ex0_mdp_pred_store_rob", width=rob_w)
     meta_query_idx_pack = m.input("meta_query_idx_pack", width=meta_query_slots * rob_w)
 
     disp_valids = []
@@ -1716,6 +1739,8 @@ def build_rob_bank_top(
         "ex0_is_load": ex0_is_load,
         "ex0_addr": ex0_addr,
         "ex0_rob": ex0_rob,
+        "ex0_mdp_pred_valid": ex0_mdp_pred_valid,
+        "ex0_mdp_pred_store_rob": ex0_mdp_pred_store_rob,
         "sub_head": sub_head,
     }
     for i in range(rob_depth):
@@ -1724,6 +1749,7 @@ def build_rob_bank_top(
         lsu_store_scan_bind[f"rob_is_store{i}"] = entry_outputs["is_store"][i]
         lsu_store_scan_bind[f"rob_store_addr{i}"] = entry_outputs["store_addr"][i]
         lsu_store_scan_bind[f"rob_store_data{i}"] = entry_outputs["store_data"][i]
+        lsu_store_scan_bind[f"rob_store_size{i}"] = entry_outputs["store_size"][i]
     lsu_store_scan = m.new(
         build_rob_lsu_store_scan_stage,
         name="rob_lsu_store_scan",
@@ -1733,17 +1759,20 @@ def build_rob_bank_top(
 
     lsu_violation_bind = {
         "replay_pending": replay_pending,
+        "replay_store_rob": replay_store_rob,
         "sub_head": sub_head,
     }
     for slot in range(issue_w):
         lsu_violation_bind[f"store_fire{slot}"] = store_fires[slot]
         lsu_violation_bind[f"store_rob{slot}"] = wb_robs[slot]
         lsu_violation_bind[f"store_addr{slot}"] = ex_addrs[slot]
+        lsu_violation_bind[f"store_size{slot}"] = ex_sizes[slot]
     for i in range(rob_depth):
         lsu_violation_bind[f"rob_valid{i}"] = entry_outputs["valid"][i]
         lsu_violation_bind[f"rob_done{i}"] = entry_outputs["done"][i]
         lsu_violation_bind[f"rob_is_load{i}"] = entry_outputs["is_load"][i]
         lsu_violation_bind[f"rob_load_addr{i}"] = entry_outputs["load_addr"][i]
+        lsu_violation_bind[f"rob_load_size{i}"] = entry_outputs["load_size"][i]
         lsu_violation_bind[f"rob_pc{i}"] = entry_outputs["pc"][i]
     lsu_violation = m.new(
         build_lsu_violation_detect_stage,
@@ -1808,9 +1837,12 @@ def build_rob_bank_top(
     m.output("flush_survivor_pdst_mask_o", flush_survivor_pdst_mask)
     m.output("lsu_older_store_pending_lane0_o", lsu_store_scan["older_store_pending_o"])
     m.output("lsu_forward_hit_lane0_o", lsu_store_scan["forward_hit_o"])
+    m.output("lsu_forward_mask_lane0_o", lsu_store_scan["forward_mask_o"])
+    m.output("lsu_mdp_store_pending_lane0_o", lsu_store_scan["pred_store_pending_o"])
     m.output("lsu_forward_data_lane0_o", lsu_store_scan["forward_data_o"])
     m.output("lsu_violation_replay_set_o", lsu_violation["replay_set"])
     m.output("lsu_violation_replay_store_rob_o", lsu_violation["replay_set_store_rob"])
+    m.output("lsu_violation_replay_load_rob_o", lsu_violation["replay_set_load_rob"])
     m.output("lsu_violation_replay_pc_o", lsu_violation["replay_set_pc"])
 
     meta_specs = rob_meta_query_slot_field_defs(m)
@@ -96,7 +96,7 @@ from common.util import make_consts
 from ..code_template_unit import build_code_template_unit
 from ..commit import _op_is, build_commit_ctrl_stage, build_commit_head_stage, is_setc_any, is_setc_tgt
 from ..helpers import mask_bit, mux_by_uindex, onehot_from_tag
-from ..lsu import build_lsu_stage
+from ..lsu import build_lsu_mdp, build_lsu_stage, build_lsu_store_inflight
 from .dispatch_frontend import (
     DECODE_SLOT_FIELD_SPECS,
     STAGE_NAMES,
@@ -113,7 +113,7 @@ from .commit_slot_step import (
 )
 from .commit_redirect import build_commit_redirect
 from .commit_trace_stage import build_commit_trace_stage
-from .exec_pipe_cluster import build_backend_exec_pipe
+from .exec_pipe_cluster import EXEC_PIPE_STAGES, build_backend_exec_pipe
 from .exec_uop_wrap import build_exec_uop
 from .ingress_decode import build_ingress_decode
 from .iq_bank import build_iq_bank_top
@@ -915,6 +915,8 @@ def _build_trace_export_core(
     rob_ex0_is_load = m.new_wire(width=1)
     rob_ex0_addr = m.new_wire(width=64)
     rob_ex0_rob = m.new_wire(width=p.rob_w)
+    rob_ex0_mdp_pred_valid = m.new_wire(width=1)
+    rob_ex0_mdp_pred_store_rob = m.new_wire(width=p.rob_w)
     rob_meta_query_slots = p.issue_w + 1 + 4
     rob_meta_query_idxs = [m.new_wire(width=p.rob_w) for _ in range(rob_meta_query_slots)]
 
@@ -928,10 +930,13 @@ def _build_trace_export_core(
         "dispatch_fire": rob_dispatch_fire,
         "commit_fire_mask": pack_bus(rob_commit_fires),
         "replay_pending": state.replay_pending.out(),
+        "replay_store_rob": state.replay_store_rob.out(),
         "issue_fire_lane0_raw": rob_issue_fire_lane0_raw,
         "ex0_is_load": rob_ex0_is_load,
         "ex0_addr": rob_ex0_addr,
         "ex0_rob": rob_ex0_rob,
+        "ex0_mdp_pred_valid": rob_ex0_mdp_pred_valid,
+        "ex0_mdp_pred_store_rob": rob_ex0_mdp_pred_store_rob,
     }
     rob_disp_input_specs = rob_dispatch_input_slot_field_defs(m, rob_w=p.rob_w, ptag_w=p.ptag_w)
     rob_disp_slot_packs = []
@@ -1025,10 +1030,12 @@ def _build_trace_export_core(
         disp_rob_idxs.append(dispatch_fields["rob_idx"])
         disp_fires.append(dispatch_fields["fire"])
     rob_lsu_older_store_pending_lane0 = rob_bank["lsu_older_store_pending_lane0_o"]
-    rob_lsu_forward_hit_lane0 = rob_bank["lsu_forward_hit_lane0_o"]
+    rob_lsu_forward_mask_lane0 = rob_bank["lsu_forward_mask_lane0_o"]
+    rob_lsu_mdp_store_pending_lane0 = rob_bank["lsu_mdp_store_pending_lane0_o"]
     rob_lsu_forward_data_lane0 = rob_bank["lsu_forward_data_lane0_o"]
     rob_lsu_violation_replay_set = rob_bank["lsu_violation_replay_set_o"]
     rob_lsu_violation_replay_store_rob = rob_bank["lsu_violation_replay_store_rob_o"]
+    rob_lsu_violation_replay_load_rob = rob_bank["lsu_violation_replay_load_rob_o"]
     rob_lsu_violation_replay_pc = rob_bank["lsu_violation_replay_pc_o"]
     rob_issue_query_uop_uids = []
     rob_issue_query_parent_uids = []
@@ -1536,7 +1543,6 @@ def _build_trace_export_core(
             "br_corr_checkpoint_id": br_corr_checkpoint_id_live,
             "replay_pending": state.replay_pending.out(),
             "replay_store_rob": state.replay_store_rob.out(),
-            "replay_pc": state.replay_pc.out(),
             "ret_ra_val": ret_ra_val,
             "macro_saved_ra": state.macro_saved_ra.out(),
             "brob_active_allocated": brob_active_allocated_i,
@@ -1797,29 +1803,37 @@ def _build_trace_export_core(
     m.assign(rob_ex0_is_load, exs[0].is_load)
     m.assign(rob_ex0_addr, exs[0].addr)
     m.assign(rob_ex0_rob, uop_robs[0])
+    lsu_older_store_inflight_lane0 = m.new_wire(width=1)
     lsu_stage_args = {
         "issue_fire_lane0_raw": issue_fires[0],
         "ex0_is_load": exs[0].is_load,
         "ex0_is_store": exs[0].is_store,
         "ex0_addr": exs[0].addr,
+        "ex0_size": exs[0].size,
         "ex0_lsid": rob_issue_query_load_store_ids[0],
         "lsid_issue_ptr": state.lsid_issue_ptr.out(),
         "commit_store_fire": commit_store_fire,
         "commit_store_addr": commit_store_addr,
         "commit_store_data": commit_store_data,
+        "commit_store_size": commit_store_size,
         "rob_older_store_pending_lane0": rob_lsu_older_store_pending_lane0,
-        "rob_forward_hit_lane0": rob_lsu_forward_hit_lane0,
+        "rob_mdp_store_pending_lane0": rob_lsu_mdp_store_pending_lane0,
+        "mdp_pred_valid_lane0": rob_ex0_mdp_pred_valid,
+        "older_store_inflight_lane0": lsu_older_store_inflight_lane0,
+        "rob_forward_mask_lane0": rob_lsu_forward_mask_lane0,
         "rob_forward_data_lane0": rob_lsu_forward_data_lane0,
+        "stbuf_head": stbuf_head.out(),
     }
     for i in range(p.sq_entries):
         lsu_stage_args[f"stbuf_valid{i}"] = stbuf_valid[i].out()
         lsu_stage_args[f"stbuf_addr{i}"] = stbuf_addr[i].out()
         lsu_stage_args[f"stbuf_data{i}"] = stbuf_data[i].out()
+        lsu_stage_args[f"stbuf_size{i}"] = stbuf_size[i].out()
 
     lsu_stage = m.instance_auto(
         build_lsu_stage,
         name="lsu_stage",
-        params={"sq_entries": p.sq_entries, "sq_w": p.sq_w},
+        params={"sq_entries": p.sq_entries, "sq_w": p.sq_w, "mdp_en": int(p.mdp_entries > 0)},
         **lsu_stage_args,
     )
     lsu_load_fire_raw = lsu_stage["lsu_load_fire_raw"]
@@ -1831,6 +1845,29 @@ def _build_trace_export_core(
     lsu_lsid_issue_advance = lsu_stage["lsu_lsid_issue_advance"]
     lsid_issue_next = lsu_stage["lsid_issue_next"]
     issue_fires_eff[0] = lsu_stage["issue_fire_lane0_eff"]
+
+    # Memory-dependence predictor: trained on violation replays, it decides
+    # which older unresolved store (if any) the lane-0 load waits for.
+    if p.mdp_entries > 0:
+        lsu_mdp = m.instance_auto(
+            build_lsu_mdp,
+            name="lsu_mdp",
+            params={"rob_w": p.rob_w, "mdp_entries": p.mdp_entries},
+            clk=clk,
+            rst=rst,
+            ld_valid=issue_fires[0] & exs[0].is_load,
+            ld_pc=uop_pcs[0],
+            ld_rob=uop_robs[0],
+            train_valid=rob_lsu_violation_replay_set,
+            train_pc=rob_lsu_violation_replay_pc,
+            train_load_rob=rob_lsu_violation_replay_load_rob,
+            train_store_rob=rob_lsu_violation_replay_store_rob,
+        )
+        m.assign(rob_ex0_mdp_pred_valid, lsu_mdp["mdp_pred_valid"])
+        m.assign(rob_ex0_mdp_pred_store_rob, lsu_mdp["mdp_pred_store_rob"])
+    else:
+        m.assign(rob_ex0_mdp_pred_valid, consts.zero1)
+        m.assign(rob_ex0_mdp_pred_store_rob, c(0, width=p.rob_w))
     issue_fire = issue_fires_eff[0]
     lsid_issue_ptr_live = lsu_lsid_issue_advance._select_internal(lsid_issue_next, lsid_issue_ptr_live)
     lsid_complete_ptr_live = lsu_lsid_issue_advance._select_internal(lsid_issue_next, lsid_complete_ptr_live)
@@ -1869,7 +1906,6 @@ def _build_trace_export_core(
     # LSU violation replay state (updated after wb metadata is formed).
     replay_set = consts.zero1
     replay_set_store_rob = state.replay_store_rob.out()
-    replay_set_pc = state.replay_pc.out()
     lsu_violation_detected = consts.zero1
 
     # --- template macro engine (FENTRY/FEXIT/FRET.*) ---
@@ -2152,6 +2188,27 @@ def _build_trace_export_core(
     m.assign(iq_cmd_complete_fires[0], exec_pipe[f"i2_fire_{cmd_slot}_o"])
     m.assign(iq_cmd_complete_robs[0], exec_pipe[f"i2_rob_{cmd_slot}_o"])
 
+    # Stores between issue and writeback, older than the lane-0 load: a
+    # predicted-independent load must still wait for them (see lsu.py).
+    store_inflight_args = {"rob_head": rob_head, "ld_rob": uop_robs[0]}
+    store_inflight_slots = 0
+    for slot in range(1, p.lsu_w):
+        store_inflight_args[f"st_valid{store_inflight_slots}"] = issue_fires[slot] & exs[slot].is_store
+        store_inflight_args[f"st_rob{store_inflight_slots}"] = uop_robs[slot]
+        store_inflight_slots += 1
+    for stage in EXEC_PIPE_STAGES:
+        for slot in range(p.lsu_w):
+            store_inflight_args[f"st_valid{store_inflight_slots}"] = exec_pipe[f"{stage}_store_{slot}_o"]
+            store_inflight_args[f"st_rob{store_inflight_slots}"] = exec_pipe[f"probe_{stage}_rob_{slot}"]
+            store_inflight_slots += 1
+    lsu_store_inflight = m.instance_auto(
+        build_lsu_store_inflight,
+        name="lsu_store_inflight",
+        params={"rob_w": p.rob_w, "store_slots": store_inflight_slots},
+        **store_inflight_args,
+    )
+    m.assign(lsu_older_store_inflight_lane0, lsu_store_inflight["older_store_inflight"])
+
     w2_pack = exec_pipe["w2_pack_o"]
     aux_out_pack = exec_pipe["aux_out_pack_o"]
 
@@ -2220,7 +2277,6 @@ def _build_trace_export_core(
 
     replay_set = rob_lsu_violation_replay_set
     replay_set_store_rob = replay_set._select_internal(rob_lsu_violation_replay_store_rob, state.replay_store_rob.out())
-    replay_set_pc = replay_set._select_internal(rob_lsu_violation_replay_pc, state.replay_pc.out())
     lsu_violation_detected = replay_set
 
     # --- dispatch frontend cluster ---
@@ -2687,11 +2743,9 @@ def _build_trace_export_core(
         "state_flush_pending": state.flush_pending.out(),
         "state_replay_pending": state.replay_pending.out(),
         "state_replay_store_rob": state.replay_store_rob.out(),
-        "state_replay_pc": state.replay_pc.out(),
         "replay_redirect_fire": replay_redirect_fire,
         "replay_set": replay_set,
         "replay_set_store_rob": replay_set_store_rob,
-        "replay_set_pc": replay_set_pc,
     }
     for slot in range(p.commit_w):
         commit_ctrl_args[f"commit_fire{slot}"] = commit_fires[slot]
@@ -2712,7 +2766,6 @@ def _build_trace_export_core(
     state.flush_bid.set(flush_bid_n)
     state.replay_pending.set(commit_ctrl["replay_pending_next"])
     state.replay_store_rob.set(commit_ctrl["replay_store_rob_next"])
-    state.replay_pc.set(commit_ctrl["replay_pc_next"])
     trap_retire = consts.zero1
     for slot in range(p.commit_w):
         trap_retire = trap_retire | (commit_fires[slot] & commit_idxs[slot].__eq__(state.trap_rob.out()))
@@ -3302,5 +3355,5 @@ def _build_trace_export_core(
 
 
 @module(name="LinxCoreTraceExport")
-def build_trace_export(m: Circuit, *, mem_bytes: int = (1 << 20)) -> None:
-    _build_trace_export_core(m, mem_bytes=mem_bytes, params=None)
+def build_trace_export(m: Circuit, *, mem_bytes: int = (1 << 20), mdp_entries: int = 0) -> None:
+    _build_trace_export_core(m, mem_bytes=mem_bytes, params=OooParams(mdp_entries=mdp_entries))
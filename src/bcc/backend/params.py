@@ -37,6 +37,10 @@ class OooParams:
     # Committed store buffer depth (decouples store retirement from memory write).
     sq_entries: int = 32
 
+    # Memory-dependence predictor (store-distance table) entries; 0 keeps loads
+    # waiting for every older unresolved store.
+    mdp_entries: int = 0
+
     def __init__(
         self,
         *,
@@ -52,6 +56,7 @@ class OooParams:
         bru_w: int | None = None,
         lsu_w: int | None = None,
         sq_entries: int | None = None,
+        mdp_entries: int | None = None,
     ) -> None:
         if pregs is not None:
             self.pregs = int(pregs)
@@ -77,6 +82,8 @@ class OooParams:
             self.lsu_w = int(lsu_w)
         if sq_entries is not None:
             self.sq_entries = int(sq_entries)
+        if mdp_entries is not None:
+            self.mdp_entries = int(mdp_entries)
 
         if self.pregs <= 0:
             raise ValueError("pregs must be > 0")
@@ -113,6 +120,8 @@ class OooParams:
             raise ValueError("mapq_depth must be a power of two")
         if self.sq_entries & (self.sq_entries - 1):
             raise ValueError("sq_entries must be a power of two (wrap-friendly)")
+        if self.mdp_entries < 0 or self.mdp_entries == 1 or (self.mdp_entries & (self.mdp_entries - 1)):
+            raise ValueError("mdp_entries must be 0 or a power of two >= 2")
 
         # Bring-up backend constraint (C++ sim supports <=64-bit wires).
         if self.pregs > 64:
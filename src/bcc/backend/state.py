@@ -45,7 +45,6 @@ class CoreCtrlRegs:
     flush_bid: Reg
     replay_pending: Reg
     replay_store_rob: Reg
-    replay_pc: Reg
     trap_pending: Reg
     trap_rob: Reg
     trap_cause: Reg
@@ -205,7 +204,6 @@ def make_core_ctrl_regs(m: Circuit, clk: Signal, rst: Signal, *, boot_pc: Wire,
         replay_store_rob = m.out(
             "replay_store_rob", clk=clk, rst=rst, width=p.rob_w, init=c(0, width=p.rob_w), en=consts.one1
         )
-        replay_pc = m.out("replay_pc", clk=clk, rst=rst, width=64, init=boot_pc, en=consts.one1)
         trap_pending = m.out("trap_pending", clk=clk, rst=rst, width=1, init=consts.zero1, en=consts.one1)
         trap_rob = m.out("trap_rob", clk=clk, rst=rst, width=p.rob_w, init=c(0, width=p.rob_w), en=consts.one1)
         trap_cause = m.out("trap_cause", clk=clk, rst=rst, width=32, init=c(0, width=32), en=consts.one1)
@@ -261,7 +259,6 @@ def make_core_ctrl_regs(m: Circuit, clk: Signal, rst: Signal, *, boot_pc: Wire,
         flush_bid=flush_bid,
         replay_pending=replay_pending,
         replay_store_rob=replay_store_rob,
-        replay_pc=replay_pc,
         trap_pending=trap_pending,
         trap_rob=trap_rob,
         trap_cause=trap_cause,
@@ -1,10 +1,186 @@
 from __future__ import annotations
 
-from pycircuit import Circuit, module
+from pycircuit import Circuit, function, module, u
 
+from bcc.backend.helpers import mux_by_uindex
+from common.isa import BK_CALL, BK_COND, BK_FALL, BK_ICALL, BK_RET
+
+
+def _validate_bpu_params(
+    *,
+    btb_sets: int,
+    btb_ways: int,
+    btb_tag_bits: int,
+    bim_entries: int,
+    tage_tables: int,
+    tage_entries: int,
+    tage_tag_bits: int,
+    tage_hist_min: int,
+    ras_depth: int,
+) -> None:
+    for name, value in (
+        ("btb_sets", btb_sets),
+        ("btb_ways", btb_ways),
+        ("bim_entries", bim_entries),
+        ("tage_entries", tage_entries),
+        ("ras_depth", ras_depth),
+    ):
+        if value < 2 or (value & (value - 1)) != 0:
+            raise ValueError(f"{name} must be a power-of-two >= 2")
+    if btb_tag_bits <= 1 or btb_tag_bits > 16:
+        raise ValueError("btb_tag_bits must be in [2,16]")
+    if tage_tables < 0 or tage_tables > 4:
+        raise ValueError("tage_tables must be in [0,4]")
+    if tage_tag_bits <= 1 or tage_tag_bits > 16:
+        raise ValueError("tage_tag_bits must be in [2,16]")
+    if tage_hist_min <= 0 or (tage_hist_min << max(0, tage_tables - 1)) > 64:
+        raise ValueError("tage_hist_min must be > 0 and the longest history <= 64")
+
+
+def _fold(m: Circuit, hist, *, length: int, width: int):
+    """XOR-fold hist[0:length] down to `width` bits (zero-extended tail chunk)."""
+    out = None
+    for lo in range(0, length, width):
+        n = min(width, length - lo)
+        chunk = hist[lo : lo + n]
+        if n < width:
+            chunk = m.cat(u(width - n, 0), chunk)
+        out = chunk if out is None else out ^ chunk
+    return out
+
+
+@function
+def _sat_step(m: Circuit, ctr, up, *, width: int):
+    _ = m
+    nxt = ctr
+    nxt = (ctr + u(width, 1)) if (up & ctr.ult(u(width, (1 << width) - 1))) else nxt
+    nxt = (ctr - u(width, 1)) if ((~up) & ctr.ugt(u(width, 0))) else nxt
+    return nxt
+
+
+def _read(m: Circuit, items, idx, width: int):
+    return mux_by_uindex(m, idx=idx, items=items, default=u(width, 0))
+
+
+@function
+def _lookup(
+    m: Circuit,
+    pc,
+    ghist,
+    *,
+    btb_valid,
+    btb_tag,
+    btb_target,
+    btb_kind,
+    btb_repl,
+    bim_ctr,
+    tage_valid,
+    tage_tag,
+    tage_ctr,
+    tage_u,
+    btb_ways: int,
+    btb_tag_bits: int,
+    tage_tag_bits: int,
+    hist_lens: list[int],
+    set_w: int,
+    way_w: int,
+    bim_w: int,
+    tage_w: int,
+) -> dict:
+    """Read every table for `pc` against the current (committed) history."""
+    btb_sets = len(btb_repl)
+    out = {}
+    set_idx = pc[2 : 2 + set_w]
+    tag = pc[2 + set_w : 2 + set_w + btb_tag_bits]
+    hit = u(1, 0)
+    hit_way = u(way_w, 0)
+    target = u(64, 0)
+    kind = u(3, BK_FALL)
+    free = u(1, 0)
+    free_way = u(way_w, 0)
+    for w in range(btb_ways):
+        ways = [s * btb_ways + w for s in range(btb_sets)]
+        v_w = _read(m, [btb_valid[i] for i in ways], set_idx, 1)
+        hit_w = v_w & (_read(m, [btb_tag[i] for i in ways], set_idx, btb_tag_bits) == tag)
+        hit = hit | hit_w
+        hit_way = u(way_w, w) if hit_w else hit_way
+        target = _read(m, [btb_target[i] for i in ways], set_idx, 64) if hit_w else target
+        kind = _read(m, [btb_kind[i] for i in ways], set_idx, 3) if hit_w else kind
+        take_free = (~v_w) & (~free)
+        free_way = u(way_w, w) if take_free else free_way
+        free = free | (~v_w)
+    out["btb_set"] = set_idx
+    out["btb_tag"] = tag
+    out["btb_hit"] = hit
+    out["btb_way"] = hit_way
+    out["btb_victim"] = free_way if free else _read(m, btb_repl, set_idx, way_w)
+    out["btb_target"] = target
+    out["btb_kind"] = kind
+
+    bim_idx = pc[2 : 2 + bim_w]
+    bim = _read(m, bim_ctr, bim_idx, 2)
+    out["bim_idx"] = bim_idx
+    out["bim_ctr"] = bim
+
+    prov_pred = bim[1]
+    alt_pred = bim[1]
+    prov_hit = u(1, 0)
+    # 0 = bimodal, k + 1 = tagged table k.
+    prov_table = u(3, 0)
+    prov_u = u(2, 0)
+    tables = []
+    for k in range(len(hist_lens)):
+        t_idx = pc[2 : 2 + tage_w] ^ _fold(m, ghist, length=hist_lens[k], width=tage_w)
+        t_tag = pc[2 + tage_w : 2 + tage_w + tage_tag_bits] ^ _fold(
+            m, ghist, length=hist_lens[k], width=tage_tag_bits
+        )
+        t_ctr = _read(m, tage_ctr[k], t_idx, 3)
+        t_hit = _read(m, tage_valid[k], t_idx, 1) & (_read(m, tage_tag[k], t_idx, tage_tag_bits) == t_tag)
+        alt_pred = prov_pred if t_hit else alt_pred
+        prov_pred = t_ctr[2] if t_hit else prov_pred
+        prov_hit = prov_hit | t_hit
+        t_u = _read(m, tage_u[k], t_idx, 2)
+        prov_table = u(3, k + 1) if t_hit else prov_table
+        prov_u = t_u if t_hit else prov_u
+        tables.append({"idx": t_idx, "tag": t_tag, "ctr": t_ctr, "u": t_u, "hit": t_hit})
+    out["tables"] = tables
+    out["prov_hit"] = prov_hit
+    out["prov_table"] = prov_table
+    out["prov_u"] = prov_u
+    out["prov_pred"] = prov_pred
+    out["alt_pred"] = alt_pred
+    return out
+
+
+@module(name="LinxCoreBpu")
+def build_bpu(
+    m: Circuit,
+    *,
+    btb_sets: int = 16,
+    btb_ways: int = 2,
+    btb_tag_bits: int = 10,
+    bim_entries: int = 128,
+    tage_tables: int = 2,
+    tage_entries: int = 64,
+    tage_tag_bits: int = 8,
+    tage_hist_min: int = 4,
+    ras_depth: int = 8,
+) -> None:
+    """Block predictor: set-associative BTB, bimodal + tagged-history direction, RAS.
+
+    The BTB records each trained block's kind (`BK_*`) and taken target. A
+    hit on a `BK_COND` block takes the TAGE direction: the longest tagged
+    table whose (pc, folded global history) tag matches provides a 3-bit
+    counter, else the bimodal 2-bit counter does. Table `k` uses the newest
+    `tage_hist_min << k` history bits. `BK_RET` hits target the RAS top
+    (pushed with `update_fallthrough`); other non-fall kinds are always taken.
+
+    All state trains at `update_*` time from resolved blocks (history, RAS
+    push on `BK_CALL`/`BK_ICALL`, pop on `BK_RET`), so no speculative repair
+    is needed; the cost is that in-flight blocks are predicted with slightly
+    stale history.
+    """
 
-@module(name="LinxCoreBpuLite")
-def build_bpu_lite(m: Circuit, *, tag_bits: int = 8) -> None:
     clk = m.clock("clk")
     rst = m.reset("rst")
 
@@ -15,40 +191,203 @@ def build_bpu_lite(m: Circuit, *, tag_bits: int = 8) -> None:
     update_pc = m.input("update_pc", width=64)
     update_taken = m.input("update_taken", width=1)
     update_target = m.input("update_target", width=64)
+    update_kind = m.input("update_kind", width=3)
+    update_fallthrough = m.input("update_fallthrough", width=64)
+
+
+    _validate_bpu_params(
+        btb_sets=btb_sets,
+        btb_ways=btb_ways,
+        btb_tag_bits=btb_tag_bits,
+        bim_entries=bim_entries,
+        tage_tables=tage_tables,
+        tage_entries=tage_entries,
+        tage_tag_bits=tage_tag_bits,
+        tage_hist_min=tage_hist_min,
+        ras_depth=ras_depth,
+    )
+
+    set_w = (btb_sets - 1).bit_length()
+    way_w = (btb_ways - 1).bit_length()
+    bim_w = (bim_entries - 1).bit_length()
+    tage_w = (tage_entries - 1).bit_length()
+    ras_w = (ras_depth - 1).bit_length()
+    hist_lens = [tage_hist_min << k for k in range(tage_tables)]
+    ghist_w = max(1, hist_lens[-1] if hist_lens else 1)
+
+    def reg(name: str, width: int, init: int = 0):
+        return m.out(name, clk=clk, rst=rst, width=width, init=u(width, init), en=u(1, 1))
+
+    with m.scope("btb"):
+        btb_valid = []
+        btb_tag = []
+        btb_target = []
+        btb_kind = []
+        for s in range(btb_sets):
+            for w in range(btb_ways):
+                idx = s * btb_ways + w
+                btb_valid.append(reg(f"v{idx}", 1))
+                btb_tag.append(reg(f"tag{idx}", btb_tag_bits))
+                btb_target.append(reg(f"tgt{idx}", 64))
+                btb_kind.append(reg(f"kind{idx}", 3))
+        btb_repl = [reg(f"repl{s}", way_w) for s in range(btb_sets)]
+
+    with m.scope("bim"):
+        # Weakly not-taken, matching the former single-entry predictor.
+        bim_ctr = [reg(f"ctr{i}", 2, init=1) for i in range(bim_entries)]
+
+    tage_valid = []
+    tage_tag = []
+    tage_ctr = []
+    tage_u = []
+    for k in range(tage_tables):
+        with m.scope(f"tage{k}"):
+            tage_valid.append([reg(f"v{i}", 1) for i in range(tage_entries)])
+            tage_tag.append([reg(f"tag{i}", tage_tag_bits) for i in range(tage_entries)])
+            tage_ctr.append([reg(f"ctr{i}", 3, init=3) for i in range(tage_entries)])
+            tage_u.append([reg(f"u{i}", 2) for i in range(tage_entries)])
+
+    with m.scope("hist"):
+        ghist = reg("ghist", ghist_w)
+
+    with m.scope("ras"):
+        ras_stack = [reg(f"ra{i}", 64) for i in range(ras_depth)]
+        ras_tos = reg("tos", ras_w)
+        ras_count = reg("count", ras_w + 1)
+
+    lookup_args = {
+        "btb_valid": btb_valid,
+        "btb_tag": btb_tag,
+        "btb_target": btb_target,
+        "btb_kind": btb_kind,
+        "btb_repl": btb_repl,
+        "bim_ctr": bim_ctr,
+        "tage_valid": tage_valid,
+        "tage_tag": tage_tag,
+        "tage_ctr": tage_ctr,
+        "tage_u": tage_u,
+        "btb_ways": btb_ways,
+        "btb_tag_bits": btb_tag_bits,
+        "tage_tag_bits": tage_tag_bits,
+        "hist_lens": hist_lens,
+        "set_w": set_w,
+        "way_w": way_w,
+        "bim_w": bim_w,
+        "tage_w": tage_w,
+    }
+
+    # --- Predict ----------------------------------------------------------
+    ras_top = _read(m, ras_stack, ras_tos.out(), 64)
+    ras_nonempty = ras_count.out() != u(ras_w + 1, 0)
 
-    c = m.const
+    req = _lookup(m, req_pc, ghist.out(), **lookup_args)
+    req_is_cond = req["btb_kind"] == u(3, BK_COND)
+    req_is_ret = req["btb_kind"] == u(3, BK_RET)
+    req_is_fall = req["btb_kind"] == u(3, BK_FALL)
+    req_taken = req["btb_hit"] & (req["prov_pred"] if req_is_cond else ~req_is_fall)
+    req_target = ras_top if (req_is_ret & ras_nonempty) else req["btb_target"]
 
-    if tag_bits <= 1 or tag_bits > 16:
-        raise ValueError("tag_bits must be in [2,16]")
+    pred_taken = req_valid & req_taken
+    pred_target = req_target if pred_taken else req_pc + u(64, 8)
 
-    with m.scope("pred"):
-        last_valid = m.out("last_valid", clk=clk, rst=rst, width=1, init=c(0, width=1), en=c(1, width=1))
-        last_tag = m.out("last_tag", clk=clk, rst=rst, width=tag_bits, init=c(0, width=tag_bits), en=c(1, width=1))
-        last_tgt = m.out("last_tgt", clk=clk, rst=rst, width=64, init=c(0, width=64), en=c(1, width=1))
-        ctr = m.out("ctr", clk=clk, rst=rst, width=2, init=c(1, width=2), en=c(1, width=1))
+    # --- Train ------------------------------------------------------------
+    upd = _lookup(m, update_pc, ghist.out(), **lookup_args)
+    upd_is_fall = update_kind == u(3, BK_FALL)
+    upd_is_cond = update_valid & (update_kind == u(3, BK_COND))
+    upd_is_call = update_valid & ((update_kind == u(3, BK_CALL)) | (update_kind == u(3, BK_ICALL)))
+    upd_is_ret = update_valid & (update_kind == u(3, BK_RET))
 
-    req_tag = req_pc[2 : 2 + tag_bits]
-    upd_tag = update_pc[2 : 2 + tag_bits]
+    # BTB: refresh a hit in place; allocate only blocks that were taken so
+    # never-taken conditionals do not evict useful entries.
+    btb_we = update_valid & (~upd_is_fall) & (upd["btb_hit"] | update_taken)
+    btb_alloc = btb_we & (~upd["btb_hit"])
+    btb_way = upd["btb_way"] if upd["btb_hit"] else upd["btb_victim"]
+    for s in range(btb_sets):
+        set_hit = upd["btb_set"] == u(set_w, s)
+        btb_repl[s].set(btb_repl[s].out() + u(way_w, 1), when=btb_alloc & set_hit)
+        for w in range(btb_ways):
+            idx = s * btb_ways + w
+            we = btb_we & set_hit & (btb_way == u(way_w, w))
+            btb_valid[idx].set(u(1, 1), when=we)
+            btb_tag[idx].set(upd["btb_tag"], when=we)
+            btb_target[idx].set(update_target, when=we & update_taken)
+            btb_kind[idx].set(update_kind, when=we)
 
-    tag_hit = last_valid.out() & req_tag.__eq__(last_tag.out())
-    taken_conf = ctr.out()[1]
+    # Direction: the provider counter (or bimodal) learns the outcome; a
+    # mispredict allocates in the first longer table with a free useful slot.
+    prov_hit = upd["prov_hit"]
+    prov_correct = upd["prov_pred"] == update_taken
+    bim_we = upd_is_cond & (~prov_hit)
+    bim_next = _sat_step(m, upd["bim_ctr"], update_taken, width=2)
+    for i in range(bim_entries):
+        bim_ctr[i].set(bim_next, when=bim_we & (upd["bim_idx"] == u(bim_w, i)))
 
-    pred_taken = req_valid & tag_hit & taken_conf
-    pred_target = pred_taken._select_internal(last_tgt.out(), req_pc + c(8, width=64))
+    mispred = upd_is_cond & (~prov_correct)
+    longer = []
+    newer_hit = u(1, 0)
+    for k in reversed(range(tage_tables)):
+        newer_hit = newer_hit | upd["tables"][k]["hit"]
+        longer.insert(0, ~newer_hit)
+    avail_seen = u(1, 0)
+    alloc = []
+    decays = []
+    for k in range(tage_tables):
+        avail_k = longer[k] & (upd["tables"][k]["u"] == u(2, 0))
+        alloc.append(mispred & avail_k & (~avail_seen))
+        avail_seen = avail_seen | avail_k
+    for k in range(tage_tables):
+        t = upd["tables"][k]
+        is_prov = t["hit"] & (longer[k + 1] if k + 1 < tage_tables else u(1, 1))
+        ctr_we = upd_is_cond & is_prov
+        u_we = ctr_we & (upd["prov_pred"] != upd["alt_pred"])
+        decay = mispred & longer[k] & (~avail_seen)
+        decays.append(decay)
+        ctr_init = u(3, 4) if update_taken else u(3, 3)
+        ctr_val = ctr_init if alloc[k] else _sat_step(m, t["ctr"], update_taken, width=3)
+        u_val = _sat_step(m, t["u"], prov_correct, width=2)
+        u_val = (t["u"] - u(2, 1)) if decay else u_val
+        u_val = u(2, 0) if alloc[k] else u_val
+        for i in range(tage_entries):
+            hit_i = t["idx"] == u(tage_w, i)
+            tage_valid[k][i].set(u(1, 1), when=alloc[k] & hit_i)
+            tage_tag[k][i].set(t["tag"], when=alloc[k] & hit_i)
+            tage_ctr[k][i].set(ctr_val, when=(ctr_we | alloc[k]) & hit_i)
+            tage_u[k][i].set(u_val, when=(u_we | decay | alloc[k]) & hit_i)
 
-    ctr_up = ctr.out()
-    ctr_up = (update_taken & ctr.out().ult(c(3, width=2)))._select_internal(ctr.out() + c(1, width=2), ctr_up)
-    ctr_up = ((~update_taken) & ctr.out().ugt(c(0, width=2)))._select_internal(ctr.out() - c(1, width=2), ctr_up)
+    # Global history: newest outcome in bit 0, one bit per resolved block.
+    hist_we = update_valid & (~upd_is_fall)
+    if ghist_w > 1:
+        ghist.set(m.cat(ghist.out()[0 : ghist_w - 1], update_taken), when=hist_we)
+    else:
+        ghist.set(update_taken, when=hist_we)
 
-    last_valid.set(update_valid._select_internal(c(1, width=1), last_valid.out()))
-    last_tag.set(upd_tag, when=update_valid)
-    last_tgt.set(update_target, when=update_valid)
-    ctr.set(ctr_up, when=update_valid)
+    # RAS: circular; a full push overwrites the oldest return address.
+    push_tos = ras_tos.out() + u(ras_w, 1)
+    pop = upd_is_ret & ras_nonempty
+    for i in range(ras_depth):
+        ras_stack[i].set(update_fallthrough, when=upd_is_call & (push_tos == u(ras_w, i)))
+    tos_next = ras_tos.out()
+    tos_next = push_tos if upd_is_call else tos_next
+    tos_next = (ras_tos.out() - u(ras_w, 1)) if pop else tos_next
+    count_next = ras_count.out()
+    count_up = upd_is_call & ras_count.out().ult(u(ras_w + 1, ras_depth))
+    count_next = (ras_count.out() + u(ras_w + 1, 1)) if count_up else count_next
+    count_next = (ras_count.out() - u(ras_w + 1, 1)) if pop else count_next
+    ras_tos.set(tos_next)
+    ras_count.set(count_next)
 
     m.output("pred_valid", req_valid)
     m.output("pred_taken", pred_taken)
     m.output("pred_target", pred_target)
+    m.output("pred_btb_hit", req_valid & req["btb_hit"])
+    m.output("pred_kind", req["btb_kind"])
+    # Direction-predictor visibility for TAGE tuning and unit tests.
+    m.output("pred_provider", req["prov_table"])
+    m.output("pred_provider_u", req["prov_u"])
+    m.output("pred_alt_taken", req["alt_pred"])
+    m.output("update_alloc", m.concat(*reversed(alloc)) if alloc else u(1, 0))
+    m.output("update_decay", m.concat(*reversed(decays)) if decays else u(1, 0))
     m.output("checkpoint_id", req_pc[2:8])
 
 
-build_bpu_lite.__pycircuit_name__ = "LinxCoreBpuLite"
+build_bpu.__pycircuit_name__ = "LinxCoreBpu"
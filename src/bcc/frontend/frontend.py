@@ -3,7 +3,7 @@ from __future__ import annotations
 from pycircuit import Circuit, ct, module, spec
 
 from common.config import frontend_config
-from .bpu import build_bpu_lite
+from .bpu import build_bpu
 from .ftq import build_ftq_lite
 from .ibuffer import build_ibuffer
 from .ifetch import build_ifetch
@@ -12,7 +12,21 @@ meta = spec
 
 
 @module(name="LinxCoreFrontend")
-def build_frontend(m: Circuit, *, ibuf_depth: int = 8, ftq_depth: int = 16) -> None:
+def build_frontend(
+    m: Circuit,
+    *,
+    ibuf_depth: int = 8,
+    ftq_depth: int = 16,
+    btb_sets: int = 16,
+    btb_ways: int = 2,
+    btb_tag_bits: int = 10,
+    bim_entries: int = 128,
+    tage_tables: int = 2,
+    tage_entries: int = 64,
+    tage_tag_bits: int = 8,
+    tage_hist_min: int = 4,
+    ras_depth: int = 8,
+) -> None:
     clk = m.clock("clk")
     rst = m.reset("rst")
 
@@ -30,6 +44,14 @@ def build_frontend(m: Circuit, *, ibuf_depth: int = 8, ftq_depth: int = 16) -> N
         .field("redirect_pc", width=64)
         .field("flush_valid", width=1)
         .field("flush_pc", width=64)
+        # Resolved block at commit (backend br_base_pc/br_kind/commit_cond/
+        # commit_tgt); the fall-through is the block's sequential next PC.
+        .field("bpu_update_valid", width=1)
+        .field("bpu_update_pc", width=64)
+        .field("bpu_update_kind", width=3)
+        .field("bpu_update_taken", width=1)
+        .field("bpu_update_target", width=64)
+        .field("bpu_update_fallthrough", width=64)
         .build()
     )
     ins = m.inputs(in_spec, prefix="")
@@ -68,17 +90,29 @@ def build_frontend(m: Circuit, *, ibuf_depth: int = 8, ftq_depth: int = 16) -> N
     )
 
     bpu = m.instance(
-        build_bpu_lite,
+        build_bpu,
         name="bpu",
-        params={"tag_bits": 8},
+        params={
+            "btb_sets": btb_sets,
+            "btb_ways": btb_ways,
+            "btb_tag_bits": btb_tag_bits,
+            "bim_entries": bim_entries,
+            "tage_tables": tage_tables,
+            "tage_entries": tage_entries,
+            "tage_tag_bits": tage_tag_bits,
+            "tage_hist_min": tage_hist_min,
+            "ras_depth": ras_depth,
+        },
         clk=clk,
         rst=rst,
         req_valid=ifetch["fetch_valid"],
         req_pc=ifetch["fetch_pc"],
-        update_valid=do_redirect,
-        update_pc=redirect_target,
-        update_taken=do_redirect,
-        update_target=redirect_target,
+        update_valid=ins["bpu_update_valid"].read(),
+        update_pc=ins["bpu_update_pc"].read(),
+        update_taken=ins["bpu_update_taken"].read(),
+        update_target=ins["bpu_update_target"].read(),
+        update_kind=ins["bpu_update_kind"].read(),
+        update_fallthrough=ins["bpu_update_fallthrough"].read(),
     )
 
     # Keep prediction disabled for strict lockstep bring-up; FTQ/BPU metadata
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pycircuit import Circuit, module
+from pycircuit import Circuit, module, u
 
 
 def _validate_icache_params(
@@ -10,6 +10,8 @@ def _validate_icache_params(
     ic_line_bytes: int,
     ifetch_bundle_bytes: int,
     ic_miss_outstanding: int,
+    ic_prefetch_lines: int,
+    ic_prefetch_ftq: int,
 ) -> None:
     if ic_sets <= 0 or (ic_sets & (ic_sets - 1)) != 0:
         raise ValueError("ic_sets must be power-of-two and > 0")
@@ -17,10 +19,16 @@ def _validate_icache_params(
         raise ValueError("ic_ways must be > 0")
     if ic_line_bytes != 64:
         raise ValueError("this milestone requires ic_line_bytes=64")
-    if ifetch_bundle_bytes != 16:
-        raise ValueError("this milestone requires ifetch_bundle_bytes=16")
-    if ic_miss_outstanding != 1:
-        raise ValueError("this milestone requires ic_miss_outstanding=1")
+    if ifetch_bundle_bytes not in (16, 32):
+        raise ValueError("ifetch_bundle_bytes must be 16 or 32")
+    if ic_miss_outstanding < 1 or ic_miss_outstanding > 8:
+        raise ValueError("ic_miss_outstanding must be in [1, 8]")
+    if ic_prefetch_lines < 0 or ic_prefetch_lines > 4:
+        raise ValueError("ic_prefetch_lines must be in [0, 4]")
+    if ic_prefetch_ftq not in (0, 1):
+        raise ValueError("ic_prefetch_ftq must be 0 or 1")
+    if (ic_prefetch_lines > 0 or ic_prefetch_ftq) and ic_miss_outstanding < 2:
+        raise ValueError("prefetching needs ic_miss_outstanding >= 2 (one MSHR is kept for demand misses)")
 
 
 @module(name="JanusBccIfuICache")
@@ -32,8 +40,25 @@ def build_janus_bcc_ifu_icache(
     ic_line_bytes: int = 64,
     ifetch_bundle_bytes: int = 16,
     ic_miss_outstanding: int = 1,
+    ic_prefetch_lines: int = 0,
+    ic_prefetch_ftq: int = 0,
     ic_enable: int = 1,
 ) -> None:
+    """Set-associative I-cache with an MSHR file and a next-line prefetcher.
+
+    Every cycle F1 presents a fetch request; it hits when all lines covered by
+    the bundle are resident, independent of outstanding misses (hit-under-miss).
+    Missing lines are allocated into one of `ic_miss_outstanding` MSHRs (one
+    allocation per cycle, merged when the line is already in flight) and the
+    request stalls until its fills land. L2 responses are matched to MSHRs by
+    line address, so the L2 may return them in any order.
+
+    The prefetcher walks a stream of `ic_prefetch_lines` lines following each
+    demand miss; with `ic_prefetch_ftq` a predicted-taken block target from F3
+    (`ftq_pf_*`) restarts the stream at the target line. A prefetch allocates
+    only while at least two MSHRs are free, so one is always left for the next
+    demand miss, and skips lines already resident or in flight.
+    """
     clk_f1 = m.clock("clk")
     rst_f1 = m.reset("rst")
 
@@ -51,12 +76,17 @@ def build_janus_bcc_ifu_icache(
     ic_l2_rsp_data_top = m.input("ic_l2_rsp_data_top", width=512)
     ic_l2_rsp_error_top = m.input("ic_l2_rsp_error_top", width=1)
 
+    ftq_pf_valid_f3 = m.input("ftq_pf_valid_f3", width=1)
+    ftq_pf_addr_f3 = m.input("ftq_pf_addr_f3", width=64)
+
     _validate_icache_params(
         ic_sets=ic_sets,
         ic_ways=ic_ways,
         ic_line_bytes=ic_line_bytes,
         ifetch_bundle_bytes=ifetch_bundle_bytes,
         ic_miss_outstanding=ic_miss_outstanding,
+        ic_prefetch_lines=ic_prefetch_lines,
+        ic_prefetch_ftq=ic_prefetch_ftq,
     )
 
     c = m.const
@@ -68,130 +98,225 @@ def build_janus_bcc_ifu_icache(
     way_w = max(1, (ic_ways - 1).bit_length())
     off_w = (ic_line_bytes - 1).bit_length()
     tag_w = 64 - set_w - off_w
+    n_mshr = ic_miss_outstanding
+    mshr_w = max(1, (n_mshr - 1).bit_length())
+    mshr_cnt_w = n_mshr.bit_length()
+    pf_en = ic_prefetch_lines > 0 or ic_prefetch_ftq != 0
+    pf_left_w = 3
 
     line_mask = c((((1 << 64) - 1) ^ (ic_line_bytes - 1)), width=64)
     decode_window_mask = c((((1 << 64) - 1) ^ (decode_window_bytes - 1)), width=64)
 
+    def reg(name: str, width: int, init: int = 0):
+        return m.out(name, clk=clk_f1, rst=rst_f1, width=width, init=c(init, width=width), en=c(1, width=1))
+
     line_valid_ic = []
     line_tag_ic = []
     line_data_ic = []
+    line_pf_ic = []
     lru_rank_ic = []
     for s in range(ic_sets):
         for w in range(ic_ways):
             idx = s * ic_ways + w
-            line_valid_ic.append(
-                m.out(
-                    f"line_valid{idx}_ic",
-                    clk=clk_f1,
-                    rst=rst_f1,
-                    width=1,
-                    init=c(0, width=1),
-                    en=c(1, width=1),
-                )
-            )
-            line_tag_ic.append(
-                m.out(
-                    f"line_tag{idx}_ic",
-                    clk=clk_f1,
-                    rst=rst_f1,
-                    width=tag_w,
-                    init=c(0, width=tag_w),
-                    en=c(1, width=1),
-                )
-            )
-            line_data_ic.append(
-                m.out(
-                    f"line_data{idx}_ic",
-                    clk=clk_f1,
-                    rst=rst_f1,
-                    width=line_bits,
-                    init=c(0, width=line_bits),
-                    en=c(1, width=1),
-                )
-            )
-            lru_rank_ic.append(
-                m.out(
-                    f"lru_rank{idx}_ic",
-                    clk=clk_f1,
-                    rst=rst_f1,
-                    width=2,
-                    init=c(w & 0x3, width=2),
-                    en=c(1, width=1),
-                )
-            )
-
-    miss_active_ic = m.out("miss_active_ic", clk=clk_f1, rst=rst_f1, width=1, init=c(0, width=1), en=c(1, width=1))
-    miss_wait_rsp_ic = m.out("miss_wait_rsp_ic", clk=clk_f1, rst=rst_f1, width=1, init=c(0, width=1), en=c(1, width=1))
-    miss_phase_ic = m.out("miss_phase_ic", clk=clk_f1, rst=rst_f1, width=1, init=c(0, width=1), en=c(1, width=1))
-    miss_need_line0_ic = m.out("miss_need_line0_ic", clk=clk_f1, rst=rst_f1, width=1, init=c(0, width=1), en=c(1, width=1))
-    miss_need_line1_ic = m.out("miss_need_line1_ic", clk=clk_f1, rst=rst_f1, width=1, init=c(0, width=1), en=c(1, width=1))
-    miss_pc_ic = m.out("miss_pc_ic", clk=clk_f1, rst=rst_f1, width=64, init=c(0, width=64), en=c(1, width=1))
-    miss_pkt_uid_ic = m.out("miss_pkt_uid_ic", clk=clk_f1, rst=rst_f1, width=64, init=c(0, width=64), en=c(1, width=1))
-    miss_bundle_base_ic = m.out("miss_bundle_base_ic", clk=clk_f1, rst=rst_f1, width=64, init=c(0, width=64), en=c(1, width=1))
-    miss_line0_addr_ic = m.out("miss_line0_addr_ic", clk=clk_f1, rst=rst_f1, width=64, init=c(0, width=64), en=c(1, width=1))
-    miss_line1_addr_ic = m.out("miss_line1_addr_ic", clk=clk_f1, rst=rst_f1, width=64, init=c(0, width=64), en=c(1, width=1))
-    miss_victim0_ic = m.out("miss_victim0_ic", clk=clk_f1, rst=rst_f1, width=way_w, init=c(0, width=way_w), en=c(1, width=1))
-    miss_victim1_ic = m.out("miss_victim1_ic", clk=clk_f1, rst=rst_f1, width=way_w, init=c(0, width=way_w), en=c(1, width=1))
+            line_valid_ic.append(reg(f"line_valid{idx}_ic", 1))
+            line_tag_ic.append(reg(f"line_tag{idx}_ic", tag_w))
+            line_data_ic.append(reg(f"line_data{idx}_ic", line_bits))
+            if pf_en:
+                # Line was filled by a prefetch and has not been fetched yet.
+                line_pf_ic.append(reg(f"line_pf{idx}_ic", 1))
+            lru_rank_ic.append(reg(f"lru_rank{idx}_ic", 2, w & 0x3))
+
+    mshr_valid_ic = []
+    mshr_sent_ic = []
+    mshr_addr_ic = []
+    mshr_pf_ic = []
+    for j in range(n_mshr):
+        mshr_valid_ic.append(reg(f"mshr_valid{j}_ic", 1))
+        mshr_sent_ic.append(reg(f"mshr_sent{j}_ic", 1))
+        mshr_addr_ic.append(reg(f"mshr_addr{j}_ic", 64))
+        mshr_pf_ic.append(reg(f"mshr_pf{j}_ic", 1))
+
+    def line_set(line_addr):
+        return line_addr[off_w : off_w + set_w]
+
+    def line_tag(line_addr):
+        return line_addr.lshr(amount=off_w + set_w)[0:tag_w]
+
+    def lookup(line_addr, *, with_data: bool = True):
+        set_ic = line_set(line_addr)
+        tag_ic = line_tag(line_addr)
+        hit_ic = c(0, width=1)
+        way_ic = c(0, width=way_w)
+        data_ic = c(0, width=line_bits)
+        pf_ic = c(0, width=1)
+        for s in range(ic_sets):
+            set_sel_ic = set_ic == c(s, width=set_w)
+            for w in range(ic_ways):
+                idx = s * ic_ways + w
+                hit_sw_ic = set_sel_ic & line_valid_ic[idx].out() & (line_tag_ic[idx].out() == tag_ic)
+                hit_ic = hit_sw_ic._select_internal(c(1, width=1), hit_ic)
+                way_ic = hit_sw_ic._select_internal(c(w, width=way_w), way_ic)
+                if with_data:
+                    data_ic = hit_sw_ic._select_internal(line_data_ic[idx].out(), data_ic)
+                if pf_en:
+                    pf_ic = hit_sw_ic._select_internal(line_pf_ic[idx].out(), pf_ic)
+        return hit_ic, way_ic, data_ic, pf_ic
+
+    def in_flight(line_addr):
+        match_ic = []
+        for j in range(n_mshr):
+            match_ic.append(mshr_valid_ic[j].out() & (mshr_addr_ic[j].out() == line_addr))
+        any_ic = c(0, width=1)
+        for j in range(n_mshr):
+            any_ic = any_ic | match_ic[j]
+        return any_ic, match_ic
 
     req_pc_ic = f1_to_icache_stage_pc_f1
     req_pkt_uid_ic = f1_to_icache_stage_pkt_uid_f1
     # Align bundle base to decode-window granularity so F2 can always select
-    # a complete 64-bit decode window from the 128-bit fetch payload.
+    # a complete 64-bit decode window from the fetch payload.
     req_bundle_base_ic = req_pc_ic & decode_window_mask
     req_bundle_off_ic = req_bundle_base_ic[0:off_w]
     req_need_line1_ic = req_bundle_off_ic.ugt(c(ic_line_bytes - bundle_bytes, width=off_w))
     req_slot_base_off_ic = (req_pc_ic - req_bundle_base_ic)[0:7]
     req_line0_addr_ic = req_bundle_base_ic & line_mask
     req_line1_addr_ic = req_line0_addr_ic + c(ic_line_bytes, width=64)
-    req_line0_set_ic = req_line0_addr_ic[off_w : off_w + set_w]
-    req_line1_set_ic = req_line1_addr_ic[off_w : off_w + set_w]
-    req_line0_tag_ic = req_line0_addr_ic.lshr(amount=off_w + set_w)[0:tag_w]
-    req_line1_tag_ic = req_line1_addr_ic.lshr(amount=off_w + set_w)[0:tag_w]
-
-    line0_hit_ic = c(0, width=1)
-    line0_way_ic = c(0, width=way_w)
-    line0_data_ic = c(0, width=line_bits)
-    line1_hit_ic = c(0, width=1)
-    line1_way_ic = c(0, width=way_w)
-    line1_data_ic = c(0, width=line_bits)
+    req_line0_set_ic = line_set(req_line0_addr_ic)
+    req_line1_set_ic = line_set(req_line1_addr_ic)
 
-    for s in range(ic_sets):
-        set0_sel_ic = req_line0_set_ic == c(s, width=set_w)
-        set1_sel_ic = req_line1_set_ic == c(s, width=set_w)
-        for w in range(ic_ways):
-            idx = s * ic_ways + w
-            hit0_sw_ic = set0_sel_ic & line_valid_ic[idx].out() & (line_tag_ic[idx].out() == req_line0_tag_ic)
-            hit1_sw_ic = set1_sel_ic & line_valid_ic[idx].out() & (line_tag_ic[idx].out() == req_line1_tag_ic)
-            line0_hit_ic = hit0_sw_ic._select_internal(c(1, width=1), line0_hit_ic)
-            line0_way_ic = hit0_sw_ic._select_internal(c(w, width=way_w), line0_way_ic)
-            line0_data_ic = hit0_sw_ic._select_internal(line_data_ic[idx].out(), line0_data_ic)
-            line1_hit_ic = hit1_sw_ic._select_internal(c(1, width=1), line1_hit_ic)
-            line1_way_ic = hit1_sw_ic._select_internal(c(w, width=way_w), line1_way_ic)
-            line1_data_ic = hit1_sw_ic._select_internal(line_data_ic[idx].out(), line1_data_ic)
-
-    line0_victim_ic = c(0, width=way_w)
-    for s in range(ic_sets):
-        set_sel_ic = req_line0_set_ic == c(s, width=set_w)
-        inv_victim_ic = c(0, width=way_w)
-        inv_found_ic = c(0, width=1)
-        r0_victim_ic = c(0, width=way_w)
-        r0_found_ic = c(0, width=1)
-        for w in range(ic_ways):
-            idx = s * ic_ways + w
-            inv_sw_ic = ~line_valid_ic[idx].out()
-            pick_inv_ic = inv_sw_ic & (~inv_found_ic)
-            inv_victim_ic = pick_inv_ic._select_internal(c(w, width=way_w), inv_victim_ic)
-            inv_found_ic = inv_sw_ic._select_internal(c(1, width=1), inv_found_ic)
-            r0_sw_ic = lru_rank_ic[idx].out() == c(0, width=2)
-            pick_r0_ic = r0_sw_ic & (~r0_found_ic)
-            r0_victim_ic = pick_r0_ic._select_internal(c(w, width=way_w), r0_victim_ic)
-            r0_found_ic = r0_sw_ic._select_internal(c(1, width=1), r0_found_ic)
-        set_victim_ic = inv_found_ic._select_internal(inv_victim_ic, r0_victim_ic)
-        line0_victim_ic = set_sel_ic._select_internal(set_victim_ic, line0_victim_ic)
+    line0_hit_ic, line0_way_ic, line0_data_ic, line0_pf_ic = lookup(req_line0_addr_ic)
+    line1_hit_ic, line1_way_ic, line1_data_ic, line1_pf_ic = lookup(req_line1_addr_ic)
+
+    cache_en_ic = c(1 if ic_enable else 0, width=1)
+    req_valid_ic = f1_to_icache_stage_valid_f1 & cache_en_ic
+    line1_ok_ic = (~req_need_line1_ic) | line1_hit_ic
+    req_hit_ic = req_valid_ic & line0_hit_ic & line1_ok_ic
+    req_miss_ic = req_valid_ic & (~req_hit_ic)
 
-    line1_victim_ic = c(0, width=way_w)
+    # --- Demand MSHR allocation ---
+    line0_inflight_ic, line0_match_ic = in_flight(req_line0_addr_ic)
+    line1_inflight_ic, line1_match_ic = in_flight(req_line1_addr_ic)
+    dem_need0_ic = req_valid_ic & (~line0_hit_ic) & (~line0_inflight_ic)
+    dem_need1_ic = req_valid_ic & req_need_line1_ic & (~line1_hit_ic) & (~line1_inflight_ic)
+    dem_need_ic = dem_need0_ic | dem_need1_ic
+    dem_addr_ic = dem_need0_ic._select_internal(req_line0_addr_ic, req_line1_addr_ic)
+
+    free_any_ic = c(0, width=1)
+    free_two_ic = c(0, width=1)
+    free_idx_ic = c(0, width=mshr_w)
+    mshr_count_ic = c(0, width=mshr_cnt_w)
+    for j in range(n_mshr):
+        free_j_ic = (~mshr_valid_ic[j].out()) & (~free_any_ic)
+        free_idx_ic = free_j_ic._select_internal(c(j, width=mshr_w), free_idx_ic)
+        free_two_ic = free_two_ic | ((~mshr_valid_ic[j].out()) & free_any_ic)
+        free_any_ic = free_any_ic | (~mshr_valid_ic[j].out())
+        mshr_count_ic = mshr_count_ic + (u(mshr_cnt_w, 1) if mshr_valid_ic[j].out() else u(mshr_cnt_w, 0))
+
+    dem_alloc_ic = dem_need_ic & free_any_ic
+    mshr_full_stall_ic = dem_need_ic & (~free_any_ic)
+
+    # A demand miss on a line already being prefetched turns that MSHR into a
+    # demand MSHR (a late but useful prefetch).
+    dem_merge_ic = []
+    pf_late_ic = c(0, width=1)
+    for j in range(n_mshr):
+        want0_ic = req_valid_ic & (~line0_hit_ic) & line0_match_ic[j]
+        want1_ic = req_valid_ic & req_need_line1_ic & (~line1_hit_ic) & line1_match_ic[j]
+        merge_j_ic = mshr_pf_ic[j].out() & (want0_ic | want1_ic)
+        dem_merge_ic.append(merge_j_ic)
+        pf_late_ic = pf_late_ic | merge_j_ic
+
+    # --- Prefetch stream ---
+    pf_alloc_ic = c(0, width=1)
+    pf_addr_now_ic = c(0, width=64)
+    if pf_en:
+        pf_active_ic = reg("pf_active_ic", 1)
+        pf_addr_ic = reg("pf_addr_ic", 64)
+        pf_left_ic = reg("pf_left_ic", pf_left_w)
+        pf_addr_now_ic = pf_addr_ic.out()
+
+        pf_hit_ic, _, _, _ = lookup(pf_addr_now_ic, with_data=False)
+        pf_inflight_ic, _ = in_flight(pf_addr_now_ic)
+        pf_try_ic = pf_active_ic.out() & (~dem_alloc_ic)
+        pf_skip_ic = pf_try_ic & (pf_hit_ic | pf_inflight_ic)
+        # Keep the last free MSHR for demand misses.
+        pf_alloc_ic = pf_try_ic & (~pf_skip_ic) & free_two_ic
+        pf_step_ic = pf_skip_ic | pf_alloc_ic
+
+        pf_active_next_ic = pf_step_ic._select_internal(
+            pf_left_ic.out() != c(1, width=pf_left_w), pf_active_ic.out()
+        )
+        pf_addr_next_ic = pf_step_ic._select_internal(pf_addr_now_ic + c(ic_line_bytes, width=64), pf_addr_now_ic)
+        pf_left_next_ic = pf_step_ic._select_internal(pf_left_ic.out() - c(1, width=pf_left_w), pf_left_ic.out())
+
+        if ic_prefetch_ftq:
+            ftq_start_ic = ftq_pf_valid_f3 & cache_en_ic
+            pf_active_next_ic = ftq_start_ic._select_internal(c(1, width=1), pf_active_next_ic)
+            pf_addr_next_ic = ftq_start_ic._select_internal(ftq_pf_addr_f3 & line_mask, pf_addr_next_ic)
+            pf_left_next_ic = ftq_start_ic._select_internal(c(ic_prefetch_lines + 1, width=pf_left_w), pf_left_next_ic)
+        if ic_prefetch_lines > 0:
+            # Demand misses take priority over FTQ hints as stream triggers.
+            stream_base_ic = req_need_line1_ic._select_internal(
+                req_line1_addr_ic + c(ic_line_bytes, width=64), req_line1_addr_ic
+            )
+            pf_active_next_ic = dem_alloc_ic._select_internal(c(1, width=1), pf_active_next_ic)
+            pf_addr_next_ic = dem_alloc_ic._select_internal(stream_base_ic, pf_addr_next_ic)
+            pf_left_next_ic = dem_alloc_ic._select_internal(c(ic_prefetch_lines, width=pf_left_w), pf_left_next_ic)
+
+        pf_active_ic.set(pf_active_next_ic)
+        pf_addr_ic.set(pf_addr_next_ic)
+        pf_left_ic.set(pf_left_next_ic)
+
+    alloc_ic = dem_alloc_ic | pf_alloc_ic
+    alloc_addr_ic = dem_alloc_ic._select_internal(dem_addr_ic, pf_addr_now_ic)
+
+    # --- L2 request/response ---
+    l2_req_valid_ic = c(0, width=1)
+    l2_req_idx_ic = c(0, width=mshr_w)
+    l2_req_addr_ic = c(0, width=64)
+    for j in range(n_mshr):
+        pend_j_ic = mshr_valid_ic[j].out() & (~mshr_sent_ic[j].out()) & (~l2_req_valid_ic)
+        l2_req_idx_ic = pend_j_ic._select_internal(c(j, width=mshr_w), l2_req_idx_ic)
+        l2_req_addr_ic = pend_j_ic._select_internal(mshr_addr_ic[j].out(), l2_req_addr_ic)
+        l2_req_valid_ic = l2_req_valid_ic | pend_j_ic
+    l2_req_fire_ic = l2_req_valid_ic & ic_l2_req_ready_top
+
+    rsp_line_addr_ic = ic_l2_rsp_addr_top & line_mask
+    rsp_hit_ic = []
+    l2_fill_fire_ic = c(0, width=1)
+    l2_fill_pf_ic = c(0, width=1)
+    for j in range(n_mshr):
+        hit_j_ic = (
+            ic_l2_rsp_valid_top
+            & mshr_valid_ic[j].out()
+            & mshr_sent_ic[j].out()
+            & (mshr_addr_ic[j].out() == rsp_line_addr_ic)
+        )
+        rsp_hit_ic.append(hit_j_ic)
+        l2_fill_fire_ic = l2_fill_fire_ic | hit_j_ic
+        l2_fill_pf_ic = l2_fill_pf_ic | (hit_j_ic & mshr_pf_ic[j].out() & (~dem_merge_ic[j]))
+    l2_fill_ok_ic = l2_fill_fire_ic & (~ic_l2_rsp_error_top)
+    l2_fill_set_ic = line_set(rsp_line_addr_ic)
+    l2_fill_tag_ic = line_tag(rsp_line_addr_ic)
+
+    for j in range(n_mshr):
+        alloc_j_ic = alloc_ic & (free_idx_ic == c(j, width=mshr_w))
+        sent_j_ic = l2_req_fire_ic & (l2_req_idx_ic == c(j, width=mshr_w))
+        valid_next_ic = rsp_hit_ic[j]._select_internal(c(0, width=1), mshr_valid_ic[j].out())
+        valid_next_ic = alloc_j_ic._select_internal(c(1, width=1), valid_next_ic)
+        sent_next_ic = sent_j_ic._select_internal(c(1, width=1), mshr_sent_ic[j].out())
+        sent_next_ic = alloc_j_ic._select_internal(c(0, width=1), sent_next_ic)
+        pf_next_ic = dem_merge_ic[j]._select_internal(c(0, width=1), mshr_pf_ic[j].out())
+        pf_next_ic = alloc_j_ic._select_internal(~dem_alloc_ic, pf_next_ic)
+        mshr_valid_ic[j].set(valid_next_ic)
+        mshr_sent_ic[j].set(sent_next_ic)
+        mshr_addr_ic[j].set(alloc_addr_ic, when=alloc_j_ic)
+        mshr_pf_ic[j].set(pf_next_ic)
+
+    # Fill victim: first invalid way of the fill set, else the LRU way.
+    l2_fill_victim_ic = c(0, width=way_w)
     for s in range(ic_sets):
-        set_sel_ic = req_line1_set_ic == c(s, width=set_w)
+        set_sel_ic = l2_fill_set_ic == c(s, width=set_w)
         inv_victim_ic = c(0, width=way_w)
         inv_found_ic = c(0, width=1)
         r0_victim_ic = c(0, width=way_w)
@@ -207,149 +332,68 @@ def build_janus_bcc_ifu_icache(
             r0_victim_ic = pick_r0_ic._select_internal(c(w, width=way_w), r0_victim_ic)
             r0_found_ic = r0_sw_ic._select_internal(c(1, width=1), r0_found_ic)
         set_victim_ic = inv_found_ic._select_internal(inv_victim_ic, r0_victim_ic)
-        line1_victim_ic = set_sel_ic._select_internal(set_victim_ic, line1_victim_ic)
-
-    cache_en_ic = c(1 if ic_enable else 0, width=1)
-    req_valid_ic = f1_to_icache_stage_valid_f1 & cache_en_ic
-    line1_ok_ic = (~req_need_line1_ic) | line1_hit_ic
-    req_hit_ic = req_valid_ic & line0_hit_ic & line1_ok_ic & (~miss_active_ic.out())
-    req_miss_ic = req_valid_ic & (~req_hit_ic)
-    miss_start_ic = req_miss_ic & (~miss_active_ic.out())
-
-    miss_req_addr_ic = miss_phase_ic.out()._select_internal(miss_line1_addr_ic.out(), miss_line0_addr_ic.out())
-    miss_req_need_ic = miss_phase_ic.out()._select_internal(miss_need_line1_ic.out(), miss_need_line0_ic.out())
-    l2_req_valid_ic = miss_active_ic.out() & (~miss_wait_rsp_ic.out()) & miss_req_need_ic
-    l2_req_fire_ic = l2_req_valid_ic & ic_l2_req_ready_top
-    l2_fill_fire_ic = miss_wait_rsp_ic.out() & ic_l2_rsp_valid_top & (ic_l2_rsp_addr_top == miss_req_addr_ic)
-    l2_fill_is_line1_ic = miss_phase_ic.out()
-    l2_fill_victim_ic = l2_fill_is_line1_ic._select_internal(miss_victim1_ic.out(), miss_victim0_ic.out())
-    l2_fill_set_ic = l2_fill_is_line1_ic._select_internal(
-        miss_line1_addr_ic.out()[off_w : off_w + set_w], miss_line0_addr_ic.out()[off_w : off_w + set_w]
-    )
-    l2_fill_tag_ic = l2_fill_is_line1_ic._select_internal(
-        miss_line1_addr_ic.out().lshr(amount=off_w + set_w)[0:tag_w],
-        miss_line0_addr_ic.out().lshr(amount=off_w + set_w)[0:tag_w],
-    )
-
-    miss_active_next_ic = miss_active_ic.out()
-    miss_wait_next_ic = miss_wait_rsp_ic.out()
-    miss_phase_next_ic = miss_phase_ic.out()
-    miss_need0_next_ic = miss_need_line0_ic.out()
-    miss_need1_next_ic = miss_need_line1_ic.out()
-    miss_pc_next_ic = miss_pc_ic.out()
-    miss_pkt_uid_next_ic = miss_pkt_uid_ic.out()
-    miss_bundle_base_next_ic = miss_bundle_base_ic.out()
-    miss_line0_addr_next_ic = miss_line0_addr_ic.out()
-    miss_line1_addr_next_ic = miss_line1_addr_ic.out()
-    miss_victim0_next_ic = miss_victim0_ic.out()
-    miss_victim1_next_ic = miss_victim1_ic.out()
-
-    miss_active_next_ic = miss_start_ic._select_internal(c(1, width=1), miss_active_next_ic)
-    miss_wait_next_ic = miss_start_ic._select_internal(c(0, width=1), miss_wait_next_ic)
-    miss_phase_init_ic = (~line0_hit_ic)._select_internal(c(0, width=1), c(1, width=1))
-    miss_phase_next_ic = miss_start_ic._select_internal(miss_phase_init_ic, miss_phase_next_ic)
-    miss_need0_next_ic = miss_start_ic._select_internal(~line0_hit_ic, miss_need0_next_ic)
-    miss_need1_next_ic = miss_start_ic._select_internal(~line1_hit_ic, miss_need1_next_ic)
-    miss_pc_next_ic = miss_start_ic._select_internal(req_pc_ic, miss_pc_next_ic)
-    miss_pkt_uid_next_ic = miss_start_ic._select_internal(req_pkt_uid_ic, miss_pkt_uid_next_ic)
-    miss_bundle_base_next_ic = miss_start_ic._select_internal(req_bundle_base_ic, miss_bundle_base_next_ic)
-    miss_line0_addr_next_ic = miss_start_ic._select_internal(req_line0_addr_ic, miss_line0_addr_next_ic)
-    miss_line1_addr_next_ic = miss_start_ic._select_internal(req_line1_addr_ic, miss_line1_addr_next_ic)
-    miss_victim0_init_ic = line0_hit_ic._select_internal(line0_way_ic, line0_victim_ic)
-    miss_victim1_init_ic = line1_hit_ic._select_internal(line1_way_ic, line1_victim_ic)
-    miss_victim0_next_ic = miss_start_ic._select_internal(miss_victim0_init_ic, miss_victim0_next_ic)
-    miss_victim1_next_ic = miss_start_ic._select_internal(miss_victim1_init_ic, miss_victim1_next_ic)
-
-    miss_wait_next_ic = l2_req_fire_ic._select_internal(c(1, width=1), miss_wait_next_ic)
-    miss_wait_next_ic = l2_fill_fire_ic._select_internal(c(0, width=1), miss_wait_next_ic)
-
-    need0_after_fill_ic = l2_fill_fire_ic & (~l2_fill_is_line1_ic)
-    need1_after_fill_ic = l2_fill_fire_ic & l2_fill_is_line1_ic
-    miss_need0_postfill_ic = need0_after_fill_ic._select_internal(c(0, width=1), miss_need0_next_ic)
-    miss_need1_postfill_ic = need1_after_fill_ic._select_internal(c(0, width=1), miss_need1_next_ic)
-    miss_need0_next_ic = miss_need0_postfill_ic
-    miss_need1_next_ic = miss_need1_postfill_ic
-
-    miss_done_ic = l2_fill_fire_ic & (~miss_need0_postfill_ic) & (~miss_need1_postfill_ic)
-    miss_active_next_ic = miss_done_ic._select_internal(c(0, width=1), miss_active_next_ic)
-    phase_after_fill_ic = miss_need0_postfill_ic._select_internal(c(0, width=1), c(1, width=1))
-    miss_phase_next_ic = l2_fill_fire_ic._select_internal(phase_after_fill_ic, miss_phase_next_ic)
-
-    miss_active_ic.set(miss_active_next_ic)
-    miss_wait_rsp_ic.set(miss_wait_next_ic)
-    miss_phase_ic.set(miss_phase_next_ic)
-    miss_need_line0_ic.set(miss_need0_next_ic)
-    miss_need_line1_ic.set(miss_need1_next_ic)
-    miss_pc_ic.set(miss_pc_next_ic)
-    miss_pkt_uid_ic.set(miss_pkt_uid_next_ic)
-    miss_bundle_base_ic.set(miss_bundle_base_next_ic)
-    miss_line0_addr_ic.set(miss_line0_addr_next_ic)
-    miss_line1_addr_ic.set(miss_line1_addr_next_ic)
-    miss_victim0_ic.set(miss_victim0_next_ic)
-    miss_victim1_ic.set(miss_victim1_next_ic)
+        l2_fill_victim_ic = set_sel_ic._select_internal(set_victim_ic, l2_fill_victim_ic)
 
+    hit1_used_ic = req_hit_ic & req_need_line1_ic
     for s in range(ic_sets):
         for w in range(ic_ways):
             idx = s * ic_ways + w
             fill_sw_ic = (
-                l2_fill_fire_ic
+                l2_fill_ok_ic
                 & (l2_fill_set_ic == c(s, width=set_w))
                 & (l2_fill_victim_ic == c(w, width=way_w))
-                & (~ic_l2_rsp_error_top)
             )
             line_valid_ic[idx].set(c(1, width=1), when=fill_sw_ic)
             line_tag_ic[idx].set(l2_fill_tag_ic, when=fill_sw_ic)
             line_data_ic[idx].set(ic_l2_rsp_data_top, when=fill_sw_ic)
-
-    for s in range(ic_sets):
-        fire_set_ic = req_hit_ic & (req_line0_set_ic == c(s, width=set_w))
-        acc_rank_ic = c(0, width=2)
-        for w in range(ic_ways):
-            idx = s * ic_ways + w
-            hit_sw_ic = fire_set_ic & (line0_way_ic == c(w, width=way_w))
-            acc_rank_ic = hit_sw_ic._select_internal(lru_rank_ic[idx].out(), acc_rank_ic)
-        for w in range(ic_ways):
-            idx = s * ic_ways + w
-            is_hit_sw_ic = line0_way_ic == c(w, width=way_w)
-            old_rank_ic = lru_rank_ic[idx].out()
-            dec_sw_ic = fire_set_ic & (~is_hit_sw_ic) & old_rank_ic.ugt(acc_rank_ic)
-            new_rank_ic = dec_sw_ic._select_internal(old_rank_ic - c(1, width=2), old_rank_ic)
-            new_rank_ic = (fire_set_ic & is_hit_sw_ic)._select_internal(c(ic_ways - 1, width=2), new_rank_ic)
-            lru_rank_ic[idx].set(new_rank_ic)
-
-    for s in range(ic_sets):
-        fire_set_ic = (req_hit_ic & req_need_line1_ic) & (req_line1_set_ic == c(s, width=set_w))
-        acc_rank_ic = c(0, width=2)
-        for w in range(ic_ways):
-            idx = s * ic_ways + w
-            hit_sw_ic = fire_set_ic & (line1_way_ic == c(w, width=way_w))
-            acc_rank_ic = hit_sw_ic._select_internal(lru_rank_ic[idx].out(), acc_rank_ic)
-        for w in range(ic_ways):
-            idx = s * ic_ways + w
-            is_hit_sw_ic = line1_way_ic == c(w, width=way_w)
-            old_rank_ic = lru_rank_ic[idx].out()
-            dec_sw_ic = fire_set_ic & (~is_hit_sw_ic) & old_rank_ic.ugt(acc_rank_ic)
-            new_rank_ic = dec_sw_ic._select_internal(old_rank_ic - c(1, width=2), old_rank_ic)
-            new_rank_ic = (fire_set_ic & is_hit_sw_ic)._select_internal(c(ic_ways - 1, width=2), new_rank_ic)
-            lru_rank_ic[idx].set(new_rank_ic)
-
-    for s in range(ic_sets):
-        fire_set_ic = (l2_fill_fire_ic & (~ic_l2_rsp_error_top)) & (l2_fill_set_ic == c(s, width=set_w))
-        acc_rank_ic = c(0, width=2)
-        for w in range(ic_ways):
-            idx = s * ic_ways + w
-            hit_sw_ic = fire_set_ic & (l2_fill_victim_ic == c(w, width=way_w))
-            acc_rank_ic = hit_sw_ic._select_internal(lru_rank_ic[idx].out(), acc_rank_ic)
-        for w in range(ic_ways):
-            idx = s * ic_ways + w
-            is_hit_sw_ic = l2_fill_victim_ic == c(w, width=way_w)
-            old_rank_ic = lru_rank_ic[idx].out()
-            dec_sw_ic = fire_set_ic & (~is_hit_sw_ic) & old_rank_ic.ugt(acc_rank_ic)
-            new_rank_ic = dec_sw_ic._select_internal(old_rank_ic - c(1, width=2), old_rank_ic)
-            new_rank_ic = (fire_set_ic & is_hit_sw_ic)._select_internal(c(ic_ways - 1, width=2), new_rank_ic)
-            lru_rank_ic[idx].set(new_rank_ic)
-
-    req_bundle128_ic = c(0, width=bundle_bits)
+            if pf_en:
+                used_sw_ic = (
+                    req_hit_ic & (req_line0_set_ic == c(s, width=set_w)) & (line0_way_ic == c(w, width=way_w))
+                ) | (hit1_used_ic & (req_line1_set_ic == c(s, width=set_w)) & (line1_way_ic == c(w, width=way_w)))
+                pf_bit_ic = used_sw_ic._select_internal(c(0, width=1), line_pf_ic[idx].out())
+                pf_bit_ic = fill_sw_ic._select_internal(l2_fill_pf_ic, pf_bit_ic)
+                line_pf_ic[idx].set(pf_bit_ic)
+
+    # LRU: apply line0 hit, line1 hit and fill touches in order so that all
+    # three land in the same cycle.
+    lru_next_ic = [r.out() for r in lru_rank_ic]
+    for fire_ic, set_ic, way_ic in (
+        (req_hit_ic, req_line0_set_ic, line0_way_ic),
+        (hit1_used_ic, req_line1_set_ic, line1_way_ic),
+        (l2_fill_ok_ic, l2_fill_set_ic, l2_fill_victim_ic),
+    ):
+        for s in range(ic_sets):
+            fire_set_ic = fire_ic & (set_ic == c(s, width=set_w))
+            acc_rank_ic = c(0, width=2)
+            for w in range(ic_ways):
+                idx = s * ic_ways + w
+                hit_sw_ic = fire_set_ic & (way_ic == c(w, width=way_w))
+                acc_rank_ic = hit_sw_ic._select_internal(lru_next_ic[idx], acc_rank_ic)
+            for w in range(ic_ways):
+                idx = s * ic_ways + w
+                is_hit_sw_ic = way_ic == c(w, width=way_w)
+                old_rank_ic = lru_next_ic[idx]
+                dec_sw_ic = fire_set_ic & (~is_hit_sw_ic) & old_rank_ic.ugt(acc_rank_ic)
+                new_rank_ic = dec_sw_ic._select_internal(old_rank_ic - c(1, width=2), old_rank_ic)
+                new_rank_ic = (fire_set_ic & is_hit_sw_ic)._select_internal(c(ic_ways - 1, width=2), new_rank_ic)
+                lru_next_ic[idx] = new_rank_ic
+    for idx in range(ic_sets * ic_ways):
+        lru_rank_ic[idx].set(lru_next_ic[idx])
+
+    # --- Performance counters (exported through the icache probe) ---
+    pf_useful_ic = (req_hit_ic & (line0_pf_ic | (req_need_line1_ic & line1_pf_ic))) | pf_late_ic
+    demand_miss_cnt_ic = reg("demand_miss_cnt_ic", 64)
+    mshr_full_cnt_ic = reg("mshr_full_cnt_ic", 64)
+    mshr_occ_cnt_ic = reg("mshr_occ_cnt_ic", 64)
+    pf_issue_cnt_ic = reg("pf_issue_cnt_ic", 64)
+    pf_useful_cnt_ic = reg("pf_useful_cnt_ic", 64)
+    demand_miss_cnt_ic.set(demand_miss_cnt_ic.out() + c(1, width=64), when=dem_alloc_ic)
+    mshr_full_cnt_ic.set(mshr_full_cnt_ic.out() + c(1, width=64), when=mshr_full_stall_ic)
+    mshr_occ_cnt_ic.set(mshr_occ_cnt_ic.out() + m.cat(u(64 - mshr_cnt_w, 0), mshr_count_ic))
+    pf_issue_cnt_ic.set(pf_issue_cnt_ic.out() + c(1, width=64), when=pf_alloc_ic)
+    pf_useful_cnt_ic.set(pf_useful_cnt_ic.out() + c(1, width=64), when=pf_useful_ic)
+
+    req_bundle_ic = c(0, width=bundle_bits)
     for byte_off in range(0, ic_line_bytes - decode_window_bytes + 1):
         off_match_ic = req_bundle_off_ic == c(byte_off, width=off_w)
         if byte_off <= (ic_line_bytes - bundle_bytes):
@@ -360,17 +404,17 @@ def build_janus_bcc_ifu_icache(
             low_slice_ic = line0_data_ic[byte_off * 8 : line_bits]
             high_slice_ic = line1_data_ic[0:high_bits]
             slice_ic = m.cat(high_slice_ic, low_slice_ic)
-        req_bundle128_ic = off_match_ic._select_internal(slice_ic, req_bundle128_ic)
+        req_bundle_ic = off_match_ic._select_internal(slice_ic, req_bundle_ic)
     req_valid_to_f2_ic = req_hit_ic
-    req_stall_to_f2_ic = req_miss_ic | miss_active_ic.out()
+    req_stall_to_f2_ic = req_miss_ic
 
     m.output("ic_l2_req_valid_top", l2_req_valid_ic)
-    m.output("ic_l2_req_addr_top", miss_req_addr_ic & line_mask)
+    m.output("ic_l2_req_addr_top", l2_req_addr_ic)
 
-    m.output("imem_raddr_top", miss_req_addr_ic & line_mask)
+    m.output("imem_raddr_top", l2_req_addr_ic)
 
     m.output("f1_to_f2_stage_pc_f1", req_pc_ic)
-    m.output("f1_to_f2_stage_bundle128_f1", req_bundle128_ic)
+    m.output("f1_to_f2_stage_bundle128_f1", req_bundle_ic)
     m.output("f1_to_f2_stage_bundle_base_pc_f1", req_bundle_base_ic)
     m.output("f1_to_f2_stage_slot_base_offset_f1", req_slot_base_off_ic)
     m.output("f1_to_f2_stage_hit_f1", req_hit_ic)
@@ -385,4 +429,14 @@ def build_janus_bcc_ifu_icache(
     m.output("icache_to_f2_stage_window_f1", line0_data_ic[0:64])
     m.output("icache_to_f2_stage_valid_f1", req_valid_to_f2_ic)
     m.output("icache_to_f2_stage_pkt_uid_f1", req_pkt_uid_ic)
-    m.output("icache_miss_active_ic", miss_active_ic.out())
+    m.output("icache_miss_active_ic", mshr_count_ic != c(0, width=mshr_cnt_w))
+
+    m.output("icache_mshr_count_ic", mshr_count_ic)
+    m.output("icache_mshr_full_ic", mshr_full_stall_ic)
+    m.output("icache_pf_issue_ic", pf_alloc_ic)
+    m.output("icache_pf_useful_ic", pf_useful_ic)
+    m.output("icache_demand_miss_cnt_ic", demand_miss_cnt_ic.out())
+    m.output("icache_mshr_full_cnt_ic", mshr_full_cnt_ic.out())
+    m.output("icache_mshr_occ_cnt_ic", mshr_occ_cnt_ic.out())
+    m.output("icache_pf_issue_cnt_ic", pf_issue_cnt_ic.out())
+    m.output("icache_pf_useful_cnt_ic", pf_useful_cnt_ic.out())
@@ -30,6 +30,8 @@ def icache_config(
     ifetch_bundle_bytes: int | None,
     ic_miss_outstanding: int,
     ic_enable: int,
+    ic_prefetch_lines: int = 0,
+    ic_prefetch_ftq: int = 0,
 ):
     _ = m
     bundle_bits = int(ifetch_bundle_bits)
@@ -54,6 +56,8 @@ def icache_config(
         .add("ifetch_bundle_bits", default=128, min_value=8)
         .add("ifetch_bundle_bytes", default=16, min_value=1)
         .add("ic_miss_outstanding", default=1, min_value=1)
+        .add("ic_prefetch_lines", default=0, min_value=0)
+        .add("ic_prefetch_ftq", default=0, min_value=0, max_value=1)
         .add("ic_enable", default=1, min_value=0, max_value=1)
     )
     return spec.build(
@@ -64,6 +68,8 @@ def icache_config(
             "ifetch_bundle_bits": bundle_bits,
             "ifetch_bundle_bytes": int(bundle_bits // 8),
             "ic_miss_outstanding": int(max(1, int(ic_miss_outstanding))),
+            "ic_prefetch_lines": int(max(0, int(ic_prefetch_lines))),
+            "ic_prefetch_ftq": int(1 if int(ic_prefetch_ftq) != 0 else 0),
             "ic_enable": int(1 if int(ic_enable) != 0 else 0),
         }
     )
@@ -81,6 +87,10 @@ def top_config(
     ib_depth: int,
     ic_miss_outstanding: int,
     ic_enable: int,
+    ic_prefetch_lines: int = 0,
+    ic_prefetch_ftq: int = 0,
+    ic_gate_fetch: int = 0,
+    mdp_entries: int = 0,
 ):
     _ = m
     ic_cfg = icache_config(
@@ -92,6 +102,8 @@ def top_config(
         ifetch_bundle_bytes=ifetch_bundle_bytes,
         ic_miss_outstanding=ic_miss_outstanding,
         ic_enable=ic_enable,
+        ic_prefetch_lines=ic_prefetch_lines,
+        ic_prefetch_ftq=ic_prefetch_ftq,
     )
     spec = (
         meta.params()
@@ -103,7 +115,11 @@ def top_config(
         .add("ifetch_bundle_bytes", default=16, min_value=1)
         .add("ib_depth", default=8, min_value=1)
         .add("ic_miss_outstanding", default=1, min_value=1)
+        .add("ic_prefetch_lines", default=0, min_value=0)
+        .add("ic_prefetch_ftq", default=0, min_value=0, max_value=1)
         .add("ic_enable", default=1, min_value=0, max_value=1)
+        .add("ic_gate_fetch", default=0, min_value=0, max_value=1)
+        .add("mdp_entries", default=0, min_value=0)
     )
     return spec.build(
         {
@@ -115,6 +131,10 @@ def top_config(
             "ifetch_bundle_bytes": int(ic_cfg["ifetch_bundle_bytes"]),
             "ib_depth": int(ct.pow2_ceil(max(1, int(ib_depth)))),
             "ic_miss_outstanding": int(ic_cfg["ic_miss_outstanding"]),
+            "ic_prefetch_lines": int(ic_cfg["ic_prefetch_lines"]),
+            "ic_prefetch_ftq": int(ic_cfg["ic_prefetch_ftq"]),
             "ic_enable": int(ic_cfg["ic_enable"]),
+            "ic_gate_fetch": int(1 if int(ic_gate_fetch) != 0 else 0),
+            "mdp_entries": int(mdp_entries),
         }
     )
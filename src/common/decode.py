@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Mapping
 
 from pycircuit import Circuit, Wire, const, function, module, spec
@@ -1538,11 +1539,13 @@ def _to_decode_info(meta) -> DecodeInfo | None:
     )
 
 
+@lru_cache(maxsize=1 << 16)
 def decode_info_from_word(insn_word: int) -> DecodeInfo | None:
     """Software decode metadata helper aligned with QEMU decode trees.
 
     This path is used for parity/debug tooling and returns the shared contract:
-    op/category/mask-match/operand-shape metadata.
+    op/category/mask-match/operand-shape metadata. Results are memoized per
+    word because trace tools classify the same hot instructions repeatedly.
     """
     word = insn_word & ((1 << 64) - 1)
 
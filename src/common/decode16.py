@@ -1,22 +1,19 @@
 from __future__ import annotations
 
-from .opcode_meta_gen import OPCODE_META_FORMS, OpcodeMeta, opcode_constraints_match
+from functools import lru_cache
+
+from .decode_index import DecodeIndex
+from .opcode_meta_gen import OPCODE_META_FORMS, OpcodeMeta
 
 
 _DECODE16 = tuple(m for m in OPCODE_META_FORMS if m.source_file == "insn16.decode")
+_INDEX16 = DecodeIndex(_DECODE16)
+
+
+@lru_cache(maxsize=1 << 16)
+def _lookup16(word: int) -> OpcodeMeta | None:
+    return _INDEX16.lookup(word)
 
 
 def decode16_meta(insn: int) -> OpcodeMeta | None:
-    word = insn & 0xFFFF
-    best: OpcodeMeta | None = None
-    best_bits = -1
-    for meta in _DECODE16:
-        if (word & meta.mask) != meta.match:
-            continue
-        if not opcode_constraints_match(word, meta):
-            continue
-        bits = int(meta.mask).bit_count()
-        if bits > best_bits:
-            best = meta
-            best_bits = bits
-    return best
+    return _lookup16(insn & 0xFFFF)
@@ -1,24 +1,19 @@
 from __future__ import annotations
 
-from .opcode_meta_gen import OPCODE_META_FORMS, OpcodeMeta, opcode_constraints_match
+from functools import lru_cache
+
+from .decode_index import DecodeIndex
+from .opcode_meta_gen import OPCODE_META_FORMS, OpcodeMeta
 
 
 _DECODE32 = tuple(m for m in OPCODE_META_FORMS if m.source_file == "insn32.decode")
+_INDEX32 = DecodeIndex(m for m in _DECODE32 if m.flags != "DECODE_ONLY_CARRIER")
+
+
+@lru_cache(maxsize=1 << 16)
+def _lookup32(word: int) -> OpcodeMeta | None:
+    return _INDEX32.lookup(word)
 
 
 def decode32_meta(insn: int) -> OpcodeMeta | None:
-    word = insn & 0xFFFFFFFF
-    best: OpcodeMeta | None = None
-    best_bits = -1
-    for meta in _DECODE32:
-        if meta.flags == "DECODE_ONLY_CARRIER":
-            continue
-        if (word & meta.mask) != meta.match:
-            continue
-        if not opcode_constraints_match(word, meta):
-            continue
-        bits = int(meta.mask).bit_count()
-        if bits > best_bits:
-            best = meta
-            best_bits = bits
-    return best
+    return _lookup32(insn & 0xFFFFFFFF)
@@ -1,22 +1,19 @@
 from __future__ import annotations
 
-from .opcode_meta_gen import OPCODE_META_FORMS, OpcodeMeta, opcode_constraints_match
+from functools import lru_cache
+
+from .decode_index import DecodeIndex
+from .opcode_meta_gen import OPCODE_META_FORMS, OpcodeMeta
 
 
 _DECODE48 = tuple(m for m in OPCODE_META_FORMS if m.source_file == "insn48.decode")
+_INDEX48 = DecodeIndex(_DECODE48)
+
+
+@lru_cache(maxsize=1 << 16)
+def _lookup48(word: int) -> OpcodeMeta | None:
+    return _INDEX48.lookup(word)
 
 
 def decode48_meta(insn: int) -> OpcodeMeta | None:
-    word = insn & ((1 << 64) - 1)
-    best: OpcodeMeta | None = None
-    best_bits = -1
-    for meta in _DECODE48:
-        if (word & meta.mask) != meta.match:
-            continue
-        if not opcode_constraints_match(word, meta):
-            continue
-        bits = int(meta.mask).bit_count()
-        if bits > best_bits:
-            best = meta
-            best_bits = bits
-    return best
+    return _lookup48(insn & ((1 << 64) - 1))
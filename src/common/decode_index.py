@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from .opcode_meta_gen import OpcodeMeta, opcode_constraints_match
+
+
+class DecodeIndex:
+    """Mask-bucketed decode table with longest-mask-wins semantics.
+
+    Forms are grouped by their distinct `mask`; each mask owns a dict keyed by
+    `match`. A lookup probes one dict per distinct mask, walking mask widths
+    from most to fewest set bits and stopping at the first width with a hit.
+    Within one width the earliest form in catalog order wins, which is exactly
+    what the former linear scan over `OPCODE_META_FORMS` returned.
+    """
+
+    def __init__(self, forms: Iterable[OpcodeMeta]) -> None:
+        buckets: dict[int, dict[int, list[tuple[int, OpcodeMeta]]]] = {}
+        for order, meta in enumerate(forms):
+            buckets.setdefault(meta.mask, {}).setdefault(meta.match, []).append((order, meta))
+        by_width: dict[int, list[tuple[int, dict[int, tuple[tuple[int, OpcodeMeta], ...]]]]] = {}
+        for mask, table in buckets.items():
+            frozen = {match: tuple(entries) for match, entries in table.items()}
+            by_width.setdefault(int(mask).bit_count(), []).append((mask, frozen))
+        self._levels = tuple(tuple(by_width[width]) for width in sorted(by_width, reverse=True))
+
+    def lookup(self, word: int) -> OpcodeMeta | None:
+        for level in self._levels:
+            best: OpcodeMeta | None = None
+            best_order = -1
+            for mask, table in level:
+                entries = table.get(word & mask)
+                if entries is None:
+                    continue
+                for order, meta in entries:
+                    if best is not None and order >= best_order:
+                        break
+                    if meta.constraints and not opcode_constraints_match(word, meta):
+                        continue
+                    best = meta
+                    best_order = order
+                    break
+            if best is not None:
+                return best
+        return None
@@ -4,6 +4,7 @@ from pycircuit import Circuit, module
 
 from probes.block_probe import define_block_probe
 from probes.commit_probe import define_commit_probe
+from probes.icache_probe import define_icache_probe
 from probes.pipeview_probe import define_pipeview_probe
 from top.modules.export_core import build_top_export
 
@@ -22,7 +23,13 @@ def build(
     ifetch_bundle_bytes: int | None = None,
     ib_depth: int = 8,
     ic_miss_outstanding: int = 1,
+    ic_prefetch_lines: int = 0,
+    ic_prefetch_ftq: int = 0,
     ic_enable: int = 1,
+    # 1 = hold host-fed packets until their I-cache bundle is resident.
+    ic_gate_fetch: int = 0,
+    # Memory-dependence predictor entries (0 = off); see `OooParams.mdp_entries`.
+    mdp_entries: int = 0,
     callframe_size_i=0,
 ) -> None:
     if ifetch_bundle_bytes is not None:
@@ -65,7 +72,11 @@ def build(
             "ifetch_bundle_bytes": (None if ifetch_bundle_bytes is None else int(ifetch_bundle_bytes)),
             "ib_depth": int(ib_depth),
             "ic_miss_outstanding": int(ic_miss_outstanding),
+            "ic_prefetch_lines": int(ic_prefetch_lines),
+            "ic_prefetch_ftq": int(ic_prefetch_ftq),
             "ic_enable": int(ic_enable),
+            "ic_gate_fetch": int(ic_gate_fetch),
+            "mdp_entries": int(mdp_entries),
         },
         clk=clk,
         rst=rst,
@@ -99,3 +110,4 @@ build.__pycircuit_name__ = "linxcore_top"
 pipeview_probe = define_pipeview_probe(build)
 block_probe = define_block_probe(build)
 commit_probe = define_commit_probe(build)
+icache_probe = define_icache_probe(build)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pycircuit import ProbeBuilder, ProbeView, probe
+
+_TOP = "linxcore_top_root"
+_ICACHE = f"{_TOP}.janus_ifu_icache"
+
+
+def define_icache_probe(target):
+    @probe(target=target, name="icache")
+    def icache_probe(p: ProbeBuilder, dut: ProbeView) -> None:
+        p.emit(
+            "mshr",
+            {
+                "count": dut.read(f"{_ICACHE}.icache_mshr_count_ic"),
+                "full": dut.read(f"{_ICACHE}.icache_mshr_full_ic"),
+                "miss_active": dut.read(f"{_ICACHE}.icache_miss_active_ic"),
+                "occupancy_total": dut.read(f"{_ICACHE}.icache_mshr_occ_cnt_ic"),
+                "full_cycles": dut.read(f"{_ICACHE}.icache_mshr_full_cnt_ic"),
+                "demand_misses": dut.read(f"{_ICACHE}.icache_demand_miss_cnt_ic"),
+            },
+            at="tick",
+            tags={"family": "icache", "stage": "mshr", "lane": 0},
+        )
+        p.emit(
+            "prefetch",
+            {
+                "issue": dut.read(f"{_ICACHE}.icache_pf_issue_ic"),
+                "useful": dut.read(f"{_ICACHE}.icache_pf_useful_ic"),
+                "issued_total": dut.read(f"{_ICACHE}.icache_pf_issue_cnt_ic"),
+                "useful_total": dut.read(f"{_ICACHE}.icache_pf_useful_cnt_ic"),
+            },
+            at="tick",
+            tags={"family": "icache", "stage": "prefetch", "lane": 0},
+        )
+
+    return icache_probe
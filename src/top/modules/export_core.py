@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pycircuit import Circuit, module
+from pycircuit import Circuit, module, u
 
 from common.config import top_config
 from common.uid_allocator import build_uid_allocator
@@ -11,6 +11,7 @@ from bcc.bctrl.bctrl import build_janus_bcc_bctrl
 from bcc.bctrl.bisq import build_janus_bcc_bctrl_bisq
 from bcc.bctrl.brob import build_janus_bcc_bctrl_brob
 from bcc.iex.iex import build_janus_bcc_iex
+from bcc.ifu.icache import build_janus_bcc_ifu_icache
 from bcc.lsu.l1d import build_janus_bcc_lsu_l1d
 from bcc.lsu.lhq import build_janus_bcc_lsu_lhq
 from bcc.lsu.liq import build_janus_bcc_lsu_liq
@@ -61,7 +62,13 @@ def build_top_export(
     ifetch_bundle_bytes: int | None = None,
     ib_depth: int = 8,
     ic_miss_outstanding: int = 1,
+    ic_prefetch_lines: int = 0,
+    ic_prefetch_ftq: int = 0,
     ic_enable: int = 1,
+    # 1 = hold host-fed packets until their I-cache bundle is resident.
+    ic_gate_fetch: int = 0,
+    # Memory-dependence predictor entries (0 = off); see `OooParams.mdp_entries`.
+    mdp_entries: int = 0,
     callframe_size_i=0,
 ) -> None:
     cfg = top_config(
@@ -75,6 +82,10 @@ def build_top_export(
         ib_depth=ib_depth,
         ic_miss_outstanding=ic_miss_outstanding,
         ic_enable=ic_enable,
+        ic_prefetch_lines=ic_prefetch_lines,
+        ic_prefetch_ftq=ic_prefetch_ftq,
+        ic_gate_fetch=ic_gate_fetch,
+        mdp_entries=mdp_entries,
     )
     mem_bytes = int(cfg["mem_bytes"])
     ic_sets = int(cfg["ic_sets"])
@@ -84,7 +95,11 @@ def build_top_export(
     ifetch_bundle_bytes = int(cfg["ifetch_bundle_bytes"])
     ib_depth = int(cfg["ib_depth"])
     ic_miss_outstanding = int(cfg["ic_miss_outstanding"])
+    ic_prefetch_lines = int(cfg["ic_prefetch_lines"])
+    ic_prefetch_ftq = int(cfg["ic_prefetch_ftq"])
     ic_enable = int(cfg["ic_enable"])
+    ic_gate_fetch = int(cfg["ic_gate_fetch"])
+    mdp_entries = int(cfg["mdp_entries"])
 
     clk_top = m.clock("clk")
     rst_top = m.reset("rst")
@@ -135,18 +150,56 @@ def build_top_export(
     )
 
     # Hard-cut frontend: instruction supply is QEMU/host-fed into an on-chip IB.
-    # IFU/ICache are removed from the functional design path.
-    m.output("ic_l2_req_valid", c(0, width=1))
-    m.output("ic_l2_req_addr", c(0, width=64))
-    m.output("icache_miss_active_dbg", c(0, width=1))
-    m.output("icache_miss_wait_dbg", c(0, width=1))
+    # The IFU stages are removed from the functional design path, but every
+    # host-fed packet is looked up in the I-cache, which refills from the TB L2
+    # model. With `ic_gate_fetch` a packet is only accepted once its bundle is
+    # resident, so misses, MSHR occupancy and prefetching shape the
+    # instruction supply; by default the cache only observes the stream and
+    # the supply stays ungated. With no I-F3 here, backend refetch targets
+    # drive the FTQ-directed prefetch hint.
+    ifu_icache = m.instance_auto(
+        build_janus_bcc_ifu_icache,
+        name="janus_ifu_icache",
+        module_name="JanusBccIfuICacheTop",
+        params={
+            "ic_sets": ic_sets,
+            "ic_ways": ic_ways,
+            "ic_line_bytes": ic_line_bytes,
+            "ifetch_bundle_bytes": ifetch_bundle_bytes,
+            "ic_miss_outstanding": ic_miss_outstanding,
+            "ic_prefetch_lines": ic_prefetch_lines,
+            "ic_prefetch_ftq": ic_prefetch_ftq,
+            "ic_enable": ic_enable,
+        },
+        clk=clk_top,
+        rst=rst_top,
+        f1_to_icache_stage_pc_f1=tb_ifu_stub_pc_top,
+        f1_to_icache_stage_valid_f1=tb_ifu_stub_enable_top & tb_ifu_stub_valid_top,
+        f1_to_icache_stage_pkt_uid_f1=tb_ifu_stub_pkt_uid_top,
+        imem_rdata_top=c(0, width=64),
+        ic_l2_req_ready_top=ic_l2_req_ready_top,
+        ic_l2_rsp_valid_top=ic_l2_rsp_valid_top,
+        ic_l2_rsp_addr_top=ic_l2_rsp_addr_top,
+        ic_l2_rsp_data_top=ic_l2_rsp_data_top,
+        ic_l2_rsp_error_top=ic_l2_rsp_error_top,
+        ftq_pf_valid_f3=flush_valid_fls,
+        ftq_pf_addr_f3=flush_pc_fls,
+    )
+    ic_fetch_stall_top = ifu_icache["f1_to_f2_stage_stall_f1"]
+    ic_fetch_gate_top = ic_fetch_stall_top if ic_gate_fetch else u(1, 0)
+
+    m.output("ic_l2_req_valid", ifu_icache["ic_l2_req_valid_top"])
+    m.output("ic_l2_req_addr", ifu_icache["ic_l2_req_addr_top"])
+    m.output("icache_miss_active_dbg", ifu_icache["icache_miss_active_ic"])
+    m.output("icache_miss_wait_dbg", ifu_icache["icache_mshr_full_ic"])
+    # The single-miss FSM phase/need fields have no MSHR-file equivalent.
     m.output("icache_miss_phase_dbg", c(0, width=2))
     m.output("icache_miss_need0_dbg", c(0, width=1))
     m.output("icache_miss_need1_dbg", c(0, width=1))
-    m.output("icache_f1_hit_dbg", c(0, width=1))
-    m.output("icache_f1_miss_dbg", c(0, width=1))
-    m.output("icache_f1_stall_dbg", c(0, width=1))
-    m.output("icache_f1_valid_dbg", c(0, width=1))
+    m.output("icache_f1_hit_dbg", ifu_icache["f1_to_f2_stage_hit_f1"])
+    m.output("icache_f1_miss_dbg", ifu_icache["f1_to_f2_stage_miss_f1"])
+    m.output("icache_f1_stall_dbg", ic_fetch_stall_top)
+    m.output("icache_f1_valid_dbg", ifu_icache["f1_to_f2_stage_valid_f1"])
 
     backend_ready_top = m.new_wire(width=1)
     # Handshake seen by the host/QEMU stub. Keep the shell redirect-aware so a
@@ -195,7 +248,7 @@ def build_top_export(
         build_backend,
         name="janus_backend",
         module_name="JanusBccBackendTop",
-        params={"mem_bytes": mem_bytes},
+        params={"mem_bytes": mem_bytes, "mdp_entries": mdp_entries},
         clk=clk_top,
         rst=rst_top,
         boot_pc=boot_pc_top,
@@ -248,7 +301,8 @@ def build_top_export(
         backend_top["frontend_ready"]
         & (~ib_flush_top)
         & (~backend_top["ctu_block_ifu"])
-        & (~ib_macro_head_block_top),
+        & (~ib_macro_head_block_top)
+        & (~ic_fetch_gate_top),
     )
     m.assign(ib_push_valid_top, tb_ifu_stub_enable_top & tb_ifu_stub_valid_top & ib_push_accept_top)
     m.assign(ib_push_ready_top, ib_top["push_ready"] & ib_push_accept_top)
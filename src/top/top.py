@@ -66,7 +66,11 @@ def build_linxcore_top(
     ifetch_bundle_bytes: int = 16,
     ib_depth: int = 8,
     ic_miss_outstanding: int = 1,
+    ic_prefetch_lines: int = 0,
+    ic_prefetch_ftq: int = 0,
     ic_enable: int = 1,
+    # Memory-dependence predictor entries (0 = off); see `OooParams.mdp_entries`.
+    mdp_entries: int = 0,
     # Bring-up option: bypass IFU and drive backend F4 inputs from the
     # testbench/runner stub stream.
     ifu_bypass: int = 0,
@@ -82,6 +86,9 @@ def build_linxcore_top(
         ib_depth=ib_depth,
         ic_miss_outstanding=ic_miss_outstanding,
         ic_enable=ic_enable,
+        ic_prefetch_lines=ic_prefetch_lines,
+        ic_prefetch_ftq=ic_prefetch_ftq,
+        mdp_entries=mdp_entries,
     )
     mem_bytes = int(cfg["mem_bytes"])
     ic_sets = int(cfg["ic_sets"])
@@ -91,7 +98,10 @@ def build_linxcore_top(
     ifetch_bundle_bytes = int(cfg["ifetch_bundle_bytes"])
     ib_depth = int(cfg["ib_depth"])
     ic_miss_outstanding = int(cfg["ic_miss_outstanding"])
+    ic_prefetch_lines = int(cfg["ic_prefetch_lines"])
+    ic_prefetch_ftq = int(cfg["ic_prefetch_ftq"])
     ic_enable = int(cfg["ic_enable"])
+    mdp_entries = int(cfg["mdp_entries"])
 
     clk_top = m.clock("clk")
     rst_top = m.reset("rst")
@@ -175,6 +185,10 @@ def build_linxcore_top(
         f0_to_f1_stage_pkt_uid_f0=ifu_f0["f0_to_f1_stage_pkt_uid_f0"],
     )
 
+    # F3 predicted-taken block targets steer the I-cache prefetcher.
+    ftq_pf_valid_wire_f3 = m.new_wire(width=1)
+    ftq_pf_addr_wire_f3 = m.new_wire(width=64)
+
     ifu_icache = m.instance_auto(
         build_janus_bcc_ifu_icache,
         name="janus_ifu_icache",
@@ -185,6 +199,8 @@ def build_linxcore_top(
             "ic_line_bytes": ic_line_bytes,
             "ifetch_bundle_bytes": ifetch_bundle_bytes,
             "ic_miss_outstanding": ic_miss_outstanding,
+            "ic_prefetch_lines": ic_prefetch_lines,
+            "ic_prefetch_ftq": ic_prefetch_ftq,
             "ic_enable": ic_enable,
         },
         clk=clk_top,
@@ -198,6 +214,8 @@ def build_linxcore_top(
         ic_l2_rsp_addr_top=ic_l2_rsp_addr_top,
         ic_l2_rsp_data_top=ic_l2_rsp_data_top,
         ic_l2_rsp_error_top=ic_l2_rsp_error_top,
+        ftq_pf_valid_f3=ftq_pf_valid_wire_f3,
+        ftq_pf_addr_f3=ftq_pf_addr_wire_f3,
     )
 
     m.output("ic_l2_req_valid", ifu_icache["ic_l2_req_valid_top"])
@@ -261,6 +279,11 @@ def build_linxcore_top(
         flush_valid_fls=flush_valid_q_top.out(),
     )
     m.assign(f3_to_f2_ready_wire_f3, ifu_f3["f3_ibuf_ready_f3"])
+    m.assign(
+        ftq_pf_valid_wire_f3,
+        ifu_f3["f3_to_pcb_stage_bstart_valid_f3"] & ifu_f3["f3_to_pcb_stage_pred_take_f3"],
+    )
+    m.assign(ftq_pf_addr_wire_f3, ifu_f3["f3_to_pcb_stage_bstart_target_f3"])
 
     ifu_f4 = m.instance_auto(
         build_janus_bcc_ifu_f4,
@@ -310,7 +333,7 @@ def build_linxcore_top(
         build_backend,
         name="janus_backend",
         module_name="JanusBccBackendTop",
-        params={"mem_bytes": mem_bytes},
+        params={"mem_bytes": mem_bytes, "mdp_entries": mdp_entries},
         clk=clk_top,
         rst=rst_top,
         boot_pc=boot_pc_top,
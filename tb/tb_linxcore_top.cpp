@@ -4,6 +4,7 @@
 #include <cstdint>
 #include <cstdlib>
 #include <array>
+#include <deque>
 #include <filesystem>
 #include <fstream>
 #include <iomanip>
@@ -698,6 +699,11 @@ int main(int argc, char **argv) {
     }
   }
   const bool rawTraceProbes = envFlag("PYC_RAW_TRACE_PROBES");
+  // Memory-dependence predictor totals carried on every raw `mdp` record.
+  std::uint64_t mdpHits = 0;
+  std::uint64_t mdpWaits = 0;
+  std::uint64_t mdpSpecIssues = 0;
+  std::uint64_t mdpMispredicts = 0;
   const bool debugMacroPrf = envFlag("PYC_DEBUG_MACRO_PRF");
 
   const bool traceVcd = envFlag("PYC_VCD");
@@ -767,6 +773,9 @@ int main(int argc, char **argv) {
   std::uint64_t icMissCycles = 20;
   if (const char *env = std::getenv("PYC_IC_MISS_CYCLES"))
     icMissCycles = static_cast<std::uint64_t>(std::stoull(env, nullptr, 0));
+  std::size_t icL2Outstanding = 1;
+  if (const char *env = std::getenv("PYC_IC_L2_OUTSTANDING"))
+    icL2Outstanding = std::max<std::size_t>(1, static_cast<std::size_t>(std::stoull(env, nullptr, 0)));
   const bool debugIcache = envFlag("PYC_DEBUG_ICACHE");
   std::uint64_t debugIcacheCycles = 200;
   if (const char *env = std::getenv("PYC_DEBUG_ICACHE_CYCLES"))
@@ -2072,10 +2081,14 @@ int main(int argc, char **argv) {
     }
   };
 
-  bool icReqPending = false;
+  // Pipelined L2 model: up to icL2Outstanding line requests in flight, each
+  // answered in order icMissCycles after acceptance, one response per cycle.
+  struct IcL2Pending {
+    std::uint64_t addr = 0;
+    std::uint64_t remain = 0;
+  };
+  std::deque<IcL2Pending> icL2Queue;
   bool icRspDriveNow = false;
-  std::uint64_t icReqAddrPending = 0;
-  std::uint64_t icReqRemainCycles = 0;
   auto buildIcacheLine = [&](std::uint64_t lineAddr) -> Wire<512> {
     return memShadow.buildIcacheLine(lineAddr);
   };
@@ -2414,11 +2427,12 @@ int main(int argc, char **argv) {
                 << " cycles_sig=" << dut.cycles.value()
                 << "\n";
     }
-    dut.ic_l2_req_ready = Wire<1>(icReqPending ? 0 : 1);
+    const bool icReqReadyPre = icL2Queue.size() < icL2Outstanding;
+    dut.ic_l2_req_ready = Wire<1>(icReqReadyPre ? 1 : 0);
     if (icRspDriveNow) {
       dut.ic_l2_rsp_valid = Wire<1>(1);
-      dut.ic_l2_rsp_addr = Wire<64>(icReqAddrPending);
-      dut.ic_l2_rsp_data = buildIcacheLine(icReqAddrPending);
+      dut.ic_l2_rsp_addr = Wire<64>(icL2Queue.front().addr);
+      dut.ic_l2_rsp_data = buildIcacheLine(icL2Queue.front().addr);
       dut.ic_l2_rsp_error = Wire<1>(0);
     } else {
       dut.ic_l2_rsp_valid = Wire<1>(0);
@@ -2427,7 +2441,7 @@ int main(int argc, char **argv) {
       dut.ic_l2_rsp_error = Wire<1>(0);
     }
 
-    const bool icReqSeenPre = (!icReqPending) && dut.ic_l2_req_valid.toBool() && dut.ic_l2_req_ready.toBool();
+    const bool icReqSeenPre = icReqReadyPre && dut.ic_l2_req_valid.toBool() && dut.ic_l2_req_ready.toBool();
     const std::uint64_t icReqAddrPre = dut.ic_l2_req_addr.value() & ~0x3Full;
     if (debugIcache && cycleNow < debugIcacheCycles) {
       std::cerr << "[icdbg-pre] cyc=" << cycleNow
@@ -2445,8 +2459,8 @@ int main(int argc, char **argv) {
                 << " f1_h=" << dut.icache_f1_hit_dbg.toBool()
                 << " f1_m=" << dut.icache_f1_miss_dbg.toBool()
                 << " f1_s=" << dut.icache_f1_stall_dbg.toBool()
-                << " pend=" << icReqPending
-                << " rem=" << std::dec << icReqRemainCycles
+                << " pend=" << icL2Queue.size()
+                << " rem=" << std::dec << (icL2Queue.empty() ? 0 : icL2Queue.front().remain)
                 << " pc=0x" << std::hex << dut.pc.value()
                 << std::dec << "\n";
     }
@@ -2596,24 +2610,22 @@ int main(int argc, char **argv) {
     ifuStubFiredPcLastCycle = ifuStubFiredPcThisCycle;
 
     if (icRspDriveNow) {
-      icReqPending = false;
+      icL2Queue.pop_front();
       icRspDriveNow = false;
-      icReqAddrPending = 0;
-      icReqRemainCycles = 0;
-    } else if (icReqPending) {
-      if (icReqRemainCycles > 0) {
-        icReqRemainCycles--;
-      }
-      if (icReqRemainCycles == 0) {
-        icRspDriveNow = true;
+    }
+    for (IcL2Pending &pending : icL2Queue) {
+      if (pending.remain > 0) {
+        pending.remain--;
       }
-    } else {
+    }
+    if (!icL2Queue.empty() && icL2Queue.front().remain == 0) {
+      icRspDriveNow = true;
+    }
+    if (icReqReadyPre) {
       const bool icReqSeenPost = dut.ic_l2_req_valid.toBool() && dut.ic_l2_req_ready.toBool();
       if (icReqSeenPre || icReqSeenPost) {
-        icReqPending = true;
-        icReqAddrPending = icReqSeenPre ? icReqAddrPre : (dut.ic_l2_req_addr.value() & ~0x3Full);
-        icReqRemainCycles = icMissCycles;
-        icRspDriveNow = false;
+        const std::uint64_t addr = icReqSeenPre ? icReqAddrPre : (dut.ic_l2_req_addr.value() & ~0x3Full);
+        icL2Queue.push_back(IcL2Pending{addr, icMissCycles});
       }
     }
     if (debugIcache && cycleNow < debugIcacheCycles) {
@@ -2632,8 +2644,8 @@ int main(int argc, char **argv) {
                 << " f1_h=" << dut.icache_f1_hit_dbg.toBool()
                 << " f1_m=" << dut.icache_f1_miss_dbg.toBool()
                 << " f1_s=" << dut.icache_f1_stall_dbg.toBool()
-                << " pend=" << icReqPending
-                << " rem=" << std::dec << icReqRemainCycles
+                << " pend=" << icL2Queue.size()
+                << " rem=" << std::dec << (icL2Queue.empty() ? 0 : icL2Queue.front().remain)
                 << " pc=0x" << std::hex << dut.pc.value()
                 << std::dec << "\n";
     }
@@ -2856,6 +2868,47 @@ int main(int argc, char **argv) {
         }
       }
       if (rawTrace.is_open()) {
+        {
+          auto *backend = dut.linxcore_top_root->janus_backend.get();
+          auto *rob = backend->rob_bank.get();
+          auto *lsu = backend->lsu_stage.get();
+          const bool loadIssue = lsu->issue_fire_lane0_eff.value() && lsu->ex0_is_load.value();
+          const bool hit = loadIssue && lsu->mdp_pred_valid_lane0.value();
+          const bool wait = lsu->lsu_mdp_wait_lane0.value();
+          const bool spec = lsu->lsu_spec_issue_lane0.value();
+          const bool mispredict = rob->lsu_violation_replay_set_o.value();
+          mdpHits += hit ? 1 : 0;
+          mdpWaits += wait ? 1 : 0;
+          mdpSpecIssues += spec ? 1 : 0;
+          mdpMispredicts += mispredict ? 1 : 0;
+          auto emitMdp = [&](const char *event, std::uint64_t pc, std::uint64_t robIdx) {
+            rawTrace << "{"
+                     << "\"type\":\"mdp\","
+                     << "\"cycle\":" << cycleNow << ","
+                     << "\"event\":\"" << event << "\","
+                     << "\"pc\":" << pc << ","
+                     << "\"rob\":" << robIdx << ","
+                     << "\"hits\":" << mdpHits << ","
+                     << "\"waits\":" << mdpWaits << ","
+                     << "\"spec_issues\":" << mdpSpecIssues << ","
+                     << "\"mispredicts\":" << mdpMispredicts
+                     << "}\n";
+          };
+          const std::uint64_t ldPc = backend->iq_lsu_bank->issue_pick_pc0_o.value();
+          const std::uint64_t ldRob = backend->iq_lsu_bank->issue_pick_rob0_o.value();
+          if (hit) {
+            emitMdp("hit", ldPc, ldRob);
+          }
+          if (wait) {
+            emitMdp("wait", ldPc, ldRob);
+          }
+          if (spec) {
+            emitMdp("spec", ldPc, ldRob);
+          }
+          if (mispredict) {
+            emitMdp("mispredict", rob->lsu_violation_replay_pc_o.value(), rob->lsu_violation_replay_load_rob_o.value());
+          }
+        }
         if (rawTraceProbes) {
           auto *backend = dut.linxcore_top_root->janus_backend.get();
           auto *dispatch = backend->dispatch_frontend.get();
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from pycircuit import Circuit, Tb, module, testbench
+
+from common.isa import BK_FALL, OP_ADD, OP_SD  # noqa: E402
+from bcc.backend.modules.commit_slot_step import (  # noqa: E402
+    COMMIT_SLOT_INPUT_FIELD_SPECS,
+    COMMIT_SLOT_REDIRECT_FIELD_SPECS,
+    COMMIT_SLOT_TRACE_FIELD_SPECS,
+    _field_width_sum,
+    _unpack_fields,
+    build_commit_slot_step,
+)
+
+STORE_PC = 0x2000
+
+
+def _pack(values: dict[str, int]) -> int:
+    result = 0
+    shift = 0
+    for name, bits in COMMIT_SLOT_INPUT_FIELD_SPECS:
+        result |= (values.get(name, 0) & ((1 << bits) - 1)) << shift
+        shift += bits
+    return result
+
+
+def _slot(*, op: int, is_store: int, commit_idx: int, replay_pending: int, replay_store_rob: int) -> int:
+    return _pack(
+        {
+            "can_run": 1,
+            "allow_macro": 1,
+            "commit_allow": 1,
+            "stbuf_has_space": 1,
+            "br_kind": BK_FALL,
+            "replay_pending": replay_pending,
+            "replay_store_rob": replay_store_rob,
+            "rob_valid": 1,
+            "rob_done": 1,
+            "rob_pc": STORE_PC,
+            "rob_op": op,
+            "rob_len": 4,
+            "rob_is_store": is_store,
+            "rob_store_addr": 0x8000,
+            "rob_store_size": 8,
+            "commit_idx": commit_idx,
+        }
+    )
+
+
+# (slot pack, expected replay redirect)
+CASES = [
+    # The violated store retires: refetch everything after it.
+    (_slot(op=OP_SD, is_store=1, commit_idx=5, replay_pending=1, replay_store_rob=5), 1),
+    # A different store retiring leaves the replay pending.
+    (_slot(op=OP_SD, is_store=1, commit_idx=4, replay_pending=1, replay_store_rob=5), 0),
+    # Only the store row itself triggers the restart.
+    (_slot(op=OP_ADD, is_store=0, commit_idx=5, replay_pending=1, replay_store_rob=5), 0),
+    # No replay pending.
+    (_slot(op=OP_SD, is_store=1, commit_idx=5, replay_pending=0, replay_store_rob=5), 0),
+]
+
+
+@module(name="LinxCoreCommitReplayProbe")
+def build(m: Circuit) -> None:
+    pack_i = m.input("pack_i", width=_field_width_sum(COMMIT_SLOT_INPUT_FIELD_SPECS))
+    slot = m.instance_auto(build_commit_slot_step, name="commit_slot", pack_i=pack_i)
+    trace = _unpack_fields(slot["trace_pack_o"], COMMIT_SLOT_TRACE_FIELD_SPECS)
+    redirect = _unpack_fields(slot["redirect_pack_o"], COMMIT_SLOT_REDIRECT_FIELD_SPECS)
+    m.output("commit_fire", trace["commit_fire"])
+    m.output("pc_next", trace["pc_next"])
+    m.output("redirect_valid", redirect["redirect_valid"])
+    m.output("redirect_pc", redirect["redirect_pc"])
+    m.output("replay_redirect_fire", redirect["replay_redirect_fire"])
+
+
+@testbench
+def tb(t: Tb) -> None:
+    t.timeout(len(CASES) + 8)
+
+    for cyc, (packed, replay) in enumerate(CASES):
+        t.drive("pack_i", packed, at=cyc)
+        t.expect("commit_fire", 1, at=cyc)
+        t.expect("pc_next", STORE_PC + 4, at=cyc)
+        t.expect("replay_redirect_fire", replay, at=cyc)
+        t.expect("redirect_valid", replay, at=cyc)
+        if replay:
+            # Restart at the instruction after the store, not at the load, so
+            # the rows in between are re-executed too.
+            t.expect("redirect_pc", STORE_PC + 4, at=cyc)
+
+    t.finish(at=len(CASES))
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import random
+
+from pycircuit import Tb, testbench
+
+from bcc.backend.issue import build_issue_picker as build  # noqa: E402
+
+IQ_DEPTH = 32
+ROB_W = 6
+WIDTH = 2
+
+
+def _reference(can_issue: list[int], rob_tags: list[int], sub_head: int) -> list[tuple[int, int]]:
+    """Linear first-wins scan: the pre-tree picker semantics."""
+    picks: list[tuple[int, int]] = []
+    taken: set[int] = set()
+    for _slot in range(WIDTH):
+        best = None
+        for i in range(IQ_DEPTH):
+            if not can_issue[i] or i in taken:
+                continue
+            age = (rob_tags[i] + sub_head) & ((1 << ROB_W) - 1)
+            if best is None or age < best[1]:
+                best = (i, age)
+        if best is None:
+            picks.append((0, 0))
+        else:
+            taken.add(best[0])
+            picks.append((1, best[0]))
+    return picks
+
+
+@testbench
+def tb(t: Tb) -> None:
+    rng = random.Random(21)
+    cycles = 24
+    t.timeout(cycles + 8)
+
+    for cyc in range(cycles):
+        if cyc == 0:
+            can_issue = [0] * IQ_DEPTH
+        elif cyc == 1:
+            # All ready with equal ages: ties go to the lowest index.
+            can_issue = [1] * IQ_DEPTH
+        else:
+            can_issue = [int(rng.random() < 0.3) for _ in range(IQ_DEPTH)]
+        if cyc == 1:
+            rob_tags = [7] * IQ_DEPTH
+        else:
+            rob_tags = [rng.randrange(1 << ROB_W) for _ in range(IQ_DEPTH)]
+        sub_head = rng.randrange(1 << ROB_W)
+
+        t.drive("sub_head", sub_head, at=cyc)
+        for i in range(IQ_DEPTH):
+            t.drive(f"can_issue{i}", can_issue[i], at=cyc)
+            t.drive(f"rob_tag{i}", rob_tags[i], at=cyc)
+        for slot, (valid, idx) in enumerate(_reference(can_issue, rob_tags, sub_head)):
+            t.expect(f"issue_valid{slot}", valid, at=cyc)
+            if valid:
+                t.expect(f"issue_idx{slot}", idx, at=cyc)
+
+    t.finish(at=cycles)
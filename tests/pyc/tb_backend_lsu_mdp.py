@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from pycircuit import Tb, testbench
+
+from bcc.backend.lsu import build_lsu_mdp as build  # noqa: E402
+
+
+@testbench
+def tb(t: Tb) -> None:
+    t.clock("clk")
+    t.reset("rst", cycles_asserted=2, cycles_deasserted=1)
+    t.timeout(32)
+
+    ld_pc = 0x1040
+    alias_pc = ld_pc + (64 << 1)  # same table index, different tag
+
+    for cyc in range(12):
+        t.drive("ld_valid", 0, at=cyc)
+        t.drive("ld_pc", ld_pc, at=cyc)
+        t.drive("ld_rob", 0, at=cyc)
+        t.drive("train_valid", 0, at=cyc)
+        t.drive("train_pc", 0, at=cyc)
+        t.drive("train_load_rob", 0, at=cyc)
+        t.drive("train_store_rob", 0, at=cyc)
+
+    # Untrained loads predict no dependence.
+    t.drive("ld_valid", 1, at=0)
+    t.drive("ld_rob", 10, at=0)
+    t.expect("mdp_pred_valid", 0, at=0)
+
+    # A violation between load rob 12 and store rob 9 records distance 3.
+    t.drive("train_valid", 1, at=1)
+    t.drive("train_pc", ld_pc, at=1)
+    t.drive("train_load_rob", 12, at=1)
+    t.drive("train_store_rob", 9, at=1)
+
+    t.drive("ld_valid", 1, at=2)
+    t.drive("ld_rob", 20, at=2)
+    t.expect("mdp_pred_valid", 1, at=2)
+    t.expect("mdp_pred_store_rob", 17, at=2)
+
+    # The distance wraps around the ROB ring.
+    t.drive("ld_valid", 1, at=3)
+    t.drive("ld_rob", 1, at=3)
+    t.expect("mdp_pred_valid", 1, at=3)
+    t.expect("mdp_pred_store_rob", 62, at=3)
+
+    # A different load sharing the index misses on its tag.
+    t.drive("ld_valid", 1, at=4)
+    t.drive("ld_pc", alias_pc, at=4)
+    t.expect("mdp_pred_valid", 0, at=4)
+
+    t.finish(at=6)
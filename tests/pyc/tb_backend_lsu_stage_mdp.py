@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from pycircuit import Tb, testbench
+
+from bcc.backend.lsu import build_lsu_stage as build  # noqa: E402
+
+# Built with `--param mdp_en=1` (see tests/test_backend_lsu_mdp_pyc_flow.sh).
+SQ_ENTRIES = 32
+BASE = 0x8000
+
+# (is_load, older_pending, pred_valid, pred_store_pending, store_inflight,
+#  commit_store) -> expected (mdp_wait, block, issue_eff, spec_issue)
+CASES = [
+    # Predicted store still unresolved: the load waits for it.
+    ((1, 1, 1, 1, 0, None), (1, 1, 0, 0)),
+    # Predicted store already resolved: issue past the other older stores.
+    ((1, 1, 1, 0, 0, None), (0, 0, 1, 1)),
+    # No prediction: speculate past older stores still in the issue queue.
+    ((1, 1, 0, 0, 0, None), (0, 0, 1, 1)),
+    # An older store between issue and writeback is never speculated past.
+    ((1, 1, 0, 0, 1, None), (0, 1, 0, 0)),
+    # Nothing older in flight: a plain, non-speculative issue.
+    ((1, 0, 0, 0, 0, None), (0, 0, 1, 0)),
+    # The predictor never gates stores.
+    ((0, 1, 1, 1, 1, None), (0, 0, 1, 0)),
+    # A partial forward still blocks when the prediction says go.
+    ((1, 1, 0, 0, 0, (BASE + 2, 1, 0xAB)), (0, 1, 0, 0)),
+]
+
+
+@testbench
+def tb(t: Tb) -> None:
+    t.timeout(len(CASES) + 8)
+
+    for cyc, ((is_load, older, pred, pred_pending, inflight, commit), expect) in enumerate(CASES):
+        mdp_wait, block, issue_eff, spec = expect
+        t.drive("issue_fire_lane0_raw", 1, at=cyc)
+        t.drive("ex0_is_load", is_load, at=cyc)
+        t.drive("ex0_is_store", 1 - is_load, at=cyc)
+        t.drive("ex0_addr", BASE, at=cyc)
+        t.drive("ex0_size", 4, at=cyc)
+        t.drive("ex0_lsid", cyc, at=cyc)
+        t.drive("lsid_issue_ptr", cyc, at=cyc)
+        t.drive("rob_older_store_pending_lane0", older, at=cyc)
+        t.drive("mdp_pred_valid_lane0", pred, at=cyc)
+        t.drive("rob_mdp_store_pending_lane0", pred_pending, at=cyc)
+        t.drive("older_store_inflight_lane0", inflight, at=cyc)
+        t.drive("rob_forward_mask_lane0", 0, at=cyc)
+        t.drive("rob_forward_data_lane0", 0, at=cyc)
+        t.drive("stbuf_head", 0, at=cyc)
+        for i in range(SQ_ENTRIES):
+            t.drive(f"stbuf_valid{i}", 0, at=cyc)
+            t.drive(f"stbuf_addr{i}", 0, at=cyc)
+            t.drive(f"stbuf_size{i}", 0, at=cyc)
+            t.drive(f"stbuf_data{i}", 0, at=cyc)
+        t.drive("commit_store_fire", int(commit is not None), at=cyc)
+        t.drive("commit_store_addr", commit[0] if commit else 0, at=cyc)
+        t.drive("commit_store_size", commit[1] if commit else 0, at=cyc)
+        t.drive("commit_store_data", commit[2] if commit else 0, at=cyc)
+
+        t.expect("lsu_mdp_wait_lane0", mdp_wait, at=cyc)
+        t.expect("lsu_block_lane0", block, at=cyc)
+        t.expect("issue_fire_lane0_eff", issue_eff, at=cyc)
+        t.expect("lsu_spec_issue_lane0", spec, at=cyc)
+
+    t.finish(at=len(CASES))
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pycircuit import Tb, testbench
+
+from bcc.backend.modules.recovery_checks import build_lsu_violation_detect_stage as build  # noqa: E402
+
+ISSUE_W = 4
+ROB_DEPTH = 64
+BASE = 0x9000
+
+# Each case: (head, pending store rob or None, stores [(rob, addr, size)],
+# done loads [(rob, addr, size)]) -> expected (store_rob, load_rob) or None.
+CASES = [
+    # No store resolving this cycle.
+    (0, None, [], [(7, BASE, 8)], None),
+    # A wide store overlaps the tail of an executed younger load.
+    (0, None, [(5, BASE, 8)], [(7, BASE + 4, 4)], (5, 7)),
+    # Adjacent bytes do not overlap.
+    (0, None, [(5, BASE, 8)], [(7, BASE + 8, 4)], None),
+    # A narrow store inside a wide load still violates.
+    (0, None, [(5, BASE + 6, 1)], [(7, BASE, 8)], (5, 7)),
+    # Loads older than the store are not affected.
+    (0, None, [(5, BASE, 8)], [(3, BASE, 8)], None),
+    # Of two violating loads the oldest one is reported.
+    (0, None, [(5, BASE, 8)], [(9, BASE, 4), (7, BASE + 2, 2)], (5, 7)),
+    # Of two violating stores the oldest one wins.
+    (0, None, [(10, BASE, 8), (4, BASE + 16, 8)], [(12, BASE, 8), (11, BASE + 16, 4)], (4, 11)),
+    # A younger store cannot displace a pending replay...
+    (0, 6, [(8, BASE, 8)], [(9, BASE, 8)], None),
+    # ...but an older one preempts it, its restart covering the younger one.
+    (0, 6, [(2, BASE, 8)], [(9, BASE, 8)], (2, 9)),
+    # Ages are taken from the ROB head, across the index wrap.
+    (60, None, [(62, BASE, 4)], [(1, BASE, 4), (58, BASE, 4)], (62, 1)),
+]
+
+
+@testbench
+def tb(t: Tb) -> None:
+    t.timeout(len(CASES) + 8)
+
+    for cyc, (head, pending, stores, loads, expect) in enumerate(CASES):
+        t.drive("replay_pending", int(pending is not None), at=cyc)
+        t.drive("replay_store_rob", pending or 0, at=cyc)
+        t.drive("sub_head", (-head) % ROB_DEPTH, at=cyc)
+        for slot in range(ISSUE_W):
+            st = stores[slot] if slot < len(stores) else None
+            t.drive(f"store_fire{slot}", int(st is not None), at=cyc)
+            t.drive(f"store_rob{slot}", st[0] if st else 0, at=cyc)
+            t.drive(f"store_addr{slot}", st[1] if st else 0, at=cyc)
+            t.drive(f"store_size{slot}", st[2] if st else 0, at=cyc)
+        done = {rob: (addr, size) for rob, addr, size in loads}
+        for i in range(ROB_DEPTH):
+            addr, size = done.get(i, (0, 0))
+            t.drive(f"rob_valid{i}", int(i in done), at=cyc)
+            t.drive(f"rob_done{i}", int(i in done), at=cyc)
+            t.drive(f"rob_is_load{i}", int(i in done), at=cyc)
+            t.drive(f"rob_load_addr{i}", addr, at=cyc)
+            t.drive(f"rob_load_size{i}", size, at=cyc)
+            t.drive(f"rob_pc{i}", 0x10000 + 4 * i, at=cyc)
+
+        t.expect("replay_set", int(expect is not None), at=cyc)
+        if expect is not None:
+            store_rob, load_rob = expect
+            t.expect("replay_set_store_rob", store_rob, at=cyc)
+            t.expect("replay_set_load_rob", load_rob, at=cyc)
+            t.expect("replay_set_pc", 0x10000 + 4 * load_rob, at=cyc)
+
+    t.finish(at=len(CASES))
@@ -2,50 +2,143 @@ from __future__ import annotations
 
 from pycircuit import Tb, testbench
 
-from bcc.frontend.bpu import build_bpu_lite as build  # noqa: E402
+from bcc.frontend.bpu import build_bpu as build  # noqa: E402
+from common.isa import BK_CALL, BK_COND, BK_DIRECT, BK_RET  # noqa: E402
+
+
+TAGE_BASE = 13
+LOOP_PC = 0x3000
+ALIAS_PC = LOOP_PC + 0x100
+TAGE_SEQ = [(LOOP_PC, taken) for taken in [1, 1, 1, 1, 1, 0] * 7]
+TAGE_SEQ += [(LOOP_PC, 1)] * 4 + [(ALIAS_PC, 1), (LOOP_PC, 0)]
+TAGE_SEQ += [(LOOP_PC, 1)] * 4 + [(ALIAS_PC, 0)]
+TAGE_SEQ += [(LOOP_PC, 1)] * 5
 
 
 @testbench
 def tb(t: Tb) -> None:
     t.clock("clk")
     t.reset("rst", cycles_asserted=2, cycles_deasserted=1)
-    t.timeout(96)
+    t.timeout(160)
 
     pc = 0x1234
     target = 0x4000
+    cond_pc = 0x2000
+    cond_target = 0x1F00
+    call_pc = 0x5000
+    call_fall = 0x5010
+    ret_pc = 0x6100
 
-    for cyc in range(20):
+    for cyc in range(TAGE_BASE + len(TAGE_SEQ) + 2):
         t.drive("req_valid", 0, at=cyc)
         t.drive("req_pc", pc, at=cyc)
         t.drive("update_valid", 0, at=cyc)
         t.drive("update_pc", pc, at=cyc)
         t.drive("update_taken", 0, at=cyc)
         t.drive("update_target", target, at=cyc)
+        t.drive("update_kind", BK_DIRECT, at=cyc)
+        t.drive("update_fallthrough", 0, at=cyc)
 
-    # No history hit yet: predict not-taken to pc+8.
+    def update(cyc: int, upd_pc: int, kind: int, taken: int, upd_target: int, fall: int = 0) -> None:
+        t.drive("update_valid", 1, at=cyc)
+        t.drive("update_pc", upd_pc, at=cyc)
+        t.drive("update_kind", kind, at=cyc)
+        t.drive("update_taken", taken, at=cyc)
+        t.drive("update_target", upd_target, at=cyc)
+        t.drive("update_fallthrough", fall, at=cyc)
+
+    # BTB miss: predict not-taken to pc+8.
     t.drive("req_valid", 1, at=0)
     t.expect("pred_valid", 1, at=0)
     t.expect("pred_taken", 0, at=0)
     t.expect("pred_target", pc + 8, at=0)
+    t.expect("pred_btb_hit", 0, at=0)
     t.expect("checkpoint_id", (pc >> 2) & 0x3F, at=0)
 
-    # Train as taken.
-    t.drive("update_valid", 1, at=1)
-    t.drive("update_taken", 1, at=1)
-    t.drive("update_target", target, at=1)
-
-    # Next request hits tag + strong-enough counter => predict taken.
+    # A trained direct block is always taken.
+    update(1, pc, BK_DIRECT, 1, target)
     t.drive("req_valid", 1, at=2)
-    t.expect("pred_valid", 1, at=2)
     t.expect("pred_taken", 1, at=2)
     t.expect("pred_target", target, at=2)
+    t.expect("pred_btb_hit", 1, at=2)
+    t.expect("pred_kind", BK_DIRECT, at=2)
 
-    # Train as not-taken once; 2-bit counter drops below taken threshold.
-    t.drive("update_valid", 1, at=3)
-    t.drive("update_taken", 0, at=3)
-
+    # A second branch gets its own BTB entry; the bimodal counter leaves
+    # weakly-not-taken after one taken outcome...
+    update(3, cond_pc, BK_COND, 1, cond_target)
     t.drive("req_valid", 1, at=4)
-    t.expect("pred_taken", 0, at=4)
-    t.expect("pred_target", pc + 8, at=4)
+    t.drive("req_pc", cond_pc, at=4)
+    t.expect("pred_taken", 1, at=4)
+    t.expect("pred_target", cond_target, at=4)
+    t.expect("pred_kind", BK_COND, at=4)
+
+    # ...and returns after one not-taken outcome, keeping the BTB entry.
+    update(5, cond_pc, BK_COND, 0, cond_target)
+    t.drive("req_valid", 1, at=6)
+    t.drive("req_pc", cond_pc, at=6)
+    t.expect("pred_taken", 0, at=6)
+    t.expect("pred_target", cond_pc + 8, at=6)
+    t.expect("pred_btb_hit", 1, at=6)
+
+    # Returns: with an empty RAS the BTB target is used; after a call the
+    # RAS supplies the call block's fall-through.
+    update(7, call_pc, BK_CALL, 1, 0x6000, call_fall)
+    update(8, ret_pc, BK_RET, 1, 0x9999)
+    t.drive("req_valid", 1, at=9)
+    t.drive("req_pc", ret_pc, at=9)
+    t.expect("pred_taken", 1, at=9)
+    t.expect("pred_target", 0x9999, at=9)
+    t.expect("pred_kind", BK_RET, at=9)
+
+    update(10, call_pc, BK_CALL, 1, 0x6000, call_fall)
+    t.drive("req_valid", 1, at=11)
+    t.drive("req_pc", ret_pc, at=11)
+    t.expect("pred_taken", 1, at=11)
+    t.expect("pred_target", call_fall, at=11)
+
+    # TAGE: a period-6 loop branch (five taken, one not-taken). The bimodal
+    # counter and the 4-bit history table both see the same recent history
+    # before the fifth and the sixth outcome; only the 8-bit table tells them
+    # apart. Each cycle predicts and then resolves the same block.
+    for i, (upd_pc, taken) in enumerate(TAGE_SEQ):
+        cyc = TAGE_BASE + i
+        t.drive("req_valid", 1, at=cyc)
+        t.drive("req_pc", upd_pc, at=cyc)
+        update(cyc, upd_pc, BK_COND, taken, upd_pc - 0x100)
+
+    def at(i: int) -> int:
+        return TAGE_BASE + i
+
+    # The first mispredict allocates in table 0; once table 0 provides and
+    # still mispredicts, allocation moves to the longer table 1.
+    t.expect("update_alloc", 0b01, at=at(0))
+    t.expect("update_alloc", 0b10, at=at(10))
+    t.expect("update_alloc", 0b10, at=at(11))
+
+    # Table 1 becomes the provider for the fifth taken outcome while the
+    # shorter alternate still says not-taken, so its useful bits count up.
+    for i, u in ((22, 1), (28, 2), (34, 3)):
+        t.expect("pred_provider", 2, at=at(i))
+        t.expect("pred_alt_taken", 0, at=at(i))
+        t.expect("pred_provider_u", u, at=at(i))
+
+    # Steady state: every outcome of the loop is predicted.
+    for i in range(36, 42):
+        t.expect("pred_taken", TAGE_SEQ[i][1], at=at(i))
+    t.expect("pred_provider", 2, at=at(41))
+
+    # An aliasing branch (same indices, different tag) seen with the same
+    # history allocates in table 0, whose slot is not useful...
+    t.expect("pred_btb_hit", 0, at=at(46))
+    t.expect("update_alloc", 0b01, at=at(46))
+    # ...then mispredicts from table 0. Table 1's slot is useful, so nothing
+    # is allocated and its useful counter decays instead.
+    t.expect("pred_provider", 1, at=at(52))
+    t.expect("pred_taken", 1, at=at(52))
+    t.expect("update_alloc", 0, at=at(52))
+    t.expect("update_decay", 0b10, at=at(52))
+    t.expect("pred_provider", 2, at=at(57))
+    t.expect("pred_provider_u", 2, at=at(57))
+    t.expect("pred_taken", 1, at=at(57))
 
-    t.finish(at=6)
+    t.finish(at=TAGE_BASE + len(TAGE_SEQ))
@@ -19,6 +19,12 @@ def tb(t: Tb) -> None:
         t.drive("redirect_pc", 0, at=cyc)
         t.drive("flush_valid", 0, at=cyc)
         t.drive("flush_pc", 0, at=cyc)
+        t.drive("bpu_update_valid", 0, at=cyc)
+        t.drive("bpu_update_pc", 0, at=cyc)
+        t.drive("bpu_update_kind", 0, at=cyc)
+        t.drive("bpu_update_taken", 0, at=cyc)
+        t.drive("bpu_update_target", 0, at=cyc)
+        t.drive("bpu_update_fallthrough", 0, at=cyc)
 
     # Consume one packet.
     t.drive("backend_ready", 1, at=2)
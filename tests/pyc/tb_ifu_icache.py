@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from pycircuit import Tb, testbench
+
+from bcc.ifu.icache import build_janus_bcc_ifu_icache as build  # noqa: E402
+
+
+def _line(base: int) -> int:
+    return sum(((base + i) & 0xFF) << (8 * i) for i in range(64))
+
+
+def _bundle(line: int, off: int) -> int:
+    return (line >> (8 * off)) & ((1 << 128) - 1)
+
+
+@testbench
+def tb(t: Tb) -> None:
+    t.clock("clk")
+    t.reset("rst", cycles_asserted=2, cycles_deasserted=1)
+    t.timeout(96)
+
+    line_a = 0x1000
+    line_b = 0x2000
+    data_a = _line(0x11)
+    data_b = _line(0x80)
+
+    for cyc in range(12):
+        t.drive("f1_to_icache_stage_valid_f1", 1, at=cyc)
+        t.drive("f1_to_icache_stage_pc_f1", line_a, at=cyc)
+        t.drive("f1_to_icache_stage_pkt_uid_f1", cyc, at=cyc)
+        t.drive("imem_rdata_top", 0, at=cyc)
+        t.drive("ic_l2_req_ready_top", 1, at=cyc)
+        t.drive("ic_l2_rsp_valid_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_addr_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_data_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_error_top", 0, at=cyc)
+        t.drive("ftq_pf_valid_f3", 0, at=cyc)
+        t.drive("ftq_pf_addr_f3", 0, at=cyc)
+
+    # Cold miss on A allocates an MSHR, which requests the line next cycle.
+    t.expect("f1_to_f2_stage_hit_f1", 0, at=0)
+    t.expect("f1_to_f2_stage_stall_f1", 1, at=0)
+    t.expect("ic_l2_req_valid_top", 0, at=0)
+    t.expect("ic_l2_req_valid_top", 1, at=1)
+    t.expect("ic_l2_req_addr_top", line_a, at=1)
+    t.expect("icache_mshr_count_ic", 1, at=1)
+    t.drive("ic_l2_rsp_valid_top", 1, at=2)
+    t.drive("ic_l2_rsp_addr_top", line_a, at=2)
+    t.drive("ic_l2_rsp_data_top", data_a, at=2)
+
+    # Miss on B, then hit-under-miss on A while B is outstanding.
+    t.drive("f1_to_icache_stage_pc_f1", line_b, at=3)
+    t.expect("f1_to_f2_stage_hit_f1", 0, at=3)
+    t.drive("f1_to_icache_stage_pc_f1", line_a + 8, at=4)
+    t.expect("ic_l2_req_valid_top", 1, at=4)
+    t.expect("ic_l2_req_addr_top", line_b, at=4)
+    t.expect("f1_to_f2_stage_hit_f1", 1, at=4)
+    t.expect("f1_to_f2_stage_stall_f1", 0, at=4)
+    t.expect("f1_to_f2_stage_bundle128_f1", _bundle(data_a, 8), at=4)
+    t.expect("icache_miss_active_ic", 1, at=4)
+
+    # B stays pending (no duplicate request) until its refill lands.
+    t.drive("f1_to_icache_stage_pc_f1", line_b, at=5)
+    t.expect("f1_to_f2_stage_stall_f1", 1, at=5)
+    t.expect("ic_l2_req_valid_top", 0, at=5)
+    t.drive("f1_to_icache_stage_pc_f1", line_b, at=6)
+    t.drive("ic_l2_rsp_valid_top", 1, at=6)
+    t.drive("ic_l2_rsp_addr_top", line_b, at=6)
+    t.drive("ic_l2_rsp_data_top", data_b, at=6)
+    t.drive("f1_to_icache_stage_pc_f1", line_b + 0x20, at=7)
+    t.expect("f1_to_f2_stage_hit_f1", 1, at=7)
+    t.expect("f1_to_f2_stage_bundle128_f1", _bundle(data_b, 0x20), at=7)
+    t.expect("icache_miss_active_ic", 0, at=7)
+    t.expect("icache_demand_miss_cnt_ic", 2, at=7)
+
+    t.finish(at=9)
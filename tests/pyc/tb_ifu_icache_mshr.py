@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from pycircuit import Tb, testbench
+
+from bcc.ifu.icache import build_janus_bcc_ifu_icache as build  # noqa: E402
+
+# Built with `--param ic_miss_outstanding=4 --param ifetch_bundle_bytes=32`
+# (see tests/test_frontend_pyc_flow.sh).
+BUNDLE_BYTES = 32
+
+
+def _line(base: int) -> int:
+    return sum(((base + 7 * i) & 0xFF) << (8 * i) for i in range(64))
+
+
+def _bundle(line0: int, line1: int, off: int) -> int:
+    pair = line0 | (line1 << 512)
+    return (pair >> (8 * off)) & ((1 << (8 * BUNDLE_BYTES)) - 1)
+
+
+@testbench
+def tb(t: Tb) -> None:
+    t.clock("clk")
+    t.reset("rst", cycles_asserted=2, cycles_deasserted=1)
+    t.timeout(96)
+
+    # Four lines of set 0 (one per way), a fifth that cannot get an MSHR, and
+    # the set-1 line that follows A.
+    line_a, line_b, line_c, line_d, line_e = 0x1000, 0x2000, 0x3000, 0x4000, 0x5000
+    line_a1 = line_a + 0x40
+    data = {addr: _line(addr >> 8) for addr in (line_a, line_b, line_c, line_d, line_a1)}
+
+    pcs = [line_a, line_b, line_c, line_d, line_e, line_a, line_c + 0x20, line_b + 0x10, line_a]
+    pcs += [line_a + 0x38] * 4
+    for cyc, pc in enumerate(pcs):
+        t.drive("f1_to_icache_stage_valid_f1", 1, at=cyc)
+        t.drive("f1_to_icache_stage_pc_f1", pc, at=cyc)
+        t.drive("f1_to_icache_stage_pkt_uid_f1", cyc, at=cyc)
+        t.drive("imem_rdata_top", 0, at=cyc)
+        t.drive("ic_l2_req_ready_top", 1, at=cyc)
+        t.drive("ic_l2_rsp_valid_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_addr_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_data_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_error_top", 0, at=cyc)
+        t.drive("ftq_pf_valid_f3", 0, at=cyc)
+        t.drive("ftq_pf_addr_f3", 0, at=cyc)
+
+    def respond(addr: int, cyc: int) -> None:
+        t.drive("ic_l2_rsp_valid_top", 1, at=cyc)
+        t.drive("ic_l2_rsp_addr_top", addr, at=cyc)
+        t.drive("ic_l2_rsp_data_top", data[addr], at=cyc)
+
+    # Back-to-back misses each take their own MSHR; requests drain in
+    # allocation order, one per cycle.
+    for cyc, addr in enumerate((line_a, line_b, line_c, line_d)):
+        t.expect("f1_to_f2_stage_stall_f1", 1, at=cyc)
+        t.expect("icache_mshr_count_ic", cyc, at=cyc)
+        t.expect("ic_l2_req_valid_top", 1, at=cyc + 1)
+        t.expect("ic_l2_req_addr_top", addr, at=cyc + 1)
+
+    # A fifth miss finds every MSHR busy and waits without allocating.
+    t.expect("icache_mshr_full_ic", 1, at=4)
+    t.expect("icache_mshr_count_ic", 4, at=4)
+    t.expect("ic_l2_req_valid_top", 0, at=5)
+
+    # The L2 returns C, B, D before A; each fill lands by address.
+    respond(line_c, 5)
+    t.expect("f1_to_f2_stage_stall_f1", 1, at=5)
+    respond(line_b, 6)
+    t.expect("f1_to_f2_stage_hit_f1", 1, at=6)
+    t.expect("f1_to_f2_stage_bundle128_f1", _bundle(data[line_c], 0, 0x20), at=6)
+    t.expect("icache_mshr_count_ic", 3, at=6)
+    respond(line_d, 7)
+    t.expect("f1_to_f2_stage_hit_f1", 1, at=7)
+    t.expect("f1_to_f2_stage_bundle128_f1", _bundle(data[line_b], 0, 0x10), at=7)
+    t.expect("f1_to_f2_stage_stall_f1", 1, at=8)
+    t.expect("icache_mshr_count_ic", 1, at=8)
+    respond(line_a, 8)
+
+    # A 32-byte bundle at +0x38 spills into the next line, which misses on
+    # its own and is then stitched onto the tail of A.
+    t.expect("f1_to_f2_stage_stall_f1", 1, at=9)
+    t.expect("icache_miss_active_ic", 0, at=9)
+    t.expect("ic_l2_req_valid_top", 1, at=10)
+    t.expect("ic_l2_req_addr_top", line_a1, at=10)
+    respond(line_a1, 11)
+    t.expect("f1_to_f2_stage_stall_f1", 1, at=11)
+    t.expect("f1_to_f2_stage_hit_f1", 1, at=12)
+    t.expect("f1_to_f2_stage_bundle128_f1", _bundle(data[line_a], data[line_a1], 0x38), at=12)
+    t.expect("icache_demand_miss_cnt_ic", 5, at=12)
+    t.expect("icache_mshr_full_cnt_ic", 1, at=12)
+
+    t.finish(at=len(pcs))
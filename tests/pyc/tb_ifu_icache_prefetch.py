@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from pycircuit import Tb, testbench
+
+from bcc.ifu.icache import build_janus_bcc_ifu_icache as build  # noqa: E402
+
+# Built with `--param ic_miss_outstanding=4 --param ic_prefetch_lines=2
+# --param ic_prefetch_ftq=1` (see tests/test_frontend_pyc_flow.sh).
+
+
+def _line(base: int) -> int:
+    return sum(((base + 3 * i) & 0xFF) << (8 * i) for i in range(64))
+
+
+@testbench
+def tb(t: Tb) -> None:
+    t.clock("clk")
+    t.reset("rst", cycles_asserted=2, cycles_deasserted=1)
+    t.timeout(96)
+
+    line_a = 0x1000
+    line_a1 = line_a + 0x40
+    line_a2 = line_a + 0x80
+    line_a3 = line_a + 0xC0
+    data = {addr: _line(addr >> 6) for addr in (line_a, line_a1, line_a2)}
+
+    pcs = [line_a] * 6 + [line_a1] + [line_a2] * 3 + [line_a2 + 0x10] * 4
+    for cyc, pc in enumerate(pcs):
+        t.drive("f1_to_icache_stage_valid_f1", 1, at=cyc)
+        t.drive("f1_to_icache_stage_pc_f1", pc, at=cyc)
+        t.drive("f1_to_icache_stage_pkt_uid_f1", cyc, at=cyc)
+        t.drive("imem_rdata_top", 0, at=cyc)
+        t.drive("ic_l2_req_ready_top", 1, at=cyc)
+        t.drive("ic_l2_rsp_valid_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_addr_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_data_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_error_top", 0, at=cyc)
+        t.drive("ftq_pf_valid_f3", 0, at=cyc)
+        t.drive("ftq_pf_addr_f3", 0, at=cyc)
+
+    def respond(addr: int, cyc: int) -> None:
+        t.drive("ic_l2_rsp_valid_top", 1, at=cyc)
+        t.drive("ic_l2_rsp_addr_top", addr, at=cyc)
+        t.drive("ic_l2_rsp_data_top", data[addr], at=cyc)
+
+    # A demand miss on A starts a two-line next-line stream behind it.
+    t.expect("icache_pf_issue_ic", 0, at=0)
+    t.expect("icache_pf_issue_ic", 1, at=1)
+    t.expect("ic_l2_req_addr_top", line_a, at=1)
+    t.expect("icache_pf_issue_ic", 1, at=2)
+    t.expect("ic_l2_req_addr_top", line_a1, at=2)
+    t.expect("icache_pf_issue_ic", 0, at=3)
+    t.expect("ic_l2_req_addr_top", line_a2, at=3)
+    t.expect("icache_mshr_count_ic", 3, at=3)
+
+    # An FTQ hint into A1 restarts the stream there. A1 and A2 are already in
+    # flight and are skipped; only A3 gets an MSHR and an L2 request.
+    t.drive("ftq_pf_valid_f3", 1, at=3)
+    t.drive("ftq_pf_addr_f3", line_a1 + 4, at=3)
+    respond(line_a, 4)
+    t.expect("icache_pf_issue_ic", 0, at=4)
+    t.expect("ic_l2_req_valid_top", 0, at=4)
+    respond(line_a1, 5)
+    t.expect("f1_to_f2_stage_hit_f1", 1, at=5)
+    t.expect("icache_pf_useful_ic", 0, at=5)
+    t.expect("icache_pf_issue_ic", 0, at=5)
+    t.expect("ic_l2_req_valid_top", 0, at=5)
+    t.expect("icache_pf_issue_ic", 1, at=6)
+    t.expect("ic_l2_req_valid_top", 1, at=7)
+    t.expect("ic_l2_req_addr_top", line_a3, at=7)
+
+    # The first fetch of a prefetched line counts as a useful prefetch.
+    t.expect("f1_to_f2_stage_hit_f1", 1, at=6)
+    t.expect("icache_pf_useful_ic", 1, at=6)
+
+    # A demand miss on a still-in-flight prefetch takes it over instead of
+    # issuing a second request (a late but useful prefetch).
+    t.expect("f1_to_f2_stage_stall_f1", 1, at=7)
+    t.expect("icache_pf_useful_ic", 1, at=7)
+    respond(line_a2, 8)
+    t.expect("ic_l2_req_valid_top", 0, at=8)
+    t.expect("f1_to_f2_stage_hit_f1", 1, at=9)
+    t.expect("icache_pf_useful_ic", 0, at=9)
+    t.expect("icache_pf_useful_cnt_ic", 2, at=9)
+
+    # A hint whose lines are all resident or in flight issues nothing.
+    t.drive("ftq_pf_valid_f3", 1, at=9)
+    t.drive("ftq_pf_addr_f3", line_a, at=9)
+    for cyc in range(10, 14):
+        t.expect("icache_pf_issue_ic", 0, at=cyc)
+        t.expect("ic_l2_req_valid_top", 0, at=cyc)
+    t.expect("icache_pf_issue_cnt_ic", 3, at=13)
+    t.expect("icache_demand_miss_cnt_ic", 1, at=13)
+
+    t.finish(at=len(pcs))
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from pycircuit import Tb, testbench
+
+from bcc.ifu.icache import build_janus_bcc_ifu_icache as build  # noqa: E402
+
+# Built with `--param ic_miss_outstanding=2 --param ic_prefetch_lines=2`
+# (see tests/test_frontend_pyc_flow.sh).
+
+
+@testbench
+def tb(t: Tb) -> None:
+    t.clock("clk")
+    t.reset("rst", cycles_asserted=2, cycles_deasserted=1)
+    t.timeout(64)
+
+    line_a, line_b = 0x1000, 0x2000
+    pcs = [line_a, line_a, line_b, line_b, line_b]
+    for cyc, pc in enumerate(pcs):
+        t.drive("f1_to_icache_stage_valid_f1", 1, at=cyc)
+        t.drive("f1_to_icache_stage_pc_f1", pc, at=cyc)
+        t.drive("f1_to_icache_stage_pkt_uid_f1", cyc, at=cyc)
+        t.drive("imem_rdata_top", 0, at=cyc)
+        t.drive("ic_l2_req_ready_top", 1, at=cyc)
+        t.drive("ic_l2_rsp_valid_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_addr_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_data_top", 0, at=cyc)
+        t.drive("ic_l2_rsp_error_top", 0, at=cyc)
+        t.drive("ftq_pf_valid_f3", 0, at=cyc)
+        t.drive("ftq_pf_addr_f3", 0, at=cyc)
+
+    # The demand miss on A takes one of the two MSHRs and starts a stream.
+    # With a single MSHR left the stream waits instead of prefetching A+1.
+    t.expect("icache_mshr_count_ic", 0, at=0)
+    t.expect("ic_l2_req_addr_top", line_a, at=1)
+    for cyc in (1, 2, 3):
+        t.expect("icache_pf_issue_ic", 0, at=cyc)
+
+    # That reserved MSHR serves the next demand miss.
+    t.expect("icache_mshr_full_ic", 0, at=2)
+    t.expect("ic_l2_req_valid_top", 1, at=3)
+    t.expect("ic_l2_req_addr_top", line_b, at=3)
+    t.expect("icache_mshr_count_ic", 2, at=3)
+    t.expect("icache_mshr_full_cnt_ic", 0, at=4)
+
+    t.finish(at=len(pcs))
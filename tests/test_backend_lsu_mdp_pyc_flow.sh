@@ -0,0 +1,55 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd -- "$(dirname -- "${BASH_SOURCE[0]}")/.." && pwd)"
+PYC_ROOT="${PYC_ROOT:-$(git -C "${ROOT_DIR}" rev-parse --show-superproject-working-tree)/tools/pyCircuit}"
+
+if [[ ! -f "${PYC_ROOT}/flows/scripts/lib.sh" ]]; then
+  echo "error: cannot locate pyCircuit at ${PYC_ROOT}" >&2
+  exit 2
+fi
+
+# shellcheck disable=SC1090
+source "${PYC_ROOT}/flows/scripts/lib.sh"
+pyc_find_pycc
+
+PYTHON_BIN="${PYC_PYTHON_BIN:-}"
+if [[ -z "${PYTHON_BIN}" ]]; then
+  for candidate in /opt/homebrew/bin/python3.14 /opt/homebrew/bin/python3 python3.14 python3; do
+    if command -v "${candidate}" >/dev/null 2>&1 && "${candidate}" -c 'import sys; raise SystemExit(sys.version_info < (3, 10))'; then
+      PYTHON_BIN="$(command -v "${candidate}")"
+      break
+    fi
+  done
+fi
+if [[ -z "${PYTHON_BIN}" ]]; then
+  echo "error: Python 3.10 or newer is required" >&2
+  exit 2
+fi
+
+run_case() {
+  local name="$1"
+  local tb_src="$2"
+  shift 2
+  local out_dir="${ROOT_DIR}/out/pyc/${name}"
+
+  rm -rf "${out_dir}"
+  echo "[lsu-mdp] build+sim ${name}"
+  PYTHONPATH="$(pyc_pythonpath):${ROOT_DIR}/src" PYTHONDONTWRITEBYTECODE=1 PYCC="${PYCC}" \
+    "${PYTHON_BIN}" -m pycircuit.cli build \
+      "${tb_src}" \
+      --out-dir "${out_dir}" \
+      --target both \
+      --jobs "${PYC_SIM_JOBS:-4}" \
+      --logic-depth "${PYC_SIM_LOGIC_DEPTH:-1024}" \
+      --run-verilator \
+      "$@"
+}
+
+run_case "backend_lsu_mdp" "${ROOT_DIR}/tests/pyc/tb_backend_lsu_mdp.py"
+run_case "backend_lsu_stage_mdp" "${ROOT_DIR}/tests/pyc/tb_backend_lsu_stage_mdp.py" --param mdp_en=1
+run_case "backend_lsu_store_inflight" "${ROOT_DIR}/tests/pyc/tb_backend_lsu_store_inflight.py"
+run_case "backend_lsu_violation" "${ROOT_DIR}/tests/pyc/tb_backend_lsu_violation.py"
+run_case "backend_commit_replay" "${ROOT_DIR}/tests/pyc/tb_backend_commit_replay.py"
+
+echo "ok: pyCircuit LSU memory-dependence predictor flow passed"
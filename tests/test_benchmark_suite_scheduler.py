@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+
+import run_benchmark_suite_xcheck as suite_runner  # noqa: E402
+
+# Stand-ins for the memh/QEMU/TB/crosscheck tools: the "ELF" holds the number
+# of seconds the TB step sleeps, and the crosscheck always reports parity.
+FAKE_ELF_TO_MEMH = 'cp "$1" "$2"\n'
+FAKE_QEMU = """out=""
+echo run >> "${FAKE_QEMU_RUNS}"
+while [[ $# -gt 0 ]]; do
+  case "$1" in
+    --out) out="$2"; shift 2 ;;
+    --) shift; break ;;
+    *) shift ;;
+  esac
+done
+echo '{"seq":0}' > "${out}"
+"""
+FAKE_TB = 'sleep "$(cat "$1")"\necho \'{"seq":0}\' > "${PYC_COMMIT_TRACE}"\n'
+FAKE_CROSSCHECK = """import json, sys
+from pathlib import Path
+report_dir = Path(sys.argv[sys.argv.index("--report-dir") + 1])
+report_dir.mkdir(parents=True, exist_ok=True)
+(report_dir / "crosscheck_report.json").write_text(json.dumps({"mismatch_count": 0, "compared_rows": 7}))
+"""
+FAKE_READELF = 'echo "  Entry point address:               0x10000"\n'
+
+
+class BenchmarkSuiteSchedulerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        tools = self.tmp / "tools"
+        tools.mkdir()
+        paths = {}
+        for name, body in (
+            ("elf_to_memh.sh", FAKE_ELF_TO_MEMH),
+            ("qemu.sh", FAKE_QEMU),
+            ("tb.sh", FAKE_TB),
+            ("crosscheck.py", FAKE_CROSSCHECK),
+            ("readelf", "#!/usr/bin/env bash\n" + FAKE_READELF),
+        ):
+            path = tools / name
+            path.write_text(body, encoding="utf-8")
+            path.chmod(0o755)
+            paths[name] = path
+        patches = [
+            mock.patch.object(suite_runner, "ELF_TO_MEMH", paths["elf_to_memh.sh"]),
+            mock.patch.object(suite_runner, "QEMU_TRACE_RUNNER", paths["qemu.sh"]),
+            mock.patch.object(suite_runner, "TB_RUNNER", paths["tb.sh"]),
+            mock.patch.object(suite_runner, "CROSSCHECK", paths["crosscheck.py"]),
+            mock.patch.dict(
+                os.environ,
+                {
+                    "LLVM_READELF": str(paths["readelf"]),
+                    "LINXCORE_QEMU_TRACE_CACHE": str(self.tmp / "qemu-cache"),
+                    "FAKE_QEMU_RUNS": str(self.tmp / "qemu-runs.txt"),
+                },
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _suite(self, sleeps: dict[str, float]) -> Path:
+        cases = []
+        for case_id, seconds in sleeps.items():
+            elf = self.tmp / f"{case_id}.elf"
+            elf.write_text(f"{seconds}\n", encoding="utf-8")
+            cases.append({"id": case_id, "bench": case_id, "elf": str(elf)})
+        suite = self.tmp / "suite.json"
+        suite.write_text(json.dumps({"suite_name": "fake", "cases": cases}), encoding="utf-8")
+        return suite
+
+    def _run(self, suite: Path, out_dir: Path, *extra: str) -> tuple[int, dict, str]:
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            rc = suite_runner.main(["--suite", str(suite), "--out-dir", str(out_dir), "--continue-on-fail", *extra])
+        summary = json.loads((out_dir / "summary.json").read_text(encoding="utf-8"))
+        return rc, summary, stdout.getvalue()
+
+    def test_parallel_run_matches_sequential_summary(self) -> None:
+        suite = self._suite({"a": 0.2, "b": 0.6, "c": 0.2, "d": 0.4})
+        rc_seq, seq, _ = self._run(suite, self.tmp / "seq")
+        rc_par, par, progress = self._run(suite, self.tmp / "par", "--jobs", "3", "--pin-cpus")
+        self.assertEqual((rc_seq, rc_par), (0, 0))
+        self.assertEqual(par["jobs"], 3)
+        self.assertEqual([row["id"] for row in par["cases"]], ["a", "b", "c", "d"])
+        self.assertEqual(
+            [(row["status"], row["compared_rows"]) for row in par["cases"]],
+            [(row["status"], row["compared_rows"]) for row in seq["cases"]],
+        )
+        self.assertEqual(progress.count("/4] "), 4)
+        self.assertLess(par["elapsed_sec"], seq["elapsed_sec"])
+
+        def md_cases(out_dir: Path) -> list[str]:
+            text = (out_dir / "summary.md").read_text(encoding="utf-8")
+            return [line.replace("/par/", "/seq/") for line in text.splitlines() if line.startswith("| `")]
+
+        self.assertEqual(md_cases(self.tmp / "par"), md_cases(self.tmp / "seq"))
+        wall = json.loads((self.tmp / "par" / "wall_times.json").read_text(encoding="utf-8"))
+        self.assertEqual(sorted(wall["cases"]), ["a", "b", "c", "d"])
+
+    def test_qemu_reference_traces_come_from_cache_on_rerun(self) -> None:
+        suite = self._suite({"a": 0.0, "b": 0.0})
+        runs = self.tmp / "qemu-runs.txt"
+        _, first, _ = self._run(suite, self.tmp / "first", "--no-qemu-cache")
+        self.assertEqual([row["qemu_cache"] for row in first["cases"]], ["off", "off"])
+        qemu_bin = self.tmp / "qemu-system-linx64"
+        qemu_bin.write_bytes(b"fake-qemu")
+        with mock.patch.dict(os.environ, {"QEMU_BIN": str(qemu_bin)}):
+            _, second, _ = self._run(suite, self.tmp / "second", "--jobs", "2")
+            _, third, _ = self._run(suite, self.tmp / "third", "--jobs", "2")
+        self.assertEqual(len(runs.read_text(encoding="utf-8").splitlines()), 4)
+        self.assertEqual([row["qemu_cache"] for row in second["cases"]], ["miss", "miss"])
+        self.assertEqual([row["qemu_cache"] for row in third["cases"]], ["hit", "hit"])
+        self.assertEqual([row["status"] for row in third["cases"]], ["ok", "ok"])
+        self.assertEqual(
+            (self.tmp / "third" / "a" / "qemu_trace.jsonl").read_bytes(),
+            (self.tmp / "second" / "a" / "qemu_trace.jsonl").read_bytes(),
+        )
+
+    def test_schedule_order_is_longest_first_with_unknown_cases_leading(self) -> None:
+        jobs = [
+            suite_runner.CaseJob(
+                index=i,
+                case_id=case_id,
+                row={},
+                elf=Path(),
+                memh_path=Path(),
+                qemu_trace=Path(),
+                dut_trace=Path(),
+                report_dir=Path(),
+                qemu_args=[],
+            )
+            for i, case_id in enumerate(["short", "new1", "long", "new2", "mid"], start=1)
+        ]
+        history = {"short": 1.0, "long": 90.0, "mid": 10.0}
+        order = suite_runner._schedule_order(jobs, history)
+        self.assertEqual([job.case_id for job in order], ["new1", "new2", "long", "mid", "short"])
+
+    def test_job_timeout_kills_case_and_reports_infra_failure(self) -> None:
+        suite = self._suite({"fast": 0.1, "hang": 30})
+        start = time.monotonic()
+        rc, summary, _ = self._run(suite, self.tmp / "out", "--jobs", "2", "--job-timeout", "1.5")
+        self.assertLess(time.monotonic() - start, 20)
+        self.assertEqual(rc, 2)
+        rows = {row["id"]: row for row in summary["cases"]}
+        self.assertEqual(rows["fast"]["status"], "ok")
+        self.assertEqual(rows["hang"]["status"], "infra_fail")
+        self.assertIn("tb_timeout", rows["hang"]["infra_reasons"])
+
+
+if __name__ == "__main__":
+    unittest.main()
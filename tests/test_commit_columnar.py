@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+sys.path.insert(0, str(ROOT / "tools" / "chisel"))
+
+import commit_columnar  # noqa: E402
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def _commit_row(seq: int) -> dict[str, object]:
+    return {
+        "seq": seq,
+        "cycle": 100 + seq,
+        "pc": hex(0x1000 + 4 * seq),
+        "insn": 0x00000013,
+        "len": 4,
+        "next_pc": hex(0x1004 + 4 * seq),
+        "wb_valid": 1,
+        "wb_rd": 5,
+        "wb_data": hex(0xFFFF_FFFF_FFFF_FFF0 + (seq & 0xF)),
+        "src0_valid": 0,
+        "src0_reg": 0,
+        "src0_data": 0,
+        "src1_valid": 0,
+        "src1_reg": 0,
+        "src1_data": 0,
+        "dst_valid": 1,
+        "dst_reg": 5,
+        "dst_data": hex(0xFFFF_FFFF_FFFF_FFF0 + (seq & 0xF)),
+        "mem_valid": seq % 2,
+        "mem_is_store": 0,
+        "mem_addr": 0x2000 + seq,
+        "mem_wdata": 0,
+        "mem_rdata": seq,
+        "mem_size": 4,
+        "trap_valid": 0,
+        "trap_cause": 0,
+        "traparg0": 0,
+    }
+
+
+class CommitColumnarTest(unittest.TestCase):
+    def _convert(self, tmp: Path, rows: list[dict[str, object]], **kwargs: object) -> Path:
+        src = tmp / "trace.jsonl"
+        src.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+        out = tmp / "trace.jsonl.lxct"
+        count = commit_columnar.convert_jsonl(src, out, **kwargs)
+        self.assertEqual(count, min(len(rows), int(kwargs.get("max_rows", 0)) or len(rows)))
+        return out
+
+    def test_round_trip_preserves_values_and_sideband(self) -> None:
+        rows = [_commit_row(i) for i in range(37)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out = self._convert(Path(tmpdir), rows)
+            self.assertTrue(commit_columnar.is_columnar_trace(out))
+            with commit_columnar.open_columnar(out) as trace:
+                self.assertEqual(len(trace), 37)
+                self.assertIn("cycle", trace.fields)
+                decoded = list(trace.iter_rows())
+                self.assertEqual(trace.row(36), decoded[36])
+        self.assertEqual(decoded[3]["pc"], 0x100C)
+        self.assertEqual(decoded[3]["wb_data"], 0xFFFF_FFFF_FFFF_FFF3)
+        self.assertEqual(decoded[3]["dst_valid"], 1)
+        self.assertEqual(decoded[3]["dst_reg"], 5)
+        self.assertEqual(decoded[3]["cycle"], 103)
+        self.assertEqual([row["seq"] for row in decoded], list(range(37)))
+
+    def test_max_rows_and_missing_fields(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            out = self._convert(tmp, [_commit_row(i) for i in range(10)], max_rows=4)
+            with commit_columnar.open_columnar(out) as trace:
+                self.assertEqual([row["seq"] for row in trace.iter_rows(1)], [1, 2, 3])
+            bad = _commit_row(0)
+            del bad["next_pc"]
+            with self.assertRaises(SystemExit):
+                self._convert(tmp, [bad])
+
+    def test_sideband_set_is_the_union_over_the_prefix(self) -> None:
+        rows = [_commit_row(i) for i in range(8)]
+        for row in rows:
+            del row["cycle"]
+        rows[5]["cycle"] = 77
+        for normalize in (False, True):
+            with self.subTest(normalize=normalize), tempfile.TemporaryDirectory() as tmpdir:
+                out = self._convert(Path(tmpdir), rows, normalize=normalize)
+                with commit_columnar.open_columnar(out) as trace:
+                    self.assertIn("cycle", trace.fields)
+                    self.assertEqual([row["cycle"] for row in trace.iter_rows()], [0] * 5 + [77, 0, 0])
+
+        scan_rows = commit_columnar._SIDEBAND_SCAN_ROWS
+        commit_columnar._SIDEBAND_SCAN_ROWS = 4
+        try:
+            for normalize in (False, True):
+                with self.subTest(normalize=normalize), tempfile.TemporaryDirectory() as tmpdir:
+                    with self.assertRaises(SystemExit) as ctx:
+                        self._convert(Path(tmpdir), rows, normalize=normalize)
+                    self.assertIn("cycle", str(ctx.exception))
+        finally:
+            commit_columnar._SIDEBAND_SCAN_ROWS = scan_rows
+
+    def test_out_of_range_values_are_rejected(self) -> None:
+        for field, value in (("wb_data", -16), ("mem_addr", 1 << 64)):
+            rows = [_commit_row(i) for i in range(3)]
+            rows[2][field] = value
+            with self.subTest(field=field), tempfile.TemporaryDirectory() as tmpdir:
+                with self.assertRaises(SystemExit) as ctx:
+                    self._convert(Path(tmpdir), rows)
+                self.assertIn(f"row 2: {field}=", str(ctx.exception))
+
+    def test_crosscheck_accepts_columnar_traces(self) -> None:
+        rows = [_commit_row(i) for i in range(12)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            out = self._convert(tmp, rows)
+            report_dir = tmp / "report"
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    str(ROOT / "tools" / "trace" / "crosscheck_qemu_linxcore.py"),
+                    "--qemu-trace",
+                    str(tmp / "trace.jsonl"),
+                    "--dut-trace",
+                    str(out),
+                    "--report-dir",
+                    str(report_dir),
+                    "--max-commits",
+                    "0",
+                    "--mode",
+                    "failfast",
+                ],
+                cwd=ROOT,
+                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False,
+            )
+            self.assertEqual(proc.returncode, 0, proc.stdout + proc.stderr)
+            report = json.loads((report_dir / "crosscheck_report.json").read_text(encoding="utf-8"))
+        self.assertEqual(report["compared_rows"], 12)
+        self.assertEqual(report["mismatch_count"], 0)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is required for memmap column access")
+    def test_numpy_memmap_columns(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out = self._convert(Path(tmpdir), [_commit_row(i) for i in range(9)])
+            with commit_columnar.open_columnar(out) as trace:
+                mem_valid = trace.column("mem_valid")
+                self.assertEqual(int(mem_valid.sum()), 4)
+                self.assertEqual(int(trace.column("pc")[8]), 0x1020)
+
+
+if __name__ == "__main__":
+    unittest.main()
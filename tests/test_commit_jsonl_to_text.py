@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from array import array
+from unittest import mock
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+
+import commit_jsonl_to_text as text_tool  # noqa: E402
+from elf_symbols import AddrTable  # noqa: E402
+
+
+class CommitJsonlToTextTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.trace = self.tmp / "commit.jsonl"
+        with self.trace.open("w", encoding="utf-8") as f:
+            for i in range(3000):
+                row = {"seq": i, "cycle": 2 * i, "pc": 0x10000 + 4 * (i % 37), "insn": i * 7919, "len": 4}
+                if i % 401 == 5:
+                    del row["seq"]  # falls back to the global row index
+                f.write(json.dumps(row) + "\n")
+                if i % 700 == 0:
+                    f.write("\nnot json\n")
+        self.table = AddrTable(array("Q", [0x10000, 0x10008]), ["BSTART.STD", "c.addi a0, 1"])
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_parallel_chunks_match_serial_output(self) -> None:
+        serial = io.StringIO()
+        rows, _ = text_tool._format_span(self.trace, 0, None, serial, text_tool._DisasmLookup(self.table), 0)
+        self.assertEqual(rows, 3000)
+        out = self.tmp / "parallel.txt"
+        with out.open("w", encoding="utf-8") as fout:
+            got = text_tool.format_parallel(self.trace, fout, self.table, 3, spool_parent=self.tmp)
+        self.assertEqual(got, rows)
+        self.assertEqual(out.read_text(encoding="utf-8"), serial.getvalue())
+        lines = serial.getvalue().splitlines()
+        self.assertTrue(lines[1609].startswith("seq=00001609 | cyc=3218 "))
+        self.assertIn("asm=c.addi a0, 1", lines[2])
+        self.assertEqual([p.name for p in self.tmp.iterdir() if p.name.startswith(".trace_txt.")], [])
+
+    def test_cli_jobs_keeps_header_and_row_footer(self) -> None:
+        serial_out = self.tmp / "trace1.txt"
+        proc = subprocess.run(
+            [sys.executable, str(ROOT / "tools/trace/commit_jsonl_to_text.py"), "--input", str(self.trace)]
+            + ["--output", str(serial_out), "--jobs", "1"],
+            cwd=ROOT,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+        # The fixture is far below PARALLEL_MIN_BYTES; drop the threshold so
+        # --jobs 2 really takes the sharded path.
+        parallel_out = self.tmp / "trace2.txt"
+        argv = ["commit_jsonl_to_text.py", "--input", str(self.trace), "--output", str(parallel_out), "--jobs", "2"]
+        with mock.patch.object(sys, "argv", argv), mock.patch.object(text_tool, "PARALLEL_MIN_BYTES", 0), mock.patch.object(
+            text_tool, "format_parallel", wraps=text_tool.format_parallel
+        ) as sharded:
+            self.assertEqual(text_tool.main(), 0)
+        sharded.assert_called_once()
+
+        outs = [serial_out.read_text(encoding="utf-8"), parallel_out.read_text(encoding="utf-8")]
+        self.assertEqual(outs[0], outs[1])
+        self.assertTrue(outs[0].startswith("# LinxCore instruction trace\n"))
+        self.assertTrue(outs[0].endswith("\n# rows=3000\n"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+sys.path.insert(0, str(ROOT / "tools" / "chisel"))
+
+import jsonl_follow  # noqa: E402
+from trace_reader import COMMIT_FIELDS  # noqa: E402
+
+CROSSCHECK = ROOT / "tools" / "trace" / "crosscheck_qemu_linxcore.py"
+
+# Appends argv[2:] chunks to argv[1] with a pause between them; "@loop" repeats
+# the previous chunk forever (a simulator that never finishes on its own).
+WRITER = """
+import sys, time
+path, chunks = sys.argv[1], sys.argv[2:]
+with open(path, "ab", buffering=0) as f:
+    for chunk in chunks:
+        while chunk == "@loop":
+            f.write(last.encode())
+            time.sleep(0.02)
+        f.write(chunk.encode())
+        last = chunk
+        time.sleep(0.05)
+"""
+
+
+def _row(i: int, **fields: int) -> dict[str, int]:
+    row = {name: 0 for name in COMMIT_FIELDS}
+    row.update(seq=i, pc=0x1000 + 4 * i, insn=0x00000013, len=4, next_pc=0x1004 + 4 * i)
+    row.update(fields)
+    return row
+
+
+def _lines(rows: list[dict[str, int]]) -> list[str]:
+    return [json.dumps(row) + "\n" for row in rows]
+
+
+class CrosscheckFollowTest(unittest.TestCase):
+    def _writer(self, path: Path, chunks: list[str]) -> subprocess.Popen:
+        return subprocess.Popen([sys.executable, "-c", WRITER, str(path), *chunks])
+
+    def _crosscheck(self, q: Path, d: Path, report_dir: Path, *extra: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, str(CROSSCHECK), "--qemu-trace", str(q), "--dut-trace", str(d)]
+            + ["--report-dir", str(report_dir), "--max-commits", "0", *extra],
+            cwd=ROOT,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=120,
+            check=False,
+        )
+
+    def test_follow_lines_waits_for_file_and_writer(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "trace.jsonl"
+            writer = self._writer(path, ["a\n", "b", "c\n", "tail"])
+            try:
+                got = list(jsonl_follow.follow_lines(path, writer_pid=writer.pid))
+            finally:
+                writer.wait(timeout=30)
+            self.assertEqual(got, [b"a", b"bc", b"tail"])
+            # Without a writer pid an idle file ends the trace.
+            self.assertEqual(list(jsonl_follow.follow_lines(path, idle_timeout=0.1)), got)
+
+    def test_follow_compare_matches_offline_compare(self) -> None:
+        qemu_rows = [_row(i) for i in range(40)]
+        dut_rows = [dict(row) for row in qemu_rows]
+        dut_rows[25]["next_pc"] = 0xDEAD
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            q, d = tmp / "qemu.jsonl", tmp / "dut.jsonl"
+            q.write_text("".join(_lines(qemu_rows)), encoding="utf-8")
+            chunks = _lines(dut_rows)
+            writer = self._writer(d, ["".join(chunks[i : i + 8]) for i in range(0, len(chunks), 8)])
+            try:
+                live = self._crosscheck(q, d, tmp / "live", "--follow", "--dut-pid", str(writer.pid), "--follow-idle", "1")
+            finally:
+                writer.wait(timeout=30)
+            offline = self._crosscheck(q, d, tmp / "offline")
+            self.assertEqual((live.returncode, offline.returncode), (0, 0), live.stderr + offline.stderr)
+            reports = [json.loads((tmp / name / "crosscheck_report.json").read_text()) for name in ("live", "offline")]
+            mismatches = [json.loads((tmp / name / "crosscheck_mismatches.json").read_text()) for name in ("live", "offline")]
+        self.assertTrue(reports[0]["follow"])
+        for key in ("qemu_rows", "dut_rows", "compared_rows", "mismatch_count", "first_mismatch"):
+            self.assertEqual(reports[0][key], reports[1][key], key)
+        self.assertEqual(mismatches[0], mismatches[1])
+
+    def test_failfast_follow_stops_the_producer(self) -> None:
+        qemu_rows = [_row(i) for i in range(200)]
+        bad = _row(10, next_pc=0xDEAD)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            q, d = tmp / "qemu.jsonl", tmp / "dut.jsonl"
+            q.write_text("".join(_lines(qemu_rows)), encoding="utf-8")
+            head = "".join(_lines(qemu_rows[:10]) + _lines([bad]))
+            writer = self._writer(d, [head, "\n", "@loop"])
+            start = time.monotonic()
+            try:
+                proc = self._crosscheck(
+                    q,
+                    d,
+                    tmp / "report",
+                    "--follow",
+                    "--mode",
+                    "failfast",
+                    "--dut-pid",
+                    str(writer.pid),
+                    "--stop-pid",
+                    str(writer.pid),
+                )
+                rc = writer.wait(timeout=30)
+            finally:
+                if writer.poll() is None:
+                    writer.kill()
+            report = json.loads((tmp / "report" / "crosscheck_report.json").read_text())
+        self.assertEqual(proc.returncode, 1, proc.stderr)
+        self.assertLess(rc, 0)
+        self.assertLess(time.monotonic() - start, 60)
+        self.assertEqual(report["compared_rows"], 10)
+        self.assertFalse(report["tail_checked"])
+        self.assertIn("first_mismatch:", proc.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import importlib.util
 import json
+import multiprocessing
 import subprocess
 import sys
 import tempfile
@@ -278,6 +279,129 @@ class CrosscheckMetadataTest(unittest.TestCase):
         self.assertEqual(proc.returncode, 0, proc.stdout + proc.stderr)
         self.assertEqual(manifest["selected"]["qemu_args"], [])
 
+    def _run_comparator(self, tmp: Path, qemu_rows: list[dict], dut_rows: list[dict], *extra: str) -> tuple[int, dict, list]:
+        qemu_trace = tmp / "qemu.jsonl"
+        dut_trace = tmp / "dut.jsonl"
+        report_dir = tmp / ("report" + "".join(extra).replace("-", "_"))
+        self._write_jsonl(qemu_trace, qemu_rows)
+        self._write_jsonl(dut_trace, dut_rows)
+        proc = subprocess.run(
+            [
+                sys.executable,
+                str(MODULE_PATH),
+                "--qemu-trace",
+                str(qemu_trace),
+                "--dut-trace",
+                str(dut_trace),
+                "--report-dir",
+                str(report_dir),
+                "--max-commits",
+                "0",
+                *extra,
+            ],
+            cwd=ROOT,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        report = json.loads((report_dir / "crosscheck_report.json").read_text(encoding="utf-8"))
+        mismatches = json.loads((report_dir / "crosscheck_mismatches.json").read_text(encoding="utf-8"))
+        return proc.returncode, report, mismatches
+
+    def test_stream_mode_matches_loaded_compare(self) -> None:
+        qemu_rows = [self._commit_row(pc=0x1000 + 4 * i, next_pc=0x1004 + 4 * i) for i in range(64)]
+        dut_rows = [dict(row) for row in qemu_rows]
+        dut_rows[40]["next_pc"] = 0xDEAD
+        dut_rows.append(self._commit_row(pc=0x2000, next_pc=0x2004))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            rc_load, loaded, loaded_mm = self._run_comparator(tmp, qemu_rows, dut_rows)
+            rc_stream, streamed, streamed_mm = self._run_comparator(tmp, qemu_rows, dut_rows, "--stream")
+        self.assertEqual((rc_load, rc_stream), (0, 0))
+        for key in ("qemu_rows", "dut_rows", "compared_rows", "mismatch_count", "first_mismatch"):
+            self.assertEqual(loaded[key], streamed[key], key)
+        self.assertEqual(loaded_mm, streamed_mm)
+        self.assertEqual([mm["field"] for mm in streamed_mm], ["next_pc", "trace_length"])
+
+    def test_stream_failfast_stops_at_first_mismatch_with_context(self) -> None:
+        qemu_rows = [self._commit_row(pc=0x1000 + 4 * i, next_pc=0x1004 + 4 * i) for i in range(32)]
+        dut_rows = [dict(row) for row in qemu_rows]
+        dut_rows[10]["next_pc"] = 0xDEAD
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rc, report, mismatches = self._run_comparator(
+                Path(tmpdir), qemu_rows, dut_rows, "--stream", "--mode", "failfast", "--context-rows", "3"
+            )
+        self.assertEqual(rc, 1)
+        self.assertFalse(report["tail_checked"])
+        self.assertEqual(report["compared_rows"], 10)
+        self.assertLess(report["dut_rows"], len(dut_rows))
+        self.assertEqual(len(mismatches), 1)
+        self.assertEqual([ctx["dut_row"]["pc"] for ctx in mismatches[0]["context"]], [0x101C, 0x1020, 0x1024])
+
+    def _looped_trace(self, iterations: int) -> list[dict]:
+        rows: list[dict] = []
+        for it in range(iterations):
+            bstart = self._commit_row(pc=0x2000, next_pc=0x2004)
+            bstart["insn"] = 0x00002001
+            rows.append(bstart)
+            for k in range(5):
+                row = self._commit_row(pc=0x2004 + 4 * k, next_pc=0x2008 + 4 * k)
+                row.update(wb_valid=1, wb_rd=2, wb_data=it * 8 + k, dst_valid=1, dst_reg=2, dst_data=it * 8 + k)
+                rows.append(row)
+        return rows
+
+    def test_sharded_compare_matches_sequential(self) -> None:
+        qemu_rows = self._looped_trace(400)
+        dut_rows = [dict(row) for row in qemu_rows]
+        dut_rows[1501]["wb_data"] = 0xBAD
+        dut_rows[1501]["dst_data"] = 0xBAD
+        marker = self._commit_row(pc=0x2018, next_pc=0x201C)
+        marker["insn"] = 0x0000003B
+        qemu_rows.insert(1800, marker)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            _, sequential, seq_mm = self._run_comparator(tmp, qemu_rows, dut_rows)
+            _, sharded, shard_mm = self._run_comparator(tmp, qemu_rows, dut_rows, "--jobs", "4")
+        self.assertGreater(sharded["shards"], 1)
+        for key in ("qemu_rows", "dut_rows", "compared_rows", "qemu_meta_skipped", "dut_meta_skipped", "mismatch_count"):
+            self.assertEqual(sequential[key], sharded[key], key)
+        self.assertEqual(seq_mm, shard_mm)
+        self.assertEqual(shard_mm[0]["dut"], 0xBAD)
+
+    def test_sharded_trace_length_matches_sequential(self) -> None:
+        qemu_rows = self._looped_trace(400)
+        dut_rows = [dict(row) for row in qemu_rows]
+        dut_rows[901]["wb_data"] = 0xBAD
+        dut_rows[901]["dst_data"] = 0xBAD
+        dut_rows.extend(self._looped_trace(2))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            for mode in ("diagnostic", "failfast"):
+                _, sequential, seq_mm = self._run_comparator(tmp, qemu_rows, dut_rows, "--mode", mode)
+                _, sharded, shard_mm = self._run_comparator(tmp, qemu_rows, dut_rows, "--mode", mode, "--jobs", "4")
+                self.assertGreater(sharded["shards"], 1, mode)
+                for key in ("compared_rows", "mismatch_count", "tail_checked"):
+                    self.assertEqual(sequential[key], sharded[key], (mode, key))
+                self.assertEqual(seq_mm, shard_mm, mode)
+                self.assertEqual([mm["field"] for mm in shard_mm][-1], "trace_length", mode)
+
+    def test_failfast_stop_index_cancels_later_shards(self) -> None:
+        rows = self._looped_trace(8)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            trace = Path(tmpdir) / "trace.jsonl"
+            self._write_jsonl(trace, rows)
+            span = (0, None, 0)
+            CROSSCHECK._init_shard_worker(multiprocessing.RawValue("q", 0))
+            try:
+                self.assertIsNone(CROSSCHECK._compare_shard(1, trace, trace, span, span, "failfast", 0))
+                res = CROSSCHECK._compare_shard(0, trace, trace, span, span, "failfast", 0)
+            finally:
+                CROSSCHECK._init_shard_worker(None)
+        self.assertIsNotNone(res)
+        self.assertEqual(res.mismatches, [])
+        self.assertGreater(res.compared, 0)
+
     def test_catalog_block_boundaries_are_metadata(self) -> None:
         self.assertTrue(CROSSCHECK._is_bstart32(0x00000391))
         self.assertTrue(CROSSCHECK._is_bstart32(0x000003A1))
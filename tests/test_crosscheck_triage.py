@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import importlib.util
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+sys.path.insert(0, str(ROOT / "tools" / "chisel"))
+
+from trace_reader import COMMIT_FIELDS  # noqa: E402
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+if HAS_NUMPY:
+    import crosscheck_qemu_linxcore as crosscheck  # noqa: E402
+    import crosscheck_triage  # noqa: E402
+
+
+def _row(pc: int, **fields: int) -> dict[str, int]:
+    row = {name: 0 for name in COMMIT_FIELDS if name != "seq"}
+    row.update(pc=pc, insn=0x00000013, len=4, next_pc=pc + 4)
+    row.update(fields)
+    return row
+
+
+def _dataflow_trace(count: int) -> list[dict[str, int]]:
+    """Each row reads the register the previous row wrote (r1..r4 round-robin)."""
+    rows = []
+    value = 7
+    for i in range(count):
+        reg, prev = 1 + i % 4, 1 + (i - 1) % 4
+        src = value
+        value = (value * 3 + i) & 0xFFFF
+        rows.append(
+            _row(
+                0x1000 + 4 * (i % 64),
+                src0_valid=int(i > 0),
+                src0_reg=prev if i else 0,
+                src0_data=src if i else 0,
+                wb_valid=1,
+                wb_rd=reg,
+                wb_data=value,
+                dst_valid=1,
+                dst_reg=reg,
+                dst_data=value,
+            )
+        )
+        rows[-1]["seq"] = i
+    return rows
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+class CrosscheckTriageTest(unittest.TestCase):
+    def _write(self, path: Path, rows: list[dict[str, int]]) -> Path:
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+        return path
+
+    def test_vectorized_checks_match_scalar_compare(self) -> None:
+        rng = random.Random(5)
+        qemu_rows, dut_rows = [], []
+        for i in range(400):
+            row = _row(0x2000 + 4 * i)
+            for name in row:
+                if name not in ("pc", "insn", "len", "next_pc") and rng.random() < 0.3:
+                    row[name] = rng.randrange(3)
+            if i % 37 == 0:
+                row.update(insn=0x00002001, wb_valid=0, dst_valid=0, mem_valid=0, trap_valid=0)
+            if i % 41 == 0:
+                row.update(len=2, insn=0, wb_valid=0, dst_valid=0, mem_valid=0, trap_valid=0)
+            other = dict(row)
+            for name in other:
+                if name not in ("len", "insn") and rng.random() < 0.05:
+                    other[name] = rng.randrange(3)
+            qemu_rows.append(row)
+            dut_rows.append(other)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            q_path = self._write(tmp / "qemu.jsonl", qemu_rows)
+            d_path = self._write(tmp / "dut.jsonl", dut_rows)
+            q_cols = crosscheck_triage.load_columns(q_path)
+            d_cols = crosscheck_triage.load_columns(d_path)
+            q_commits = crosscheck._load_trace(q_path, 0)
+            d_commits = crosscheck._load_trace(d_path, 0)
+        self.assertEqual(
+            crosscheck_triage.metadata_mask(q_cols).tolist(), [crosscheck._is_metadata_commit(r) for r in q_commits]
+        )
+        masks = crosscheck_triage.field_masks(q_cols, d_cols)
+        for i, (q, d) in enumerate(zip(q_commits, d_commits)):
+            ok, name, _, _ = crosscheck._cmp_commit(q, d)
+            first = next((f for f in crosscheck_triage.CHECK_FIELDS if masks[f][i]), "")
+            self.assertEqual(first, name, i)
+
+    def test_causal_root_groups_and_misalignment(self) -> None:
+        qemu_rows = _dataflow_trace(200)
+        dut_rows = [dict(row) for row in qemu_rows]
+        # r3 written wrong at row 50; rows 51 and 52 consume it and write wrong r4/r1.
+        for i, name in ((50, "wb_data"), (51, "wb_data"), (52, "wb_data")):
+            dut_rows[i][name] ^= 0x100
+            dut_rows[i]["dst_data"] ^= 0x100
+        dut_rows[51]["src0_data"] ^= 0x100
+        dut_rows[52]["src0_data"] ^= 0x100
+        dut_rows[90]["mem_valid"] = 1
+        del dut_rows[150]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            summary = crosscheck_triage.triage_traces(
+                self._write(tmp / "qemu.jsonl", qemu_rows), self._write(tmp / "dut.jsonl", dut_rows)
+            )
+        causal = summary["causal"]
+        self.assertEqual((causal["row"], causal["field"], causal["reg"], causal["downstream"]), (50, "wb_data", 3, 2))
+        self.assertEqual(summary["roots"][0]["row"], 50)
+        self.assertEqual(summary["first_divergence"]["mem_valid"]["row"], 90)
+        self.assertEqual(summary["first_divergence"]["src0_data"]["row"], 51)
+        mis = summary["misalignment"]
+        self.assertEqual((mis["shift"], mis["start_row"]), (-1, 150))
+        self.assertEqual(mis["dut_missing_pcs"], [qemu_rows[150]["pc"]])
+        self.assertEqual(summary["by_opcode"][0]["count"], summary["mismatch_rows"])
+        self.assertEqual(summary["by_register"][0]["fields"], {"wb_data": 1})
+
+    def test_crosscheck_triage_flag_extends_report(self) -> None:
+        qemu_rows = _dataflow_trace(64)
+        dut_rows = [dict(row) for row in qemu_rows]
+        dut_rows[20]["wb_data"] = dut_rows[20]["dst_data"] = 0xBAD
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            report_dir = tmp / "report"
+            proc = subprocess.run(
+                [sys.executable, str(ROOT / "tools" / "trace" / "crosscheck_qemu_linxcore.py")]
+                + ["--qemu-trace", str(self._write(tmp / "qemu.jsonl", qemu_rows))]
+                + ["--dut-trace", str(self._write(tmp / "dut.jsonl", dut_rows))]
+                + ["--report-dir", str(report_dir), "--max-commits", "0", "--triage"],
+                cwd=ROOT,
+                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False,
+            )
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            report = json.loads((report_dir / "crosscheck_report.json").read_text(encoding="utf-8"))
+            triage = json.loads((report_dir / "crosscheck_triage.json").read_text(encoding="utf-8"))
+            md = (report_dir / "crosscheck_report.md").read_text(encoding="utf-8")
+        self.assertEqual(triage["mismatch_rows"], report["mismatch_count"])
+        self.assertEqual(triage["causal"]["row"], 20)
+        self.assertIn("## Divergence Triage", md)
+        self.assertIn("Earliest causal write: row `20`", md)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+
+import elf_symbols  # noqa: E402
+
+OBJDUMP_OUT = """
+prog.elf:\tfile format elf64-linx
+
+Disassembly of section .text:
+
+0000000000010000 <_start>:
+   10000: 01 02 03 04 05 06            \tBSTART.STD CALL, 0x10040
+   10006: 11 22                        \tc.addi a0, 1
+   10008: 33 44 55 66                  \tsub a1, a2, a3
+   1000c: 77 88 99 aa                  \tld a4, 0x10(sp)
+
+0000000000010040 <helper>:
+   10040: ab cd                        \tFRET.STK
+"""
+NM_OUT = """0000000000010000 T _start
+0000000000010040 t helper
+0000000000020000 D data_table
+"""
+
+
+def _fake_tool(path: Path, output: str, log: Path) -> Path:
+    path.write_text(f"#!/usr/bin/env bash\necho run >> '{log}'\ncat <<'EOF'\n{output}\nEOF\n", encoding="utf-8")
+    path.chmod(0o755)
+    return path
+
+
+class ElfSymbolsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.log = self.tmp / "runs.txt"
+        self.objdump = _fake_tool(self.tmp / "llvm-objdump", OBJDUMP_OUT, self.log)
+        self.nm = _fake_tool(self.tmp / "llvm-nm", NM_OUT, self.log)
+        self.elf = self.tmp / "prog.elf"
+        self.elf.write_bytes(b"\x7fELF-one")
+        self.cache = self.tmp / "cache"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _load(self, elf: Path | None = None, **kwargs: object) -> elf_symbols.ElfSymbols:
+        return elf_symbols.load_elf_symbols(
+            elf or self.elf, objdump=str(self.objdump), nm=str(self.nm), cache_dir=self.cache, **kwargs
+        )
+
+    def _runs(self) -> int:
+        return len(self.log.read_text(encoding="utf-8").splitlines()) if self.log.exists() else 0
+
+    def test_tables_and_alias_spans(self) -> None:
+        symbols = self._load(use_cache=False)
+        self.assertEqual(symbols.sym_sorted, [(0x10000, "_start"), (0x10040, "helper"), (0x20000, "data_table")])
+        self.assertEqual(symbols.sym_exact[0x20000], "data_table")
+        self.assertEqual(symbols.disasm.get(0x10006), "c.addi a0, 1")
+        self.assertEqual(symbols.disasm.get(0x10004, "?"), "?")
+        alias = symbols.disasm_alias
+        # Byte tokens cover 0x10002/4; the block marker widens the span to 12 bytes, cut at the next insn.
+        self.assertEqual([alias.get(pc) for pc in (0x10002, 0x10004)], ["BSTART.STD CALL, 0x10040"] * 2)
+        self.assertEqual(alias.get(0x10006), "")
+        self.assertEqual(alias.get(0x1000a), "sub a1, a2, a3")
+        self.assertEqual(alias.get(0x10009), "")
+        self.assertEqual([alias.get(pc) for pc in (0x1000e, 0x10010, 0x10012)], ["ld a4, 0x10(sp)"] * 3)
+        self.assertEqual(alias.get(0x10014), "")
+        self.assertEqual([alias.get(pc) for pc in range(0x10042, 0x1004c, 2)], ["FRET.STK"] * 5)
+        self.assertEqual(alias.get(0x1004c), "")
+        self.assertEqual(symbols.pc_label(0x10048), "0x10048 <helper+0x8>")
+        self.assertEqual(symbols.pc_label(0x10000), "0x10000 <_start>")
+        self.assertEqual(symbols.pc_label(0x100), "0x100")
+
+    def test_cache_is_keyed_by_elf_content(self) -> None:
+        cold = self._load()
+        self.assertEqual(self._runs(), 2)
+        warm = self._load()
+        self.assertEqual(self._runs(), 2)
+        self.assertEqual(list(warm.disasm.items()), list(cold.disasm.items()))
+        self.assertEqual(warm.sym_sorted, cold.sym_sorted)
+        self.assertEqual(warm.sym_exact, cold.sym_exact)
+        for pc in range(0x10000, 0x10050):
+            self.assertEqual(warm.disasm_alias.get(pc), cold.disasm_alias.get(pc))
+        copy = self.tmp / "copy" / "prog.elf"
+        copy.parent.mkdir()
+        copy.write_bytes(self.elf.read_bytes())
+        self._load(copy)
+        self.assertEqual(self._runs(), 2)
+        self.elf.write_bytes(b"\x7fELF-two-rebuilt")
+        self._load()
+        self.assertEqual(self._runs(), 4)
+        self.assertEqual(len(list(self.cache.glob(f"*{elf_symbols.SUFFIX}"))), 2)
+
+    def test_commit_text_uses_cached_disassembly(self) -> None:
+        trace = self.tmp / "commit.jsonl"
+        trace.write_text('{"seq": 0, "pc": 65542, "insn": 8721, "len": 2}\n', encoding="utf-8")
+        out = self.tmp / "commit.txt"
+        env_cmd = [
+            sys.executable,
+            str(ROOT / "tools" / "trace" / "commit_jsonl_to_text.py"),
+            "--input",
+            str(trace),
+            "--output",
+            str(out),
+            "--objdump-elf",
+            str(self.elf),
+            "--objdump-tool",
+            str(self.objdump),
+        ]
+        for _ in range(2):
+            proc = subprocess.run(
+                env_cmd,
+                cwd=ROOT,
+                env={**os.environ, elf_symbols.ENV_DIR: str(self.cache), "LLVM_NM": str(self.nm)},
+                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False,
+            )
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            self.assertIn("c.addi a0, 1", out.read_text(encoding="utf-8"))
+        self.assertEqual(self._runs(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
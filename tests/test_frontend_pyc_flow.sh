@@ -79,6 +79,7 @@ PYTHONPATH_VAL="$(pyc_pythonpath):${ROOT_DIR}/src"
 run_case() {
   local name="$1"
   local tb_src="$2"
+  shift 2
   local out_dir="${ROOT_DIR}/out/pyc/${name}"
 
   rm -rf "${out_dir}" >/dev/null 2>&1 || true
@@ -92,7 +93,8 @@ run_case() {
       --target both \
       --jobs "${PYC_SIM_JOBS:-4}" \
       --logic-depth "${PYC_SIM_LOGIC_DEPTH:-1024}" \
-      --run-verilator
+      --run-verilator \
+      "$@"
 
   local cpp_bin
   cpp_bin="$(
@@ -121,5 +123,12 @@ run_case "frontend_bpu" "${ROOT_DIR}/tests/pyc/tb_frontend_bpu.py"
 run_case "frontend_ibuffer" "${ROOT_DIR}/tests/pyc/tb_frontend_ibuffer.py"
 run_case "frontend_ftq" "${ROOT_DIR}/tests/pyc/tb_frontend_ftq.py"
 run_case "frontend_frontend" "${ROOT_DIR}/tests/pyc/tb_frontend_frontend.py"
+run_case "ifu_icache" "${ROOT_DIR}/tests/pyc/tb_ifu_icache.py"
+run_case "ifu_icache_mshr" "${ROOT_DIR}/tests/pyc/tb_ifu_icache_mshr.py" \
+  --param ic_miss_outstanding=4 --param ifetch_bundle_bytes=32
+run_case "ifu_icache_prefetch" "${ROOT_DIR}/tests/pyc/tb_ifu_icache_prefetch.py" \
+  --param ic_miss_outstanding=4 --param ic_prefetch_lines=2 --param ic_prefetch_ftq=1
+run_case "ifu_icache_prefetch_reserve" "${ROOT_DIR}/tests/pyc/tb_ifu_icache_prefetch_reserve.py" \
+  --param ic_miss_outstanding=2 --param ic_prefetch_lines=2
 
 echo "frontend pyc flow passed"
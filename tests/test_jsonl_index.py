@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+sys.path.insert(0, str(ROOT / "tools" / "chisel"))
+
+import jsonl_index  # noqa: E402
+from jsonl_index import JsonlIndex  # noqa: E402
+from scan_replay_liq_qemu_seeded_windows import write_window_slice  # noqa: E402
+
+
+def _lines(count: int) -> list[str]:
+    return [json.dumps({"seq": seq, "pc": hex(0x10000 + 4 * seq)}) + "\n" for seq in range(count)]
+
+
+class JsonlIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.trace = self.tmp / "qemu.live.raw.jsonl"
+        self.out = self.tmp / "window" / "qemu.window.raw.jsonl"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_dense_window_matches_slice_and_sidecar_is_reused(self) -> None:
+        lines = _lines(500)
+        self.trace.write_text("".join(lines), encoding="utf-8")
+        self.assertEqual(write_window_slice(self.trace, self.out, start=120, count=37), 37)
+        self.assertEqual(self.out.read_text(encoding="utf-8"), "".join(lines[120:157]))
+        self.assertTrue(jsonl_index.index_path(self.trace).is_file())
+        with mock.patch.object(JsonlIndex, "build", side_effect=AssertionError("index rebuilt")):
+            index = JsonlIndex.open(self.trace)
+            self.assertTrue(index.dense)
+            self.assertEqual(jsonl_index.row_count(self.trace), 500)
+            self.assertEqual(index.copy_window(self.out, start=490, count=50), 10)
+        self.assertEqual(self.out.read_text(encoding="utf-8"), "".join(lines[490:]))
+        self.assertEqual(index.copy_window(self.out, start=600, count=5), 0)
+        self.assertEqual(self.out.read_bytes(), b"")
+
+    def test_blank_lines_are_skipped_like_the_line_loader(self) -> None:
+        lines = _lines(20)
+        lines[5] = "\n"
+        lines[6] = "   \n"
+        lines[-1] = lines[-1].rstrip("\n")
+        self.trace.write_text("".join(lines), encoding="utf-8")
+        kept = [line for line in lines if line.strip()]
+        index = JsonlIndex.open(self.trace)
+        self.assertFalse(index.dense)
+        self.assertEqual(index.rows, len(kept))
+        for start, count in ((0, 18), (3, 4), (4, 1), (15, 10)):
+            self.assertEqual(index.copy_window(self.out, start=start, count=count), len(kept[start : start + count]))
+            self.assertEqual(self.out.read_text(encoding="utf-8"), "".join(kept[start : start + count]))
+
+    def test_stale_sidecar_is_rebuilt_after_rewrite(self) -> None:
+        self.trace.write_text("".join(_lines(10)), encoding="utf-8")
+        self.assertEqual(jsonl_index.row_count(self.trace), 10)
+        self.trace.write_text("".join(_lines(25)), encoding="utf-8")
+        st = self.trace.stat()
+        os.utime(self.trace, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        self.assertEqual(jsonl_index.row_count(self.trace), 25)
+        self.assertEqual(JsonlIndex.open(self.trace).copy_window(self.out, start=20, count=5), 5)
+        self.assertEqual(self.out.read_text(encoding="utf-8"), "".join(_lines(25)[20:]))
+
+    def test_copy_falls_back_when_sendfile_targets_sockets_only(self) -> None:
+        lines = _lines(50)
+        self.trace.write_text("".join(lines), encoding="utf-8")
+        with mock.patch.object(os, "sendfile", side_effect=OSError(jsonl_index.errno.ENOTSOCK, "not a socket")):
+            self.assertEqual(jsonl_index.copy_window(self.trace, self.out, start=10, count=5), 5)
+        self.assertEqual(self.out.read_text(encoding="utf-8"), "".join(lines[10:15]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "linxcoresight"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+import linxtrace_index  # noqa: E402
+from test_linxtrace_stream_builder import _build, _raw_trace  # noqa: E402
+
+
+def _scan(trace: Path) -> list[dict]:
+    return [json.loads(line) for line in trace.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+class LinxTraceIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = Path(cls._tmp.name)
+        raw = cls.tmp / "raw.jsonl"
+        raw.write_text("".join(json.dumps(r) + "\n" for r in _raw_trace(11)), encoding="utf-8")
+        proc = _build(cls.tmp, raw, "t")
+        assert proc.returncode == 0, proc.stderr
+        cls.trace = cls.tmp / "t.linxtrace"
+        cls.records = _scan(cls.trace)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
+
+    def _events(self) -> dict[int, list[dict]]:
+        out: dict[int, list[dict]] = {}
+        for rec in self.records:
+            if rec["type"] in linxtrace_index.EVENT_KINDS:
+                out.setdefault(int(rec["row_id"]), []).append(rec)
+        return out
+
+    def test_builder_writes_index_and_queries_match_scan(self) -> None:
+        self.assertTrue(linxtrace_index.index_path(self.trace).is_file())
+        events = self._events()
+        with linxtrace_index.LinxTraceIndex.open(self.trace, rebuild=False) as index:
+            self.assertEqual(index.header["lines"], len(self.records))
+            for start, stop in ((0, 1), (5, 9), (20, 21), (0, 10**6), (10**6, 10**6 + 5)):
+                want = sorted(
+                    rid
+                    for rid, evs in events.items()
+                    if min(e["cycle"] for e in evs) < stop and max(e["cycle"] for e in evs) >= start
+                )
+                self.assertEqual(index.rows_alive(start, stop), want, (start, stop))
+                hist = Counter(
+                    r["stage_id"] for r in self.records if r["type"] == "OCC" and start <= r["cycle"] < stop
+                )
+                self.assertEqual(index.stage_histogram(start, stop), hist)
+            for rid in (min(events), 3, max(events)):
+                got = index.timeline(rid)
+                self.assertEqual(sorted(map(json.dumps, got)), sorted(map(json.dumps, events[rid])))
+                self.assertEqual([r["cycle"] for r in got], sorted(r["cycle"] for r in got))
+            left = {r["row_id"]: r["text"] for r in self.records if r["type"] == "LABEL" and r["label_type"] == "left"}
+            self.assertEqual(index.row_label(3), left[3])
+            with self.assertRaises(KeyError):
+                index.timeline(10**9)
+
+    def test_stale_index_is_rebuilt(self) -> None:
+        trace = self.tmp / "copy.linxtrace"
+        trace.write_bytes(self.trace.read_bytes())
+        with self.assertRaises(SystemExit):
+            linxtrace_index.LinxTraceIndex.open(trace, rebuild=False)
+        first = linxtrace_index.LinxTraceIndex.open(trace)
+        first.close()
+        with trace.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"cycle": 999999, "row_id": 3, "status": "OK", "status_code": 0, "type": "RETIRE"}) + "\n")
+        with linxtrace_index.LinxTraceIndex.open(trace) as index:
+            self.assertEqual(index.header["lines"], first.header["lines"] + 1)
+            self.assertEqual(index.rows_alive(999999, 1000000), [3])
+
+    def test_build_without_numpy_matches(self) -> None:
+        with_np = linxtrace_index.build_index(self.trace, self.tmp / "np.lxti")
+        with mock.patch.object(linxtrace_index, "np", None):
+            without_np = linxtrace_index.build_index(self.trace, self.tmp / "py.lxti")
+        self.assertEqual(with_np.read_bytes(), without_np.read_bytes())
+
+    def test_columns_are_views_into_the_mapping(self) -> None:
+        index = linxtrace_index.LinxTraceIndex.open(self.trace, rebuild=False)
+        if sys.byteorder == "little":
+            self.assertIsInstance(index._cols["ev_cycle"], memoryview)
+        self.assertEqual(len(index._cols["ev_cycle"]), index.header["events"])
+        index.close()
+        self.assertEqual(index._cols, {})
+
+    def test_unwritable_sidecar_falls_back_to_cache(self) -> None:
+        trace = self.tmp / "ro.linxtrace"
+        trace.write_bytes(self.trace.read_bytes())
+        build = linxtrace_index.build_index
+
+        def refuse_sidecar(path: Path, out: Path | None = None) -> Path:
+            if out is None:
+                raise PermissionError(13, "read-only", str(path))
+            return build(path, out)
+
+        cache = self.tmp / "cache"
+        with mock.patch.dict("os.environ", {"XDG_CACHE_HOME": str(cache)}), mock.patch.object(
+            linxtrace_index, "build_index", side_effect=refuse_sidecar
+        ):
+            with linxtrace_index.LinxTraceIndex.open(trace) as index:
+                self.assertEqual(index.header["lines"], len(self.records))
+                self.assertTrue(index.path.is_relative_to(cache))
+            self.assertFalse(linxtrace_index.index_path(trace).exists())
+            # A second open reuses the cached index without rebuilding.
+            with linxtrace_index.LinxTraceIndex.open(trace, rebuild=False) as index:
+                self.assertEqual(index.path, linxtrace_index.cache_index_path(trace))
+
+    def test_debug_cli_window(self) -> None:
+        proc = subprocess.run(
+            [sys.executable, str(ROOT / "tools/linxcoresight/linxtrace_cli_debug.py"), str(self.trace)]
+            + ["--cycles", "10:14", "--top", "3"],
+            cwd=ROOT,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        lines = proc.stdout.splitlines()
+        self.assertTrue(lines[0].startswith(f"linxtrace-debug total_events={len(self.records)} "))
+        self.assertEqual(sum(1 for line in lines if line.startswith("  row=")), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+BUILDER = ROOT / "tools" / "trace" / "build_linxtrace_view.py"
+PIPE = ["F0", "F1", "IB", "D1", "D2", "S1", "S2", "IQ", "P1", "I1", "E1", "W1"]
+
+
+def _raw_trace(seed: int) -> list[dict[str, object]]:
+    rng = random.Random(seed)
+    records: list[dict[str, object]] = []
+    uid = 0x100
+    seq = 1
+    for core in (0, 1):
+        cycle0 = 0
+        for blk in range(24):
+            block_uid = (core << 20) | (blk + 1)
+            last = cycle0
+            count = rng.randint(2, 5)
+            for slot in range(count):
+                uid += 1
+                pc = 0x10000 + core * 0x1000 + blk * 0x40 + slot * 4
+                cycle = cycle0 + rng.randint(0, 4)
+                flush = rng.random() < 0.2
+                base = {"uop_uid": uid, "core_id": core, "block_uid": block_uid, "pc": pc}
+                for stage in PIPE:
+                    if stage in {"F1", "D2", "IQ", "I1"} and rng.random() < 0.5:
+                        continue
+                    records.append(
+                        {
+                            "type": "occ",
+                            "cycle": cycle,
+                            "stage": stage,
+                            "lane": rng.randint(0, 1),
+                            "stall": int(rng.random() < 0.1),
+                            "stall_cause": "dep",
+                            "kind": 1 if flush else 0,
+                            **base,
+                        }
+                    )
+                    cycle += rng.choice([1, 1, 2, 3])
+                if flush:
+                    records.append({"type": "occ", "cycle": cycle, "stage": "FLS", "lane": 0, "kind": 1, **base})
+                else:
+                    records.append({"type": "occ", "cycle": cycle, "stage": "CMT", "lane": 0, **base})
+                    records.append(
+                        {
+                            "type": "commit",
+                            "cycle": cycle,
+                            "seq": seq,
+                            "len": 4,
+                            "op_name": "LD" if slot % 2 else "ADD",
+                            "is_bstart": int(slot == 0),
+                            "is_bstop": int(slot == count - 1),
+                            "dst_valid": 1,
+                            "dst_reg": 3,
+                            "dst_data": seq,
+                            **base,
+                        }
+                    )
+                    seq += 1
+                last = max(last, cycle)
+            records.append(
+                {"type": "blk_evt", "cycle": cycle0 + 1, "kind": "open", "block_uid": block_uid, "seq": seq, "core_id": core}
+            )
+            records.append(
+                {"type": "blk_evt", "cycle": last + 1, "kind": "retired", "block_uid": block_uid, "seq": seq, "core_id": core}
+            )
+            cycle0 += rng.randint(2, 6)
+    records.sort(key=lambda record: int(record["cycle"]))
+    return records
+
+
+def _build(tmp: Path, raw: Path, name: str, *extra: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, str(BUILDER), "--raw", str(raw), "--out", str(tmp / f"{name}.linxtrace"), *extra],
+        cwd=ROOT,
+        text=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+
+
+class LinxTraceStreamBuilderTest(unittest.TestCase):
+    def _write_raw(self, tmp: Path, records: list[dict[str, object]]) -> Path:
+        raw = tmp / "raw.jsonl"
+        raw.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+        return raw
+
+    def test_stream_output_matches_in_memory_build(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            raw = self._write_raw(tmp, _raw_trace(7))
+            ref = _build(tmp, raw, "ref", "--map-report", str(tmp / "ref.map.json"))
+            self.assertEqual(ref.returncode, 0, ref.stderr)
+            # A tiny spill threshold forces the multi-run merge path.
+            for window in ("0", "32"):
+                proc = _build(
+                    tmp,
+                    raw,
+                    "stream",
+                    "--map-report",
+                    str(tmp / "ref.map.json.stream"),
+                    "--stream",
+                    "--stream-window",
+                    window,
+                    "--spill-records",
+                    "64",
+                )
+                self.assertEqual(proc.returncode, 0, proc.stderr)
+                self.assertEqual(proc.stdout.replace("stream.linxtrace", "ref.linxtrace"), ref.stdout)
+                self.assertEqual(
+                    (tmp / "stream.linxtrace").read_bytes(),
+                    (tmp / "ref.linxtrace").read_bytes(),
+                )
+                stream_map = json.loads((tmp / "ref.map.json.stream").read_text(encoding="utf-8"))
+                ref_map = json.loads((tmp / "ref.map.json").read_text(encoding="utf-8"))
+                stream_map["linxtrace"] = ref_map["linxtrace"]
+                self.assertEqual(stream_map, ref_map)
+            self.assertEqual(sorted(p.name for p in tmp.iterdir() if p.name.startswith(".linxtrace.")), [])
+
+    def test_sharded_build_matches_serial_build(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            raw = self._write_raw(tmp, _raw_trace(13))
+            ref = _build(tmp, raw, "ref", "--no-index")
+            self.assertEqual(ref.returncode, 0, ref.stderr)
+            for jobs in ("2", "3"):
+                proc = _build(tmp, raw, f"j{jobs}", "--no-index", "--jobs", jobs)
+                self.assertEqual(proc.returncode, 0, proc.stderr)
+                self.assertEqual(proc.stdout.replace(f"j{jobs}.linxtrace", "ref.linxtrace"), ref.stdout)
+                self.assertEqual((tmp / f"j{jobs}.linxtrace").read_bytes(), (tmp / "ref.linxtrace").read_bytes())
+                got = json.loads((tmp / f"j{jobs}.map.json").read_text(encoding="utf-8"))
+                want = json.loads((tmp / "ref.map.json").read_text(encoding="utf-8"))
+                self.assertEqual({**got, "linxtrace": ""}, {**want, "linxtrace": ""})
+            self.assertEqual(sorted(p.name for p in tmp.iterdir() if p.name.startswith(".linxtrace.")), [])
+
+    def test_windowed_build_keeps_rows_alive_in_window(self) -> None:
+        def timelines(tmp: Path, name: str) -> dict[str, list[tuple[object, ...]]]:
+            kid = json.loads((tmp / f"{name}.map.json").read_text(encoding="utf-8"))["uid_to_kid"]
+            uid_of = {row_id: uid for uid, row_id in kid.items()}
+            out: dict[str, list[tuple[object, ...]]] = {}
+            for line in (tmp / f"{name}.linxtrace").read_text(encoding="utf-8").splitlines():
+                rec = json.loads(line)
+                if rec["type"] in {"OCC", "RETIRE"} and rec["row_id"] in uid_of:
+                    key = (rec["cycle"], rec["type"], rec.get("stage_id"), rec.get("lane_id"))
+                    out.setdefault(uid_of[rec["row_id"]], []).append(key)
+            return out
+
+        records = _raw_trace(5)
+        commit = next(r for r in records if r["type"] == "commit" and r["seq"] == 30)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            raw = self._write_raw(tmp, records)
+            (tmp / "mm.json").write_text(json.dumps([{"seq": 30, "field": "pc"}]), encoding="utf-8")
+            self.assertEqual(_build(tmp, raw, "full", "--no-index").returncode, 0)
+            full = timelines(tmp, "full")
+            cases = [
+                ("cyc", (40, 52), ["--cycle-window", "40:52"]),
+                ("cyc_stream", (40, 52), ["--cycle-window", "40:52", "--stream"]),
+                (
+                    "mm",
+                    (int(commit["cycle"]) - 6, int(commit["cycle"]) + 6),
+                    ["--mismatches", str(tmp / "mm.json"), "--mismatch-cycles", "6"],
+                ),
+            ]
+            for name, (lo, hi), extra in cases:
+                proc = _build(tmp, raw, name, "--no-index", *extra)
+                self.assertEqual(proc.returncode, 0, proc.stderr)
+                got = timelines(tmp, name)
+                alive = {uid for uid, evs in full.items() if evs[0][0] <= hi and max(e[0] for e in evs) >= lo}
+                self.assertEqual(set(got), alive, name)
+                for uid, evs in got.items():
+                    self.assertEqual(evs, full[uid], (name, uid))
+                windows = json.loads((tmp / f"{name}.map.json").read_text(encoding="utf-8"))["cycle_windows"]
+                self.assertEqual(windows, [[lo, hi]])
+            self.assertEqual(
+                (tmp / "cyc.linxtrace").read_bytes(), (tmp / "cyc_stream.linxtrace").read_bytes()
+            )
+            self.assertNotEqual(_build(tmp, raw, "bad", "--seq-window", "100000:100001").returncode, 0)
+
+    def test_stream_rejects_rows_behind_the_window(self) -> None:
+        records = _raw_trace(3)
+        late = {"type": "occ", "cycle": 0, "stage": "F0", "lane": 0, "uop_uid": 0xFFFF, "core_id": 0, "pc": 0x10000}
+        records.append(late)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            raw = self._write_raw(tmp, records)
+            proc = _build(tmp, raw, "stream", "--stream", "--stream-window", "8")
+        self.assertNotEqual(proc.returncode, 0)
+        self.assertIn("--stream-window", proc.stderr)
+
+    def test_stream_rejects_block_records_behind_the_window(self) -> None:
+        records = _raw_trace(3)
+        end = max(int(record["cycle"]) for record in records)
+        records.append({"type": "blk_evt", "cycle": end, "kind": "retired", "block_uid": 1, "seq": 1, "core_id": 0})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            raw = self._write_raw(tmp, records)
+            self.assertEqual(_build(tmp, raw, "ref", "--no-index").returncode, 0)
+            proc = _build(tmp, raw, "stream", "--no-index", "--stream", "--stream-window", "8")
+        self.assertNotEqual(proc.returncode, 0)
+        self.assertIn("block 0x1", proc.stderr)
+        self.assertIn("--stream-window", proc.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "linxcoresight"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+import linxtrace_index  # noqa: E402
+import linxtrace_zstd  # noqa: E402
+from test_linxtrace_stream_builder import _raw_trace  # noqa: E402
+
+HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+
+
+@unittest.skipUnless(HAS_ZSTD, "zstandard not installed")
+class LinxTraceZstdTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.tmp = Path(cls._tmp.name)
+        raw = cls.tmp / "raw.jsonl"
+        raw.write_text("".join(json.dumps(r) + "\n" for r in _raw_trace(17)), encoding="utf-8")
+        for name, extra in (("plain.linxtrace", ()), ("packed.linxtrace.zst", ("--frame-rows", "16"))):
+            proc = subprocess.run(
+                [sys.executable, str(ROOT / "tools/trace/build_linxtrace_view.py"), "--raw", str(raw)]
+                + ["--out", str(cls.tmp / name), *extra],
+                cwd=ROOT,
+                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False,
+            )
+            assert proc.returncode == 0, proc.stderr
+        cls.plain = cls.tmp / "plain.linxtrace"
+        cls.packed = cls.tmp / "packed.linxtrace.zst"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
+
+    def test_frames_round_trip_and_seek(self) -> None:
+        want = self.plain.read_bytes()
+        with linxtrace_zstd.open_linxtrace(self.packed, "rb") as f:
+            self.assertEqual(f.read(), want)
+            self.assertGreater(f.raw.frames, 4)
+            for offset in (0, 1, len(want) // 3, len(want) - 5):
+                f.seek(offset)
+                self.assertEqual(f.read(4096), want[offset : offset + 4096])
+        self.assertEqual(
+            (self.tmp / "packed.map.json").read_text(encoding="utf-8").replace("packed.linxtrace.zst", "x"),
+            (self.tmp / "plain.map.json").read_text(encoding="utf-8").replace("plain.linxtrace", "x"),
+        )
+
+    def test_index_answers_match_plain_trace(self) -> None:
+        self.assertTrue((self.tmp / "packed.linxtrace.lxti").is_file())
+        with linxtrace_index.LinxTraceIndex.open(self.plain) as plain, linxtrace_index.LinxTraceIndex.open(
+            self.packed, rebuild=False
+        ) as packed:
+            self.assertEqual(packed.rows_alive(10, 30), plain.rows_alive(10, 30))
+            self.assertEqual(packed.stage_histogram(), plain.stage_histogram())
+            for row_id in plain.rows_alive(0, 1 << 30)[::7]:
+                self.assertEqual(packed.timeline(row_id), plain.timeline(row_id))
+                self.assertEqual(packed.row_label(row_id), plain.row_label(row_id))
+
+    def test_cli_decompress(self) -> None:
+        out = self.tmp / "unpacked.linxtrace"
+        proc = subprocess.run(
+            [sys.executable, str(ROOT / "tools/linxcoresight/linxtrace_zstd.py"), "decompress", str(self.packed)]
+            + ["--out", str(out)],
+            cwd=ROOT,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(out.read_bytes(), self.plain.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,8 @@ set -euo pipefail
 ROOT_DIR="$(cd -- "$(dirname -- "${BASH_SOURCE[0]}")/.." && pwd)"
 
 bash "${ROOT_DIR}/tests/test_lsu_scb_pyc_flow.sh"
+bash "${ROOT_DIR}/tests/test_backend_lsu_stage_pyc_flow.sh"
+bash "${ROOT_DIR}/tests/test_backend_lsu_mdp_pyc_flow.sh"
 
 for suite in \
   LoadStoreForwardingSpec \
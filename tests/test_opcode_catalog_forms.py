@@ -328,6 +328,50 @@ class OpcodeCatalogFormsTest(unittest.TestCase):
         self.assertEqual(decode64_meta(0x0000207D0000007F).mnemonic, "v_qpop")
         self.assertEqual(decode64_meta(0x0000107D0000007F).mnemonic, "v_qpush")
 
+    def test_decode_index_matches_linear_longest_mask_scan(self) -> None:
+        import random
+
+        from common.decode16 import decode16_meta
+        from common.decode32 import decode32_meta
+        from common.decode48 import decode48_meta
+        from common.decode64 import decode64_meta
+        from common.opcode_meta_gen import OPCODE_META_FORMS, opcode_constraints_match
+
+        def linear(source_file: str, word: int, *, skip_carrier: bool):
+            best = None
+            best_bits = -1
+            for meta in OPCODE_META_FORMS:
+                if meta.source_file != source_file:
+                    continue
+                if skip_carrier and meta.flags == "DECODE_ONLY_CARRIER":
+                    continue
+                if (word & meta.mask) != meta.match or not opcode_constraints_match(word, meta):
+                    continue
+                bits = int(meta.mask).bit_count()
+                if bits > best_bits:
+                    best = meta
+                    best_bits = bits
+            return best
+
+        rng = random.Random(0x5EED)
+        for source_file, decode, width in (
+            ("insn16.decode", decode16_meta, 16),
+            ("insn32.decode", decode32_meta, 32),
+            ("insn48.decode", decode48_meta, 64),
+            ("insn64.decode", decode64_meta, 64),
+        ):
+            word_mask = (1 << width) - 1
+            words = [rng.getrandbits(width) for _ in range(256)]
+            for meta in OPCODE_META_FORMS:
+                if meta.source_file == source_file:
+                    words.extend((rng.getrandbits(width) & ~meta.mask & word_mask) | meta.match for _ in range(3))
+            for word in words:
+                self.assertIs(
+                    decode(word),
+                    linear(source_file, word, skip_carrier=source_file == "insn32.decode"),
+                    f"{source_file} 0x{word:x}",
+                )
+
     def test_active_locked_pto_counts_and_exact_decode_surface(self) -> None:
         from common.decode32 import decode32_meta
 
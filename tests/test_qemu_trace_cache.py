@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "qemu"))
+
+import qemu_trace_cache  # noqa: E402
+from qemu_trace_cache import QemuTraceCache  # noqa: E402
+
+
+def _rows(start: int, count: int) -> str:
+    return "".join(json.dumps({"seq": seq, "pc": hex(0x10000 + 4 * seq)}) + "\n" for seq in range(start, start + count))
+
+
+class QemuTraceCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.cache = QemuTraceCache(self.tmp / "cache", 1 << 20)
+        self.elf = self.tmp / "prog.elf"
+        self.elf.write_bytes(b"\x7fELF-program")
+        self.qemu = self.tmp / "qemu-system-linx64"
+        self.qemu.write_bytes(b"qemu-binary")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _key(self, elf: Path | None = None) -> str:
+        elf = elf or self.elf
+        return self.cache.trace_key(elf=elf, qemu_args=["-machine", "virt", "-kernel", str(elf)], qemu_bin=self.qemu)
+
+    def _store(self, key: str, start: int, count: int, *, complete: bool = False) -> bool:
+        src = self.tmp / "src.jsonl"
+        src.write_text(_rows(start, count), encoding="utf-8")
+        return self.cache.store(key, src, start=start, complete=complete)
+
+    def _fetch(self, key: str, start: int = 0, rows: int = 0) -> str | None:
+        out = self.tmp / "out.jsonl"
+        got = self.cache.fetch(key, out, start=start, rows=rows)
+        return None if got is None else out.read_text(encoding="utf-8")
+
+    def test_key_tracks_content_not_paths(self) -> None:
+        copy = self.tmp / "elsewhere" / "copy.elf"
+        copy.parent.mkdir()
+        copy.write_bytes(self.elf.read_bytes())
+        self.assertEqual(self._key(), self._key(copy))
+        base = self._key()
+        self.qemu.write_bytes(b"rebuilt-qemu-binary")
+        self.assertNotEqual(self._key(), base)
+        self.elf.write_bytes(b"\x7fELF-other")
+        self.assertNotEqual(self._key(), base)
+
+    def test_windows_are_served_from_a_cached_superset(self) -> None:
+        key = self._key()
+        self.assertIsNone(self._fetch(key, 100, 10))
+        self.assertTrue(self._store(key, 100, 50))
+        self.assertEqual(self._fetch(key, 110, 20), _rows(110, 20))
+        self.assertEqual(self._fetch(key, 100, 50), _rows(100, 50))
+        self.assertIsNone(self._fetch(key, 140, 20))
+        self.assertIsNone(self._fetch(key, 90, 20))
+        self.assertIsNone(self._fetch(key))
+        # A contained window adds nothing; a wider one replaces it.
+        self.assertFalse(self._store(key, 120, 10))
+        self.assertTrue(self._store(key, 0, 400, complete=True))
+        self.assertEqual(self.cache.stats()["entries"], 1)
+        self.assertEqual(self._fetch(key), _rows(0, 400))
+        self.assertEqual(self._fetch(key, 390, 100), _rows(390, 10))
+        self.assertIsNone(self._fetch(key, 400, 10))
+        self.assertIsNone(self._fetch(self._key(self.qemu), 0, 10))
+
+    def test_lru_eviction_bounds_total_size(self) -> None:
+        size = len(_rows(0, 40).encode("utf-8"))
+        cache = QemuTraceCache(self.tmp / "small", size * 2 + size // 2)
+        self.cache = cache
+        keys = []
+        for seed in range(3):
+            elf = self.tmp / f"p{seed}.elf"
+            elf.write_bytes(bytes([seed]) * 16)
+            keys.append(self._key(elf))
+        self._store(keys[0], 0, 40)
+        self._store(keys[1], 0, 40)
+        self.assertIsNotNone(self._fetch(keys[0], 0, 40))
+        self._store(keys[2], 0, 40)
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["total_bytes"], cache.max_bytes)
+        self.assertIsNotNone(self._fetch(keys[0], 0, 40))
+        self.assertIsNone(self._fetch(keys[1], 0, 40))
+        self.assertIsNotNone(self._fetch(keys[2], 0, 40))
+        self.assertEqual(len(list((self.tmp / "small" / "traces").iterdir())), 2)
+        self.assertEqual(cache.prune(0), 2 * size)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_env_disables_cache_and_cli_reports_stats(self) -> None:
+        with mock.patch.dict(os.environ, {qemu_trace_cache.ENV_DIR: "off"}):
+            self.assertIsNone(QemuTraceCache.from_env())
+        self._store(self._key(), 0, 5, complete=True)
+        proc = subprocess.run(
+            [sys.executable, str(ROOT / "tools" / "qemu" / "qemu_trace_cache.py"), "--cache-dir", str(self.cache.root), "stats"],
+            cwd=ROOT,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(json.loads(proc.stdout)["entries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import random
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import Any
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "chisel"))
+
+import find_replay_liq_qemu_candidates as locator  # noqa: E402
+from find_replay_liq_qemu_candidates import MemoryEvent  # noqa: E402
+
+
+def _reference_pairs(
+    events: list[MemoryEvent], *, lookback_rows: int, same_line: bool, min_second_row: int, max_second_row: int
+) -> list[tuple[int, int]]:
+    """The original quadratic scan, kept as the oracle for the indexed window."""
+    pairs: list[tuple[int, int]] = []
+    for index, event in enumerate(events):
+        if event.row < min_second_row or (max_second_row >= 0 and event.row > max_second_row):
+            continue
+        for prior in reversed(events[:index]):
+            if event.row - prior.row > lookback_rows:
+                break
+            overlap = locator.ranges_overlap(prior, event)
+            if not overlap and not (same_line and prior.line == event.line):
+                continue
+            if prior.is_store != event.is_store:
+                pairs.append((prior.row, event.row))
+    return pairs
+
+
+def _random_events(seed: int, count: int) -> list[MemoryEvent]:
+    rng = random.Random(seed)
+    events = []
+    row = 0
+    for _ in range(count):
+        row += rng.randint(1, 4)
+        size = rng.choice([0, 1, 2, 4, 8, 8, 16, 64, 100, 1 << 16])
+        events.append(
+            MemoryEvent(
+                row=row,
+                cycle=row,
+                pc=0x1000 + 4 * rng.randrange(32),
+                insn=rng.randrange(1 << 16),
+                is_store=rng.random() < 0.4,
+                addr=0x8000 + rng.randrange(0x400),
+                size=size,
+                data=rng.randrange(1 << 32),
+            )
+        )
+    return events
+
+
+def _pairs(candidates: list[dict[str, Any]]) -> list[tuple[int, int]]:
+    return sorted((item["first"]["row"], item["second"]["row"]) for item in candidates)
+
+
+class ReplayLiqCandidateIndexTest(unittest.TestCase):
+    def test_indexed_window_matches_linear_scan(self) -> None:
+        for seed in range(6):
+            events = _random_events(seed, 600)
+            for same_line in (True, False):
+                options = dict(lookback_rows=40, same_line=same_line, min_second_row=150, max_second_row=1800)
+                got = locator.find_candidates(iter(events), dedupe_pairs=False, **options)
+                self.assertEqual(_pairs(got), sorted(_reference_pairs(events, **options)))
+                for item in got:
+                    self.assertNotEqual(item["first"]["op"], item["second"]["op"])
+
+    def test_streaming_input_from_trace_file(self) -> None:
+        rows = []
+        for i in range(2000):
+            is_store = i % 3 == 0
+            rows.append(
+                {
+                    "pc": 0x2000 + 4 * (i % 5),
+                    "insn": 1,
+                    "mem_valid": int(i % 2 == 0),
+                    "mem_is_store": int(is_store),
+                    "mem_addr": 0x4000 + 8 * (i % 16),
+                    "mem_size": 8,
+                    "mem_wdata" if is_store else "mem_rdata": i,
+                }
+            )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "qemu.live.raw.jsonl"
+            path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+            options = dict(lookback_rows=64, same_line=True, min_second_row=0, max_second_row=-1, dedupe_pairs=True)
+            streamed = locator.find_candidates(locator.iter_events(path), **options)
+            loaded = locator.find_candidates(locator.load_events(path), **options)
+        self.assertEqual(streamed, loaded)
+        self.assertTrue(streamed)
+        self.assertEqual(streamed[0]["kind"], "store_before_load")
+
+    def test_cost_is_bounded_by_the_lookback_window(self) -> None:
+        # Disjoint lines: no pairs, so runtime must stay linear in the event count.
+        events = [
+            MemoryEvent(row=i, cycle=i, pc=0x1000, insn=0, is_store=i % 2 == 0, addr=0x10000 + 64 * i, size=8, data=0)
+            for i in range(60000)
+        ]
+        start = time.monotonic()
+        got = locator.find_candidates(
+            events, lookback_rows=50000, same_line=True, min_second_row=0, max_second_row=-1, dedupe_pairs=True
+        )
+        self.assertEqual(got, [])
+        self.assertLess(time.monotonic() - start, 10.0)
+
+    def test_self_test_passes(self) -> None:
+        locator.run_self_test()
+
+
+if __name__ == "__main__":
+    unittest.main()
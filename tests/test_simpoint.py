@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+
+import commit_columnar  # noqa: E402
+import simpoint  # noqa: E402
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+PHASES = {"A": (0x1000, 8), "B": (0x5000, 20), "C": (0x9000, 3)}
+FIELDS = (
+    "insn", "len", "wb_valid", "wb_rd", "wb_data", "src0_valid", "src0_reg", "src0_data", "src1_valid",
+    "src1_reg", "src1_data", "dst_valid", "dst_reg", "dst_data", "mem_valid", "mem_is_store", "mem_addr",
+    "mem_wdata", "mem_rdata", "mem_size", "trap_valid", "trap_cause", "traparg0",
+)  # fmt: skip
+
+
+def _phased_trace(path: Path, schedule: str = "ABACBA", rows_per_phase: int = 3000) -> None:
+    """Three loops over disjoint code; phase A runs half the time, B a third, C a sixth."""
+    rng = random.Random(5)
+    seq = 0
+    with path.open("w", encoding="utf-8") as f:
+        for phase in schedule:
+            base, body = PHASES[phase]
+            for _ in range(rows_per_phase):
+                slot = seq % body
+                pc = base + 4 * slot
+                next_pc = base if slot == body - 1 else pc + 4
+                if rng.random() < 0.02:
+                    next_pc = base + 4 * rng.randrange(body)
+                row = {"seq": seq, "pc": pc, "next_pc": next_pc, **{name: 0 for name in FIELDS}}
+                f.write(json.dumps(row) + "\n")
+                seq += 1
+
+
+class SimpointTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.trace = self.tmp / "trace.jsonl"
+        _phased_trace(self.trace)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_one_weighted_simpoint_per_phase(self) -> None:
+        result = simpoint.select_simpoints(self.trace, 1000, use_numpy=False)
+        self.assertEqual((result["rows"], result["intervals"]), (18000, 18))
+        self.assertEqual(result["k"], 3)
+        picks = result["picked_windows"]
+        self.assertEqual([round(p["weight"], 4) for p in picks], [0.5, 0.3333, 0.1667])
+        self.assertEqual([PHASES[phase][0] for phase in "ABC"], [p["start_pc"] for p in picks])
+        for pick in picks:
+            self.assertEqual(pick["end_index_exclusive"] - pick["start_index"], 1000)
+            self.assertEqual(pick["start_seq"], pick["start_index"])
+
+    def test_bbv_stream_matches_between_jsonl_and_columnar_with_partial_tail(self) -> None:
+        lxct = self.tmp / "trace.lxct"
+        commit_columnar.convert_jsonl(self.trace, lxct)
+        outs = []
+        for path in (self.trace, lxct):
+            bbv = io.StringIO()
+            builder = simpoint.build_bbvs(path, 700, bbv_out=bbv, use_numpy=False)
+            outs.append(bbv.getvalue())
+        self.assertEqual(outs[0], outs[1])
+        lines = outs[0].splitlines()
+        self.assertEqual(len(lines), builder.intervals)
+        self.assertEqual(builder.commits[-1], 18000 % 700)
+        counts = [int(item.split(":")[2]) for item in lines[-1][1:].split()]
+        self.assertEqual(sum(counts), 18000 % 700)
+        self.assertTrue(lines[0].startswith("T:1:"))
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is required for the vectorized path")
+    def test_vectorized_columnar_path_matches_pure_python(self) -> None:
+        lxct = self.tmp / "trace.lxct"
+        commit_columnar.convert_jsonl(self.trace, lxct)
+        pure, fast = io.StringIO(), io.StringIO()
+        ref = simpoint.build_bbvs(lxct, 700, bbv_out=pure, use_numpy=False)
+        got = simpoint.build_bbvs(lxct, 700, bbv_out=fast, use_numpy=True)
+        self.assertEqual(fast.getvalue(), pure.getvalue())
+        self.assertEqual(list(got.commits), list(ref.commits))
+        self.assertEqual(list(got.end_pc), list(ref.end_pc))
+        for a, b in zip(got.points, ref.points):
+            self.assertAlmostEqual(a, b, places=9)
+        result = simpoint.select_simpoints(lxct, 1000, use_numpy=True)
+        self.assertEqual(result["k"], 3)
+
+    def test_cli_writes_json_report_and_bbv(self) -> None:
+        out = self.tmp / "slice.json"
+        proc = subprocess.run(
+            [
+                sys.executable,
+                str(ROOT / "tools" / "trace" / "select_simpoint_window.py"),
+                "--trace",
+                str(self.trace),
+                "--interval",
+                "1000",
+                "--pick-count",
+                "1",
+                "--max-commits",
+                "12000",
+                "--out",
+                str(out),
+                "--report",
+                str(self.tmp / "slice.md"),
+                "--bbv-out",
+                str(self.tmp / "trace.bb"),
+            ],
+            cwd=ROOT,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        payload = json.loads(out.read_text(encoding="utf-8"))
+        self.assertEqual(payload["rows"], 12000)
+        self.assertEqual(len(payload["picked_windows"]), 1)
+        self.assertEqual(payload["picked_windows"][0]["start_pc"], PHASES["A"][0])
+        self.assertIn("## Simulation Points", (self.tmp / "slice.md").read_text(encoding="utf-8"))
+        self.assertEqual(len((self.tmp / "trace.bb").read_text(encoding="utf-8").splitlines()), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
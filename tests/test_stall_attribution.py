@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import importlib.util
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+import stall_attribution  # noqa: E402
+from test_linxtrace_stream_builder import _raw_trace  # noqa: E402
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def _occ(cycle: int, uid: int, stage: str, pc: int, **extra: int) -> dict:
+    return {"type": "occ", "cycle": cycle, "core_id": 0, "stage": stage, "lane": 0, "uop_uid": uid,
+            "block_uid": 7, "pc": pc, "kind": 0, "stall": 0, "stall_cause": 0, **extra}  # fmt: skip
+
+
+def _commit(cycle: int, uid: int, seq: int, pc: int) -> dict:
+    return {"type": "commit", "cycle": cycle, "core_id": 0, "uop_uid": uid, "block_uid": 7, "seq": seq, "pc": pc}
+
+
+# uid 1 commits at 4 after two stalled E1 cycles, uid 2 is flushed at 4 and
+# uid 3 refetches at 6: frontend c0, backend c1-c3/c7, retiring c4/c8 and
+# flush recovery (bad speculation) c5-c6.
+RECORDS = [
+    _occ(0, 1, "F0", 0x100),
+    _occ(1, 1, "D1", 0x100),
+    _occ(1, 2, "F0", 0x104),
+    _occ(2, 1, "E1", 0x100, stall=1, stall_cause=2),
+    _occ(2, 2, "D1", 0x104),
+    _occ(3, 1, "E1", 0x100, stall=1, stall_cause=2),
+    _occ(3, 2, "E1", 0x104, kind=1),
+    _occ(4, 1, "CMT", 0x100),
+    _commit(4, 1, 1, 0x100),
+    _occ(4, 2, "FLS", 0x104, kind=1),
+    {"type": "blk_evt", "cycle": 4, "kind": "open", "block_uid": 7, "seq": 1, "core_id": 0},
+    _occ(6, 3, "F0", 0x108),
+    _occ(7, 3, "D1", 0x108),
+    _occ(8, 3, "CMT", 0x108),
+    _commit(8, 3, 2, 0x108),
+]
+
+
+class StallAttributionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.raw = self.tmp / "raw.jsonl"
+        self.raw.write_text("".join(json.dumps(r) + "\n" for r in RECORDS), encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_top_down_buckets_and_blame(self) -> None:
+        report = stall_attribution.analyze(stall_attribution.load_events(self.raw), use_numpy=False)
+        total = report["total"]
+        self.assertEqual((total["cycles"], total["commits"]), (9, 2))
+        self.assertEqual(
+            total["top_down"], {"retiring": 2, "frontend_bound": 1, "backend_bound": 4, "bad_speculation": 2}
+        )
+        self.assertEqual(total["frontend_bound_detail"], {"fetch_starved": 0, "delivery_stalled": 1})
+        self.assertEqual(total["backend_bound_by_stage"], {"D1": 2, "E1": 2})
+        self.assertEqual(
+            [(row["pc"], row["blamed_cycles"], row["stall_occ"]) for row in report["pcs"]],
+            [("0x100", 3, 2), ("0x108", 1, 0)],
+        )
+        self.assertEqual(report["blocks"], [
+            {"block_pc": "0x100", "label": "0x100", "instances": 1, "blamed_cycles": 4, "stall_occ": 2}
+        ])  # fmt: skip
+        e1 = report["stages"]["E1"]
+        self.assertEqual(e1["distribution"], {"0": 7, "1": 1, "2": 1})
+        self.assertEqual((e1["max_occupancy"], e1["stall_occ"], e1["stall_causes"]), (2, 2, {"2": 2}))
+
+    def test_columnar_and_engines_agree(self) -> None:
+        raw = self.tmp / "big.jsonl"
+        raw.write_text("".join(json.dumps(r) + "\n" for r in _raw_trace(9)), encoding="utf-8")
+        events = stall_attribution.load_events(raw)
+        lxoc = self.tmp / f"big{stall_attribution.SUFFIX}"
+        events.write_columnar(lxoc)
+        ref = stall_attribution.analyze(events, use_numpy=False)
+        engines = [False, True] if HAS_NUMPY else [False]
+        for use_numpy in engines:
+            got = stall_attribution.analyze(stall_attribution.load_events(lxoc), use_numpy=use_numpy)
+            self.assertEqual({**got, "engine": ""}, {**ref, "engine": ""})
+        self.assertEqual(sum(ref["total"]["top_down"].values()), ref["total"]["cycles"])
+        self.assertEqual(set(ref["cores"]), {"0", "1"})
+
+    def test_cli_writes_json_and_markdown(self) -> None:
+        out_json, out_md = self.tmp / "r.json", self.tmp / "r.md"
+        proc = subprocess.run(
+            [sys.executable, str(ROOT / "tools/trace/stall_attribution.py"), "--raw", str(self.raw)]
+            + ["--json-out", str(out_json), "--md-out", str(out_md), "--no-numpy"],
+            cwd=ROOT,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertIn("backend_bound=44.44%", proc.stdout)
+        self.assertEqual(json.loads(out_json.read_text(encoding="utf-8"))["schema"], stall_attribution.REPORT_SCHEMA_ID)
+        self.assertIn("| 0 | 9 | 2 (22.22%) |", out_md.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+import trace_reader  # noqa: E402
+from test_commit_columnar import _commit_row  # noqa: E402
+
+
+class TraceReaderTest(unittest.TestCase):
+    def _write(self, tmp: Path, lines: list[str]) -> Path:
+        path = tmp / "trace.jsonl"
+        path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+        return path
+
+    def test_fast_path_matches_json_for_both_spellings(self) -> None:
+        rows = [_commit_row(i) for i in range(40)]
+        for i, row in enumerate(rows):
+            if i % 3 == 0:
+                del row["cycle"]
+            if i % 5 == 0:
+                del row["seq"]
+            if i % 7 == 0:
+                row["mem_rdata"] = True
+            if i % 11 == 0:
+                row["note"] = "a, b: {c}"
+        with tempfile.TemporaryDirectory() as td:
+            for separators in ((",", ":"), (", ", ": ")):
+                path = self._write(Path(td), [json.dumps(row, separators=separators) for row in rows])
+                reader = trace_reader.commit_reader(["cycle"])
+                got = [(row, values) for _, row, values in reader.iter_file(path)]
+                want = [(i, trace_reader.commit_reader(["cycle"])._from_obj(row, i)) for i, row in enumerate(rows)]
+                self.assertEqual(got, want)
+                self.assertTrue(any(shape is not None for shape in reader._shapes.values()))
+
+    def test_span_limit_and_offsets(self) -> None:
+        lines = [json.dumps(_commit_row(i)) for i in range(10)]
+        with tempfile.TemporaryDirectory() as td:
+            path = self._write(Path(td), lines[:4] + [""] + lines[4:])
+            reader = trace_reader.commit_reader()
+            offsets = [offset for offset, _, _ in reader.iter_file(path)]
+            self.assertEqual(len(offsets), 10)
+            tail = list(reader.iter_file(path, start=offsets[6], row_base=6, limit=2))
+            self.assertEqual([(offset, row) for offset, row, _ in tail], [(offsets[6], 6), (offsets[7], 7)])
+            self.assertEqual(tail[0][2][0], 6)
+            head = list(reader.iter_file(path, end=offsets[3]))
+            self.assertEqual(len(head), 3)
+
+    def test_missing_mandatory_field_is_fatal(self) -> None:
+        good = _commit_row(0)
+        bad = _commit_row(1)
+        del bad["next_pc"]
+        with tempfile.TemporaryDirectory() as td:
+            path = self._write(Path(td), [json.dumps(good), json.dumps(bad)])
+            with self.assertRaises(SystemExit) as ctx:
+                list(trace_reader.commit_reader().iter_file(path))
+            self.assertIn("row 1 missing mandatory commit fields: next_pc", str(ctx.exception))
+
+    def test_escaped_strings_and_extra_fields(self) -> None:
+        reader = trace_reader.TypedRowReader(("pc", "cycle"), defaults={"cycle": 7})
+        line = json.dumps({"pc": "0x40", "asm": 'add "x1", x2\\n'}).encode()
+        self.assertEqual(reader.decode(line, 0, "row 0"), (0x40, 7))
+        self.assertEqual(reader.decode(b'{"pc": 16, "asm": "nop"}', 1, "row 1"), (16, 7))
+        self.assertEqual(reader.decode(b'{"pc": 17, "asm": "mov"}', 2, "row 2"), (17, 7))
+
+
+if __name__ == "__main__":
+    unittest.main()
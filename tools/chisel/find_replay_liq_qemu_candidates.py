@@ -11,9 +11,21 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
+
+TRACE_TOOLS = Path(__file__).resolve().parents[1] / "trace"
+if str(TRACE_TOOLS) not in sys.path:
+    sys.path.insert(0, str(TRACE_TOOLS))
+
+from commit_columnar import is_columnar_trace, open_columnar  # noqa: E402
+
+LINE_BYTES = 64
+# Accesses spanning more lines than this are kept on a short linear list
+# instead of being indexed under every line they touch.
+MAX_INDEXED_LINES = 64
 
 
 @dataclass(frozen=True)
@@ -33,7 +45,11 @@ class MemoryEvent:
 
     @property
     def line(self) -> int:
-        return self.addr // 64
+        return self.addr // LINE_BYTES
+
+    def lines(self) -> range:
+        """Cache lines holding the start address or any accessed byte."""
+        return range(self.line, max(self.end - 1, self.addr) // LINE_BYTES + 1)
 
 
 def parse_int(value: Any, default: int = 0) -> int:
@@ -48,8 +64,34 @@ def parse_int(value: Any, default: int = 0) -> int:
     raise ValueError(f"unsupported integer value {value!r}")
 
 
-def load_events(path: Path) -> list[MemoryEvent]:
-    events: list[MemoryEvent] = []
+def iter_columnar_events(path: Path) -> Iterator[MemoryEvent]:
+    with open_columnar(path) as trace:
+        has_cycle = "cycle" in trace.fields
+        for index, row in enumerate(trace.iter_rows()):
+            if row["mem_valid"] == 0:
+                continue
+            is_store = row["mem_is_store"] != 0
+            yield MemoryEvent(
+                row=index,
+                cycle=row["cycle"] if has_cycle else index,
+                pc=row["pc"],
+                insn=row["insn"],
+                is_store=is_store,
+                addr=row["mem_addr"],
+                size=row["mem_size"],
+                data=row["mem_wdata"] if is_store else row["mem_rdata"],
+            )
+
+
+def load_columnar_events(path: Path) -> list[MemoryEvent]:
+    return list(iter_columnar_events(path))
+
+
+def iter_events(path: Path) -> Iterator[MemoryEvent]:
+    """Stream memory events from a JSONL or columnar trace in row order."""
+    if is_columnar_trace(path):
+        yield from iter_columnar_events(path)
+        return
     with path.open("r", encoding="utf-8") as f:
         for line_no, line in enumerate(f, 1):
             if not line.strip():
@@ -61,19 +103,20 @@ def load_events(path: Path) -> list[MemoryEvent]:
                 continue
             is_store = parse_int(row.get("mem_is_store"), 0) != 0
             data_key = "mem_wdata" if is_store else "mem_rdata"
-            events.append(
-                MemoryEvent(
-                    row=line_no - 1,
-                    cycle=parse_int(row.get("cycle"), line_no - 1),
-                    pc=parse_int(row.get("pc")),
-                    insn=parse_int(row.get("insn")),
-                    is_store=is_store,
-                    addr=parse_int(row.get("mem_addr")),
-                    size=parse_int(row.get("mem_size")),
-                    data=parse_int(row.get(data_key), 0),
-                )
+            yield MemoryEvent(
+                row=line_no - 1,
+                cycle=parse_int(row.get("cycle"), line_no - 1),
+                pc=parse_int(row.get("pc")),
+                insn=parse_int(row.get("insn")),
+                is_store=is_store,
+                addr=parse_int(row.get("mem_addr")),
+                size=parse_int(row.get("mem_size")),
+                data=parse_int(row.get(data_key), 0),
             )
-    return events
+
+
+def load_events(path: Path) -> list[MemoryEvent]:
+    return list(iter_events(path))
 
 
 def ranges_overlap(a: MemoryEvent, b: MemoryEvent) -> bool:
@@ -96,8 +139,72 @@ def candidate_score(kind: str, first: MemoryEvent, second: MemoryEvent, distance
     return score
 
 
+class HazardWindow:
+    """Memory events from the last `lookback_rows` rows, indexed for overlap queries.
+
+    Events are bucketed by (cache line, store/load) under every line they
+    touch, so a query only visits opposite-kind events sharing a line with it.
+    Each bucket is a deque in row order; expiry pops from the left.
+    """
+
+    def __init__(self, lookback_rows: int, *, same_line: bool) -> None:
+        self.lookback_rows = lookback_rows
+        self.same_line = same_line
+        self._order: deque[MemoryEvent] = deque()
+        self._buckets: dict[tuple[int, bool], deque[MemoryEvent]] = {}
+        self._wide: deque[MemoryEvent] = deque()
+
+    @staticmethod
+    def _indexed_lines(event: MemoryEvent) -> range | None:
+        lines = event.lines()
+        return lines if len(lines) <= MAX_INDEXED_LINES else None
+
+    def expire(self, row: int) -> None:
+        """Drop events more than `lookback_rows` before `row`."""
+        horizon = row - self.lookback_rows
+        while self._order and self._order[0].row < horizon:
+            old = self._order.popleft()
+            lines = self._indexed_lines(old)
+            if lines is None:
+                self._wide.popleft()
+                continue
+            for line in lines:
+                key = (line, old.is_store)
+                bucket = self._buckets[key]
+                bucket.popleft()
+                if not bucket:
+                    del self._buckets[key]
+
+    def matches(self, event: MemoryEvent) -> list[MemoryEvent]:
+        """Opposite-kind window events that overlap `event` (or share its line), nearest first."""
+        want_store = not event.is_store
+        found: dict[int, MemoryEvent] = {}
+        lines = self._indexed_lines(event)
+        if lines is None:
+            pools: Iterable[Iterable[MemoryEvent]] = [self._order]
+        else:
+            pools = [self._buckets.get((line, want_store), ()) for line in lines]
+            pools.append(self._wide)
+        for pool in pools:
+            for prior in pool:
+                if prior.is_store != want_store or prior.row in found:
+                    continue
+                if ranges_overlap(prior, event) or (self.same_line and prior.line == event.line):
+                    found[prior.row] = prior
+        return [found[row] for row in sorted(found, reverse=True)]
+
+    def push(self, event: MemoryEvent) -> None:
+        self._order.append(event)
+        lines = self._indexed_lines(event)
+        if lines is None:
+            self._wide.append(event)
+            return
+        for line in lines:
+            self._buckets.setdefault((line, event.is_store), deque()).append(event)
+
+
 def find_candidates(
-    events: list[MemoryEvent],
+    events: Iterable[MemoryEvent],
     *,
     lookback_rows: int,
     same_line: bool,
@@ -105,26 +212,22 @@ def find_candidates(
     max_second_row: int,
     dedupe_pairs: bool,
 ) -> list[dict[str, Any]]:
+    """Pair each memory event with earlier opposite-kind events within `lookback_rows`.
+
+    `events` may be any iterable in row order (e.g. `iter_events`); only the
+    lookback window is held in memory, so the cost is O(events + pairs).
+    """
     out: list[dict[str, Any]] = []
-    for index, event in enumerate(events):
-        if event.row < min_second_row:
-            continue
+    window = HazardWindow(lookback_rows, same_line=same_line)
+    for event in events:
         if max_second_row >= 0 and event.row > max_second_row:
-            continue
-        for prior in reversed(events[:index]):
+            break
+        window.expire(event.row)
+        priors = window.matches(event) if event.row >= min_second_row else []
+        window.push(event)
+        for prior in priors:
             distance = event.row - prior.row
-            if distance > lookback_rows:
-                break
-            if not same_line and not ranges_overlap(prior, event):
-                continue
-            if same_line and prior.line != event.line and not ranges_overlap(prior, event):
-                continue
-            if prior.is_store and not event.is_store:
-                kind = "store_before_load"
-            elif not prior.is_store and event.is_store:
-                kind = "load_before_store"
-            else:
-                continue
+            kind = "store_before_load" if prior.is_store else "load_before_store"
             exact = ranges_overlap(prior, event)
             line_match = prior.line == event.line
             out.append(
@@ -22,6 +22,16 @@ from find_replay_liq_qemu_candidates import (
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 WRAPPER = ROOT_DIR / "tools/chisel/run_chisel_frontend_fetch_rf_alu_qemu_elf_xcheck.sh"
+QEMU_CROSSCHECK_RUNNER = ROOT_DIR / "tools/chisel/run_chisel_qemu_crosscheck.sh"
+QEMU_TOOLS = ROOT_DIR / "tools/qemu"
+if str(QEMU_TOOLS) not in sys.path:
+    sys.path.insert(0, str(QEMU_TOOLS))
+TRACE_TOOLS = ROOT_DIR / "tools/trace"
+if str(TRACE_TOOLS) not in sys.path:
+    sys.path.insert(0, str(TRACE_TOOLS))
+
+from jsonl_index import row_count  # noqa: E402
+from qemu_trace_cache import QemuTraceCache  # noqa: E402
 
 
 def parse_int_list(value: str) -> list[int]:
@@ -64,11 +74,6 @@ def dedupe_preserve_order(values: list[int]) -> list[int]:
     return out
 
 
-def count_rows(path: Path) -> int:
-    with path.open("r", encoding="utf-8") as f:
-        return sum(1 for line in f if line.strip())
-
-
 def default_qemu_args(elf: Path) -> list[str]:
     return [
         "-nographic",
@@ -87,11 +92,44 @@ def interval_name(skip_rows: int, capture_rows: int) -> str:
     return f"skip{skip_rows}-rows{capture_rows}"
 
 
+def resolve_qemu_bin(args: argparse.Namespace) -> Path | None:
+    """The binary the wrapper will run: --qemu-bin, else the crosscheck runner's default."""
+    if args.qemu_bin is not None:
+        return args.qemu_bin
+    try:
+        proc = subprocess.run(
+            ["bash", str(QEMU_CROSSCHECK_RUNNER), "--print-qemu-bin"],
+            cwd=ROOT_DIR,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+    except OSError:
+        return None
+    path = proc.stdout.strip()
+    return Path(path) if proc.returncode == 0 and path else None
+
+
+def open_qemu_cache(args: argparse.Namespace, qemu_args: list[str]) -> tuple[QemuTraceCache | None, str | None]:
+    cache = QemuTraceCache.from_env(args.qemu_cache_dir, disabled=args.no_qemu_cache)
+    if cache is None:
+        return None, None
+    qemu_bin = resolve_qemu_bin(args)
+    if qemu_bin is None or not qemu_bin.is_file() or not args.elf.is_file():
+        return None, None
+    return cache, cache.trace_key(elf=args.elf, qemu_args=qemu_args, qemu_bin=qemu_bin)
+
+
 def run_interval(args: argparse.Namespace, skip_rows: int, qemu_args: list[str]) -> dict[str, Any]:
     interval_dir = args.build_dir / interval_name(skip_rows, args.capture_rows)
     trace_dir = interval_dir / "traces"
     report_dir = interval_dir / "report"
     report_dir.mkdir(parents=True, exist_ok=True)
+    raw_trace = trace_dir / "qemu.live.raw.jsonl"
+    cache: QemuTraceCache | None = getattr(args, "qemu_cache", None)
+    cache_key: str | None = getattr(args, "qemu_cache_key", None)
+    cache_state = "off" if cache is None or cache_key is None else "miss"
 
     cmd = [
         "bash",
@@ -119,45 +157,58 @@ def run_interval(args: argparse.Namespace, skip_rows: int, qemu_args: list[str])
     timed_out = False
     stdout = ""
     stderr = ""
-    process = subprocess.Popen(
-        cmd,
-        cwd=ROOT_DIR,
-        text=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        start_new_session=True,
-    )
-    try:
-        stdout, stderr = process.communicate(timeout=args.wrapper_timeout_seconds)
-    except subprocess.TimeoutExpired:
-        timed_out = True
-        os.killpg(process.pid, signal.SIGTERM)
+    returncode = 0
+    cached_rows = None
+    if cache_state == "miss":
+        cached_rows = cache.fetch(cache_key, raw_trace, start=skip_rows, rows=args.capture_rows)
+    if cached_rows is not None:
+        cache_state = "hit"
+        stdout = f"qemu-trace-cache hit key={cache_key} skip={skip_rows} rows={cached_rows} root={cache.root}\n"
+    else:
+        process = subprocess.Popen(
+            cmd,
+            cwd=ROOT_DIR,
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
         try:
-            stdout, stderr = process.communicate(timeout=5)
+            stdout, stderr = process.communicate(timeout=args.wrapper_timeout_seconds)
         except subprocess.TimeoutExpired:
-            os.killpg(process.pid, signal.SIGKILL)
-            stdout, stderr = process.communicate()
+            timed_out = True
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                stdout, stderr = process.communicate(timeout=5)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                stdout, stderr = process.communicate()
+        returncode = process.returncode
     (report_dir / "scan-wrapper.stdout.txt").write_text(stdout, encoding="utf-8")
     (report_dir / "scan-wrapper.stderr.txt").write_text(stderr, encoding="utf-8")
 
-    raw_trace = trace_dir / "qemu.live.raw.jsonl"
-    raw_rows = count_rows(raw_trace) if raw_trace.exists() else 0
+    raw_rows = row_count(raw_trace) if raw_trace.exists() else 0
     capture_complete = raw_rows >= args.capture_rows
     interval: dict[str, Any] = {
         "skip_rows": skip_rows,
         "capture_rows": args.capture_rows,
         "build_dir": str(interval_dir),
         "raw_trace": str(raw_trace),
-        "wrapper_returncode": process.returncode,
+        "wrapper_returncode": returncode,
         "wrapper_timed_out": timed_out,
         "capture_complete": capture_complete,
+        "qemu_cache": cache_state,
     }
-    if process.returncode != 0 and not capture_complete:
+    if returncode != 0 and not capture_complete:
         interval["error"] = "wrapper failed"
         return interval
     if not raw_trace.exists():
         interval["error"] = "wrapper did not produce qemu.live.raw.jsonl"
         return interval
+    if cache_state == "miss" and raw_rows > 0:
+        # The captured rows are exact even when QEMU stopped early, so the
+        # window is kept as [skip, skip + raw_rows) and never marked complete.
+        cache.store(cache_key, raw_trace, start=skip_rows)
 
     events = load_events(raw_trace)
     candidates = find_candidates(
@@ -180,7 +231,7 @@ def run_interval(args: argparse.Namespace, skip_rows: int, qemu_args: list[str])
 
     interval.update(
         {
-            "raw_rows": count_rows(raw_trace),
+            "raw_rows": raw_rows,
             "event_count": candidate_summary["event_count"],
             "store_count": candidate_summary["store_count"],
             "load_count": candidate_summary["load_count"],
@@ -261,6 +312,13 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         help="hard scanner-side timeout per wrapper run; default is max(2*--max-seconds, --max-seconds+30)",
     )
     parser.add_argument("--qemu-bin", type=Path, default=None, help="optional QEMU binary override")
+    parser.add_argument(
+        "--qemu-cache-dir",
+        type=Path,
+        default=None,
+        help="QEMU reference-trace cache root (default: $LINXCORE_QEMU_TRACE_CACHE or ~/.cache/linxcore/qemu-traces)",
+    )
+    parser.add_argument("--no-qemu-cache", action="store_true", help="always rerun QEMU; do not read or fill the trace cache")
     parser.add_argument("--lookback-rows", type=int, default=2048, help="locator lookback rows")
     parser.add_argument("--top", type=int, default=20, help="top candidates/histogram rows per interval")
     parser.add_argument("--exact-overlap-only", action="store_true", help="drop same-line-only locator candidates")
@@ -301,6 +359,7 @@ def main(argv: list[str]) -> int:
         qemu_args = qemu_args[1:]
     if not qemu_args:
         qemu_args = default_qemu_args(args.elf)
+    args.qemu_cache, args.qemu_cache_key = open_qemu_cache(args, qemu_args)
 
     intervals: list[dict[str, Any]] = []
     for skip_rows in args.skips:
@@ -312,7 +371,8 @@ def main(argv: list[str]) -> int:
             f"timeout={int(bool(interval.get('wrapper_timed_out', False)))} "
             f"rows={interval.get('raw_rows', 0)} events={interval.get('event_count', 0)} "
             f"stores={interval.get('store_count', 0)} loads={interval.get('load_count', 0)} "
-            f"candidates={interval.get('candidate_count', 0)}",
+            f"candidates={interval.get('candidate_count', 0)} "
+            f"cache={interval['qemu_cache']}",
             flush=True,
         )
         if interval.get("error"):
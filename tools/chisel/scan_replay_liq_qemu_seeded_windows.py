@@ -37,6 +37,12 @@ from scan_replay_liq_activation_artifacts import (
 
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
+TRACE_TOOLS = ROOT_DIR / "tools/trace"
+if str(TRACE_TOOLS) not in sys.path:
+    sys.path.insert(0, str(TRACE_TOOLS))
+
+from jsonl_index import JsonlIndex  # noqa: E402
+
 WRAPPER = ROOT_DIR / "tools/chisel/run_chisel_frontend_fetch_rf_alu_trace_top_xcheck.sh"
 SCHEMA = "linxcore.replay_liq_qemu_seeded_window_scan.v1"
 
@@ -72,21 +78,9 @@ def parse_int(value: Any) -> int:
     raise ValueError(f"expected integer-like value, got {value!r}")
 
 
-def load_jsonl_lines(path: Path) -> list[str]:
-    lines: list[str] = []
-    with path.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            if line.strip():
-                lines.append(line)
-    return lines
-
-
 def write_window_slice(source: Path, output: Path, *, start: int, count: int) -> int:
-    lines = load_jsonl_lines(source)
-    output.parent.mkdir(parents=True, exist_ok=True)
-    selected = lines[start : start + count]
-    output.write_text("".join(selected), encoding="utf-8")
-    return len(selected)
+    """Copy non-blank rows [start, start + count) of `source` via its `.idx` sidecar."""
+    return JsonlIndex.open(source).copy_window(output, start=start, count=count)
 
 
 def candidate_windows(
@@ -544,7 +544,12 @@ if [[ -n "${commit_trace_path}" && -f "${commit_trace_path}" && -s "${commit_tra
     fi
   fi
   if [[ -f "${TRACE_TXT_TOOL}" ]]; then
-    txt_cmd=(python3 "${TRACE_TXT_TOOL}" --input "${commit_trace_path}" --output "${trace_txt_path}")
+    txt_cmd=(
+      python3 "${TRACE_TXT_TOOL}"
+      --input "${commit_trace_path}"
+      --output "${trace_txt_path}"
+      --jobs "${PYC_TRACE_TEXT_JOBS:-0}"
+    )
     if [[ -n "${PYC_OBJDUMP_ELF:-}" && -f "${PYC_OBJDUMP_ELF}" ]]; then
       txt_cmd+=(--objdump-elf "${PYC_OBJDUMP_ELF}")
     fi
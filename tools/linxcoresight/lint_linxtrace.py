@@ -18,6 +18,7 @@ from common.stage_tokens import (
     LINXTRACE_STAGE_ID_ORDER,
     LINXTRACE_STAGE_ORDER_CSV,
 )
+from linxtrace_zstd import open_linxtrace
 
 STAGE_ORDER = list(LINXTRACE_STAGE_ID_ORDER)
 STAGE_RANK = {stage: idx for idx, stage in enumerate(STAGE_ORDER)}
@@ -52,7 +53,7 @@ def _read_trace(trace_path: Path) -> Tuple[dict, List[dict]]:
 
     meta = None
     events: List[dict] = []
-    with trace_path.open("r", encoding="utf-8", errors="replace") as handle:
+    with open_linxtrace(trace_path) as handle:
         for lineno, line in enumerate(handle, 1):
             line = line.strip()
             if not line:
@@ -81,7 +82,7 @@ def _read_trace(trace_path: Path) -> Tuple[dict, List[dict]]:
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Strict canonical LinxTrace v1 linter.")
-    parser.add_argument("trace", help="Path to *.linxtrace")
+    parser.add_argument("trace", help="Path to *.linxtrace or *.linxtrace.zst")
     parser.add_argument("--meta", default="", help="Optional sidecar meta path to compare against in-band META.")
     parser.add_argument("--require-stages", default="", help="Comma-separated stages that must appear in OCC.")
     parser.add_argument(
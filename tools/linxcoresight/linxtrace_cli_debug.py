@@ -2,55 +2,53 @@
 from __future__ import annotations
 
 import argparse
-import json
-from collections import Counter
 from pathlib import Path
 
+from linxtrace_index import LinxTraceIndex, _parse_cycles
+
 
 def main() -> int:
     ap = argparse.ArgumentParser(description="Inspect LinxTrace rows/stages quickly.")
-    ap.add_argument("trace", help="Path to .linxtrace")
+    ap.add_argument("trace", help="Path to .linxtrace or .linxtrace.zst")
     ap.add_argument("--top", type=int, default=12, help="Number of rows to print")
+    ap.add_argument(
+        "--cycles",
+        type=_parse_cycles,
+        default=None,
+        help="Restrict the stage histogram and row list to cycles start:stop (stop exclusive).",
+    )
     args = ap.parse_args()
 
     p = Path(args.trace)
     if not p.exists():
         raise SystemExit(f"missing trace: {p}")
 
-    stage_hist = Counter()
-    row_left = {}
-    row_occ = Counter()
-    row_retire = Counter()
-    total = 0
-    with p.open("r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            rec = json.loads(line)
-            total += 1
-            t = rec.get("type")
-            if t == "META":
-                continue
-            if t == "LABEL" and rec.get("label_type") == "left":
-                row_left[int(rec["row_id"])] = str(rec.get("text", ""))
-            elif t == "OCC":
-                rid = int(rec["row_id"])
-                row_occ[rid] += 1
-                stage_hist[str(rec.get("stage_id", ""))] += 1
-            elif t == "RETIRE":
-                row_retire[int(rec["row_id"])] += 1
-
-    print(f"linxtrace-debug total_events={total} rows={len(row_left)} unique_stages={len(stage_hist)}")
-    print("top stages:")
-    for st, n in stage_hist.most_common(16):
-        print(f"  {st}: {n}")
-    print("top rows:")
-    top = sorted(row_occ.items(), key=lambda x: (-x[1], x[0]))[: max(1, args.top)]
-    for rid, n in top:
-        lbl = row_left.get(rid, "")
-        retired = row_retire.get(rid, 0)
-        print(f"  row={rid} occ={n} retire={retired} label={lbl[:120]}")
+    # Answers come from the <trace>.lxti sidecar (built on first use, or kept
+    # under $XDG_CACHE_HOME when the trace directory is read-only) rather than
+    # a full JSON scan.
+    with LinxTraceIndex.open(p) as index:
+        if args.cycles is None:
+            stage_hist = index.stage_histogram()
+            row_occ = index.occ_counts()
+        else:
+            stage_hist = index.stage_histogram(*args.cycles)
+            alive = index.occ_counts()
+            row_occ = {rid: alive[rid] for rid in index.rows_alive(*args.cycles) if rid in alive}
+        row_retire = index.retire_counts()
+
+        print(
+            f"linxtrace-debug total_events={index.header['lines']} rows={index.labelled_rows} "
+            f"unique_stages={len(stage_hist)}"
+        )
+        print("top stages:")
+        for st, n in stage_hist.most_common(16):
+            print(f"  {st}: {n}")
+        print("top rows:")
+        top = sorted(row_occ.items(), key=lambda x: (-x[1], x[0]))[: max(1, args.top)]
+        for rid, n in top:
+            lbl = index.row_label(rid)
+            retired = row_retire.get(rid, 0)
+            print(f"  row={rid} occ={n} retire={retired} label={lbl[:120]}")
     return 0
 
 
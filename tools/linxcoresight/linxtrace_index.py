@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""Row/cycle index for LinxTrace files and a query CLI over it.
+
+`trace.linxtrace` gets a sidecar `trace.lxti` (all integers little-endian):
+
+    magic      8 bytes   b"LXTRIDX1"
+    version    u32       index version (currently 1)
+    hdr_len    u32       byte length of the JSON header that follows
+    header     hdr_len   UTF-8 JSON: trace size/mtime, counts, stage list,
+                         column list
+    padding    to a 64-byte boundary
+    columns    one array per column, in header order, each 64-byte aligned
+
+Row columns (one entry per row, ascending `row_id`): `row_id`, `first_cycle`
+and `last_cycle` over the row's OCC/RETIRE/BLOCK_EVT records, `def_offset` and
+`label_offset` (byte offsets of its OP_DEF and left LABEL lines), and
+`ev_start`/`ev_count` into the event columns.
+
+Event columns (grouped by row, cycle order within a row): `ev_cycle`,
+`ev_offset` (byte offset of the record line), `ev_stage` (index into the
+header's stage list, or NO_STAGE) and `ev_kind` (EVENT_KINDS index).
+
+Interval columns: `by_first` lists the rows with events by `first_cycle`,
+`first_sorted` holds those cycles, and `seg_max` is a max-segment tree over
+their `last_cycle`. Together they answer "rows alive in [a, b)" in
+O(log n + k) without touching the trace.
+
+The index is rebuilt whenever the trace's size or mtime no longer match. When
+the sidecar cannot be written (a read-only trace directory), it goes to
+`$XDG_CACHE_HOME/linxcoresight/` (default `~/.cache`) instead. Opening an
+index maps the file; columns are views into the mapping, so opening costs the
+same for any trace size. Building sorts the events with numpy when it is
+installed.
+For a seekable zstd trace (`trace.linxtrace.zst`, see linxtrace_zstd.py) the
+sidecar is `trace.linxtrace.lxti` and offsets are into the decompressed text;
+lookups decompress only the frame holding the line.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from linxtrace_zstd import is_compressed, open_linxtrace
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None  # type: ignore[assignment]
+
+MAGIC = b"LXTRIDX1"
+VERSION = 1
+SCHEMA_ID = "linxcore.linxtrace_index.v1"
+SUFFIX = ".lxti"
+ALIGN = 64
+NO_STAGE = 0xFFFFFFFF
+NO_OFFSET = (1 << 64) - 1
+EVENT_KINDS = ("OCC", "RETIRE", "BLOCK_EVT")
+_PREAMBLE = struct.Struct("<8sII")
+
+_TYPE_RE = re.compile(rb'"type": "([A-Za-z_]+)"')
+_ROW_RE = re.compile(rb'"row_id": (\d+)')
+_CYCLE_RE = re.compile(rb'"cycle": (\d+)')
+_STAGE_RE = re.compile(rb'"stage_id": "([^"\\]*)"')
+_LABEL_LEFT_RE = re.compile(rb'"label_type": "left"')
+
+ROW_COLUMNS = ("row_id", "first_cycle", "last_cycle", "def_offset", "label_offset", "ev_start", "ev_count")
+EVENT_COLUMNS = ("ev_cycle", "ev_offset", "ev_stage", "ev_kind")
+INTERVAL_COLUMNS = ("by_first", "first_sorted", "seg_max")
+_U32_COLUMNS = {"ev_stage", "ev_kind"}
+
+
+def index_path(trace: Path) -> Path:
+    return trace.with_suffix(SUFFIX)
+
+
+def cache_index_path(trace: Path) -> Path:
+    """Fallback index location for traces whose directory is not writable."""
+    root = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "linxcoresight"
+    key = hashlib.sha1(str(Path(trace).resolve()).encode("utf-8")).hexdigest()[:16]
+    return root / f"{Path(trace).name}.{key}{SUFFIX}"
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _typecode(name: str) -> str:
+    return "I" if name in _U32_COLUMNS else "Q"
+
+
+def _parse_line(raw: bytes) -> Optional[Tuple[str, int, int, str, bool]]:
+    """(type, row_id, cycle, stage_id, is_left_label) of one record, or None without a row."""
+    t = _TYPE_RE.search(raw)
+    r = _ROW_RE.search(raw)
+    c = _CYCLE_RE.search(raw)
+    if t is None or r is None or c is None:
+        # Not in the builder's canonical spelling; fall back to a real parse.
+        try:
+            rec = json.loads(raw)
+        except ValueError:
+            return None
+        if not isinstance(rec, dict) or "row_id" not in rec:
+            return None
+        return (
+            str(rec.get("type", "")),
+            int(rec["row_id"]),
+            int(rec.get("cycle", 0)),
+            str(rec.get("stage_id", "")),
+            rec.get("label_type") == "left",
+        )
+    stage = _STAGE_RE.search(raw)
+    return (
+        t.group(1).decode("ascii"),
+        int(r.group(1)),
+        int(c.group(1)),
+        stage.group(1).decode("utf-8", "replace") if stage else "",
+        t.group(1) == b"LABEL" and _LABEL_LEFT_RE.search(raw) is not None,
+    )
+
+
+def _event_order(ev_row: array, ev_cycle: array, ev_offset: array) -> Any:
+    """Permutation that sorts the events by (row, cycle, offset)."""
+    if np is not None:
+        keys = [np.frombuffer(col, dtype=np.uint64) for col in (ev_offset, ev_cycle, ev_row)]
+        return np.lexsort(keys)
+    return sorted(range(len(ev_row)), key=lambda i: (ev_row[i], ev_cycle[i], ev_offset[i]))
+
+
+def _gather(src: array, order: Any) -> array:
+    if np is not None:
+        out = array(src.typecode)
+        out.frombytes(np.frombuffer(src, dtype=np.dtype(src.typecode)).take(order).tobytes())
+        return out
+    return array(src.typecode, (src[i] for i in order))
+
+
+def build_index(trace: Path, out: Optional[Path] = None) -> Path:
+    """Scan `trace` once and write its index (default: `<trace>.lxti`)."""
+    trace = Path(trace)
+    out = Path(out) if out is not None else index_path(trace)
+    st = trace.stat()
+    stages: List[str] = []
+    stage_ids: Dict[str, int] = {}
+    kind_ids = {name: i for i, name in enumerate(EVENT_KINDS)}
+    defs: Dict[int, int] = {}
+    left: Dict[int, int] = {}
+    ev_row, ev_cycle, ev_offset, ev_stage, ev_kind = array("Q"), array("Q"), array("Q"), array("I"), array("I")
+    lines = 0
+    offset = 0
+    with open_linxtrace(trace, "rb") as f:
+        for raw in f:
+            line_offset = offset
+            offset += len(raw)
+            if not raw.strip():
+                continue
+            lines += 1
+            parsed = _parse_line(raw)
+            if parsed is None:
+                continue
+            rtype, row_id, cycle, stage, is_left = parsed
+            if rtype == "OP_DEF":
+                defs.setdefault(row_id, line_offset)
+            elif is_left:
+                left.setdefault(row_id, line_offset)
+            elif rtype in kind_ids:
+                ev_row.append(row_id)
+                ev_cycle.append(cycle)
+                ev_offset.append(line_offset)
+                if stage:
+                    sid = stage_ids.get(stage)
+                    if sid is None:
+                        sid = stage_ids[stage] = len(stages)
+                        stages.append(stage)
+                    ev_stage.append(sid)
+                else:
+                    ev_stage.append(NO_STAGE)
+                ev_kind.append(kind_ids[rtype])
+
+    order = _event_order(ev_row, ev_cycle, ev_offset)
+    columns: Dict[str, array] = {name: array(_typecode(name)) for name in ROW_COLUMNS + EVENT_COLUMNS + INTERVAL_COLUMNS}
+    for name, src in (("ev_cycle", ev_cycle), ("ev_offset", ev_offset), ("ev_stage", ev_stage), ("ev_kind", ev_kind)):
+        columns[name] = _gather(src, order)
+    sorted_rows = _gather(ev_row, order)
+    # The unsorted copies are no longer needed; drop them before the row pass.
+    del order, src, ev_row, ev_cycle, ev_offset, ev_stage, ev_kind
+
+    row_ids = sorted(set(defs) | set(left) | set(sorted_rows))
+    pos = 0
+    for row_id in row_ids:
+        start = pos
+        while pos < len(sorted_rows) and sorted_rows[pos] == row_id:
+            pos += 1
+        columns["row_id"].append(row_id)
+        columns["def_offset"].append(defs.get(row_id, NO_OFFSET))
+        columns["label_offset"].append(left.get(row_id, NO_OFFSET))
+        columns["ev_start"].append(start)
+        columns["ev_count"].append(pos - start)
+        if pos > start:
+            cycles = columns["ev_cycle"][start:pos]
+            columns["first_cycle"].append(min(cycles))
+            columns["last_cycle"].append(max(cycles))
+        else:
+            columns["first_cycle"].append(NO_OFFSET)
+            columns["last_cycle"].append(0)
+
+    live = [i for i in range(len(row_ids)) if columns["ev_count"][i]]
+    live.sort(key=lambda i: (columns["first_cycle"][i], columns["row_id"][i]))
+    columns["by_first"] = array("Q", live)
+    columns["first_sorted"] = array("Q", (columns["first_cycle"][i] for i in live))
+    size = 1
+    while size < len(live):
+        size *= 2
+    seg = array("Q", [0]) * (2 * size)
+    for j, i in enumerate(live):
+        seg[size + j] = columns["last_cycle"][i]
+    for node in range(size - 1, 0, -1):
+        seg[node] = max(seg[2 * node], seg[2 * node + 1])
+    columns["seg_max"] = seg
+
+    names = list(ROW_COLUMNS + EVENT_COLUMNS + INTERVAL_COLUMNS)
+    header = {
+        "schema": SCHEMA_ID,
+        "trace": str(trace),
+        "trace_size": st.st_size,
+        "trace_mtime_ns": st.st_mtime_ns,
+        "lines": lines,
+        "rows": len(row_ids),
+        "events": len(sorted_rows),
+        "seg_size": size,
+        "stages": stages,
+        "columns": [{"name": name, "dtype": "<u4" if name in _U32_COLUMNS else "<u8", "count": len(columns[name])} for name in names],
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{out.name}.", dir=str(out.parent))
+    with os.fdopen(fd, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (_align(_PREAMBLE.size + len(header_bytes)) - _PREAMBLE.size - len(header_bytes)))
+        for name in names:
+            buf = columns[name]
+            if sys.byteorder != "little":
+                buf = array(buf.typecode, buf)
+                buf.byteswap()
+            data = buf.tobytes()
+            f.write(data)
+            f.write(b"\0" * (_align(len(data)) - len(data)))
+    os.replace(tmp, out)
+    return out
+
+
+class LinxTraceIndex:
+    """Read-only view of a `.lxti` index plus random access into its trace."""
+
+    def __init__(self, trace: Path, path: Optional[Path] = None) -> None:
+        self.trace = Path(trace)
+        self.path = Path(path) if path is not None else index_path(self.trace)
+        self._trace_file = None
+        self._trace_map: Optional[mmap.mmap] = None
+        self._file = self.path.open("rb")
+        try:
+            preamble = self._file.read(_PREAMBLE.size)
+            if len(preamble) != _PREAMBLE.size:
+                raise ValueError(f"{self.path}: truncated LinxTrace index")
+            magic, version, header_len = _PREAMBLE.unpack(preamble)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path}: not a v{VERSION} LinxTrace index")
+            self.header: Dict[str, Any] = json.loads(self._file.read(header_len).decode("utf-8"))
+            if self.header.get("schema") != SCHEMA_ID:
+                raise ValueError(f"{self.path}: unexpected schema {self.header.get('schema')!r}")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self._view = memoryview(self._map)
+        self.stages: List[str] = list(self.header["stages"])
+        # Each column is a typed view into the mapping, so nothing is read
+        # until a query touches it. Big-endian hosts copy and byteswap.
+        self._cols: Dict[str, Any] = {}
+        pos = _align(_PREAMBLE.size + header_len)
+        for column in self.header["columns"]:
+            name = column["name"]
+            typecode = "I" if column["dtype"] == "<u4" else "Q"
+            nbytes = int(column["count"]) * array(typecode).itemsize
+            if pos + nbytes > len(self._map):
+                self.close()
+                raise ValueError(f"{self.path}: truncated LinxTrace index")
+            view = self._view[pos : pos + nbytes]
+            if sys.byteorder == "little":
+                self._cols[name] = view.cast(typecode)
+            else:
+                buf = array(typecode)
+                buf.frombytes(view)
+                buf.byteswap()
+                self._cols[name] = buf
+            pos += _align(nbytes)
+
+    @classmethod
+    def open(cls, trace: Path, *, rebuild: bool = True) -> "LinxTraceIndex":
+        """Open the index for `trace`, (re)building it when missing or stale.
+
+        The sidecar is preferred; when it cannot be written the index lives in
+        `cache_index_path(trace)` instead.
+        """
+        trace = Path(trace)
+        if not trace.is_file():
+            raise SystemExit(f"error: missing LinxTrace file: {trace}")
+        st = trace.stat()
+        for path in (index_path(trace), cache_index_path(trace)):
+            try:
+                index = cls(trace, path)
+            except (OSError, ValueError, KeyError):
+                continue
+            if index.header.get("trace_size") == st.st_size and index.header.get("trace_mtime_ns") == st.st_mtime_ns:
+                return index
+            index.close()
+        if not rebuild:
+            raise SystemExit(f"error: missing or stale LinxTrace index: {index_path(trace)}")
+        try:
+            path = build_index(trace)
+        except OSError:
+            try:
+                path = build_index(trace, cache_index_path(trace))
+            except OSError as exc:
+                raise SystemExit(f"error: cannot write LinxTrace index for {trace}: {exc}") from None
+        return cls(trace, path)
+
+    def close(self) -> None:
+        for col in self._cols.values():
+            if isinstance(col, memoryview):
+                col.release()
+        self._cols = {}
+        if self._map is not None:
+            self._view.release()
+            self._map.close()
+            self._map = None
+            self._file.close()
+        if self._trace_map is not None:
+            self._trace_map.close()
+            self._trace_map = None
+        if self._trace_file is not None:
+            self._trace_file.close()
+            self._trace_file = None
+
+    def __enter__(self) -> "LinxTraceIndex":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def rows(self) -> int:
+        return len(self._cols["row_id"])
+
+    @property
+    def labelled_rows(self) -> int:
+        """Rows that carry a left LABEL line."""
+        return sum(1 for offset in self._cols["label_offset"] if offset != NO_OFFSET)
+
+    # -- trace access ------------------------------------------------------
+
+    def _line(self, offset: int) -> dict:
+        if is_compressed(self.trace):
+            if self._trace_file is None:
+                self._trace_file = open_linxtrace(self.trace, "rb")
+            self._trace_file.seek(offset)
+            return json.loads(self._trace_file.readline())
+        if self._trace_map is None:
+            self._trace_file = self.trace.open("rb")
+            self._trace_map = mmap.mmap(self._trace_file.fileno(), 0, access=mmap.ACCESS_READ)
+        end = self._trace_map.find(b"\n", offset)
+        return json.loads(self._trace_map[offset : end if end >= 0 else len(self._trace_map)])
+
+    def _row_index(self, row_id: int) -> int:
+        ids = self._cols["row_id"]
+        lo, hi = 0, len(ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ids[mid] < row_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo >= len(ids) or ids[lo] != row_id:
+            raise KeyError(row_id)
+        return lo
+
+    def row_span(self, row_id: int) -> Optional[Tuple[int, int]]:
+        """[first, last] cycles with records for `row_id`, or None for a row without events."""
+        i = self._row_index(row_id)
+        if not self._cols["ev_count"][i]:
+            return None
+        return self._cols["first_cycle"][i], self._cols["last_cycle"][i]
+
+    def row_label(self, row_id: int) -> str:
+        offset = self._cols["label_offset"][self._row_index(row_id)]
+        return "" if offset == NO_OFFSET else str(self._line(offset).get("text", ""))
+
+    def row_definition(self, row_id: int) -> Optional[dict]:
+        offset = self._cols["def_offset"][self._row_index(row_id)]
+        return None if offset == NO_OFFSET else self._line(offset)
+
+    def timeline(self, row_id: int) -> List[dict]:
+        """Every OCC/RETIRE/BLOCK_EVT record of `row_id`, in cycle order."""
+        i = self._row_index(row_id)
+        start = self._cols["ev_start"][i]
+        offsets = self._cols["ev_offset"]
+        return [self._line(offsets[j]) for j in range(start, start + self._cols["ev_count"][i])]
+
+    # -- cycle queries -----------------------------------------------------
+
+    def rows_alive(self, start: int, stop: int) -> List[int]:
+        """Row ids with at least one record cycle range overlapping [start, stop), ascending."""
+        if stop <= start:
+            return []
+        first_sorted = self._cols["first_sorted"]
+        lo, hi = 0, len(first_sorted)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if first_sorted[mid] < stop:
+                lo = mid + 1
+            else:
+                hi = mid
+        limit = lo
+        seg = self._cols["seg_max"]
+        size = int(self.header["seg_size"])
+        by_first = self._cols["by_first"]
+        row_ids = self._cols["row_id"]
+        found: List[int] = []
+        # Walk the max-segment tree over leaves [0, limit), pruning subtrees
+        # whose latest last_cycle ends before `start`.
+        stack = [(1, 0, size)]
+        while stack:
+            node, node_lo, node_hi = stack.pop()
+            if node_lo >= limit or seg[node] < start:
+                continue
+            if node >= size:
+                found.append(row_ids[by_first[node - size]])
+                continue
+            mid = (node_lo + node_hi) // 2
+            stack.append((2 * node + 1, mid, node_hi))
+            stack.append((2 * node, node_lo, mid))
+        found.sort()
+        return found
+
+    def _row_events(self, i: int, start: int, stop: int) -> Iterator[int]:
+        first = self._cols["ev_start"][i]
+        last = first + self._cols["ev_count"][i]
+        cycles = self._cols["ev_cycle"]
+        lo, hi = first, last
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if cycles[mid] < start:
+                lo = mid + 1
+            else:
+                hi = mid
+        for j in range(lo, last):
+            if cycles[j] >= stop:
+                break
+            yield j
+
+    def stage_histogram(self, start: int = 0, stop: Optional[int] = None) -> Counter:
+        """OCC counts per stage over cycles [start, stop) (whole trace when `stop` is None).
+
+        Stages are inserted in trace first-seen order so `most_common()` ties
+        break the same way as a sequential scan of the file.
+        """
+        counts = [0] * len(self.stages)
+        stages, kinds = self._cols["ev_stage"], self._cols["ev_kind"]
+        if stop is None:
+            for stage, kind in zip(stages, kinds):
+                if kind == 0 and stage != NO_STAGE:
+                    counts[stage] += 1
+        else:
+            for row_id in self.rows_alive(start, stop):
+                for j in self._row_events(self._row_index(row_id), start, stop):
+                    if kinds[j] == 0 and stages[j] != NO_STAGE:
+                        counts[stages[j]] += 1
+        return Counter({self.stages[i]: n for i, n in enumerate(counts) if n})
+
+    def occ_counts(self) -> Dict[int, int]:
+        """OCC records per row id."""
+        kinds = self._cols["ev_kind"]
+        starts, counts = self._cols["ev_start"], self._cols["ev_count"]
+        out: Dict[int, int] = {}
+        for i, row_id in enumerate(self._cols["row_id"]):
+            n = sum(1 for j in range(starts[i], starts[i] + counts[i]) if kinds[j] == 0)
+            if n:
+                out[row_id] = n
+        return out
+
+    def retire_counts(self) -> Dict[int, int]:
+        kinds = self._cols["ev_kind"]
+        starts, counts = self._cols["ev_start"], self._cols["ev_count"]
+        out: Dict[int, int] = {}
+        for i, row_id in enumerate(self._cols["row_id"]):
+            n = sum(1 for j in range(starts[i], starts[i] + counts[i]) if kinds[j] == 1)
+            if n:
+                out[row_id] = n
+        return out
+
+
+def _parse_cycles(text: str) -> Tuple[int, int]:
+    parts = text.split(":")
+    if len(parts) != 2:
+        raise argparse.ArgumentTypeError("cycle windows use start:stop")
+    try:
+        start, stop = (int(part, 0) for part in parts)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid cycle window: {text!r}") from None
+    if start < 0 or stop < start:
+        raise argparse.ArgumentTypeError("cycle window must satisfy 0 <= start <= stop")
+    return start, stop
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("trace", help="Path to .linxtrace or .linxtrace.zst")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="(Re)build the index and print its counts")
+    rows = sub.add_parser("rows", help="Rows alive in a cycle window")
+    rows.add_argument("--cycles", type=_parse_cycles, required=True, help="start:stop (stop exclusive)")
+    rows.add_argument("--limit", type=int, default=0, help="Print at most N rows (0 = all)")
+    timeline = sub.add_parser("timeline", help="Definition, label and records of one row")
+    timeline.add_argument("--row", type=int, required=True)
+    hist = sub.add_parser("hist", help="OCC stage histogram")
+    hist.add_argument("--cycles", type=_parse_cycles, default=None, help="start:stop (default: whole trace)")
+    args = ap.parse_args(argv)
+
+    trace = Path(args.trace)
+    if args.cmd == "build":
+        if not trace.is_file():
+            raise SystemExit(f"error: missing LinxTrace file: {trace}")
+        path = build_index(trace)
+        index = LinxTraceIndex(trace, path)
+        print(f"linxtrace-index {path} rows={index.rows} events={index.header['events']} lines={index.header['lines']}")
+        return 0
+
+    with LinxTraceIndex.open(trace) as index:
+        if args.cmd == "rows":
+            start, stop = args.cycles
+            alive = index.rows_alive(start, stop)
+            print(f"rows alive in [{start}, {stop}): {len(alive)}")
+            for row_id in alive[: args.limit] if args.limit > 0 else alive:
+                first, last = index.row_span(row_id) or (0, 0)
+                print(f"  row={row_id} cycles={first}..{last} label={index.row_label(row_id)[:120]}")
+        elif args.cmd == "timeline":
+            try:
+                definition = index.row_definition(args.row)
+            except KeyError:
+                raise SystemExit(f"error: row {args.row} not in {trace}") from None
+            print(json.dumps(definition, sort_keys=True))
+            print(f"label: {index.row_label(args.row)}")
+            for record in index.timeline(args.row):
+                print(json.dumps(record, sort_keys=True))
+        else:
+            start, stop = args.cycles if args.cycles else (0, None)
+            histogram = index.stage_histogram(start, stop)
+            scope = "whole trace" if stop is None else f"[{start}, {stop})"
+            print(f"stage histogram {scope}: occ={sum(histogram.values())}")
+            for stage, count in histogram.most_common():
+                print(f"  {stage}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Seekable zstd framing for LinxTrace files (`*.linxtrace.zst`).
+
+The file follows the zstd seekable format, so plain `zstd -d` decodes it:
+
+    frame 0 .. n-1   independent zstd frames, each holding whole trace lines
+                     (a new frame starts after every `frame_rows` lines)
+    seek table       skippable frame, all integers little-endian:
+        magic        u32   0x184D2A5E (skippable frame)
+        frame_size   u32   byte length of the entries plus footer
+        entries      n x (compressed_size u32, decompressed_size u32)
+        frames       u32   n
+        descriptor   u8    0 (no per-frame checksums)
+        magic        u32   0x8F92EAB1 (seekable footer)
+
+Readers locate the seek table from the footer and decompress only the frames
+covering the requested decompressed byte range, so `.lxti` offsets (which are
+decompressed offsets) still give random access to any row.
+
+Compression needs the optional `zstandard` package; plain `.linxtrace` files
+never touch it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import io
+import os
+import struct
+import tempfile
+from array import array
+from pathlib import Path
+from typing import IO, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # optional: only *.linxtrace.zst needs it
+    zstandard = None
+
+SUFFIX = ".zst"
+FRAME_ROWS = 4096
+LEVEL = 3
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+_ENTRY = struct.Struct("<II")
+_FOOTER = struct.Struct("<IBI")
+_SKIP_HEADER = struct.Struct("<II")
+
+
+def is_compressed(path: Path) -> bool:
+    return Path(path).suffix == SUFFIX
+
+
+def trace_base(path: Path) -> Path:
+    """`x.linxtrace` for both `x.linxtrace` and `x.linxtrace.zst`."""
+    path = Path(path)
+    return path.with_suffix("") if is_compressed(path) else path
+
+
+def _zstd():
+    if zstandard is None:
+        raise SystemExit("error: *.linxtrace.zst needs the 'zstandard' package (pip install zstandard)")
+    return zstandard
+
+
+class SeekableZstdWriter:
+    """Text sink that cuts an independent zstd frame every `frame_rows` lines."""
+
+    def __init__(self, path: Path, *, frame_rows: int = FRAME_ROWS, level: int = LEVEL) -> None:
+        self._compressor = _zstd().ZstdCompressor(level=level, write_content_size=True)
+        self._frame_rows = max(1, frame_rows)
+        self._file = Path(path).open("wb")
+        self._pending: List[bytes] = []
+        self._pending_lines = 0
+        self._entries: List[bytes] = []
+        self.closed = False
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._pending.append(data)
+        self._pending_lines += data.count(b"\n")
+        if self._pending_lines >= self._frame_rows:
+            self._flush_frame()
+        return len(text)
+
+    def _flush_frame(self, *, final: bool = False) -> None:
+        data = b"".join(self._pending)
+        cut = len(data) if final else data.rfind(b"\n") + 1
+        if cut == 0:
+            return
+        frame = self._compressor.compress(data[:cut])
+        self._file.write(frame)
+        self._entries.append(_ENTRY.pack(len(frame), cut))
+        self._pending = [data[cut:]] if cut < len(data) else []
+        self._pending_lines = 0
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._flush_frame(final=True)
+        table = b"".join(self._entries) + _FOOTER.pack(len(self._entries), 0, SEEKABLE_MAGIC)
+        self._file.write(_SKIP_HEADER.pack(SKIPPABLE_MAGIC, len(table)) + table)
+        self._file.close()
+        self.closed = True
+
+    def __enter__(self) -> "SeekableZstdWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class SeekableZstdReader(io.RawIOBase):
+    """Random-access raw stream over the decompressed bytes of a seekable zstd file."""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self._decompressor = _zstd().ZstdDecompressor()
+        self._file = Path(path).open("rb")
+        self._file.seek(0, os.SEEK_END)
+        end = self._file.tell()
+        if end < _SKIP_HEADER.size + _FOOTER.size:
+            raise SystemExit(f"error: {path}: not a seekable zstd LinxTrace")
+        self._file.seek(end - _FOOTER.size)
+        frames, descriptor, magic = _FOOTER.unpack(self._file.read(_FOOTER.size))
+        if magic != SEEKABLE_MAGIC:
+            raise SystemExit(f"error: {path}: missing zstd seek table")
+        entry_size = _ENTRY.size + (4 if descriptor & 0x80 else 0)
+        table_start = end - _FOOTER.size - frames * entry_size
+        self._file.seek(table_start - _SKIP_HEADER.size)
+        skip_magic, _ = _SKIP_HEADER.unpack(self._file.read(_SKIP_HEADER.size))
+        if skip_magic != SKIPPABLE_MAGIC:
+            raise SystemExit(f"error: {path}: corrupt zstd seek table")
+        table = self._file.read(frames * entry_size)
+        # Frame k spans [comp[k], comp[k+1]) compressed and [plain[k], plain[k+1]) decompressed.
+        self._comp = array("Q", [0])
+        self._plain = array("Q", [0])
+        for k in range(frames):
+            csize, dsize = _ENTRY.unpack_from(table, k * entry_size)
+            self._comp.append(self._comp[-1] + csize)
+            self._plain.append(self._plain[-1] + dsize)
+        self._pos = 0
+        self._cached = -1
+        self._cached_data = b""
+
+    @property
+    def frames(self) -> int:
+        return len(self._comp) - 1
+
+    @property
+    def size(self) -> int:
+        return self._plain[-1]
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: self.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def _frame(self, k: int) -> bytes:
+        if k != self._cached:
+            self._file.seek(self._comp[k])
+            data = self._file.read(self._comp[k + 1] - self._comp[k])
+            self._cached_data = self._decompressor.decompress(data)
+            self._cached = k
+        return self._cached_data
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        if self._pos >= self.size:
+            return 0
+        k = bisect.bisect_right(self._plain, self._pos) - 1
+        data = self._frame(k)
+        start = self._pos - self._plain[k]
+        n = min(len(buffer), len(data) - start)
+        buffer[:n] = data[start : start + n]
+        self._pos += n
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+def open_linxtrace(path: Path, mode: str = "r", *, frame_rows: int = FRAME_ROWS) -> Union[IO, SeekableZstdWriter]:
+    """Open a plain or seekable-zstd LinxTrace for "r" (text), "rb" or "w" (text)."""
+    path = Path(path)
+    if mode not in {"r", "rb", "w"}:
+        raise ValueError(f"unsupported mode {mode!r}")
+    if not is_compressed(path):
+        if mode == "rb":
+            return path.open("rb")
+        return path.open(mode, encoding="utf-8", errors="replace" if mode == "r" else "strict")
+    if mode == "w":
+        return SeekableZstdWriter(path, frame_rows=frame_rows)
+    reader = io.BufferedReader(SeekableZstdReader(path), 1 << 16)
+    if mode == "rb":
+        return reader
+    return io.TextIOWrapper(reader, encoding="utf-8", errors="replace")
+
+
+def _copy(src: IO, dst: IO) -> None:
+    while True:
+        chunk = src.read(1 << 20)
+        if not chunk:
+            return
+        dst.write(chunk)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    compress = sub.add_parser("compress", help="Write <trace>.zst next to a plain .linxtrace")
+    compress.add_argument("trace")
+    compress.add_argument("--frame-rows", type=int, default=FRAME_ROWS, help=f"Lines per frame (default: {FRAME_ROWS})")
+    decompress = sub.add_parser("decompress", help="Write a plain .linxtrace from a .linxtrace.zst")
+    decompress.add_argument("trace")
+    decompress.add_argument("-o", "--out", default="", help="Output path (default: strip .zst)")
+    args = ap.parse_args(argv)
+
+    src = Path(args.trace)
+    if not src.is_file():
+        raise SystemExit(f"error: missing LinxTrace file: {src}")
+    if args.cmd == "compress":
+        if is_compressed(src):
+            raise SystemExit(f"error: already compressed: {src}")
+        dst = src.with_name(src.name + SUFFIX)
+        with src.open("r", encoding="utf-8") as fin, open_linxtrace(dst, "w", frame_rows=args.frame_rows) as fout:
+            for line in fin:
+                fout.write(line)
+    else:
+        if not is_compressed(src):
+            raise SystemExit(f"error: expected *{SUFFIX}: {src}")
+        dst = Path(args.out) if args.out else trace_base(src)
+        fd, tmp = tempfile.mkstemp(prefix=f".{dst.name}.", dir=str(dst.parent))
+        try:
+            with os.fdopen(fd, "wb") as fout, open_linxtrace(src, "rb") as fin:
+                _copy(fin, fout)
+            os.replace(tmp, dst)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    print(f"linxtrace-zstd {args.cmd} {src} -> {dst} ({src.stat().st_size} -> {dst.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
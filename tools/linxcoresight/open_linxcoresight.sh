@@ -5,7 +5,7 @@ ROOT_DIR="$(cd -- "$(dirname -- "${BASH_SOURCE[0]}")/../.." && pwd)"
 
 TRACE="${1:-}"
 if [[ -z "${TRACE}" ]]; then
-  TRACE="$(find "${ROOT_DIR}/generated/linxtrace" -name '*.linxtrace' -type f -print0 2>/dev/null | xargs -0 ls -t 2>/dev/null | head -n 1 || true)"
+  TRACE="$(find "${ROOT_DIR}/generated/linxtrace" \( -name '*.linxtrace' -o -name '*.linxtrace.zst' \) -type f -print0 2>/dev/null | xargs -0 ls -t 2>/dev/null | head -n 1 || true)"
 fi
 if [[ -z "${TRACE}" ]]; then
   echo "error: no LinxTrace found. Generate one first via:" >&2
@@ -17,13 +17,24 @@ if [[ ! -f "${TRACE}" ]]; then
   exit 2
 fi
 
-if [[ "${TRACE}" != *.linxtrace ]]; then
-  echo "error: unsupported trace format: ${TRACE} (expected *.linxtrace)" >&2
+if [[ "${TRACE}" != *.linxtrace && "${TRACE}" != *.linxtrace.zst ]]; then
+  echo "error: unsupported trace format: ${TRACE} (expected *.linxtrace or *.linxtrace.zst)" >&2
   exit 2
 fi
 
 python3 "${ROOT_DIR}/tools/linxcoresight/lint_linxtrace.py" "${TRACE}" >/dev/null
 
+if [[ "${TRACE}" == *.linxtrace.zst ]]; then
+  # The app reads plain LinxTrace; unpack seekable-zstd traces into a cache once.
+  CACHE_DIR="${LINXCORESIGHT_CACHE:-${XDG_CACHE_HOME:-${HOME}/.cache}/linxcore/linxcoresight}"
+  mkdir -p "${CACHE_DIR}"
+  PLAIN="${CACHE_DIR}/$(basename -- "${TRACE%.zst}")"
+  if [[ ! -f "${PLAIN}" || "${TRACE}" -nt "${PLAIN}" ]]; then
+    python3 "${ROOT_DIR}/tools/linxcoresight/linxtrace_zstd.py" decompress "${TRACE}" --out "${PLAIN}" >/dev/null
+  fi
+  TRACE="${PLAIN}"
+fi
+
 APP="${LINXCORESIGHT_APP:-}"
 if [[ -z "${APP}" ]]; then
   for cand in \
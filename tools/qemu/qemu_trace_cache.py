@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""Content-addressed on-disk cache for QEMU reference commit traces.
+
+A cached trace is identified by a key over everything that determines the rows
+QEMU emits: the ELF's SHA-256, the QEMU argument list (with the ELF path
+replaced by ``{elf}``), the QEMU binary's SHA-256 and name, and the optional
+commit-trace PC filter. Under one key the cache holds row windows
+``[start, start + rows)`` of the raw trace; a window marked ``complete`` ends
+where QEMU exited on its own, so it also serves any request that runs past its
+last row. A request for ``[a, b)`` is sliced out of the smallest cached window
+that covers it.
+
+Layout under the cache root::
+
+    index.json                 entries + memoized binary hashes
+    .lock                      flock serializing index updates
+    traces/<key>/<start>-<rows>[-complete].jsonl
+
+The total size of cached traces is bounded; the least recently used windows are
+evicted first.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts
+    fcntl = None  # type: ignore[assignment]
+
+SCHEMA = "linxcore.qemu_trace_cache.v1"
+ENV_DIR = "LINXCORE_QEMU_TRACE_CACHE"
+ENV_MAX_MB = "LINXCORE_QEMU_TRACE_CACHE_MAX_MB"
+DEFAULT_MAX_MB = 8192
+_DISABLED_VALUES = {"0", "off", "none", "false"}
+_HASH_CHUNK = 1 << 20
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+LINX_ROOT = ROOT_DIR.parents[1]
+QEMU_CURRENT_BIN = LINX_ROOT / "emulator" / "qemu" / "build-linx" / "qemu-system-linx64"
+QEMU_LEGACY_BIN = LINX_ROOT / "emulator" / "qemu" / "build" / "qemu-system-linx64"
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    start: int
+    rows: int
+    complete: bool
+    size: int
+    last_used: float
+    file: str
+
+    @property
+    def end(self) -> int:
+        return self.start + self.rows
+
+    def covers(self, start: int, rows: int) -> bool:
+        """True when this window can serve rows ``[start, start + rows)`` (rows=0: to trace end)."""
+        if start < self.start:
+            return False
+        if self.complete:
+            return True
+        return rows > 0 and start + rows <= self.end
+
+    def contains(self, other: "CacheEntry") -> bool:
+        return self.covers(other.start, 0 if other.complete else other.rows)
+
+
+def default_cache_dir() -> Path:
+    xdg = os.environ.get("XDG_CACHE_HOME", "").strip()
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "linxcore" / "qemu-traces"
+
+
+def default_qemu_bin() -> Path:
+    """Mirror the binary selection of tools/qemu/run_qemu_commit_trace.sh."""
+    env_bin = os.environ.get("QEMU_BIN", "").strip()
+    if env_bin:
+        return Path(env_bin)
+    if os.access(QEMU_CURRENT_BIN, os.X_OK):
+        return QEMU_CURRENT_BIN
+    return QEMU_LEGACY_BIN
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_qemu_args(qemu_args: Sequence[str], elf: Path) -> list[str]:
+    """Replace the ELF path inside QEMU arguments with ``{elf}`` so copies of one ELF share a key."""
+    spellings = sorted({str(elf), str(elf.resolve())}, key=len, reverse=True)
+    out: list[str] = []
+    for item in qemu_args:
+        text = str(item)
+        for spelling in spellings:
+            text = text.replace(spelling, "{elf}")
+        out.append(text)
+    return out
+
+
+def _count_lines(path: Path) -> int:
+    with path.open("rb") as f:
+        return sum(1 for _ in f)
+
+
+class QemuTraceCache:
+    """LRU-bounded store of raw QEMU commit-trace windows; safe across threads and processes."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        if max_bytes <= 0:
+            raise SystemExit("error: QEMU trace cache size limit must be > 0")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = root / "index.json"
+        self.traces_dir = root / "traces"
+        self.traces_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, root: str | Path | None = None, *, disabled: bool = False) -> "QemuTraceCache | None":
+        """Open the cache at ``root`` (default: $LINXCORE_QEMU_TRACE_CACHE or ~/.cache); None when disabled."""
+        if disabled:
+            return None
+        if root is None or str(root) == "":
+            env_dir = os.environ.get(ENV_DIR, "").strip()
+            if env_dir.lower() in _DISABLED_VALUES:
+                return None
+            root = Path(env_dir) if env_dir else default_cache_dir()
+        max_mb_raw = os.environ.get(ENV_MAX_MB, "").strip() or str(DEFAULT_MAX_MB)
+        try:
+            max_mb = int(max_mb_raw)
+        except ValueError:
+            raise SystemExit(f"error: invalid {ENV_MAX_MB}: {max_mb_raw!r}") from None
+        return cls(Path(os.path.expanduser(str(root))).resolve(), max_mb << 20)
+
+    # -- index -----------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[dict[str, Any]]:
+        with (self.root / ".lock").open("a+") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                index = self._load_index()
+                yield index
+                self._save_index(index)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_index(self) -> dict[str, Any]:
+        try:
+            obj = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            obj = {}
+        if obj.get("schema") != SCHEMA:
+            obj = {"schema": SCHEMA, "entries": [], "binaries": {}}
+        return obj
+
+    def _save_index(self, index: dict[str, Any]) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=".index.", dir=self.root)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, self.index_path)
+
+    @staticmethod
+    def _entries(index: dict[str, Any]) -> list[CacheEntry]:
+        return [CacheEntry(**raw) for raw in index["entries"]]
+
+    @staticmethod
+    def _set_entries(index: dict[str, Any], entries: list[CacheEntry]) -> None:
+        index["entries"] = [asdict(entry) for entry in entries]
+
+    # -- keys ------------------------------------------------------------
+
+    def binary_sha256(self, path: Path) -> str:
+        """SHA-256 of a (large) QEMU binary, memoized in the index by size and mtime."""
+        resolved = path.resolve()
+        st = resolved.stat()
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self._locked() as index:
+            known = index["binaries"].get(str(resolved))
+        if known and known.get("stamp") == stamp:
+            return str(known["sha256"])
+        digest = file_sha256(resolved)
+        with self._locked() as index:
+            index["binaries"][str(resolved)] = {"stamp": stamp, "sha256": digest}
+        return digest
+
+    def trace_key(
+        self,
+        *,
+        elf: Path,
+        qemu_args: Sequence[str],
+        qemu_bin: Path,
+        pc_lo: str = "",
+        pc_hi: str = "",
+    ) -> str:
+        ident = {
+            "schema": SCHEMA,
+            "elf_sha256": file_sha256(elf),
+            "qemu_args": normalize_qemu_args(qemu_args, elf),
+            "qemu_bin_sha256": self.binary_sha256(qemu_bin),
+            # run_qemu_commit_trace.sh appends `-bios none` based on the binary name.
+            "qemu_bin_name": qemu_bin.name,
+            "pc_lo": pc_lo,
+            "pc_hi": pc_hi,
+        }
+        return hashlib.sha256(json.dumps(ident, sort_keys=True).encode("utf-8")).hexdigest()
+
+    # -- lookup / store ----------------------------------------------------
+
+    def fetch(self, key: str, out: Path, *, start: int = 0, rows: int = 0) -> int | None:
+        """Write rows ``[start, start + rows)`` (rows=0: to trace end) to ``out``.
+
+        Returns the number of rows written, or None on a miss. A complete
+        window may yield fewer than ``rows`` rows when QEMU exited earlier.
+        """
+        with self._locked() as index:
+            entries = self._entries(index)
+            hits = [entry for entry in entries if entry.key == key and entry.covers(start, rows)]
+            if not hits:
+                return None
+            best = min(hits, key=lambda entry: entry.size)
+            try:
+                # The open handle keeps the data readable even if a concurrent
+                # store evicts the file once the lock is released.
+                src = (self.root / best.file).open("rb")
+            except FileNotFoundError:
+                self._set_entries(index, [entry for entry in entries if entry is not best])
+                return None
+            best.last_used = time.time()
+            self._set_entries(index, entries)
+
+        skip = start - best.start
+        written = 0
+        out.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{out.name}.", dir=out.parent)
+        with src, os.fdopen(fd, "wb") as dst:
+            for lineno, line in enumerate(src):
+                if lineno < skip:
+                    continue
+                if rows and written >= rows:
+                    break
+                dst.write(line)
+                written += 1
+        if written == 0:
+            os.unlink(tmp)
+            return None
+        os.replace(tmp, out)
+        return written
+
+    def store(self, key: str, src: Path, *, start: int = 0, complete: bool = False) -> bool:
+        """Add the trace window in ``src`` (rows starting at raw row ``start``); False if not kept."""
+        rows = _count_lines(src)
+        if rows == 0:
+            return False
+        size = src.stat().st_size
+        if size > self.max_bytes:
+            return False
+        candidate = CacheEntry(
+            key=key,
+            start=start,
+            rows=rows,
+            complete=complete,
+            size=size,
+            last_used=time.time(),
+            file="",
+        )
+        key_dir = self.traces_dir / key
+        key_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{start}-{rows}{'-complete' if complete else ''}.jsonl"
+        candidate.file = str((key_dir / name).relative_to(self.root))
+        # Copy outside the lock; publishing is a rename under it.
+        fd, tmp = tempfile.mkstemp(prefix=f".{name}.", dir=key_dir)
+        with os.fdopen(fd, "wb") as dst, src.open("rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                dst.write(chunk)
+
+        with self._locked() as index:
+            entries = self._entries(index)
+            if any(entry.key == key and entry.contains(candidate) for entry in entries):
+                os.unlink(tmp)
+                return False
+            os.replace(tmp, self.root / candidate.file)
+            kept: list[CacheEntry] = []
+            for entry in entries:
+                if entry.key == key and candidate.contains(entry):
+                    self._remove_file(entry)
+                else:
+                    kept.append(entry)
+            kept.append(candidate)
+            self._set_entries(index, self._evict(kept, pinned=candidate))
+        return True
+
+    def _evict(self, entries: list[CacheEntry], *, pinned: CacheEntry | None = None) -> list[CacheEntry]:
+        total = sum(entry.size for entry in entries)
+        if total <= self.max_bytes:
+            return entries
+        kept = list(entries)
+        for entry in sorted(entries, key=lambda item: item.last_used):
+            if total <= self.max_bytes:
+                break
+            if entry is pinned:
+                continue
+            self._remove_file(entry)
+            kept.remove(entry)
+            total -= entry.size
+        return kept
+
+    def _remove_file(self, entry: CacheEntry) -> None:
+        path = self.root / entry.file
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+        with contextlib.suppress(OSError):
+            path.parent.rmdir()
+
+    # -- maintenance -------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        with self._locked() as index:
+            entries = self._entries(index)
+        return {
+            "root": str(self.root),
+            "max_bytes": self.max_bytes,
+            "total_bytes": sum(entry.size for entry in entries),
+            "entries": len(entries),
+            "keys": len({entry.key for entry in entries}),
+        }
+
+    def prune(self, max_bytes: int | None = None) -> int:
+        """Evict LRU windows down to ``max_bytes`` (default: the configured limit); returns bytes freed."""
+        limit_saved = self.max_bytes
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        try:
+            with self._locked() as index:
+                entries = self._entries(index)
+                before = sum(entry.size for entry in entries)
+                kept = self._evict(entries)
+                self._set_entries(index, kept)
+        finally:
+            self.max_bytes = limit_saved
+        return before - sum(entry.size for entry in kept)
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(description="Inspect or prune the QEMU reference-trace cache.")
+    ap.add_argument("--cache-dir", default="", help=f"Cache root (default: ${ENV_DIR} or ~/.cache/linxcore/qemu-traces)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="Print entry count and total size as JSON")
+    prune = sub.add_parser("prune", help="Evict least recently used traces")
+    prune.add_argument("--max-mb", type=int, default=None, help="Target size in MiB (default: configured limit)")
+    args = ap.parse_args(argv)
+
+    cache = QemuTraceCache.from_env(args.cache_dir or None)
+    if cache is None:
+        raise SystemExit(f"error: QEMU trace cache is disabled (${ENV_DIR})")
+    if args.cmd == "prune":
+        if args.max_mb is not None and args.max_mb < 0:
+            raise SystemExit("error: --max-mb must be >= 0")
+        freed = cache.prune(None if args.max_mb is None else args.max_mb << 20)
+        print(f"freed_bytes={freed}")
+    print(json.dumps(cache.stats(), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -4,156 +4,49 @@ from __future__ import annotations
 import argparse
 import bisect
 import dataclasses
+import heapq
+import itertools
 import json
+import os
+import pickle
 import re
 import shutil
-import subprocess
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 SRC_DIR = ROOT_DIR / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
+LINXCORESIGHT_TOOLS = ROOT_DIR / "tools" / "linxcoresight"
+if str(LINXCORESIGHT_TOOLS) not in sys.path:
+    sys.path.insert(0, str(LINXCORESIGHT_TOOLS))
 
 from common.stage_tokens import (
     LINXTRACE_PIPELINE_SCHEMA_ID,
     LINXTRACE_STAGE_ID_ORDER,
     LINXTRACE_STAGE_ORDER_CSV,
 )
+from elf_symbols import AddrTable, AliasSpans, load_elf_symbols
+from linxtrace_index import build_index as build_linxtrace_index
+from linxtrace_zstd import FRAME_ROWS, open_linxtrace, trace_base
 
 STAGE_ORDER = list(LINXTRACE_STAGE_ID_ORDER)
 STAGE_RANK = {name: i for i, name in enumerate(STAGE_ORDER)}
 TERMINAL_STAGES = {"CMT", "FLS", "XCHK"}
+STREAM_WINDOW_CYCLES = 256
+SPILL_RECORDS = 1 << 18
+MISMATCH_WINDOW_CYCLES = 256
+MISMATCH_LIMIT = 16
 
 
 def _fmt_hex(v: int) -> str:
     return f"0x{int(v):X}"
 
 
-def _resolve_tool(candidates: List[str]) -> Optional[str]:
-    for candidate in candidates:
-        if not candidate:
-            continue
-        path = Path(candidate)
-        if path.exists() and path.is_file():
-            return str(path)
-        resolved = shutil.which(candidate)
-        if resolved:
-            return resolved
-    return None
-
-
-def _load_symbol_maps(
-    elf_path: Optional[Path],
-) -> Tuple[Dict[int, str], List[Tuple[int, str]], Dict[int, str], Dict[int, str]]:
-    if elf_path is None or not elf_path.is_file():
-        return {}, [], {}, {}
-
-    objdump_bin = _resolve_tool(
-        [
-            str(Path.home() / "llvm-project/build-linxisa-clang/bin/llvm-objdump"),
-            "llvm-objdump",
-            "objdump",
-        ]
-    )
-    nm_bin = _resolve_tool(
-        [
-            str(Path.home() / "llvm-project/build-linxisa-clang/bin/llvm-nm"),
-            "llvm-nm",
-            "nm",
-        ]
-    )
-
-    sym_exact: Dict[int, str] = {}
-    sym_sorted: List[Tuple[int, str]] = []
-    disasm_by_pc: Dict[int, str] = {}
-    disasm_alias_by_pc: Dict[int, str] = {}
-
-    if objdump_bin:
-        try:
-            out = subprocess.check_output(
-                [objdump_bin, "-d", str(elf_path)],
-                text=True,
-                stderr=subprocess.DEVNULL,
-            )
-            for line in out.splitlines():
-                match = re.match(r"^\s*([0-9A-Fa-f]+)\s+<([^>]+)>:\s*$", line)
-                if not match:
-                    match = re.match(r"^\s*([0-9a-fA-F]+):\s*(.*)$", line)
-                    if not match:
-                        continue
-                    addr = int(match.group(1), 16)
-                    rest = match.group(2).strip()
-                    if not rest:
-                        continue
-                    toks = rest.split()
-                    i = 0
-                    while i < len(toks) and re.fullmatch(r"[0-9a-fA-F]+", toks[i]):
-                        i += 1
-                    if i >= len(toks):
-                        continue
-                    text = " ".join(toks[i:]).strip()
-                    if text:
-                        disasm_by_pc[addr] = text
-                        for alias_addr in range(addr + 2, addr + i, 2):
-                            disasm_alias_by_pc.setdefault(alias_addr, text)
-                    continue
-                addr = int(match.group(1), 16)
-                name = match.group(2).strip()
-                if name:
-                    sym_exact[addr] = name
-        except Exception:
-            pass
-
-    if nm_bin:
-        try:
-            out = subprocess.check_output(
-                [nm_bin, "-n", "--defined-only", str(elf_path)],
-                text=True,
-                stderr=subprocess.DEVNULL,
-            )
-            for line in out.splitlines():
-                match = re.match(r"^\s*([0-9A-Fa-f]+)\s+[A-Za-z]\s+(\S+)\s*$", line)
-                if not match:
-                    continue
-                addr = int(match.group(1), 16)
-                name = match.group(2).strip()
-                if not name:
-                    continue
-                sym_exact.setdefault(addr, name)
-                sym_sorted.append((addr, name))
-        except Exception:
-            pass
-
-    if not sym_sorted and sym_exact:
-        sym_sorted = sorted((addr, name) for addr, name in sym_exact.items())
-    else:
-        sym_sorted.sort(key=lambda item: item[0])
-    if disasm_by_pc:
-        disasm_addrs = sorted(disasm_by_pc)
-        for idx, addr in enumerate(disasm_addrs):
-            text = disasm_by_pc[addr]
-            next_addr = disasm_addrs[idx + 1] if idx + 1 < len(disasm_addrs) else None
-            upper = addr + 8
-            upper_mn = text.upper()
-            if (
-                upper_mn.startswith("FENTRY")
-                or upper_mn.startswith("FEXIT")
-                or upper_mn.startswith("FRET")
-                or "BSTART" in upper_mn
-                or "BSTOP" in upper_mn
-            ):
-                upper = addr + 12
-            if next_addr is not None:
-                upper = min(upper, next_addr)
-            for alias_addr in range(addr + 2, upper, 2):
-                if alias_addr not in disasm_by_pc:
-                    disasm_alias_by_pc.setdefault(alias_addr, text)
-    return sym_exact, sym_sorted, disasm_by_pc, disasm_alias_by_pc
-
-
 def _symbolize_asm(text: str, sym_exact: Dict[int, str]) -> str:
     if not text or not sym_exact:
         return text
@@ -221,18 +114,20 @@ def _stage_color(stage: str) -> str:
     return "#9CA3AF"
 
 
-def _contract_id(stage_ids: List[str], lane_ids: List[str], row_schema: List[Tuple[int, str]]) -> str:
-    seed = (
-        f"{LINXTRACE_PIPELINE_SCHEMA_ID}|"
-        f"{','.join(stage_ids)}|"
-        f"{','.join(lane_ids)}|"
-        f"{';'.join(f'{rid}:{kind}' for rid, kind in row_schema)}|"
-        "linxtrace.v1"
-    )
-    h = 1469598103934665603
-    for byte in seed.encode("utf-8"):
+def _fnv1a64(h: int, text: str) -> int:
+    for byte in text.encode("utf-8"):
         h ^= byte
         h = (h * 1099511628211) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+
+def _contract_id(stage_ids: List[str], lane_ids: List[str], row_schema: Iterable[Tuple[int, str]]) -> str:
+    # FNV-1a over "<schema>|<stages>|<lanes>|<rid:kind;...>|linxtrace.v1",
+    # fed piecewise so streaming builds never materialize the row schema.
+    h = _fnv1a64(1469598103934665603, f"{LINXTRACE_PIPELINE_SCHEMA_ID}|{','.join(stage_ids)}|{','.join(lane_ids)}|")
+    for idx, (rid, kind) in enumerate(row_schema):
+        h = _fnv1a64(h, f"{';' if idx else ''}{rid}:{kind}")
+    h = _fnv1a64(h, "|linxtrace.v1")
     return f"{LINXTRACE_PIPELINE_SCHEMA_ID}-{h:016X}"
 
 
@@ -691,39 +586,31 @@ def _format_block_detail(block: BlockState, asm_text: str = "") -> str:
     return "\n".join(parts)
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(
-        description="Build canonical LinxTrace v1 (uop-only rows) from LinxCore raw event trace."
-    )
-    parser.add_argument("--raw", required=True, help="Raw event JSONL from tb_linxcore_top.cpp (PYC_RAW_TRACE).")
-    parser.add_argument("--out", required=True, help="Output .linxtrace path.")
-    parser.add_argument("--map-report", default="", help="Optional mapping report JSON path.")
-    parser.add_argument("--commit-text", default="", help="Optional commit text trace for asm labels.")
-    parser.add_argument("--elf", default="", help="Optional ELF path used for symbolized labels.")
-    args = parser.parse_args()
-
-    raw_path = Path(args.raw)
-    out_path = Path(args.out)
-    if out_path.suffix != ".linxtrace":
-        raise SystemExit(f"output must be *.linxtrace, got: {out_path}")
-    if not raw_path.is_file():
-        raise SystemExit(f"missing raw trace: {raw_path}")
-
-    map_path = Path(args.map_report) if args.map_report else out_path.with_suffix(".map.json")
-    commit_text_path = Path(args.commit_text) if args.commit_text else None
-    elf_path = Path(args.elf) if args.elf else None
-    sym_exact, sym_sorted, disasm_by_pc, disasm_alias_by_pc = _load_symbol_maps(elf_path)
-    sym_addrs = [addr for addr, _ in sym_sorted]
-    asm_by_uid, asm_by_seq, op_by_seq = _parse_commit_text(commit_text_path)
+@dataclasses.dataclass
+class RawTraceState:
+    uops: Dict[int, UopRow] = dataclasses.field(default_factory=dict)
+    blocks: Dict[int, BlockState] = dataclasses.field(default_factory=dict)
+    lane_ids: set[str] = dataclasses.field(default_factory=set)
+    op_by_pc: Dict[int, str] = dataclasses.field(default_factory=dict)
+    op_alias_by_pc: Dict[int, str] = dataclasses.field(default_factory=dict)
+    span_by_seq: Dict[int, Tuple[int, int]] = dataclasses.field(default_factory=dict)
 
-    uops: Dict[int, UopRow] = {}
-    blocks: Dict[int, BlockState] = {}
-    block_events: List[dict] = []
-    lane_ids: set[str] = set()
-    op_by_pc: Dict[int, str] = {}
-    op_alias_by_pc: Dict[int, str] = {}
-    span_by_seq: Dict[int, Tuple[int, int]] = {}
 
+@dataclasses.dataclass
+class LabelSources:
+    sym_exact: Dict[int, str]
+    sym_sorted: List[Tuple[int, str]]
+    sym_addrs: List[int]
+    disasm_by_pc: AddrTable
+    disasm_alias_by_pc: AliasSpans
+    asm_by_uid: Dict[int, str]
+    asm_by_seq: Dict[int, str]
+    op_by_seq: Dict[int, str]
+    asm_by_pc_commit: Dict[int, str] = dataclasses.field(default_factory=dict)
+    asm_alias_by_pc_commit: Dict[int, str] = dataclasses.field(default_factory=dict)
+
+
+def _iter_raw_records(raw_path: Path) -> Iterator[Tuple[int, dict]]:
     with raw_path.open("r", encoding="utf-8", errors="ignore") as handle:
         for lineno, line in enumerate(handle, 1):
             line = line.strip()
@@ -733,524 +620,821 @@ def main() -> int:
                 record = json.loads(line)
             except json.JSONDecodeError as exc:
                 raise SystemExit(f"line {lineno}: invalid JSON ({exc})") from exc
+            yield lineno, record
 
-            rtype = str(record.get("type", ""))
-            if rtype == "probe_occ":
+
+_RAW_TYPE_RE = re.compile(rb'"type"\s*:\s*"([A-Za-z_]+)"')
+_RAW_CYCLE_RE = re.compile(rb'"cycle"\s*:\s*(\d+)')
+_RAW_UID_RE = re.compile(rb'"uop_uid"\s*:\s*(\d+)')
+_RAW_BLOCK_RE = re.compile(rb'"block_uid"\s*:\s*(\d+)')
+_RAW_SEQ_RE = re.compile(rb'"seq"\s*:\s*(\d+)')
+_RAW_STAGE_RE = re.compile(rb'"stage"\s*:\s*"([A-Za-z0-9_]+)"')
+_RAW_KIND_TEXT_RE = re.compile(rb'"kind"\s*:\s*"([A-Za-z_]+)"')
+_RAW_CORE_RE = re.compile(rb'"core_id"\s*:\s*(\d+)')
+
+
+def _raw_int(pattern: re.Pattern[bytes], line: bytes) -> Optional[int]:
+    match = pattern.search(line)
+    return int(match.group(1)) if match else None
+
+
+def _load_raw_line(line: bytes, lineno: int) -> dict:
+    try:
+        return json.loads(line.decode("utf-8", errors="ignore"))
+    except json.JSONDecodeError as exc:
+        raise SystemExit(f"line {lineno}: invalid JSON ({exc})") from exc
+
+
+def _raw_fields(line: bytes, lineno: int) -> Optional[Tuple[str, int, int, int]]:
+    """(type, cycle, uop_uid, block_uid) of one raw line without a full JSON parse.
+
+    Lines not in the plain integer spelling the testbench writes fall back to
+    json.loads; blank lines give None.
+    """
+    rtype = _RAW_TYPE_RE.search(line)
+    cycle = _raw_int(_RAW_CYCLE_RE, line)
+    if rtype is None or cycle is None:
+        if not line.strip():
+            return None
+        record = _load_raw_line(line, lineno)
+        return (
+            str(record.get("type", "")),
+            int(record.get("cycle", 0)),
+            int(record.get("uop_uid", 0)),
+            int(record.get("block_uid", 0)),
+        )
+    return (
+        rtype.group(1).decode("ascii"),
+        cycle,
+        _raw_int(_RAW_UID_RE, line) or 0,
+        _raw_int(_RAW_BLOCK_RE, line) or 0,
+    )
+
+
+def _merge_windows(windows: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort inclusive (lo, hi) windows and merge the ones that overlap or touch."""
+    merged: List[Tuple[int, int]] = []
+    for lo, hi in sorted(windows):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _mismatch_seqs(path: Path, limit: int) -> List[int]:
+    """Commit seqs of the first `limit` records in a crosscheck_mismatches.json (0 = all)."""
+    if not path.is_file():
+        raise SystemExit(f"missing mismatch report: {path}")
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise SystemExit(f"{path}: invalid JSON ({exc})") from exc
+    if isinstance(data, dict):
+        data = data.get("mismatches", [data["first_mismatch"]] if data.get("first_mismatch") else [])
+    if not isinstance(data, list):
+        raise SystemExit(f"{path}: expected a list of mismatch records")
+    seqs = [int(item["seq"]) for item in data if isinstance(item, dict) and "seq" in item]
+    return seqs[:limit] if limit > 0 else seqs
+
+
+def _resolve_seq_cycles(raw_path: Path, seqs: Iterable[int]) -> Dict[int, int]:
+    """Map each commit seq to the cycle of its raw commit record; seqs never committed are absent."""
+    pending = set(seqs)
+    found: Dict[int, int] = {}
+    if not pending:
+        return found
+    with raw_path.open("rb") as handle:
+        for lineno, line in enumerate(handle, 1):
+            if b"commit" not in line:
+                continue
+            fields = _raw_fields(line, lineno)
+            if fields is None or fields[0] != "commit":
                 continue
+            seq = _raw_int(_RAW_SEQ_RE, line)
+            if seq is None:
+                seq = int(_load_raw_line(line, lineno).get("seq", -1))
+            if seq in pending:
+                pending.discard(seq)
+                found[seq] = fields[1]
+                if not pending:
+                    break
+    return found
 
-            if rtype == "occ":
-                uid = int(record.get("uop_uid", 0))
-                if uid == 0:
-                    continue
-                kind_code = int(record.get("kind", 0))
-                if kind_code == 5:
+
+@dataclasses.dataclass
+class WindowSelection:
+    """Uops and blocks whose lifetimes overlap the requested cycle windows.
+
+    `start` is the (byte offset, line number) of the first raw record of any
+    selected uop or block and `last_line` the final line worth reading.
+    """
+
+    windows: List[Tuple[int, int]]
+    uids: set[int]
+    blocks: set[int]
+    start: Tuple[int, int]
+    last_line: int
+
+
+def _select_window_rows(raw_path: Path, windows: List[Tuple[int, int]], slack: int) -> WindowSelection:
+    """Pick every uop and block alive inside an inclusive cycle window.
+
+    A uop is alive from its first record until its commit or FLS/XCHK
+    terminal. Uops still in flight when the scan first reaches a window's
+    start are taken along with those that have a record inside it. The scan
+    stops `slack` cycles (the raw trace's reordering tolerance) past the last
+    window and the last terminal of a selected uop or block.
+    """
+    uids: set[int] = set()
+    blocks: set[int] = set()
+    # Live uops/blocks -> (byte offset, line number) of their first record.
+    live: Dict[int, Tuple[int, int]] = {}
+    live_blocks: Dict[int, Tuple[int, int]] = {}
+    open_uids: set[int] = set()
+    open_blocks: set[int] = set()
+    next_window = 0
+    entered = -1
+    horizon = windows[-1][1] if windows else -1
+    start: Optional[Tuple[int, int]] = None
+    last_line = 0
+
+    def select(uid: int, block_uid: int) -> None:
+        nonlocal start
+        if uid and uid not in uids:
+            uids.add(uid)
+            first = live.get(uid)
+            if first is not None:
+                open_uids.add(uid)
+                start = first if start is None else min(start, first)
+        if block_uid and block_uid not in blocks:
+            blocks.add(block_uid)
+            first = live_blocks.get(block_uid)
+            if first is not None:
+                open_blocks.add(block_uid)
+                start = first if start is None else min(start, first)
+
+    def select_live() -> None:
+        for live_uid in live:
+            select(live_uid, 0)
+        for live_block in live_blocks:
+            select(0, live_block)
+
+    offset = 0
+    with raw_path.open("rb") as handle:
+        for lineno, line in enumerate(handle, 1):
+            line_offset = offset
+            offset += len(line)
+            rtype_match = _RAW_TYPE_RE.search(line)
+            cycle = _raw_int(_RAW_CYCLE_RE, line)
+            if rtype_match is not None and cycle is not None:
+                rtype = rtype_match.group(1).decode("ascii")
+                uid = _raw_int(_RAW_UID_RE, line) or 0
+                # Block liveness only follows commit/blk_evt records, the ones
+                # _iter_window_records replays for blocks.
+                block_uid = 0 if rtype == "occ" and uid not in uids else _raw_int(_RAW_BLOCK_RE, line) or 0
+            else:
+                fields = _raw_fields(line, lineno)
+                if fields is None:
                     continue
-                stage = str(record.get("stage", "")).upper()
-                if stage not in STAGE_RANK:
-                    raise SystemExit(f"line {lineno}: non-canonical occ stage {stage!r}")
-                row = uops.setdefault(uid, UopRow(uid=uid))
-                row.kind_codes.add(kind_code)
-                row.parent_uid = int(record.get("parent_uid", row.parent_uid))
-                row.core_id = int(record.get("core_id", row.core_id))
-                row.block_uid = int(record.get("block_uid", row.block_uid))
-                row.block_bid = int(record.get("block_bid", row.block_bid))
-                row.pc = int(record.get("pc", row.pc))
-                cycle = int(record.get("cycle", 0))
-                if row.first_cycle is None or cycle < row.first_cycle:
-                    row.first_cycle = cycle
-                lane_id = f"c{row.core_id}.l{int(record.get('lane', 0))}"
-                if cycle in row.occ_by_cycle:
-                    prev = row.occ_by_cycle[cycle]
-                    raise SystemExit(
-                        "duplicate canonical OCC for one uop-cycle: "
-                        f"uid=0x{uid:x} cycle={cycle} prev={prev.stage_id}@{prev.lane_id} new={stage}@{lane_id}"
-                    )
-                occ = OccSample(
-                    cycle=cycle,
-                    lane_id=lane_id,
-                    stage_id=stage,
-                    stall=int(record.get("stall", 0)),
-                    cause=str(record.get("stall_cause", "0")),
-                )
-                row.occ_by_cycle[cycle] = occ
-                lane_ids.add(lane_id)
+                rtype, cycle, uid, block_uid = fields
+            last_line = lineno
+            if cycle > horizon + slack and not open_uids and not open_blocks:
+                break
+            if rtype == "probe_occ":
                 continue
-
+            while next_window < len(windows) and cycle > windows[next_window][1]:
+                if entered != next_window:
+                    # No record fell inside this window; whatever was in flight spans it.
+                    select_live()
+                next_window += 1
+            in_window = next_window < len(windows) and cycle >= windows[next_window][0]
+            if in_window and entered != next_window:
+                entered = next_window
+                select_live()
+            if uid and uid not in live:
+                live[uid] = (line_offset, lineno)
+            if block_uid and block_uid not in live_blocks and rtype != "occ":
+                live_blocks[block_uid] = (line_offset, lineno)
+            if in_window:
+                select(uid, block_uid)
+            elif uid in uids:
+                select(0, block_uid)
+            terminal_uid = terminal_block = 0
             if rtype == "commit":
-                uid = int(record.get("uop_uid", 0))
-                if uid != 0:
-                    row = uops.setdefault(uid, UopRow(uid=uid))
-                    row.parent_uid = int(record.get("parent_uid", row.parent_uid))
-                    row.core_id = int(record.get("core_id", row.core_id))
-                    row.block_uid = int(record.get("block_uid", row.block_uid))
-                    row.block_bid = int(record.get("block_bid", row.block_bid))
-                    row.commit_seq = int(record.get("seq", 0))
-                    row.commit_cycle = int(record.get("cycle", 0))
-                    row.commit_slot = int(record.get("slot", 0))
-                    row.pc = int(record.get("pc", row.pc))
-                    insn_len = int(record.get("len", 0))
-                    if row.commit_seq and row.pc != 0 and insn_len > 0:
-                        span_by_seq[row.commit_seq] = (row.pc, insn_len)
-                    row.op_name = str(record.get("op_name", row.op_name))
-                    if row.pc != 0 and row.op_name and row.op_name != "uop":
-                        op_by_pc[row.pc] = row.op_name
-                        for addr in range(row.pc + 2, row.pc + max(insn_len, 2) + 1, 2):
-                            op_alias_by_pc.setdefault(addr, row.op_name)
-                    row.trap_valid = bool(int(record.get("trap_valid", 0)))
-                    row.commit_payload = record
-                    if row.first_cycle is None:
-                        row.first_cycle = row.commit_cycle
-                block_uid = int(record.get("block_uid", 0))
-                if block_uid != 0:
-                    block = blocks.setdefault(block_uid, BlockState(block_uid=block_uid))
-                    block.core_id = int(record.get("core_id", block.core_id))
-                    block.block_bid = int(record.get("block_bid", block.block_bid))
-                    seq = int(record.get("seq", 0))
-                    cycle = int(record.get("cycle", 0))
-                    if int(record.get("is_bstart", 0)) != 0:
-                        if block.open_seq is None or seq < block.open_seq:
-                            block.open_seq = seq
-                            block.open_cycle = cycle
-                            block.open_pc = int(record.get("pc", block.open_pc))
-                    if int(record.get("is_bstop", 0)) != 0:
-                        if block.close_seq is None or seq < block.close_seq:
-                            block.close_seq = seq
-                            block.close_cycle = cycle
-                continue
+                terminal_uid = uid
+            elif rtype == "occ":
+                if b"FLS" in line or b"XCHK" in line:
+                    stage = _RAW_STAGE_RE.search(line)
+                    if stage is not None and stage.group(1).upper() in {b"FLS", b"XCHK"}:
+                        terminal_uid = uid
+            elif rtype in {"blk_evt", "block_evt"}:
+                kind = _RAW_KIND_TEXT_RE.search(line)
+                if kind is not None and kind.group(1) == b"retired":
+                    terminal_block = block_uid
+            if terminal_uid:
+                live.pop(terminal_uid, None)
+                if terminal_uid in open_uids:
+                    open_uids.discard(terminal_uid)
+                    horizon = max(horizon, cycle)
+            if terminal_block:
+                live_blocks.pop(terminal_block, None)
+                if terminal_block in open_blocks:
+                    open_blocks.discard(terminal_block)
+                    horizon = max(horizon, cycle)
+    return WindowSelection(
+        windows=windows, uids=uids, blocks=blocks, start=start or (0, 1), last_line=last_line
+    )
 
-            if rtype in {"blk_evt", "block_evt"}:
-                normalized = _normalize_block_event(record)
-                block_events.append(normalized)
-                block_uid = int(record.get("block_uid", 0))
-                if block_uid != 0:
-                    block = blocks.setdefault(block_uid, BlockState(block_uid=block_uid))
-                    block.core_id = int(record.get("core_id", block.core_id))
-                    bid = int(record.get("block_bid", record.get("bid", block.block_bid)))
-                    if bid != 0:
-                        block.block_bid = bid
-                    kind = str(record.get("kind", "open"))
-                    seq = int(record.get("seq", 0))
-                    cycle = int(record.get("cycle", 0))
-                    if kind == "open":
-                        if block.open_seq is None or seq < block.open_seq:
-                            block.open_seq = seq
-                            block.open_cycle = cycle
-                            block.open_pc = int(record.get("pc", block.open_pc))
-                    elif kind == "retired":
-                        if block.retire_seq is None or seq < block.retire_seq:
-                            block.retire_seq = seq
-                            block.retire_cycle = cycle
-                            block.terminal_kind = kind
-                    else:
-                        if block.close_seq is None or seq < block.close_seq:
-                            block.close_seq = seq
-                            block.close_cycle = cycle
-                        block.terminal_kind = kind
+
+def _iter_window_records(raw_path: Path, selection: WindowSelection) -> Iterator[Tuple[int, dict]]:
+    """Yield the parsed raw records that feed the selected uops and blocks.
+
+    Commit records of unselected uops in a selected block still update the
+    block's open/close state; their uop id is cleared so no row is created.
+    """
+    uids, blocks = selection.uids, selection.blocks
+    offset, first_line = selection.start
+    with raw_path.open("rb") as handle:
+        handle.seek(offset)
+        for lineno, line in enumerate(handle, first_line):
+            if lineno > selection.last_line:
+                break
+            fields = _raw_fields(line, lineno)
+            if fields is None:
+                continue
+            rtype, _, uid, block_uid = fields
+            if uid in uids:
+                keep_uop = True
+            elif block_uid in blocks and rtype in {"commit", "blk_evt", "block_evt"}:
+                keep_uop = False
+            else:
                 continue
+            record = _load_raw_line(line, lineno)
+            if not keep_uop and "uop_uid" in record:
+                record["uop_uid"] = 0
+            yield lineno, record
+
+
+def _ingest_record(state: RawTraceState, record: dict, lineno: int) -> Tuple[Optional[UopRow], Optional[dict]]:
+    """Fold one raw event into `state`.
+
+    Returns the uop row the event touched (occ/commit) and the normalized
+    BLOCK_EVT record (blk_evt), either of which may be None.
+    """
+    rtype = str(record.get("type", ""))
+    if rtype == "probe_occ":
+        return None, None
+
+    if rtype == "occ":
+        uid = int(record.get("uop_uid", 0))
+        if uid == 0:
+            return None, None
+        kind_code = int(record.get("kind", 0))
+        if kind_code == 5:
+            return None, None
+        stage = str(record.get("stage", "")).upper()
+        if stage not in STAGE_RANK:
+            raise SystemExit(f"line {lineno}: non-canonical occ stage {stage!r}")
+        row = state.uops.setdefault(uid, UopRow(uid=uid))
+        row.kind_codes.add(kind_code)
+        row.parent_uid = int(record.get("parent_uid", row.parent_uid))
+        row.core_id = int(record.get("core_id", row.core_id))
+        row.block_uid = int(record.get("block_uid", row.block_uid))
+        row.block_bid = int(record.get("block_bid", row.block_bid))
+        row.pc = int(record.get("pc", row.pc))
+        cycle = int(record.get("cycle", 0))
+        if row.first_cycle is None or cycle < row.first_cycle:
+            row.first_cycle = cycle
+        lane_id = f"c{row.core_id}.l{int(record.get('lane', 0))}"
+        if cycle in row.occ_by_cycle:
+            prev = row.occ_by_cycle[cycle]
+            raise SystemExit(
+                "duplicate canonical OCC for one uop-cycle: "
+                f"uid=0x{uid:x} cycle={cycle} prev={prev.stage_id}@{prev.lane_id} new={stage}@{lane_id}"
+            )
+        occ = OccSample(
+            cycle=cycle,
+            lane_id=lane_id,
+            stage_id=stage,
+            stall=int(record.get("stall", 0)),
+            cause=str(record.get("stall_cause", "0")),
+        )
+        row.occ_by_cycle[cycle] = occ
+        state.lane_ids.add(lane_id)
+        return row, None
+
+    if rtype == "commit":
+        row = None
+        uid = int(record.get("uop_uid", 0))
+        if uid != 0:
+            row = state.uops.setdefault(uid, UopRow(uid=uid))
+            row.parent_uid = int(record.get("parent_uid", row.parent_uid))
+            row.core_id = int(record.get("core_id", row.core_id))
+            row.block_uid = int(record.get("block_uid", row.block_uid))
+            row.block_bid = int(record.get("block_bid", row.block_bid))
+            row.commit_seq = int(record.get("seq", 0))
+            row.commit_cycle = int(record.get("cycle", 0))
+            row.commit_slot = int(record.get("slot", 0))
+            row.pc = int(record.get("pc", row.pc))
+            insn_len = int(record.get("len", 0))
+            if row.commit_seq and row.pc != 0 and insn_len > 0:
+                state.span_by_seq[row.commit_seq] = (row.pc, insn_len)
+            row.op_name = str(record.get("op_name", row.op_name))
+            if row.pc != 0 and row.op_name and row.op_name != "uop":
+                state.op_by_pc[row.pc] = row.op_name
+                for addr in range(row.pc + 2, row.pc + max(insn_len, 2) + 1, 2):
+                    state.op_alias_by_pc.setdefault(addr, row.op_name)
+            row.trap_valid = bool(int(record.get("trap_valid", 0)))
+            row.commit_payload = record
+            if row.first_cycle is None:
+                row.first_cycle = row.commit_cycle
+        block_uid = int(record.get("block_uid", 0))
+        if block_uid != 0:
+            block = state.blocks.setdefault(block_uid, BlockState(block_uid=block_uid))
+            block.core_id = int(record.get("core_id", block.core_id))
+            block.block_bid = int(record.get("block_bid", block.block_bid))
+            seq = int(record.get("seq", 0))
+            cycle = int(record.get("cycle", 0))
+            if int(record.get("is_bstart", 0)) != 0:
+                if block.open_seq is None or seq < block.open_seq:
+                    block.open_seq = seq
+                    block.open_cycle = cycle
+                    block.open_pc = int(record.get("pc", block.open_pc))
+            if int(record.get("is_bstop", 0)) != 0:
+                if block.close_seq is None or seq < block.close_seq:
+                    block.close_seq = seq
+                    block.close_cycle = cycle
+        return row, None
+
+    if rtype in {"blk_evt", "block_evt"}:
+        normalized = _normalize_block_event(record)
+        block_uid = int(record.get("block_uid", 0))
+        if block_uid != 0:
+            block = state.blocks.setdefault(block_uid, BlockState(block_uid=block_uid))
+            block.core_id = int(record.get("core_id", block.core_id))
+            bid = int(record.get("block_bid", record.get("bid", block.block_bid)))
+            if bid != 0:
+                block.block_bid = bid
+            kind = str(record.get("kind", "open"))
+            seq = int(record.get("seq", 0))
+            cycle = int(record.get("cycle", 0))
+            if kind == "open":
+                if block.open_seq is None or seq < block.open_seq:
+                    block.open_seq = seq
+                    block.open_cycle = cycle
+                    block.open_pc = int(record.get("pc", block.open_pc))
+            elif kind == "retired":
+                if block.retire_seq is None or seq < block.retire_seq:
+                    block.retire_seq = seq
+                    block.retire_cycle = cycle
+                    block.terminal_kind = kind
+            else:
+                if block.close_seq is None or seq < block.close_seq:
+                    block.close_seq = seq
+                    block.close_cycle = cycle
+                block.terminal_kind = kind
+        return None, normalized
 
-    if not uops:
-        raise SystemExit("raw trace produced zero uops")
+    return None, None
 
-    asm_by_pc_commit: Dict[int, str] = {}
-    asm_alias_by_pc_commit: Dict[int, str] = {}
-    for row in uops.values():
-        if row.commit_seq is None:
-            continue
-        asm_text = asm_by_seq.get(row.commit_seq, "")
-        if not asm_text:
-            continue
-        base_pc, insn_len = span_by_seq.get(row.commit_seq, (row.pc, 0))
-        if base_pc == 0:
-            continue
-        asm_by_pc_commit.setdefault(base_pc, asm_text)
-        for addr in range(base_pc + 2, base_pc + max(insn_len, 2) + 1, 2):
-            asm_alias_by_pc_commit.setdefault(addr, asm_text)
 
-    for row in uops.values():
-        if not row.occ_by_cycle:
-            raise SystemExit(f"uop 0x{row.uid:x} has no canonical OCC records")
-        _fill_hold_gaps(row)
-        if row.block_uid == 0:
-            row.block_uid = _best_block_for_uop(row, blocks)
-        if row.block_bid == 0 and row.block_uid != 0:
-            block = blocks.get(row.block_uid)
-            if block is not None and block.block_bid:
-                row.block_bid = block.block_bid
-
-        occs = row.occ_sorted()
-        if row.commit_cycle is not None:
-            commit_occ = row.occ_by_cycle.get(row.commit_cycle)
-            if commit_occ is None or commit_occ.stage_id != "CMT":
+def _commit_asm_span(row: UopRow, state: RawTraceState, labels: LabelSources) -> Optional[Tuple[int, int, str]]:
+    """(base_pc, insn_len, asm) a committed row contributes to the per-pc asm maps, if any."""
+    if row.commit_seq is None:
+        return None
+    asm_text = labels.asm_by_seq.get(row.commit_seq, "")
+    if not asm_text:
+        return None
+    base_pc, insn_len = state.span_by_seq.get(row.commit_seq, (row.pc, 0))
+    if base_pc == 0:
+        return None
+    return base_pc, insn_len, asm_text
+
+
+def _note_commit_asm(row: UopRow, state: RawTraceState, labels: LabelSources) -> None:
+    span = _commit_asm_span(row, state, labels)
+    if span is None:
+        return
+    base_pc, insn_len, asm_text = span
+    labels.asm_by_pc_commit.setdefault(base_pc, asm_text)
+    for addr in range(base_pc + 2, base_pc + max(insn_len, 2) + 1, 2):
+        labels.asm_alias_by_pc_commit.setdefault(addr, asm_text)
+
+
+def _check_uop_occupancy(row: UopRow) -> None:
+    if not row.occ_by_cycle:
+        raise SystemExit(f"uop 0x{row.uid:x} has no canonical OCC records")
+    _fill_hold_gaps(row)
+    occs = row.occ_sorted()
+    if row.commit_cycle is not None:
+        commit_occ = row.occ_by_cycle.get(row.commit_cycle)
+        if commit_occ is None or commit_occ.stage_id != "CMT":
+            raise SystemExit(
+                f"uop 0x{row.uid:x} committed at cycle {row.commit_cycle} without canonical CMT occupancy"
+            )
+        if occs[-1].cycle > row.commit_cycle:
+            raise SystemExit(f"uop 0x{row.uid:x} has occupancy after commit cycle {row.commit_cycle}")
+    else:
+        terminal_occs = [occ for occ in occs if occ.stage_id in {"FLS", "XCHK"}]
+        if terminal_occs:
+            terminal = terminal_occs[-1]
+            if occs[-1].cycle != terminal.cycle or occs[-1].stage_id != terminal.stage_id:
                 raise SystemExit(
-                    f"uop 0x{row.uid:x} committed at cycle {row.commit_cycle} without canonical CMT occupancy"
+                    f"uop 0x{row.uid:x} has occupancy after terminal stage {terminal.stage_id} at cycle {terminal.cycle}"
                 )
-            if occs[-1].cycle > row.commit_cycle:
-                raise SystemExit(f"uop 0x{row.uid:x} has occupancy after commit cycle {row.commit_cycle}")
-        else:
-            terminal_occs = [occ for occ in occs if occ.stage_id in {"FLS", "XCHK"}]
-            if terminal_occs:
-                terminal = terminal_occs[-1]
-                if occs[-1].cycle != terminal.cycle or occs[-1].stage_id != terminal.stage_id:
-                    raise SystemExit(
-                        f"uop 0x{row.uid:x} has occupancy after terminal stage {terminal.stage_id} at cycle {terminal.cycle}"
-                    )
-        asm_hint = asm_by_uid.get(row.uid, asm_by_seq.get(row.commit_seq or -1, ""))
-        if not asm_hint:
-            asm_hint = disasm_by_pc.get(row.pc, "")
-        if not asm_hint:
-            asm_hint = asm_alias_by_pc_commit.get(row.pc, "")
-        if not asm_hint:
-            asm_hint = disasm_alias_by_pc.get(row.pc, "")
-        if row.kind_text(asm_hint) in {"flush", "replay"} and occs[-1].stage_id != "FLS":
-            raise SystemExit(f"uop 0x{row.uid:x} is flush/replay but does not end at FLS")
-
-    uop_rows = sorted(
-        uops.values(),
-        key=lambda row: (
-            row.core_id,
-            row.first_cycle if row.first_cycle is not None else (1 << 60),
-            row.commit_seq if row.commit_seq is not None else (1 << 60),
-            row.uid,
-        ),
+
+
+def _resolve_uop_block(row: UopRow, blocks: Dict[int, BlockState]) -> None:
+    if row.block_uid == 0:
+        row.block_uid = _best_block_for_uop(row, blocks)
+    if row.block_bid == 0 and row.block_uid != 0:
+        block = blocks.get(row.block_uid)
+        if block is not None and block.block_bid:
+            row.block_bid = block.block_bid
+
+
+def _check_uop_kind(row: UopRow, labels: LabelSources) -> None:
+    asm_hint = labels.asm_by_uid.get(row.uid, labels.asm_by_seq.get(row.commit_seq or -1, ""))
+    if not asm_hint:
+        asm_hint = labels.disasm_by_pc.get(row.pc, "")
+    if not asm_hint:
+        asm_hint = labels.asm_alias_by_pc_commit.get(row.pc, "")
+    if not asm_hint:
+        asm_hint = labels.disasm_alias_by_pc.get(row.pc, "")
+    if row.kind_text(asm_hint) in {"flush", "replay"} and row.occ_sorted()[-1].stage_id != "FLS":
+        raise SystemExit(f"uop 0x{row.uid:x} is flush/replay but does not end at FLS")
+
+
+def _uop_row_key(row: UopRow) -> Tuple[int, int, int, int]:
+    return (
+        row.core_id,
+        row.first_cycle if row.first_cycle is not None else (1 << 60),
+        row.commit_seq if row.commit_seq is not None else (1 << 60),
+        row.uid,
     )
-    row_to_id = {row.uid: idx + 1 for idx, row in enumerate(uop_rows)}
-    lane_list = sorted(lane_ids)
 
-    bootstrap_cycle = min(
-        [row.first_cycle for row in uop_rows if row.first_cycle is not None] + [0]
+
+def _block_end_cycle(block: BlockState) -> Optional[int]:
+    """Cycle of the block's last close/retire event, or None while it is still open."""
+    ends = [cycle for cycle in (block.close_cycle, block.retire_cycle) if cycle is not None]
+    return max(ends) if ends else None
+
+
+def _block_row_key(block: BlockState) -> Tuple[int, int, int]:
+    return (
+        block.core_id,
+        block.open_cycle if block.open_cycle is not None else (1 << 60),
+        block.block_uid,
     )
 
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    map_path.parent.mkdir(parents=True, exist_ok=True)
 
-    row_catalog: List[dict] = []
-    header_records: List[dict] = []
-    timeline_records: List[Tuple[int, int, int, dict]] = []
-    uid_to_kid = {str(row.uid): row_to_id[row.uid] for row in uop_rows}
+RowRecords = Tuple[List[dict], dict, List[Tuple[int, int, dict]]]
+
+
+def _uop_row_labels(
+    row: UopRow,
+    row_id: int,
+    bootstrap_cycle: int,
+    state: RawTraceState,
+    labels: LabelSources,
+) -> Tuple[List[dict], dict]:
+    """Render one uop row's header records and row_catalog entry."""
+    uid_hex = f"0x{row.uid:x}"
+    parent_hex = f"0x{row.parent_uid:x}"
+    block_hex = f"0x{row.block_uid:x}"
+    asm_raw = labels.asm_by_uid.get(row.uid, "")
+    if not asm_raw:
+        asm_raw = labels.asm_by_seq.get(row.commit_seq or -1, "")
+    if not asm_raw:
+        asm_raw = labels.asm_by_pc_commit.get(row.pc, "")
+    if not asm_raw:
+        asm_raw = labels.disasm_by_pc.get(row.pc, "")
+    if not asm_raw:
+        asm_raw = labels.asm_alias_by_pc_commit.get(row.pc, "")
+    if not asm_raw:
+        asm_raw = labels.disasm_alias_by_pc.get(row.pc, "")
+    asm = _symbolize_asm(asm_raw, labels.sym_exact)
+    op_name = row.op_name.strip() if row.op_name else ""
+    if not op_name or op_name == "uop":
+        op_name = labels.op_by_seq.get(row.commit_seq or -1, "")
+    if not op_name or op_name == "uop":
+        op_name = state.op_by_pc.get(row.pc, "")
+    if not op_name or op_name == "uop":
+        op_name = state.op_alias_by_pc.get(row.pc, "")
+    if not op_name or op_name == "uop":
+        op_name = _extract_opcode(asm_raw or asm, "uop")
+    opcode = _extract_opcode(asm, op_name)
+    pseudo_asm = _emit_pseudo_asm(opcode, row.commit_payload)
+    kind_text = row.kind_text(asm_raw)
+    entity_kind = "gen_uop" if _is_generated_uop(kind_text, row.parent_uid, asm_raw) else "uop"
+    left_label, micro_text = _compose_left_label(
+        row,
+        asm=asm,
+        pseudo_asm=pseudo_asm,
+        kind_text=kind_text,
+        sym_sorted=labels.sym_sorted,
+        sym_addrs=labels.sym_addrs,
+    )
+    detail = _format_uop_detail(row, opcode, asm_text=asm, micro_text=micro_text)
+    row_sid = f"c{row.core_id}.uop.0x{row.uid:x}"
+
+    header_records = [
+        {
+            "type": "OP_DEF",
+            "cycle": bootstrap_cycle,
+            "row_id": row_id,
+            "row_kind": "uop",
+            "core_id": row.core_id,
+            "row_sid": row_sid,
+            "uop_uid": uid_hex,
+            "parent_uid": parent_hex,
+            "block_uid": block_hex,
+            "kind": kind_text,
+        },
+        {
+            "type": "LABEL",
+            "cycle": bootstrap_cycle,
+            "row_id": row_id,
+            "row_sid": row_sid,
+            "label_type": "left",
+            "text": left_label,
+        },
+        {
+            "type": "LABEL",
+            "cycle": bootstrap_cycle,
+            "row_id": row_id,
+            "row_sid": row_sid,
+            "label_type": "detail",
+            "text": detail,
+        },
+    ]
+    catalog_entry = {
+        "row_id": row_id,
+        "row_kind": "uop",
+        "core_id": row.core_id,
+        "row_sid": row_sid,
+        "uop_uid": uid_hex,
+        "parent_uid": parent_hex,
+        "block_uid": block_hex,
+        "entity_kind": entity_kind,
+        "left_label": left_label,
+        "detail_defaults": detail,
+    }
+    return header_records, catalog_entry
 
-    for row in uop_rows:
-        row_id = row_to_id[row.uid]
-        uid_hex = f"0x{row.uid:x}"
-        parent_hex = f"0x{row.parent_uid:x}"
-        block_hex = f"0x{row.block_uid:x}"
-        asm_raw = asm_by_uid.get(row.uid, "")
-        if not asm_raw:
-            asm_raw = asm_by_seq.get(row.commit_seq or -1, "")
-        if not asm_raw:
-            asm_raw = asm_by_pc_commit.get(row.pc, "")
-        if not asm_raw:
-            asm_raw = disasm_by_pc.get(row.pc, "")
-        if not asm_raw:
-            asm_raw = asm_alias_by_pc_commit.get(row.pc, "")
-        if not asm_raw:
-            asm_raw = disasm_alias_by_pc.get(row.pc, "")
-        asm = _symbolize_asm(asm_raw, sym_exact)
-        op_name = row.op_name.strip() if row.op_name else ""
-        if not op_name or op_name == "uop":
-            op_name = op_by_seq.get(row.commit_seq or -1, "")
-        if not op_name or op_name == "uop":
-            op_name = op_by_pc.get(row.pc, "")
-        if not op_name or op_name == "uop":
-            op_name = op_alias_by_pc.get(row.pc, "")
-        if not op_name or op_name == "uop":
-            op_name = _extract_opcode(asm_raw or asm, "uop")
-        opcode = _extract_opcode(asm, op_name)
-        pseudo_asm = _emit_pseudo_asm(opcode, row.commit_payload)
-        kind_text = row.kind_text(asm_raw)
-        entity_kind = "gen_uop" if _is_generated_uop(kind_text, row.parent_uid, asm_raw) else "uop"
-        left_label, micro_text = _compose_left_label(
-            row,
-            asm=asm,
-            pseudo_asm=pseudo_asm,
-            kind_text=kind_text,
-            sym_sorted=sym_sorted,
-            sym_addrs=sym_addrs,
-        )
-        detail = _format_uop_detail(row, opcode, asm_text=asm, micro_text=micro_text)
-        row_sid = f"c{row.core_id}.uop.0x{row.uid:x}"
-
-        header_records.append(
-            {
-                "type": "OP_DEF",
-                "cycle": bootstrap_cycle,
-                "row_id": row_id,
-                "row_kind": "uop",
-                "core_id": row.core_id,
-                "row_sid": row_sid,
-                "uop_uid": uid_hex,
-                "parent_uid": parent_hex,
-                "block_uid": block_hex,
-                "kind": kind_text,
-            }
-        )
-        header_records.append(
-            {
-                "type": "LABEL",
-                "cycle": bootstrap_cycle,
-                "row_id": row_id,
-                "row_sid": row_sid,
-                "label_type": "left",
-                "text": left_label,
-            }
-        )
-        header_records.append(
-            {
-                "type": "LABEL",
-                "cycle": bootstrap_cycle,
-                "row_id": row_id,
-                "row_sid": row_sid,
-                "label_type": "detail",
-                "text": detail,
-            }
-        )
-        row_catalog.append(
-            {
-                "row_id": row_id,
-                "row_kind": "uop",
-                "core_id": row.core_id,
-                "row_sid": row_sid,
-                "uop_uid": uid_hex,
-                "parent_uid": parent_hex,
-                "block_uid": block_hex,
-                "entity_kind": entity_kind,
-                "left_label": left_label,
-                "detail_defaults": detail,
-            }
-        )
 
-        occs = row.occ_sorted()
-        for occ in occs:
-            timeline_records.append(
+def _uop_row_timeline(row: UopRow, row_id: int) -> List[Tuple[int, int, dict]]:
+    """Render one uop row's timeline as (cycle, prio, record)."""
+    timeline: List[Tuple[int, int, dict]] = []
+    occs = row.occ_sorted()
+    for occ in occs:
+        timeline.append(
+            (
+                occ.cycle,
+                0,
+                {
+                    "type": "OCC",
+                    "cycle": occ.cycle,
+                    "row_id": row_id,
+                    "lane_id": occ.lane_id,
+                    "stage_id": occ.stage_id,
+                    "stall": occ.stall,
+                    "cause": occ.cause,
+                },
+            )
+        )
+        if occ.stage_id == "XCHK":
+            detail_text = occ.cause if occ.cause not in {"", "0"} else "xcheck"
+            timeline.append(
                 (
                     occ.cycle,
-                    0,
-                    row_id,
+                    1,
                     {
-                        "type": "OCC",
+                        "type": "XCHECK",
                         "cycle": occ.cycle,
                         "row_id": row_id,
-                        "lane_id": occ.lane_id,
-                        "stage_id": occ.stage_id,
-                        "stall": occ.stall,
-                        "cause": occ.cause,
+                        "status": "mismatch",
+                        "detail": detail_text,
                     },
                 )
             )
-            if occ.stage_id == "XCHK":
-                detail_text = occ.cause if occ.cause not in {"", "0"} else "xcheck"
-                timeline_records.append(
-                    (
-                        occ.cycle,
-                        1,
-                        row_id,
-                        {
-                            "type": "XCHECK",
-                            "cycle": occ.cycle,
-                            "row_id": row_id,
-                            "status": "mismatch",
-                            "detail": detail_text,
-                        },
-                    )
-                )
 
-        last_occ = occs[-1]
-        if row.commit_cycle is not None:
-            status_code = 1 if row.trap_valid else 0
-            status = "terminal" if row.trap_valid else "ok"
-            timeline_records.append(
-                (
-                    row.commit_cycle,
-                    2,
-                    row_id,
-                    {
-                        "type": "RETIRE",
-                        "cycle": row.commit_cycle,
-                        "row_id": row_id,
-                        "status": status,
-                        "status_code": status_code,
-                    },
-                )
-            )
-        elif last_occ.stage_id in {"FLS", "XCHK"}:
-            timeline_records.append(
-                (
-                    last_occ.cycle,
-                    2,
-                    row_id,
-                    {
-                        "type": "RETIRE",
-                        "cycle": last_occ.cycle,
-                        "row_id": row_id,
-                        "status": "terminal",
-                        "status_code": 1,
-                    },
-                )
+    last_occ = occs[-1]
+    if row.commit_cycle is not None:
+        status_code = 1 if row.trap_valid else 0
+        status = "terminal" if row.trap_valid else "ok"
+        timeline.append(
+            (
+                row.commit_cycle,
+                2,
+                {
+                    "type": "RETIRE",
+                    "cycle": row.commit_cycle,
+                    "row_id": row_id,
+                    "status": status,
+                    "status_code": status_code,
+                },
             )
-
-    next_row_id = len(uop_rows) + 1
-    block_rows = sorted(
-        [block for block in blocks.values() if block.block_uid != 0],
-        key=lambda block: (
-            block.core_id,
-            block.open_cycle if block.open_cycle is not None else (1 << 60),
-            block.block_uid,
-        ),
-    )
-    block_row_to_id = {block.block_uid: next_row_id + idx for idx, block in enumerate(block_rows)}
-    for block in block_rows:
-        row_id = block_row_to_id[block.block_uid]
-        block_uid_hex = f"0x{block.block_uid:x}"
-        block_bid_hex = f"0x{block.block_bid:x}"
-        row_sid = f"c{block.core_id}.block.{block_uid_hex}"
-        block_asm_raw = asm_by_seq.get(block.open_seq or -1, "")
-        if not block_asm_raw:
-            block_asm_raw = disasm_by_pc.get(block.open_pc, "")
-        block_asm = _symbolize_asm(block_asm_raw, sym_exact)
-        left_label = f"BLK {block_uid_hex} bid={block_bid_hex}"
-        if block_asm:
-            left_label += f": {_block_asm_tag(block_asm)}{block_asm}"
-        detail = _format_block_detail(block, asm_text=block_asm)
-        header_records.append(
-            {
-                "type": "OP_DEF",
-                "cycle": bootstrap_cycle,
-                "row_id": row_id,
-                "row_kind": "block",
-                "core_id": block.core_id,
-                "row_sid": row_sid,
-                "block_uid": block_uid_hex,
-                "kind": "block",
-            }
         )
-        header_records.append(
-            {
-                "type": "LABEL",
-                "cycle": bootstrap_cycle,
-                "row_id": row_id,
-                "row_sid": row_sid,
-                "label_type": "left",
-                "text": left_label,
-            }
-        )
-        header_records.append(
-            {
-                "type": "LABEL",
-                "cycle": bootstrap_cycle,
-                "row_id": row_id,
-                "row_sid": row_sid,
-                "label_type": "detail",
-                "text": detail,
-            }
-        )
-        row_catalog.append(
-            {
-                "row_id": row_id,
-                "row_kind": "block",
-                "core_id": block.core_id,
-                "row_sid": row_sid,
-                "uop_uid": block_uid_hex,
-                "block_uid": block_uid_hex,
-                "entity_kind": "block",
-                "left_label": left_label,
-                "detail_defaults": detail,
-                "id_refs": {
-                    "block_bid": block_bid_hex,
-                    "seq": block.open_seq if block.open_seq is not None else block.retire_seq,
+    elif last_occ.stage_id in {"FLS", "XCHK"}:
+        timeline.append(
+            (
+                last_occ.cycle,
+                2,
+                {
+                    "type": "RETIRE",
+                    "cycle": last_occ.cycle,
+                    "row_id": row_id,
+                    "status": "terminal",
+                    "status_code": 1,
                 },
-            }
+            )
         )
-        open_cycle = block.open_cycle
-        terminal_cycle = block.retire_cycle if block.retire_cycle is not None else block.close_cycle
-        if open_cycle is not None:
-            timeline_records.append(
-                (
-                    open_cycle,
-                    2,
-                    row_id,
-                    {
-                        "type": "OCC",
-                        "cycle": open_cycle,
-                        "row_id": row_id,
-                        "lane_id": f"c{block.core_id}.l0",
-                        # Block rows are backend-resident lifecycle objects.
-                        # Starting them at IQ keeps stage order monotonic under
-                        # the canonical pipeline ordering used by the linter.
-                        "stage_id": "IQ",
-                        "stall": 0,
-                        "cause": "block_open",
-                    },
-                )
+    return timeline
+
+
+def _spool_uop_row(row: UopRow) -> str:
+    return json.dumps(
+        {
+            "uid": row.uid,
+            "parent_uid": row.parent_uid,
+            "core_id": row.core_id,
+            "block_uid": row.block_uid,
+            "block_bid": row.block_bid,
+            "first_cycle": row.first_cycle,
+            "commit_seq": row.commit_seq,
+            "commit_cycle": row.commit_cycle,
+            "commit_slot": row.commit_slot,
+            "pc": row.pc,
+            "op_name": row.op_name,
+            "trap_valid": row.trap_valid,
+            "kind_codes": sorted(row.kind_codes),
+            "commit_payload": row.commit_payload,
+            "occ": [[occ.cycle, occ.lane_id, occ.stage_id, occ.stall, occ.cause] for occ in row.occ_sorted()],
+        }
+    )
+
+
+def _unspool_uop_row(text: str) -> UopRow:
+    obj = json.loads(text)
+    occs = obj.pop("occ")
+    obj["kind_codes"] = set(obj["kind_codes"])
+    row = UopRow(**obj)
+    for cycle, lane_id, stage_id, stall, cause in occs:
+        row.occ_by_cycle[cycle] = OccSample(cycle=cycle, lane_id=lane_id, stage_id=stage_id, stall=stall, cause=cause)
+    return row
+
+
+def _block_row_records(block: BlockState, row_id: int, bootstrap_cycle: int, labels: LabelSources) -> RowRecords:
+    block_uid_hex = f"0x{block.block_uid:x}"
+    block_bid_hex = f"0x{block.block_bid:x}"
+    row_sid = f"c{block.core_id}.block.{block_uid_hex}"
+    block_asm_raw = labels.asm_by_seq.get(block.open_seq or -1, "")
+    if not block_asm_raw:
+        block_asm_raw = labels.disasm_by_pc.get(block.open_pc, "")
+    block_asm = _symbolize_asm(block_asm_raw, labels.sym_exact)
+    left_label = f"BLK {block_uid_hex} bid={block_bid_hex}"
+    if block_asm:
+        left_label += f": {_block_asm_tag(block_asm)}{block_asm}"
+    detail = _format_block_detail(block, asm_text=block_asm)
+    header_records = [
+        {
+            "type": "OP_DEF",
+            "cycle": bootstrap_cycle,
+            "row_id": row_id,
+            "row_kind": "block",
+            "core_id": block.core_id,
+            "row_sid": row_sid,
+            "block_uid": block_uid_hex,
+            "kind": "block",
+        },
+        {
+            "type": "LABEL",
+            "cycle": bootstrap_cycle,
+            "row_id": row_id,
+            "row_sid": row_sid,
+            "label_type": "left",
+            "text": left_label,
+        },
+        {
+            "type": "LABEL",
+            "cycle": bootstrap_cycle,
+            "row_id": row_id,
+            "row_sid": row_sid,
+            "label_type": "detail",
+            "text": detail,
+        },
+    ]
+    catalog_entry = {
+        "row_id": row_id,
+        "row_kind": "block",
+        "core_id": block.core_id,
+        "row_sid": row_sid,
+        "uop_uid": block_uid_hex,
+        "block_uid": block_uid_hex,
+        "entity_kind": "block",
+        "left_label": left_label,
+        "detail_defaults": detail,
+        "id_refs": {
+            "block_bid": block_bid_hex,
+            "seq": block.open_seq if block.open_seq is not None else block.retire_seq,
+        },
+    }
+
+    timeline: List[Tuple[int, int, dict]] = []
+    open_cycle = block.open_cycle
+    terminal_cycle = block.retire_cycle if block.retire_cycle is not None else block.close_cycle
+    if open_cycle is not None:
+        timeline.append(
+            (
+                open_cycle,
+                2,
+                {
+                    "type": "OCC",
+                    "cycle": open_cycle,
+                    "row_id": row_id,
+                    "lane_id": f"c{block.core_id}.l0",
+                    # Block rows are backend-resident lifecycle objects.
+                    # Starting them at IQ keeps stage order monotonic under
+                    # the canonical pipeline ordering used by the linter.
+                    "stage_id": "IQ",
+                    "stall": 0,
+                    "cause": "block_open",
+                },
             )
-            if terminal_cycle is not None and terminal_cycle > open_cycle:
-                active_stage = "IQ"
-                for cycle in range(open_cycle + 1, terminal_cycle):
-                    timeline_records.append(
-                        (
-                            cycle,
-                            2,
-                            row_id,
-                            {
-                                "type": "OCC",
-                                "cycle": cycle,
-                                "row_id": row_id,
-                                "lane_id": f"c{block.core_id}.l0",
-                                "stage_id": active_stage,
-                                "stall": 0,
-                                "cause": "block_live",
-                            },
-                        )
+        )
+        if terminal_cycle is not None and terminal_cycle > open_cycle:
+            active_stage = "IQ"
+            for cycle in range(open_cycle + 1, terminal_cycle):
+                timeline.append(
+                    (
+                        cycle,
+                        2,
+                        {
+                            "type": "OCC",
+                            "cycle": cycle,
+                            "row_id": row_id,
+                            "lane_id": f"c{block.core_id}.l0",
+                            "stage_id": active_stage,
+                            "stall": 0,
+                            "cause": "block_live",
+                        },
                     )
-        if terminal_cycle is not None:
-            terminal_stage = "CMT" if block.retire_cycle is not None else "FLS"
-            terminal_cause = "block_retired" if block.retire_cycle is not None else f"block_{block.terminal_kind}"
-            timeline_records.append(
-                (
-                    terminal_cycle,
-                    2,
-                    row_id,
-                    {
-                        "type": "OCC",
-                        "cycle": terminal_cycle,
-                        "row_id": row_id,
-                        "lane_id": f"c{block.core_id}.l0",
-                        "stage_id": terminal_stage,
-                        "stall": 0,
-                        "cause": terminal_cause,
-                    },
                 )
+    if terminal_cycle is not None:
+        terminal_stage = "CMT" if block.retire_cycle is not None else "FLS"
+        terminal_cause = "block_retired" if block.retire_cycle is not None else f"block_{block.terminal_kind}"
+        timeline.append(
+            (
+                terminal_cycle,
+                2,
+                {
+                    "type": "OCC",
+                    "cycle": terminal_cycle,
+                    "row_id": row_id,
+                    "lane_id": f"c{block.core_id}.l0",
+                    "stage_id": terminal_stage,
+                    "stall": 0,
+                    "cause": terminal_cause,
+                },
             )
-            timeline_records.append(
-                (
-                    terminal_cycle,
-                    3,
-                    row_id,
-                    {
-                        "type": "RETIRE",
-                        "cycle": terminal_cycle,
-                        "row_id": row_id,
-                        "status": "ok" if block.retire_cycle is not None else "terminal",
-                        "status_code": 0 if block.retire_cycle is not None else 1,
-                    },
-                )
+        )
+        timeline.append(
+            (
+                terminal_cycle,
+                3,
+                {
+                    "type": "RETIRE",
+                    "cycle": terminal_cycle,
+                    "row_id": row_id,
+                    "status": "ok" if block.retire_cycle is not None else "terminal",
+                    "status_code": 0 if block.retire_cycle is not None else 1,
+                },
             )
+        )
+    return header_records, catalog_entry, timeline
 
-    for block_event in block_events:
-        row_id = block_row_to_id.get(int(block_event["block_uid"], 16))
-        if row_id is not None:
-            block_event = dict(block_event)
-            block_event["row_id"] = row_id
-        timeline_records.append((int(block_event["cycle"]), 4, row_id or 0, block_event))
 
-    row_schema = [(row_to_id[row.uid], "uop") for row in uop_rows]
-    row_schema.extend((block_row_to_id[block.block_uid], "block") for block in block_rows)
-    contract_id = _contract_id(STAGE_ORDER, lane_list, row_schema)
+def _block_event_record(block_event: dict, block_row_to_id: Dict[int, int]) -> Tuple[int, int, dict]:
+    row_id = block_row_to_id.get(int(block_event["block_uid"], 16))
+    if row_id is not None:
+        block_event = dict(block_event)
+        block_event["row_id"] = row_id
+    return int(block_event["cycle"]), row_id or 0, block_event
+
+
+def _stage_rank(record: dict) -> int:
+    return STAGE_RANK.get(record.get("stage_id", ""), 999)
+
 
+def _meta_record(contract_id: str, lane_list: List[str]) -> dict:
     stage_catalog = [
         {"stage_id": stage, "label": stage, "color": _stage_color(stage), "group": _stage_group(stage)}
         for stage in STAGE_ORDER
     ]
     lane_catalog = [{"lane_id": lane, "label": lane} for lane in lane_list]
-    meta = {
+    return {
         "type": "META",
         "format": "linxtrace.v1",
         "contract_id": contract_id,
@@ -1258,39 +1442,1009 @@ def main() -> int:
         "stage_order_csv": LINXTRACE_STAGE_ORDER_CSV,
         "stage_catalog": stage_catalog,
         "lane_catalog": lane_catalog,
-        "row_catalog": row_catalog,
+        "row_catalog": [],
         "render_prefs": {"theme": "high-contrast", "show_symbols": True},
     }
 
-    with out_path.open("w", encoding="utf-8") as out:
-        out.write(json.dumps(meta, sort_keys=False) + "\n")
+
+def _write_meta(out: TextIO, meta: dict, catalog_texts: Iterable[str]) -> None:
+    """Write the META line, splicing in pre-serialized row_catalog entries.
+
+    Produces the same bytes as `json.dumps(meta)` with the entries inlined,
+    without holding the whole catalog in memory.
+    """
+    head, tail = json.dumps(meta, sort_keys=False).split('"row_catalog": []', 1)
+    out.write(head + '"row_catalog": [')
+    for idx, text in enumerate(catalog_texts):
+        if idx:
+            out.write(", ")
+        out.write(text)
+    out.write("]" + tail + "\n")
+
+
+def _write_map_report(
+    map_path: Path,
+    *,
+    raw_path: Path,
+    out_path: Path,
+    uid_to_kid: Iterable[Tuple[str, int]],
+    block_to_bid: Dict[str, int],
+    uop_rows: int,
+    block_rows: int,
+    block_events: int,
+    cycle_windows: Optional[List[Tuple[int, int]]] = None,
+) -> None:
+    """Write the mapping report; `uid_to_kid` must already be sorted by key."""
+    report = {
+        "raw": str(raw_path),
+        "linxtrace": str(out_path),
+        "uid_to_kid": {},
+        "block_uid_to_bid": block_to_bid,
+        "uop_rows": uop_rows,
+        "block_rows": block_rows,
+        "block_events": block_events,
+    }
+    if cycle_windows is not None:
+        report["cycle_windows"] = [list(window) for window in cycle_windows]
+    head, tail = json.dumps(report, indent=2, sort_keys=True).split('"uid_to_kid": {}', 1)
+    with map_path.open("w", encoding="utf-8") as map_file:
+        map_file.write(head + '"uid_to_kid": {')
+        count = 0
+        for uid_text, kid in uid_to_kid:
+            map_file.write(("," if count else "") + f"\n    {json.dumps(uid_text)}: {kid}")
+            count += 1
+        map_file.write(("\n  }" if count else "}") + tail + "\n")
+
+
+class _SpillSorter:
+    """Sort `(key, text)` pairs, spilling sorted runs to disk past `limit` pending items.
+
+    Keys must be unique JSON-serializable tuples; `text` must be a single line.
+    """
+
+    def __init__(self, spool_dir: Path, tag: str, limit: int = SPILL_RECORDS) -> None:
+        self._spool_dir = spool_dir
+        self._tag = tag
+        self._limit = max(1, limit)
+        self._pending: List[Tuple[tuple, str]] = []
+        self._runs: List[Path] = []
+
+    @property
+    def runs(self) -> int:
+        return len(self._runs)
+
+    def add(self, key: tuple, text: str) -> None:
+        self._pending.append((key, text))
+        if len(self._pending) >= self._limit:
+            self._spill()
+
+    def _spill(self) -> None:
+        self._pending.sort(key=lambda item: item[0])
+        path = self._spool_dir / f"{self._tag}.{len(self._runs)}.run"
+        with path.open("w", encoding="utf-8") as run:
+            for key, text in self._pending:
+                run.write(json.dumps(key) + "\t" + text + "\n")
+        self._runs.append(path)
+        self._pending = []
+
+    @staticmethod
+    def _read_run(path: Path) -> Iterator[Tuple[tuple, str]]:
+        with path.open("r", encoding="utf-8") as run:
+            for line in run:
+                key_text, text = line.rstrip("\n").split("\t", 1)
+                yield tuple(json.loads(key_text)), text
+
+    def merged(self) -> Iterator[Tuple[tuple, str]]:
+        self._pending.sort(key=lambda item: item[0])
+        if not self._runs:
+            yield from self._pending
+            return
+        streams = [self._read_run(path) for path in self._runs]
+        streams.append(iter(self._pending))
+        yield from heapq.merge(*streams, key=lambda item: item[0])
+
+
+# Uop row ids are not final while streaming (they depend on how many rows
+# every lower-numbered core produced), so spooled timeline records carry a -1
+# placeholder that is patched on the final write. JSON escapes quotes inside
+# string values, so the unescaped `"row_id": -1` can only be the key itself.
+_PLACEHOLDER = -1
+_BLOCK_ROW_RANK = 1 << 62
+
+
+def _patch_row_id(text: str, row_id: int) -> str:
+    return text.replace(f'"row_id": {_PLACEHOLDER}', f'"row_id": {row_id}', 1)
+
+
+class StreamingLinxTraceBuilder:
+    """Single-pass LinxTrace builder with bounded live state.
+
+    A uop row is finalized once its commit or FLS/XCHK terminal occupancy is
+    more than `window` cycles behind the newest raw cycle; OCC for it can no
+    longer arrive provided the raw trace is cycle-ordered within `window`.
+    Finalized rows wait in per-core reorder heaps and are released in
+    `(core_id, first_cycle, commit_seq, uid)` order once no live row and no
+    future row can sort ahead of them. Released rows emit their timeline into
+    a sorter that spills sorted runs past `spill_records`, and park a compact
+    copy in a per-core spool; labels are rendered from the spool at the end,
+    when the commit-derived label maps are complete.
+
+    Live state stays bounded as well: a row's commit span is dropped once the
+    row is finalized, and a block leaves the block table for a spill-sorted
+    spool once its last close/retire event is more than `window` cycles behind
+    the released rows. Rows that carry no block uid are therefore matched
+    against the blocks still live when they are released.
+    """
+
+    def __init__(
+        self,
+        labels: LabelSources,
+        spool_dir: Path,
+        *,
+        window: int = STREAM_WINDOW_CYCLES,
+        spill_records: int = SPILL_RECORDS,
+    ) -> None:
+        self.labels = labels
+        self.state = RawTraceState()
+        self.window = max(0, window)
+        self._spool_dir = spool_dir
+        self._timeline = _SpillSorter(spool_dir, "timeline", spill_records)
+        self._uid_to_local = _SpillSorter(spool_dir, "uid", spill_records)
+        self._blocks = _SpillSorter(spool_dir, "blocks", spill_records)
+        self._seq = itertools.count()
+        self._retire_queue: List[Tuple[int, int]] = []
+        self._live_first: List[Tuple[int, int]] = []
+        self._ready: Dict[int, List[Tuple[Tuple[int, int, int], UopRow]]] = {}
+        self._row_spools: Dict[int, TextIO] = {}
+        self._local_counts: Dict[int, int] = {}
+        self._min_first_cycle: Optional[int] = None
+        self._released_floor: Optional[int] = None
+        self._watermark: Optional[int] = None
+        self._block_events = (spool_dir / "block_events.jsonl").open("w", encoding="utf-8")
+        self.block_event_count = 0
+
+    def feed(self, record: dict, lineno: int) -> None:
+        row, block_event = _ingest_record(self.state, record, lineno)
+        if block_event is not None:
+            self._block_events.write(json.dumps(block_event) + "\n")
+            self.block_event_count += 1
+        if row is None:
+            return
+        cycle = int(record.get("cycle", 0))
+        first_cycle = row.first_cycle if row.first_cycle is not None else cycle
+        if self._released_floor is not None and first_cycle < self._released_floor:
+            raise SystemExit(
+                f"line {lineno}: uop 0x{row.uid:x} starts at cycle {first_cycle}, behind rows already "
+                f"streamed (floor {self._released_floor}); rerun with a larger --stream-window or without --stream"
+            )
+        if first_cycle == cycle:
+            heapq.heappush(self._live_first, (first_cycle, row.uid))
+        if str(record.get("type", "")) == "commit" and row.commit_cycle is not None:
+            heapq.heappush(self._retire_queue, (row.commit_cycle, row.uid))
+        elif str(record.get("stage", "")).upper() in {"FLS", "XCHK"}:
+            heapq.heappush(self._retire_queue, (cycle, row.uid))
+        if self._watermark is None or cycle > self._watermark:
+            self._watermark = cycle
+            self._advance(cycle - self.window)
+
+    def _advance(self, limit: int) -> None:
+        uops = self.state.uops
+        while self._retire_queue and self._retire_queue[0][0] < limit:
+            _, uid = heapq.heappop(self._retire_queue)
+            row = uops.pop(uid, None)
+            if row is not None:
+                self._finalize(row)
+        floor = limit
+        while self._live_first:
+            first_cycle, uid = self._live_first[0]
+            row = uops.get(uid)
+            if row is None or row.first_cycle != first_cycle:
+                heapq.heappop(self._live_first)
+                continue
+            floor = min(floor, first_cycle)
+            break
+        self._release(floor)
+        self._evict_blocks()
+
+    def _evict_blocks(self) -> None:
+        if self._released_floor is None:
+            return
+        horizon = self._released_floor - self.window
+        blocks = self.state.blocks
+        done = []
+        for block_uid, block in blocks.items():
+            end_cycle = _block_end_cycle(block)
+            if end_cycle is not None and end_cycle < horizon:
+                done.append(block_uid)
+        for block_uid in done:
+            self._spool_block(blocks.pop(block_uid))
+
+    def _spool_block(self, block: BlockState) -> None:
+        if block.block_uid != 0:
+            self._blocks.add(_block_row_key(block), json.dumps(dataclasses.asdict(block)))
+
+    def _finalize(self, row: UopRow) -> None:
+        _note_commit_asm(row, self.state, self.labels)
+        if row.commit_seq is not None:
+            self.state.span_by_seq.pop(row.commit_seq, None)
+        _check_uop_occupancy(row)
+        if row.first_cycle is not None:
+            if self._min_first_cycle is None or row.first_cycle < self._min_first_cycle:
+                self._min_first_cycle = row.first_cycle
+        _, *key = _uop_row_key(row)
+        heapq.heappush(self._ready.setdefault(row.core_id, []), (tuple(key), row))
+
+    def _release(self, floor: int) -> None:
+        for core_id, heap in self._ready.items():
+            while heap and heap[0][0][0] < floor:
+                _, row = heapq.heappop(heap)
+                self._emit(core_id, row)
+        if self._released_floor is None or floor > self._released_floor:
+            self._released_floor = floor
+
+    def _emit(self, core_id: int, row: UopRow) -> None:
+        _resolve_uop_block(row, self.state.blocks)
+        local = self._local_counts.get(core_id, 0)
+        self._local_counts[core_id] = local + 1
+        for cycle, prio, record in _uop_row_timeline(row, _PLACEHOLDER):
+            self._timeline.add(
+                (cycle, prio, core_id, local, _stage_rank(record), next(self._seq)),
+                json.dumps(record, sort_keys=True),
+            )
+        spool = self._row_spools.get(core_id)
+        if spool is None:
+            spool = (self._spool_dir / f"core{core_id}.rows").open("w", encoding="utf-8")
+            self._row_spools[core_id] = spool
+        spool.write(_spool_uop_row(row) + "\n")
+        self._uid_to_local.add((str(row.uid),), f"{core_id} {local}")
+
+    def finish(
+        self,
+        out_path: Path,
+        map_path: Path,
+        raw_path: Path,
+        *,
+        cycle_windows: Optional[List[Tuple[int, int]]] = None,
+        frame_rows: int = FRAME_ROWS,
+    ) -> Tuple[int, int, int]:
+        """Flush every remaining row and write the trace and map report."""
+        for row in list(self.state.uops.values()):
+            del self.state.uops[row.uid]
+            self._finalize(row)
+        self._release(1 << 62)
+        for block in self.state.blocks.values():
+            self._spool_block(block)
+        self.state.blocks.clear()
+        self._block_events.close()
+        for spool in self._row_spools.values():
+            spool.close()
+
+        uop_rows = sum(self._local_counts.values())
+        if uop_rows == 0:
+            raise SystemExit("raw trace produced zero uops")
+        core_ids = sorted(self._local_counts)
+        core_base: Dict[int, int] = {}
+        next_base = 0
+        for core_id in core_ids:
+            core_base[core_id] = next_base
+            next_base += self._local_counts[core_id]
+        bootstrap_cycle = min(self._min_first_cycle if self._min_first_cycle is not None else 0, 0)
+
+        catalog_path = self._spool_dir / "catalog.jsonl"
+        headers_path = self._spool_dir / "headers.jsonl"
+        block_row_to_id: Dict[int, int] = {}
+        block_to_bid: Dict[str, int] = {}
+        with catalog_path.open("w", encoding="utf-8") as catalog, headers_path.open("w", encoding="utf-8") as headers:
+            for core_id in core_ids:
+                with (self._spool_dir / f"core{core_id}.rows").open("r", encoding="utf-8") as rows:
+                    for idx, line in enumerate(rows):
+                        row = _unspool_uop_row(line)
+                        _check_uop_kind(row, self.labels)
+                        header_records, catalog_entry = _uop_row_labels(
+                            row, core_base[core_id] + idx + 1, bootstrap_cycle, self.state, self.labels
+                        )
+                        catalog.write(json.dumps(catalog_entry) + "\n")
+                        for record in header_records:
+                            headers.write(json.dumps(record, sort_keys=True) + "\n")
+            for _, text in self._blocks.merged():
+                block = BlockState(**json.loads(text))
+                if block.block_uid in block_row_to_id:
+                    raise SystemExit(
+                        f"block 0x{block.block_uid:x} has records more than --stream-window cycles after it ended; "
+                        "rerun with a larger --stream-window or without --stream"
+                    )
+                row_id = uop_rows + 1 + len(block_row_to_id)
+                block_row_to_id[block.block_uid] = row_id
+                if block.block_bid:
+                    block_to_bid[str(block.block_uid)] = block.block_bid
+                header_records, catalog_entry, timeline = _block_row_records(
+                    block, row_id, bootstrap_cycle, self.labels
+                )
+                catalog.write(json.dumps(catalog_entry) + "\n")
+                for record in header_records:
+                    headers.write(json.dumps(record, sort_keys=True) + "\n")
+                for cycle, prio, record in timeline:
+                    self._timeline.add(
+                        (cycle, prio, _BLOCK_ROW_RANK, row_id, _stage_rank(record), next(self._seq)),
+                        json.dumps(record, sort_keys=True),
+                    )
+        with (self._spool_dir / "block_events.jsonl").open("r", encoding="utf-8") as events:
+            for line in events:
+                cycle, row_id, record = _block_event_record(json.loads(line), block_row_to_id)
+                self._timeline.add(
+                    (cycle, 4, _BLOCK_ROW_RANK if row_id else -1, row_id, _stage_rank(record), next(self._seq)),
+                    json.dumps(record, sort_keys=True),
+                )
+
+        row_schema = itertools.chain(
+            ((row_id, "uop") for row_id in range(1, uop_rows + 1)),
+            ((row_id, "block") for row_id in range(uop_rows + 1, uop_rows + 1 + len(block_row_to_id))),
+        )
+        lane_list = sorted(self.state.lane_ids)
+        meta = _meta_record(_contract_id(STAGE_ORDER, lane_list, row_schema), lane_list)
+        with open_linxtrace(out_path, "w", frame_rows=frame_rows) as out:
+            with catalog_path.open("r", encoding="utf-8") as catalog:
+                _write_meta(out, meta, (line.rstrip("\n") for line in catalog))
+            with headers_path.open("r", encoding="utf-8") as headers:
+                shutil.copyfileobj(headers, out)
+            for (_, _, rank, local, _, _), text in self._timeline.merged():
+                if 0 <= rank < _BLOCK_ROW_RANK:
+                    text = _patch_row_id(text, core_base[rank] + local + 1)
+                out.write(text + "\n")
+
+        def uid_to_kid() -> Iterator[Tuple[str, int]]:
+            for (uid_text,), text in self._uid_to_local.merged():
+                core_id, local = text.split()
+                yield uid_text, core_base[int(core_id)] + int(local) + 1
+
+        _write_map_report(
+            map_path,
+            raw_path=raw_path,
+            out_path=out_path,
+            uid_to_kid=uid_to_kid(),
+            block_to_bid=block_to_bid,
+            uop_rows=uop_rows,
+            block_rows=len(block_row_to_id),
+            block_events=self.block_event_count,
+            cycle_windows=cycle_windows,
+        )
+        return uop_rows, len(block_row_to_id), self.block_event_count
+
+
+def _build_in_memory(
+    raw_path: Path,
+    out_path: Path,
+    map_path: Path,
+    labels: LabelSources,
+    *,
+    records: Optional[Iterable[Tuple[int, dict]]] = None,
+    cycle_windows: Optional[List[Tuple[int, int]]] = None,
+    frame_rows: int = FRAME_ROWS,
+) -> Tuple[int, int, int]:
+    state = RawTraceState()
+    block_events: List[dict] = []
+    for lineno, record in records if records is not None else _iter_raw_records(raw_path):
+        _, block_event = _ingest_record(state, record, lineno)
+        if block_event is not None:
+            block_events.append(block_event)
+
+    uops = state.uops
+    if not uops:
+        raise SystemExit("raw trace produced zero uops")
+    for row in uops.values():
+        _note_commit_asm(row, state, labels)
+    for row in uops.values():
+        _check_uop_occupancy(row)
+        _resolve_uop_block(row, state.blocks)
+        _check_uop_kind(row, labels)
+
+    uop_rows = sorted(uops.values(), key=_uop_row_key)
+    row_to_id = {row.uid: idx + 1 for idx, row in enumerate(uop_rows)}
+    lane_list = sorted(state.lane_ids)
+    bootstrap_cycle = min(
+        [row.first_cycle for row in uop_rows if row.first_cycle is not None] + [0]
+    )
+
+    row_catalog: List[dict] = []
+    header_records: List[dict] = []
+    timeline_records: List[Tuple[int, int, int, dict]] = []
+    for row in uop_rows:
+        row_id = row_to_id[row.uid]
+        headers, catalog_entry = _uop_row_labels(row, row_id, bootstrap_cycle, state, labels)
+        header_records.extend(headers)
+        row_catalog.append(catalog_entry)
+        timeline_records.extend((cycle, prio, row_id, record) for cycle, prio, record in _uop_row_timeline(row, row_id))
+
+    next_row_id = len(uop_rows) + 1
+    block_rows = sorted([block for block in state.blocks.values() if block.block_uid != 0], key=_block_row_key)
+    block_row_to_id = {block.block_uid: next_row_id + idx for idx, block in enumerate(block_rows)}
+    for block in block_rows:
+        row_id = block_row_to_id[block.block_uid]
+        headers, catalog_entry, timeline = _block_row_records(block, row_id, bootstrap_cycle, labels)
+        header_records.extend(headers)
+        row_catalog.append(catalog_entry)
+        timeline_records.extend((cycle, prio, row_id, record) for cycle, prio, record in timeline)
+
+    for block_event in block_events:
+        cycle, row_id, record = _block_event_record(block_event, block_row_to_id)
+        timeline_records.append((cycle, 4, row_id, record))
+
+    row_schema = [(row_to_id[row.uid], "uop") for row in uop_rows]
+    row_schema.extend((block_row_to_id[block.block_uid], "block") for block in block_rows)
+    meta = _meta_record(_contract_id(STAGE_ORDER, lane_list, row_schema), lane_list)
+
+    with open_linxtrace(out_path, "w", frame_rows=frame_rows) as out:
+        _write_meta(out, meta, (json.dumps(entry) for entry in row_catalog))
         for record in header_records:
             out.write(json.dumps(record, sort_keys=True) + "\n")
-        timeline_records.sort(key=lambda item: (item[0], item[1], item[2], STAGE_RANK.get(item[3].get("stage_id", ""), 999)))
+        timeline_records.sort(key=lambda item: (item[0], item[1], item[2], _stage_rank(item[3])))
         for _, _, _, record in timeline_records:
             out.write(json.dumps(record, sort_keys=True) + "\n")
 
-    block_to_bid = {str(block_uid): block.block_bid for block_uid, block in blocks.items() if block.block_bid}
-    with map_path.open("w", encoding="utf-8") as map_file:
-        json.dump(
-            {
-                "raw": str(raw_path),
-                "linxtrace": str(out_path),
-                "uid_to_kid": uid_to_kid,
-                "block_uid_to_bid": block_to_bid,
-                "uop_rows": len(uop_rows),
-                "block_rows": len(block_rows),
-                "block_events": len(block_events),
-            },
-            map_file,
-            indent=2,
-            sort_keys=True,
+    _write_map_report(
+        map_path,
+        raw_path=raw_path,
+        out_path=out_path,
+        uid_to_kid=sorted((str(row.uid), row_to_id[row.uid]) for row in uop_rows),
+        block_to_bid={str(block_uid): block.block_bid for block_uid, block in state.blocks.items() if block.block_bid},
+        uop_rows=len(uop_rows),
+        block_rows=len(block_rows),
+        block_events=len(block_events),
+        cycle_windows=cycle_windows,
+    )
+    return len(uop_rows), len(block_rows), len(block_events)
+
+
+# Sharded builds (--jobs): the raw trace is split into uop shards keyed by
+# (core_id, uop_uid % stripes) and one block shard per core. Workers ingest,
+# validate and render their shard; the only cross-shard state is the per-pc
+# op/asm label maps, whose first-/last-writer entries carry the raw line
+# number so the merge picks the same winner as a serial ingest would.
+_SHARD_LABELS: Optional[LabelSources] = None
+_SHARD_CACHE: Dict[Path, object] = {}
+
+
+def _init_shard_worker(labels: LabelSources) -> None:
+    global _SHARD_LABELS
+    _SHARD_LABELS = labels
+
+
+def _shard_pickle(path: Path) -> object:
+    """Load a spooled pickle once per worker process."""
+    if path not in _SHARD_CACHE:
+        with path.open("rb") as f:
+            _SHARD_CACHE[path] = pickle.load(f)
+    return _SHARD_CACHE[path]
+
+
+def _partition_raw(
+    raw_path: Path, spool_dir: Path, stripes: int
+) -> Tuple[Dict[Tuple[int, int], Path], Dict[int, Path]]:
+    """Copy raw lines into uop and block shard files as `lineno<TAB>line`."""
+    files: Dict[object, BinaryIO] = {}
+    uop_shards: Dict[Tuple[int, int], Path] = {}
+    block_shards: Dict[int, Path] = {}
+
+    def shard(key: object, path: Path) -> BinaryIO:
+        handle = files.get(key)
+        if handle is None:
+            handle = files[key] = path.open("wb")
+        return handle
+
+    try:
+        with raw_path.open("rb") as raw:
+            for lineno, line in enumerate(raw, 1):
+                fields = _raw_fields(line, lineno)
+                if fields is None:
+                    continue
+                rtype, _, uid, block_uid = fields
+                if rtype not in {"occ", "commit", "blk_evt", "block_evt"}:
+                    continue
+                if not line.endswith(b"\n"):
+                    line += b"\n"
+                tagged = b"%d\t%s" % (lineno, line)
+                core_id = _raw_int(_RAW_CORE_RE, line) or 0
+                if uid != 0 and rtype in {"occ", "commit"}:
+                    key = (core_id, uid % stripes)
+                    path = uop_shards.setdefault(key, spool_dir / f"uop-{core_id}-{key[1]}.raw")
+                    shard(key, path).write(tagged)
+                if rtype != "occ" and (block_uid != 0 or rtype != "commit"):
+                    path = block_shards.setdefault(core_id, spool_dir / f"block-{core_id}.raw")
+                    shard(core_id, path).write(tagged)
+    finally:
+        for handle in files.values():
+            handle.close()
+    return uop_shards, block_shards
+
+
+def _iter_shard_records(shard_path: Path) -> Iterator[Tuple[int, dict]]:
+    with shard_path.open("rb") as shard:
+        for line in shard:
+            lineno_text, text = line.split(b"\t", 1)
+            lineno = int(lineno_text)
+            yield lineno, _load_raw_line(text, lineno)
+
+
+def _shard_ingest_uops(shard_path: Path, rows_path: Path) -> dict:
+    """Phase A for a uop shard: ingest, validate occupancy and spool rows in row-key order."""
+    assert _SHARD_LABELS is not None
+    state = RawTraceState()
+    first_line: Dict[int, int] = {}
+    op_last: Dict[int, Tuple[int, str]] = {}
+    op_alias_first: Dict[int, Tuple[int, str]] = {}
+    for lineno, record in _iter_shard_records(shard_path):
+        row, _ = _ingest_record(state, record, lineno)
+        if row is None:
+            continue
+        first_line.setdefault(row.uid, lineno)
+        if record.get("type") == "commit" and row.pc != 0 and row.op_name and row.op_name != "uop":
+            op_last[row.pc] = (lineno, row.op_name)
+            insn_len = int(record.get("len", 0))
+            for addr in range(row.pc + 2, row.pc + max(insn_len, 2) + 1, 2):
+                op_alias_first.setdefault(addr, (lineno, row.op_name))
+
+    asm_first: Dict[int, Tuple[int, str]] = {}
+    asm_alias_first: Dict[int, Tuple[int, str]] = {}
+    for row in state.uops.values():
+        span = _commit_asm_span(row, state, _SHARD_LABELS)
+        if span is None:
+            continue
+        base_pc, insn_len, asm_text = span
+        asm_first.setdefault(base_pc, (first_line[row.uid], asm_text))
+        for addr in range(base_pc + 2, base_pc + max(insn_len, 2) + 1, 2):
+            asm_alias_first.setdefault(addr, (first_line[row.uid], asm_text))
+
+    rows = sorted(state.uops.values(), key=_uop_row_key)
+    with rows_path.open("w", encoding="utf-8") as spool:
+        for row in rows:
+            _check_uop_occupancy(row)
+            spool.write(_spool_uop_row(row) + "\n")
+    return {
+        "keys": [_uop_row_key(row) for row in rows],
+        "lane_ids": state.lane_ids,
+        "op_by_pc": op_last,
+        "op_alias_by_pc": op_alias_first,
+        "asm_by_pc_commit": asm_first,
+        "asm_alias_by_pc_commit": asm_alias_first,
+    }
+
+
+def _shard_ingest_blocks(shard_path: Path, blocks_path: Path) -> dict:
+    """Phase A for a block shard: fold commit/blk_evt records into BlockState and spool them."""
+    state = RawTraceState()
+    block_events: List[Tuple[int, dict]] = []
+    for lineno, record in _iter_shard_records(shard_path):
+        if record.get("type") == "commit":
+            record = dict(record, uop_uid=0)
+        _, block_event = _ingest_record(state, record, lineno)
+        if block_event is not None:
+            block_events.append((lineno, block_event))
+    with blocks_path.open("wb") as f:
+        pickle.dump((state.blocks, block_events), f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {
+        "keys": [_block_row_key(block) for block in state.blocks.values() if block.block_uid != 0],
+        "block_bids": {uid: block.block_bid for uid, block in state.blocks.items() if block.block_bid},
+        "block_events": len(block_events),
+    }
+
+
+def _shard_labels(labels_path: Path) -> Tuple[RawTraceState, LabelSources]:
+    assert _SHARD_LABELS is not None
+    merged = _shard_pickle(labels_path)
+    state = RawTraceState(op_by_pc=merged["op_by_pc"], op_alias_by_pc=merged["op_alias_by_pc"])
+    labels = dataclasses.replace(
+        _SHARD_LABELS,
+        asm_by_pc_commit=merged["asm_by_pc_commit"],
+        asm_alias_by_pc_commit=merged["asm_alias_by_pc_commit"],
+    )
+    return state, labels
+
+
+def _write_shard_outputs(
+    prefix: Path,
+    rendered: Iterable[Tuple[int, List[dict], dict]],
+    timeline: List[Tuple[tuple, str]],
+) -> None:
+    """Write `<prefix>.catalog/.headers` (row-id tagged, row order) and a sorted `<prefix>.run`.
+
+    `timeline` is filled while `rendered` is consumed, so the run is written last.
+    """
+    with prefix.with_suffix(".catalog").open("w", encoding="utf-8") as catalog, prefix.with_suffix(
+        ".headers"
+    ).open("w", encoding="utf-8") as headers:
+        for row_id, header_records, catalog_entry in rendered:
+            catalog.write(f"{row_id}\t{json.dumps(catalog_entry)}\n")
+            for record in header_records:
+                headers.write(f"{row_id}\t{json.dumps(record, sort_keys=True)}\n")
+    timeline.sort(key=lambda item: item[0])
+    with prefix.with_suffix(".run").open("w", encoding="utf-8") as run:
+        for key, text in timeline:
+            run.write(json.dumps(key) + "\t" + text + "\n")
+
+
+def _shard_render_uops(
+    rows_path: Path,
+    row_ids: List[int],
+    blocks_path: Optional[Path],
+    labels_path: Path,
+    bootstrap_cycle: int,
+    prefix: Path,
+) -> None:
+    """Phase B for a uop shard: resolve blocks, check kinds and render rows under their final ids."""
+    state, labels = _shard_labels(labels_path)
+    blocks: Dict[int, BlockState] = _shard_pickle(blocks_path)[0] if blocks_path is not None else {}
+    timeline: List[Tuple[tuple, str]] = []
+
+    def rendered() -> Iterator[Tuple[int, List[dict], dict]]:
+        with rows_path.open("r", encoding="utf-8") as rows:
+            for row_id, line in zip(row_ids, rows):
+                row = _unspool_uop_row(line)
+                _resolve_uop_block(row, blocks)
+                _check_uop_kind(row, labels)
+                header_records, catalog_entry = _uop_row_labels(row, row_id, bootstrap_cycle, state, labels)
+                for idx, (cycle, prio, record) in enumerate(_uop_row_timeline(row, row_id)):
+                    timeline.append(
+                        ((cycle, prio, row_id, _stage_rank(record), 0, idx), json.dumps(record, sort_keys=True))
+                    )
+                yield row_id, header_records, catalog_entry
+
+    _write_shard_outputs(prefix, rendered(), timeline)
+
+
+def _shard_render_blocks(
+    blocks_path: Path, block_row_to_id: Dict[int, int], labels_path: Path, bootstrap_cycle: int, prefix: Path
+) -> None:
+    """Phase B for a block shard: render block rows and BLOCK_EVT records under their final ids."""
+    _, labels = _shard_labels(labels_path)
+    blocks, block_events = _shard_pickle(blocks_path)
+    timeline: List[Tuple[tuple, str]] = []
+
+    def rendered() -> Iterator[Tuple[int, List[dict], dict]]:
+        for block_uid, row_id in sorted(block_row_to_id.items(), key=lambda item: item[1]):
+            header_records, catalog_entry, records = _block_row_records(
+                blocks[block_uid], row_id, bootstrap_cycle, labels
+            )
+            for idx, (cycle, prio, record) in enumerate(records):
+                timeline.append(
+                    ((cycle, prio, row_id, _stage_rank(record), 0, idx), json.dumps(record, sort_keys=True))
+                )
+            yield row_id, header_records, catalog_entry
+        for lineno, block_event in block_events:
+            cycle, row_id, record = _block_event_record(block_event, block_row_to_id)
+            timeline.append(((cycle, 4, row_id, _stage_rank(record), 1, lineno), json.dumps(record, sort_keys=True)))
+
+    _write_shard_outputs(prefix, rendered(), timeline)
+
+
+def _iter_tagged(path: Path) -> Iterator[Tuple[int, str]]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            row_id, text = line.rstrip("\n").split("\t", 1)
+            yield int(row_id), text
+
+
+def _merge_first(dest: Dict[int, Tuple[int, str]], src: Dict[int, Tuple[int, str]], *, last: bool = False) -> None:
+    """Keep the entry from the lowest (or with `last`, highest) raw line number."""
+    for key, entry in src.items():
+        prev = dest.get(key)
+        if prev is None or (entry[0] > prev[0] if last else entry[0] < prev[0]):
+            dest[key] = entry
+
+
+def _build_sharded(
+    raw_path: Path, out_path: Path, map_path: Path, labels: LabelSources, jobs: int, *, frame_rows: int = FRAME_ROWS
+) -> Tuple[int, int, int]:
+    """Build the same bytes as `_build_in_memory` with shards ingested and rendered in a process pool."""
+    with tempfile.TemporaryDirectory(prefix=".linxtrace.", dir=str(out_path.parent)) as spool_name:
+        spool_dir = Path(spool_name)
+        uop_shards, block_shards = _partition_raw(raw_path, spool_dir, jobs)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_shard_worker, initargs=(labels,)) as pool:
+            uop_futures = {
+                key: pool.submit(_shard_ingest_uops, path, path.with_suffix(".rows"))
+                for key, path in sorted(uop_shards.items())
+            }
+            block_futures = {
+                core_id: pool.submit(_shard_ingest_blocks, path, path.with_suffix(".pkl"))
+                for core_id, path in sorted(block_shards.items())
+            }
+            uop_parts = {key: future.result() for key, future in uop_futures.items()}
+            block_parts = {core_id: future.result() for core_id, future in block_futures.items()}
+
+            uop_row_to_id: Dict[int, int] = {}
+            for row_id, key in enumerate(heapq.merge(*(part["keys"] for part in uop_parts.values())), 1):
+                if key[3] in uop_row_to_id:
+                    raise SystemExit(f"uop 0x{key[3]:x} appears on more than one core; rebuild with --jobs 1")
+                uop_row_to_id[key[3]] = row_id
+            uop_rows = len(uop_row_to_id)
+            if uop_rows == 0:
+                raise SystemExit("raw trace produced zero uops")
+            block_keys = sorted(key for part in block_parts.values() for key in part["keys"])
+            block_row_to_id: Dict[int, int] = {}
+            for idx, key in enumerate(block_keys):
+                if key[2] in block_row_to_id:
+                    raise SystemExit(f"block 0x{key[2]:x} appears on more than one core; rebuild with --jobs 1")
+                block_row_to_id[key[2]] = uop_rows + 1 + idx
+            bootstrap_cycle = min(
+                [key[1] for part in uop_parts.values() for key in part["keys"] if key[1] != (1 << 60)] + [0]
+            )
+
+            merged: Dict[str, Dict[int, Tuple[int, str]]] = {
+                name: {} for name in ("op_by_pc", "op_alias_by_pc", "asm_by_pc_commit", "asm_alias_by_pc_commit")
+            }
+            lane_ids: set[str] = set()
+            for part in uop_parts.values():
+                lane_ids |= part["lane_ids"]
+                for name, entries in merged.items():
+                    _merge_first(entries, part[name], last=name == "op_by_pc")
+            labels_path = spool_dir / "labels.pkl"
+            with labels_path.open("wb") as f:
+                pickle.dump(
+                    {name: {key: text for key, (_, text) in entries.items()} for name, entries in merged.items()},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+
+            prefixes: List[Path] = []
+            render_futures = []
+            for key, part in uop_parts.items():
+                prefix = spool_dir / f"uop-{key[0]}-{key[1]}"
+                blocks_path = block_shards[key[0]].with_suffix(".pkl") if key[0] in block_shards else None
+                row_ids = [uop_row_to_id[row_key[3]] for row_key in part["keys"]]
+                render_futures.append(
+                    pool.submit(
+                        _shard_render_uops,
+                        prefix.with_suffix(".rows"),
+                        row_ids,
+                        blocks_path,
+                        labels_path,
+                        bootstrap_cycle,
+                        prefix,
+                    )
+                )
+                prefixes.append(prefix)
+            for core_id, part in block_parts.items():
+                prefix = spool_dir / f"block-{core_id}"
+                core_row_to_id = {key[2]: block_row_to_id[key[2]] for key in part["keys"]}
+                render_futures.append(
+                    pool.submit(
+                        _shard_render_blocks,
+                        prefix.with_suffix(".pkl"),
+                        core_row_to_id,
+                        labels_path,
+                        bootstrap_cycle,
+                        prefix,
+                    )
+                )
+                prefixes.append(prefix)
+            for future in render_futures:
+                future.result()
+
+        lane_list = sorted(lane_ids)
+        row_schema = itertools.chain(
+            ((row_id, "uop") for row_id in range(1, uop_rows + 1)),
+            ((uop_rows + 1 + idx, "block") for idx in range(len(block_keys))),
+        )
+        meta = _meta_record(_contract_id(STAGE_ORDER, lane_list, row_schema), lane_list)
+
+        def tagged(suffix: str) -> Iterator[str]:
+            streams = [_iter_tagged(prefix.with_suffix(suffix)) for prefix in prefixes]
+            for _, text in heapq.merge(*streams, key=lambda item: item[0]):
+                yield text
+
+        with open_linxtrace(out_path, "w", frame_rows=frame_rows) as out:
+            _write_meta(out, meta, tagged(".catalog"))
+            for text in tagged(".headers"):
+                out.write(text + "\n")
+            runs = [_SpillSorter._read_run(prefix.with_suffix(".run")) for prefix in prefixes]
+            for _, text in heapq.merge(*runs, key=lambda item: item[0]):
+                out.write(text + "\n")
+
+    block_to_bid: Dict[str, int] = {}
+    for part in block_parts.values():
+        block_to_bid.update((str(uid), bid) for uid, bid in part["block_bids"].items())
+    block_events = sum(part["block_events"] for part in block_parts.values())
+    _write_map_report(
+        map_path,
+        raw_path=raw_path,
+        out_path=out_path,
+        uid_to_kid=sorted((str(uid), row_id) for uid, row_id in uop_row_to_id.items()),
+        block_to_bid=block_to_bid,
+        uop_rows=uop_rows,
+        block_rows=len(block_keys),
+        block_events=block_events,
+    )
+    return uop_rows, len(block_keys), block_events
+
+
+def _parse_span(text: str) -> Tuple[int, int]:
+    parts = text.split(":")
+    if len(parts) != 2:
+        raise argparse.ArgumentTypeError(f"expected LO:HI, got {text!r}")
+    try:
+        lo, hi = (int(part, 0) for part in parts)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected integer LO:HI, got {text!r}") from None
+    if lo < 0 or hi < lo:
+        raise argparse.ArgumentTypeError(f"window must satisfy 0 <= LO <= HI, got {text!r}")
+    return lo, hi
+
+
+def _requested_windows(args: argparse.Namespace, raw_path: Path) -> Optional[List[Tuple[int, int]]]:
+    """Merge --cycle-window/--seq-window/--mismatches into inclusive cycle windows (None = whole run)."""
+    seq_windows = list(args.seq_window or [])
+    mismatch_seqs = _mismatch_seqs(Path(args.mismatches), args.mismatch_limit) if args.mismatches else []
+    if not args.cycle_window and not seq_windows and not args.mismatches:
+        return None
+    windows = list(args.cycle_window or [])
+    seq_cycles = _resolve_seq_cycles(raw_path, [seq for window in seq_windows for seq in window] + mismatch_seqs)
+    for lo, hi in seq_windows:
+        if lo not in seq_cycles:
+            raise SystemExit(f"--seq-window {lo}:{hi}: raw trace has no commit with seq {lo}")
+        # A HI past the end of the run keeps everything after LO.
+        windows.append((seq_cycles[lo], max(seq_cycles[lo], seq_cycles.get(hi, 1 << 62))))
+    radius = max(0, args.mismatch_cycles)
+    for seq in mismatch_seqs:
+        if seq in seq_cycles:
+            windows.append((max(0, seq_cycles[seq] - radius), seq_cycles[seq] + radius))
+    if not windows:
+        raise SystemExit(f"{args.mismatches}: no mismatch seq maps to a commit in {raw_path}")
+    return _merge_windows(windows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Build canonical LinxTrace v1 (uop-only rows) from LinxCore raw event trace."
+    )
+    parser.add_argument("--raw", required=True, help="Raw event JSONL from tb_linxcore_top.cpp (PYC_RAW_TRACE).")
+    parser.add_argument(
+        "--out",
+        required=True,
+        help="Output .linxtrace path; *.linxtrace.zst writes seekable zstd frames (needs zstandard).",
+    )
+    parser.add_argument("--map-report", default="", help="Optional mapping report JSON path.")
+    parser.add_argument("--commit-text", default="", help="Optional commit text trace for asm labels.")
+    parser.add_argument("--elf", default="", help="Optional ELF path used for symbolized labels.")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Build in one pass with bounded live state (rows retire once terminal; spools under the output dir).",
+    )
+    parser.add_argument(
+        "--stream-window",
+        type=int,
+        default=STREAM_WINDOW_CYCLES,
+        help=f"Cycles of raw-trace reordering tolerated by --stream (default: {STREAM_WINDOW_CYCLES}).",
+    )
+    parser.add_argument(
+        "--spill-records",
+        type=int,
+        default=SPILL_RECORDS,
+        help=f"Timeline records buffered before --stream spills a sorted run to disk (default: {SPILL_RECORDS}).",
+    )
+    parser.add_argument(
+        "--cycle-window",
+        action="append",
+        type=_parse_span,
+        metavar="LO:HI",
+        help="Only emit uops/blocks alive in cycles LO..HI (inclusive); repeatable.",
+    )
+    parser.add_argument(
+        "--seq-window",
+        action="append",
+        type=_parse_span,
+        metavar="LO:HI",
+        help="Only emit uops/blocks alive between the commits of seq LO and HI (inclusive); repeatable.",
+    )
+    parser.add_argument(
+        "--mismatches",
+        default="",
+        help="crosscheck_mismatches.json; emit a window of --mismatch-cycles around each mismatch commit.",
+    )
+    parser.add_argument(
+        "--mismatch-cycles",
+        type=int,
+        default=MISMATCH_WINDOW_CYCLES,
+        help=f"Cycles kept on each side of a mismatch commit (default: {MISMATCH_WINDOW_CYCLES}).",
+    )
+    parser.add_argument(
+        "--mismatch-limit",
+        type=int,
+        default=MISMATCH_LIMIT,
+        help=f"Use the first N mismatch records (default: {MISMATCH_LIMIT}; 0 = all).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Ingest and render per-core/uid-stripe shards in N worker processes; output is identical to a "
+            "serial build (whole-run in-memory builds only; 0 = one per CPU)"
+        ),
+    )
+    parser.add_argument(
+        "--frame-rows",
+        type=int,
+        default=FRAME_ROWS,
+        help=f"Lines per independent zstd frame for *.linxtrace.zst output (default: {FRAME_ROWS}).",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Skip writing the <out>.lxti row/cycle index used by linxtrace_index.py queries.",
+    )
+    args = parser.parse_args()
+
+    raw_path = Path(args.raw)
+    out_path = Path(args.out)
+    if trace_base(out_path).suffix != ".linxtrace":
+        raise SystemExit(f"output must be *.linxtrace or *.linxtrace.zst, got: {out_path}")
+    if not raw_path.is_file():
+        raise SystemExit(f"missing raw trace: {raw_path}")
+    if args.jobs < 0:
+        raise SystemExit("error: --jobs must be >= 0")
+    jobs = args.jobs or (os.cpu_count() or 1)
+
+    map_path = Path(args.map_report) if args.map_report else trace_base(out_path).with_suffix(".map.json")
+    commit_text_path = Path(args.commit_text) if args.commit_text else None
+    elf_path = Path(args.elf) if args.elf else None
+    symbols = load_elf_symbols(elf_path)
+    asm_by_uid, asm_by_seq, op_by_seq = _parse_commit_text(commit_text_path)
+    labels = LabelSources(
+        sym_exact=symbols.sym_exact,
+        sym_sorted=symbols.sym_sorted,
+        sym_addrs=symbols.sym_addrs,
+        disasm_by_pc=symbols.disasm,
+        disasm_alias_by_pc=symbols.disasm_alias,
+        asm_by_uid=asm_by_uid,
+        asm_by_seq=asm_by_seq,
+        op_by_seq=op_by_seq,
+    )
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    map_path.parent.mkdir(parents=True, exist_ok=True)
+
+    cycle_windows = _requested_windows(args, raw_path)
+    if cycle_windows is None:
+        records: Iterable[Tuple[int, dict]] = _iter_raw_records(raw_path)
+    else:
+        selection = _select_window_rows(raw_path, cycle_windows, max(0, args.stream_window))
+        if not selection.uids:
+            raise SystemExit(f"no uops alive in cycle windows {cycle_windows}")
+        records = _iter_window_records(raw_path, selection)
+
+    sharded = jobs > 1 and not args.stream and cycle_windows is None
+    if jobs > 1 and not sharded:
+        print("note: --jobs does not apply to --stream or windowed builds; building serially", file=sys.stderr)
+    if sharded:
+        uop_rows, block_rows, block_events = _build_sharded(
+            raw_path, out_path, map_path, labels, jobs, frame_rows=args.frame_rows
+        )
+    elif args.stream:
+        with tempfile.TemporaryDirectory(prefix=".linxtrace.", dir=str(out_path.parent)) as spool_dir:
+            builder = StreamingLinxTraceBuilder(
+                labels, Path(spool_dir), window=args.stream_window, spill_records=args.spill_records
+            )
+            for lineno, record in records:
+                builder.feed(record, lineno)
+            uop_rows, block_rows, block_events = builder.finish(
+                out_path, map_path, raw_path, cycle_windows=cycle_windows, frame_rows=args.frame_rows
+            )
+    else:
+        uop_rows, block_rows, block_events = _build_in_memory(
+            raw_path,
+            out_path,
+            map_path,
+            labels,
+            records=records,
+            cycle_windows=cycle_windows,
+            frame_rows=args.frame_rows,
         )
-        map_file.write("\n")
+    if not args.no_index:
+        build_linxtrace_index(out_path)
 
     print(
         f"linxtrace-built {out_path} "
-        f"uop_rows={len(uop_rows)} block_rows={len(block_rows)} block_events={len(block_events)}"
+        f"uop_rows={uop_rows} block_rows={block_rows} block_events={block_events}"
     )
     return 0
 
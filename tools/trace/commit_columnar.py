@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""Fixed-width binary columnar container for commit traces.
+
+Layout (all integers little-endian):
+
+    magic      8 bytes   b"LXCOMMIT"
+    version    u32       container version (currently 1)
+    hdr_len    u32       byte length of the JSON header that follows
+    header     hdr_len   UTF-8 JSON: schema id, row count, field list
+    padding    to a 64-byte boundary
+    columns    one contiguous u64 array of `rows` entries per field, in the
+               order listed by the header; each column starts 64-byte aligned
+
+Every field is stored as an unsigned 64-bit value, so a reader can map any
+column directly (`numpy.memmap`) without parsing a single row. Values outside
+that range are rejected at conversion time rather than wrapped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Iterator
+
+ROOT = Path(__file__).resolve().parents[2]
+CHISEL_TOOLS = ROOT / "tools" / "chisel"
+if str(CHISEL_TOOLS) not in sys.path:
+    sys.path.insert(0, str(CHISEL_TOOLS))
+
+from trace_schema_adapter import (  # noqa: E402
+    REQUIRED_TRACE_FIELDS,
+    SIDEBAND_FIELDS,
+    load_jsonl,
+    normalize_row,
+)
+from trace_reader import commit_reader  # noqa: E402
+
+MAGIC = b"LXCOMMIT"
+VERSION = 1
+SCHEMA_ID = "linxcore.commit_columnar.v1"
+SUFFIX = ".lxct"
+ALIGN = 64
+U64_MASK = (1 << 64) - 1
+_PREAMBLE = struct.Struct("<8sII")
+_FLUSH_ROWS = 1 << 16
+# Rows scanned to fix the sideband field set before conversion starts.
+_SIDEBAND_SCAN_ROWS = 1024
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def is_columnar_trace(path: Path) -> bool:
+    try:
+        with path.open("rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _prefix_sidebands(path: Path) -> list[str]:
+    """Sideband fields present in any of the first `_SIDEBAND_SCAN_ROWS` rows."""
+    seen: set[str] = set()
+    scanned = 0
+    with path.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if isinstance(obj, dict):
+                seen.update(name for name in SIDEBAND_FIELDS if name in obj)
+            scanned += 1
+            if scanned >= _SIDEBAND_SCAN_ROWS:
+                break
+    return [name for name in SIDEBAND_FIELDS if name in seen]
+
+
+def _raw_rows(path: Path) -> tuple[list[str], Iterator[dict[str, int]]]:
+    # Same field defaults as crosscheck_qemu_linxcore._iter_trace (dst_* fall
+    # back to wb_* only when the dst field is absent). The reader rejects a
+    # row carrying a sideband field the prefix scan did not see.
+    sidebands = _prefix_sidebands(path)
+    reader = commit_reader(sidebands, reject_extra=SIDEBAND_FIELDS)
+    names = reader.fields
+    return sidebands, (dict(zip(names, values)) for _, _, values in reader.iter_file(path))
+
+
+def _normalized_rows(path: Path) -> tuple[list[str], Iterator[dict[str, int]]]:
+    rows = (normalize_row(obj, seq) for seq, obj in enumerate(load_jsonl(path)))
+    head = list(islice(rows, _SIDEBAND_SCAN_ROWS))
+    sidebands = [name for name in SIDEBAND_FIELDS if any(name in row for row in head)]
+    late = set(SIDEBAND_FIELDS).difference(sidebands)
+
+    def tail() -> Iterator[dict[str, int]]:
+        for index, row in enumerate(rows, len(head)):
+            extra = late.intersection(row)
+            if extra:
+                raise SystemExit(
+                    f"error: {path}: row {index} has sideband fields absent from the first "
+                    f"{_SIDEBAND_SCAN_ROWS} rows: {', '.join(sorted(extra))}"
+                )
+            yield row
+
+    return sidebands, chain(head, tail())
+
+
+def convert_jsonl(input_path: Path, output_path: Path, *, max_rows: int = 0, normalize: bool = False) -> int:
+    """Convert a commit JSONL trace to the columnar container.
+
+    With `normalize`, rows go through `trace_schema_adapter.normalize_row`
+    first, so Chisel/pyCircuit aliases and nested fields are accepted. The
+    sideband fields are those present in any of the first
+    `_SIDEBAND_SCAN_ROWS` rows; rows missing one store 0 for it, and a later
+    row carrying a sideband field outside that set is an error. So is a value
+    outside [0, 2**64): it would otherwise wrap silently.
+    """
+    sidebands, rows = _normalized_rows(input_path) if normalize else _raw_rows(input_path)
+    fields = ["seq"] + list(REQUIRED_TRACE_FIELDS)
+    fields += [name for name in sidebands if name not in fields]
+    count = 0
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=".lxct.", dir=str(output_path.parent)) as spool_dir:
+        spools: list[Any] = []
+        buffers = [array("Q") for _ in fields]
+        try:
+            spools = [open(Path(spool_dir) / f"{i}.col", "wb") for i in range(len(fields))]
+            for row in rows:
+                try:
+                    for i, name in enumerate(fields):
+                        buffers[i].append(int(row.get(name, 0)))
+                except OverflowError:
+                    raise SystemExit(
+                        f"error: {input_path}: row {count}: {name}={row.get(name)} does not fit an unsigned 64-bit column"
+                    ) from None
+                count += 1
+                if count % _FLUSH_ROWS == 0:
+                    for buf, spool in zip(buffers, spools):
+                        _write_u64(spool, buf)
+                        del buf[:]
+                if max_rows > 0 and count >= max_rows:
+                    break
+            for buf, spool in zip(buffers, spools):
+                _write_u64(spool, buf)
+        finally:
+            for spool in spools:
+                spool.close()
+
+        header = {
+            "schema": SCHEMA_ID,
+            "byteorder": "little",
+            "dtype": "<u8",
+            "rows": count,
+            "fields": fields,
+            "source": str(input_path),
+            "normalized": bool(normalize),
+        }
+        header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+        data_start = _align(_PREAMBLE.size + len(header_bytes))
+        column_stride = _align(count * 8)
+        with output_path.open("wb") as out:
+            out.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+            out.write(header_bytes)
+            out.write(b"\0" * (data_start - _PREAMBLE.size - len(header_bytes)))
+            for i in range(len(fields)):
+                col_path = Path(spool_dir) / f"{i}.col"
+                written = 0
+                if col_path.exists():
+                    with col_path.open("rb") as src:
+                        while True:
+                            chunk = src.read(1 << 20)
+                            if not chunk:
+                                break
+                            out.write(chunk)
+                            written += len(chunk)
+                out.write(b"\0" * (column_stride - written))
+    return count
+
+
+def _write_u64(f: Any, buf: array) -> None:
+    if sys.byteorder != "little":
+        buf = array("Q", buf)
+        buf.byteswap()
+    buf.tofile(f)
+
+
+class ColumnarCommitTrace:
+    """Read-only, memory-mapped view of a columnar commit trace."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._file = self.path.open("rb")
+        preamble = self._file.read(_PREAMBLE.size)
+        if len(preamble) != _PREAMBLE.size:
+            raise ValueError(f"{self.path}: truncated columnar trace header")
+        magic, version, header_len = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: not a columnar commit trace")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: unsupported columnar trace version {version}")
+        self.header: dict[str, Any] = json.loads(self._file.read(header_len).decode("utf-8"))
+        if self.header.get("schema") != SCHEMA_ID:
+            raise ValueError(f"{self.path}: unexpected schema {self.header.get('schema')!r}")
+        self.rows: int = int(self.header["rows"])
+        self.fields: list[str] = list(self.header["fields"])
+        missing = [name for name in REQUIRED_TRACE_FIELDS if name not in self.fields]
+        if missing:
+            raise ValueError(f"{self.path}: columnar trace missing mandatory commit fields: {', '.join(missing)}")
+        self._data_start = _align(_PREAMBLE.size + header_len)
+        self._stride = _align(self.rows * 8)
+        self._offsets = {name: self._data_start + i * self._stride for i, name in enumerate(self.fields)}
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.rows else None
+        self._views: dict[str, memoryview] = {}
+
+    def __enter__(self) -> "ColumnarCommitTrace":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def column(self, name: str) -> Any:
+        """Return `name` as a zero-copy `numpy.memmap` of little-endian u64."""
+        import numpy as np
+
+        return np.memmap(self.path, dtype="<u8", mode="r", offset=self._offsets[name], shape=(self.rows,))
+
+    def _view(self, name: str) -> memoryview:
+        view = self._views.get(name)
+        if view is None:
+            if self._mmap is None:
+                raise IndexError("empty columnar trace")
+            if sys.byteorder != "little":
+                raise RuntimeError("row access without numpy requires a little-endian host")
+            start = self._offsets[name]
+            view = memoryview(self._mmap)[start : start + self.rows * 8].cast("Q")
+            self._views[name] = view
+        return view
+
+    def row(self, index: int) -> dict[str, int]:
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+        return {name: self._view(name)[index] for name in self.fields}
+
+    def iter_rows(self, start: int = 0, stop: int | None = None) -> Iterator[dict[str, int]]:
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if start >= stop:
+            return
+        views = [(name, self._view(name)) for name in self.fields]
+        for index in range(start, stop):
+            yield {name: view[index] for name, view in views}
+
+
+def open_columnar(path: Path) -> ColumnarCommitTrace:
+    return ColumnarCommitTrace(path)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--input", required=True, help="Input commit JSONL trace")
+    ap.add_argument("--output", default="", help=f"Output columnar trace (default: <input>{SUFFIX})")
+    ap.add_argument("--max-rows", type=int, default=0)
+    ap.add_argument(
+        "--normalize",
+        action="store_true",
+        help="Apply trace_schema_adapter aliases (Chisel/pyCircuit rows) before packing",
+    )
+    args = ap.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.is_file():
+        raise SystemExit(f"error: missing input trace: {input_path}")
+    output_path = Path(args.output) if args.output else input_path.with_name(input_path.name + SUFFIX)
+    rows = convert_jsonl(input_path, output_path, max_rows=args.max_rows, normalize=args.normalize)
+    print(f"columnar trace rows={rows} output={output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
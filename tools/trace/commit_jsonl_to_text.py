@@ -4,11 +4,20 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import re
 import shutil
-import subprocess
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
+
+from elf_symbols import AddrTable, load_elf_symbols
+from jsonl_index import line_aligned_bounds
+
+# Inputs smaller than this are formatted in-process: pool start-up would cost
+# more than the formatting itself.
+PARALLEL_MIN_BYTES = 8 << 20
+CHUNKS_PER_JOB = 4
 
 
 def _to_int(v: Any, default: int = 0) -> int:
@@ -40,69 +49,21 @@ def _mask_insn(insn: int, length: int) -> int:
     return insn
 
 
-def _choose_objdump(cli_tool: str | None) -> str | None:
-    if cli_tool:
-        return cli_tool
-    env = (os.environ.get("LLVM_OBJDUMP") or "").strip()
-    if env:
-        return env
-    in_repo: Path | None = None
-    p = Path(__file__).resolve()
-    for _ in range(12):
-        cand = p / "compiler/llvm/build-linxisa-clang/bin/llvm-objdump"
-        if cand.is_file():
-            in_repo = cand
-            break
-        if p.parent == p:
-            break
-        p = p.parent
-    for cand in (
-        str(in_repo) if in_repo is not None else "",
-        "llvm-objdump",
-        "objdump",
-    ):
-        if not cand:
-            continue
-        p = shutil.which(cand)
-        if p:
-            return p
-        if Path(cand).is_file():
-            return cand
-    return None
-
-
-def _build_disasm_map(elf: Path, objdump_tool: str | None) -> dict[int, str]:
-    tool = _choose_objdump(objdump_tool)
-    if tool is None or not elf.is_file():
-        return {}
-    cmd = [tool, "-d", str(elf)]
-    try:
-        out = subprocess.check_output(cmd, text=True, stderr=subprocess.DEVNULL, errors="ignore")
-    except Exception:
-        return {}
-
-    disasm: dict[int, str] = {}
-    for ln in out.splitlines():
-        m = re.match(r"^\s*([0-9a-fA-F]+):\s*(.*)$", ln)
-        if not m:
-            continue
-        addr = int(m.group(1), 16)
-        rest = m.group(2).strip()
-        if not rest:
-            continue
-        toks = rest.split()
-        i = 0
-        while i < len(toks) and re.fullmatch(r"[0-9a-fA-F]+", toks[i]):
-            i += 1
-        if i >= len(toks):
-            continue
-        text = " ".join(toks[i:]).strip()
-        if text:
-            disasm[addr] = text
-    return disasm
-
-
-def _trace_line(row: dict[str, Any], idx: int, disasm: dict[int, str]) -> str:
+class _DisasmLookup:
+    """Per-process memo in front of the sorted disasm table; only PCs that commit are ever looked up."""
+
+    def __init__(self, table: AddrTable) -> None:
+        self.table = table
+        self.memo: dict[int, str] = {}
+
+    def get(self, pc: int, default: str = "") -> str:
+        text = self.memo.get(pc)
+        if text is None:
+            text = self.memo[pc] = self.table.get(pc, "")
+        return text or default
+
+
+def _trace_line(row: dict[str, Any], idx: int, disasm: _DisasmLookup | AddrTable) -> str:
     seq = _to_int(row.get("seq", idx))
     cyc = _to_int(row.get("cycle", -1))
     pc = _to_int(row.get("pc", 0))
@@ -193,44 +154,131 @@ def _trace_line(row: dict[str, Any], idx: int, disasm: dict[int, str]) -> str:
     return " | ".join(parts)
 
 
+def _format_span(
+    in_path: Path, start: int, end: int | None, fout: TextIO, disasm: _DisasmLookup, row_base: int
+) -> tuple[int, bool]:
+    """Format the JSONL rows in bytes `[start, end)`; return (rows, whether any row lacked `seq`)."""
+    rows = 0
+    missing_seq = False
+    with in_path.open("rb") as fin:
+        fin.seek(start)
+        offset = start
+        for raw in fin:
+            if end is not None and offset >= end:
+                break
+            offset += len(raw)
+            line = raw.decode("utf-8", errors="ignore").strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "seq" not in row:
+                missing_seq = True
+            fout.write(_trace_line(row, row_base + rows, disasm))
+            fout.write("\n")
+            rows += 1
+    return rows, missing_seq
+
+
+_WORKER_DISASM: _DisasmLookup | None = None
+
+
+def _init_worker(table: AddrTable) -> None:
+    global _WORKER_DISASM
+    _WORKER_DISASM = _DisasmLookup(table)
+
+
+def _format_chunk(in_path: Path, start: int, end: int, part_path: Path, row_base: int) -> tuple[int, bool]:
+    assert _WORKER_DISASM is not None
+    with part_path.open("w", encoding="utf-8") as fout:
+        return _format_span(in_path, start, end, fout, _WORKER_DISASM, row_base)
+
+
+def format_parallel(in_path: Path, fout: TextIO, table: AddrTable, jobs: int, *, spool_parent: Path) -> int:
+    """Format line-aligned chunks in a process pool and append them to `fout` in input order.
+
+    Rows without `seq` fall back to their global row index, which a chunk only
+    learns once every earlier chunk is counted; such chunks are formatted again
+    with the right base (commit traces always carry `seq`, so this is rare).
+    """
+    bounds = line_aligned_bounds(in_path, jobs * CHUNKS_PER_JOB)
+    spans = list(zip(bounds[:-1], bounds[1:]))
+    with tempfile.TemporaryDirectory(prefix=".trace_txt.", dir=str(spool_parent)) as spool_dir:
+        parts = [Path(spool_dir) / f"{i:05d}.txt" for i in range(len(spans))]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(table,)) as pool:
+            counts = list(
+                pool.map(
+                    _format_chunk,
+                    [in_path] * len(spans),
+                    [lo for lo, _ in spans],
+                    [hi for _, hi in spans],
+                    parts,
+                    [0] * len(spans),
+                )
+            )
+            bases = [0]
+            for rows, _ in counts:
+                bases.append(bases[-1] + rows)
+            redo = [i for i, (_, missing_seq) in enumerate(counts) if missing_seq and bases[i]]
+            list(
+                pool.map(
+                    _format_chunk,
+                    [in_path] * len(redo),
+                    [spans[i][0] for i in redo],
+                    [spans[i][1] for i in redo],
+                    [parts[i] for i in redo],
+                    [bases[i] for i in redo],
+                )
+            )
+        fout.flush()
+        for part in parts:
+            with part.open("r", encoding="utf-8") as src:
+                shutil.copyfileobj(src, fout, 1 << 20)
+    return bases[-1]
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="Convert LinxCore commit JSONL trace to readable text.")
     ap.add_argument("--input", required=True, help="Input commit trace JSONL")
     ap.add_argument("--output", required=True, help="Output text trace path")
     ap.add_argument("--objdump-elf", default="", help="Optional ELF for disassembly mapping")
     ap.add_argument("--objdump-tool", default="", help="Optional objdump binary path")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Format line-aligned chunks in N worker processes and concatenate them in order "
+            f"(inputs under {PARALLEL_MIN_BYTES >> 20} MiB stay serial; 0 = one per CPU)"
+        ),
+    )
     args = ap.parse_args()
 
     in_path = Path(args.input)
     out_path = Path(args.output)
     if not in_path.is_file():
         raise SystemExit(f"error: missing input trace: {in_path}")
+    if args.jobs < 0:
+        raise SystemExit("error: --jobs must be >= 0")
 
-    disasm_map: dict[int, str] = {}
+    disasm_map = AddrTable(array("Q"), [])
     if args.objdump_elf:
-        disasm_map = _build_disasm_map(Path(args.objdump_elf), args.objdump_tool or None)
+        disasm_map = load_elf_symbols(Path(args.objdump_elf), objdump=args.objdump_tool or None).disasm
+    jobs = args.jobs or (os.cpu_count() or 1)
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    rows = 0
-    with in_path.open("r", encoding="utf-8", errors="ignore") as fin, out_path.open(
-        "w", encoding="utf-8"
-    ) as fout:
+    with out_path.open("w", encoding="utf-8") as fout:
         fout.write(f"# LinxCore instruction trace\n")
         fout.write(f"# input_jsonl: {in_path}\n")
         if args.objdump_elf:
             fout.write(f"# disasm_elf: {args.objdump_elf}\n")
         fout.write("\n")
-        for idx, line in enumerate(fin):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                row = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            fout.write(_trace_line(row, rows, disasm_map))
-            fout.write("\n")
-            rows += 1
+        if jobs > 1 and in_path.stat().st_size >= PARALLEL_MIN_BYTES:
+            rows = format_parallel(in_path, fout, disasm_map, jobs, spool_parent=out_path.parent)
+        else:
+            rows, _ = _format_span(in_path, 0, None, fout, _DisasmLookup(disasm_map), 0)
         fout.write(f"\n# rows={rows}\n")
     print(f"text_trace: {out_path} rows={rows}")
     return 0
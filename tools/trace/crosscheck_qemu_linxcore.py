@@ -2,17 +2,28 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import json
 import math
+import multiprocessing
+import os
+import signal
 import sys
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tools" / "trace"))
 
 from common.decode32 import decode32_meta
+from commit_columnar import is_columnar_trace, open_columnar
+from jsonl_follow import IDLE_TIMEOUT, follow_lines, signal_tree
+from jsonl_index import line_aligned_bounds
+from trace_reader import COMMIT_FIELDS, commit_reader
 
 REQUIRED_TRACE_FIELDS = [
     "pc",
@@ -73,6 +84,13 @@ class Commit:
     next_pc: int
 
 
+# Readers yield rows in `COMMIT_FIELDS` order and `Commit(*values)` binds them
+# positionally; keep the dataclass in lockstep (`len` is spelled `length` here).
+_COMMIT_ATTRS = tuple("length" if name == "len" else name for name in COMMIT_FIELDS)
+if tuple(f.name for f in fields(Commit)) != _COMMIT_ATTRS:
+    raise ImportError(f"Commit fields out of sync with trace_reader.COMMIT_FIELDS: {_COMMIT_ATTRS}")
+
+
 def _mask_insn(raw: int, length: int) -> int:
     if length == 2:
         return raw & 0xFFFF
@@ -192,52 +210,124 @@ def _to_int(v: Any, default: int = 0) -> int:
     return default
 
 
+def _commit_from_obj(obj: dict[str, Any], seq_default: int) -> Commit:
+    return Commit(
+        seq=_to_int(obj.get("seq", seq_default)),
+        pc=_to_int(obj.get("pc", 0)),
+        insn=_to_int(obj.get("insn", 0)),
+        length=_to_int(obj.get("len", 0)),
+        wb_valid=_to_int(obj.get("wb_valid", 0)),
+        wb_rd=_to_int(obj.get("wb_rd", 0)),
+        wb_data=_to_int(obj.get("wb_data", 0)),
+        src0_valid=_to_int(obj.get("src0_valid", 0)),
+        src0_reg=_to_int(obj.get("src0_reg", 0)),
+        src0_data=_to_int(obj.get("src0_data", 0)),
+        src1_valid=_to_int(obj.get("src1_valid", 0)),
+        src1_reg=_to_int(obj.get("src1_reg", 0)),
+        src1_data=_to_int(obj.get("src1_data", 0)),
+        dst_valid=_to_int(obj.get("dst_valid", obj.get("wb_valid", 0))),
+        dst_reg=_to_int(obj.get("dst_reg", obj.get("wb_rd", 0))),
+        dst_data=_to_int(obj.get("dst_data", obj.get("wb_data", 0))),
+        mem_valid=_to_int(obj.get("mem_valid", 0)),
+        mem_is_store=_to_int(obj.get("mem_is_store", 0)),
+        mem_addr=_to_int(obj.get("mem_addr", 0)),
+        mem_wdata=_to_int(obj.get("mem_wdata", 0)),
+        mem_rdata=_to_int(obj.get("mem_rdata", 0)),
+        mem_size=_to_int(obj.get("mem_size", 0)),
+        trap_valid=_to_int(obj.get("trap_valid", 0)),
+        trap_cause=_to_int(obj.get("trap_cause", 0)),
+        traparg0=_to_int(obj.get("traparg0", 0)),
+        next_pc=_to_int(obj.get("next_pc", 0)),
+    )
+
+
+def _iter_columnar_trace(path: Path, limit: int) -> Iterator[Commit]:
+    # Field presence is validated once by the container header.
+    with open_columnar(path) as trace:
+        stop = min(limit, trace.rows) if limit > 0 else trace.rows
+        for count, obj in enumerate(trace.iter_rows(0, stop)):
+            yield _commit_from_obj(obj, count)
+
+
+def _iter_trace(path: Path, limit: int) -> Iterator[Commit]:
+    if is_columnar_trace(path):
+        yield from _iter_columnar_trace(path, limit)
+        return
+    for _, _, values in commit_reader().iter_file(path, limit=limit):
+        yield Commit(*values)
+
+
+def _iter_follow(path: Path, limit: int, *, writer_pid: int | None, idle_timeout: float) -> Iterator[Commit]:
+    """Commit rows of a JSONL trace that is still being written (see `jsonl_follow.follow_lines`)."""
+    lines = follow_lines(path, writer_pid=writer_pid, idle_timeout=idle_timeout)
+    for _, values in commit_reader().iter_lines(lines, name=str(path), limit=limit):
+        yield Commit(*values)
+
+
+def _raw_window(limit: int) -> int:
+    # Metadata rows are filtered before compare. Read a wider raw window so
+    # the compare window can still reach `limit` architectural rows.
+    return limit * 32 + 1024 if limit > 0 else 0
+
+
 def _load_trace(path: Path, limit: int) -> list[Commit]:
-    rows: list[Commit] = []
-    with path.open("r", encoding="utf-8", errors="ignore") as f:
-        for idx, line in enumerate(f):
-            line = line.strip()
-            if not line:
-                continue
-            obj = json.loads(line)
-            missing = [field for field in REQUIRED_TRACE_FIELDS if field not in obj]
-            if missing:
-                raise SystemExit(
-                    f"error: {path}: row {idx} missing mandatory commit fields: {', '.join(missing)}"
-                )
-            seq = _to_int(obj.get("seq", len(rows)))
-            row = Commit(
-                seq=seq,
-                pc=_to_int(obj.get("pc", 0)),
-                insn=_to_int(obj.get("insn", 0)),
-                length=_to_int(obj.get("len", 0)),
-                wb_valid=_to_int(obj.get("wb_valid", 0)),
-                wb_rd=_to_int(obj.get("wb_rd", 0)),
-                wb_data=_to_int(obj.get("wb_data", 0)),
-                src0_valid=_to_int(obj.get("src0_valid", 0)),
-                src0_reg=_to_int(obj.get("src0_reg", 0)),
-                src0_data=_to_int(obj.get("src0_data", 0)),
-                src1_valid=_to_int(obj.get("src1_valid", 0)),
-                src1_reg=_to_int(obj.get("src1_reg", 0)),
-                src1_data=_to_int(obj.get("src1_data", 0)),
-                dst_valid=_to_int(obj.get("dst_valid", obj.get("wb_valid", 0))),
-                dst_reg=_to_int(obj.get("dst_reg", obj.get("wb_rd", 0))),
-                dst_data=_to_int(obj.get("dst_data", obj.get("wb_data", 0))),
-                mem_valid=_to_int(obj.get("mem_valid", 0)),
-                mem_is_store=_to_int(obj.get("mem_is_store", 0)),
-                mem_addr=_to_int(obj.get("mem_addr", 0)),
-                mem_wdata=_to_int(obj.get("mem_wdata", 0)),
-                mem_rdata=_to_int(obj.get("mem_rdata", 0)),
-                mem_size=_to_int(obj.get("mem_size", 0)),
-                trap_valid=_to_int(obj.get("trap_valid", 0)),
-                trap_cause=_to_int(obj.get("trap_cause", 0)),
-                traparg0=_to_int(obj.get("traparg0", 0)),
-                next_pc=_to_int(obj.get("next_pc", 0)),
-            )
-            rows.append(row)
-            if limit > 0 and len(rows) >= limit:
-                break
-    return rows
+    return list(_iter_trace(path, limit))
+
+
+class TraceCursor:
+    """Forward-only cursor over commit rows with a small lookahead buffer.
+
+    The comparator only ever needs the current row and the row after it (for
+    the side-effect-free sysreg resync), so the lookahead never grows past two
+    rows no matter how long the underlying trace is.
+    """
+
+    def __init__(self, rows: Iterable[Commit]) -> None:
+        self._it = iter(rows)
+        self._ahead: deque[Commit] = deque()
+        self.rows_read = 0
+
+    def peek(self, offset: int = 0) -> Commit | None:
+        while len(self._ahead) <= offset:
+            row = next(self._it, None)
+            if row is None:
+                return None
+            self._ahead.append(row)
+            self.rows_read += 1
+        return self._ahead[offset]
+
+    def advance(self) -> None:
+        if self.peek() is not None:
+            self._ahead.popleft()
+
+    def drain_nonmeta(self) -> int:
+        count = 0
+        while True:
+            row = self.peek()
+            if row is None:
+                return count
+            if not _is_metadata_commit(row):
+                count += 1
+            self._ahead.popleft()
+
+
+@dataclass
+class CompareResult:
+    compared: int = 0
+    q_meta_skipped: int = 0
+    d_meta_skipped: int = 0
+    q_cbstop: int = 0
+    d_cbstop: int = 0
+    q_rows: int = 0
+    d_rows: int = 0
+    tail_checked: bool = True
+    # Non-metadata rows left in each stream once the compare loop stopped, and
+    # the last compared pair; these feed the single `trace_length` verdict.
+    q_tail: int = 0
+    d_tail: int = 0
+    last_q: Commit | None = None
+    last_d: Commit | None = None
+    mismatches: list[dict[str, Any]] = field(default_factory=list)
 
 
 def _cmp_commit(q: Commit, d: Commit) -> tuple[bool, str, int, int]:
@@ -305,8 +395,12 @@ def _cmp_commit(q: Commit, d: Commit) -> tuple[bool, str, int, int]:
     return True, "", 0, 0
 
 
+def _is_cbstop(r: Commit) -> bool:
+    return r.length == 2 and (_mask_insn(r.insn, r.length) == 0)
+
+
 def _cbstop_count(rows: list[Commit]) -> int:
-    return sum(1 for r in rows if r.length == 2 and (_mask_insn(r.insn, r.length) == 0))
+    return sum(1 for r in rows if _is_cbstop(r))
 
 
 def _hex(v: int) -> str:
@@ -356,10 +450,427 @@ def _row_dict(r: Commit) -> dict[str, Any]:
     }
 
 
+def _mismatch_record(
+    field_name: str,
+    qv: int,
+    dv: int,
+    q: Commit,
+    d: Commit,
+    context: deque[tuple[Commit, Commit]] | None,
+) -> dict[str, Any]:
+    record: dict[str, Any] = {
+        "seq": d.seq,
+        "field": field_name,
+        "qemu": qv,
+        "dut": dv,
+        "qemu_pc": q.pc,
+        "dut_pc": d.pc,
+        "qemu_insn": _mask_insn(q.insn, q.length),
+        "dut_insn": _mask_insn(d.insn, d.length),
+        "qemu_row": _row_dict(q),
+        "dut_row": _row_dict(d),
+    }
+    if context:
+        record["context"] = [{"qemu_row": _row_dict(cq), "dut_row": _row_dict(cd)} for cq, cd in context]
+    return record
+
+
+def _trace_length_record(
+    compared: int,
+    q_rem: int,
+    d_rem: int,
+    last_q: Commit | None,
+    last_d: Commit | None,
+) -> dict[str, Any]:
+    return {
+        "seq": compared if last_d is None else last_d.seq,
+        "field": "trace_length",
+        "qemu": q_rem,
+        "dut": d_rem,
+        "qemu_pc": last_q.pc if last_q is not None else 0,
+        "dut_pc": last_d.pc if last_d is not None else 0,
+        "qemu_insn": 0,
+        "dut_insn": 0,
+        "qemu_row": _row_dict(last_q) if last_q is not None else {},
+        "dut_row": _row_dict(last_d) if last_d is not None else {},
+    }
+
+
+def compare_streams(
+    q_cur: TraceCursor,
+    d_cur: TraceCursor,
+    *,
+    limit: int,
+    mode: str,
+    context_rows: int = 0,
+    drain_on_failfast: bool = True,
+    check_tail: bool = True,
+    on_mismatch: Callable[[dict[str, Any]], None] | None = None,
+) -> CompareResult:
+    """Walk both commit streams in lockstep and collect mismatches.
+
+    Only the cursors' two-row lookahead and an optional `context_rows` ring of
+    recently compared pairs are held in memory, so a full-length compare stays
+    flat regardless of trace size. `on_mismatch` fires as soon as a mismatch is
+    found, before the rest of either trace has been read. With `check_tail`
+    off the leftover row counts are only recorded on the result, so a caller
+    comparing one span of a longer trace can judge the length once at the end.
+    """
+    res = CompareResult()
+    context: deque[tuple[Commit, Commit]] | None = deque(maxlen=context_rows) if context_rows > 0 else None
+    last_q: Commit | None = None
+    last_d: Commit | None = None
+    compare_limit = limit if limit > 0 else None
+    stopped_early = False
+
+    while True:
+        q = q_cur.peek()
+        while q is not None and _is_metadata_commit(q):
+            res.q_meta_skipped += 1
+            q_cur.advance()
+            q = q_cur.peek()
+        d = d_cur.peek()
+        while d is not None and _is_metadata_commit(d):
+            res.d_meta_skipped += 1
+            d_cur.advance()
+            d = d_cur.peek()
+        if q is None or d is None:
+            break
+        if compare_limit is not None and res.compared >= compare_limit:
+            break
+        last_q = q
+        last_d = d
+        res.q_cbstop += int(_is_cbstop(q))
+        res.d_cbstop += int(_is_cbstop(d))
+        ok, field_name, qv, dv = _cmp_commit(q, d)
+        if not ok:
+            # Bounded, local resync: skip known side-effect-free marker rows if
+            # the next row aligns exactly. This keeps compare strict for
+            # architectural WB/MEM/TRAP effects.
+            if _is_sideeffect_free_sysreg_marker(q):
+                next_q = q_cur.peek(1)
+                if next_q is not None and _cmp_commit(next_q, d)[0]:
+                    res.q_meta_skipped += 1
+                    q_cur.advance()
+                    continue
+            if _is_sideeffect_free_sysreg_marker(d):
+                next_d = d_cur.peek(1)
+                if next_d is not None and _cmp_commit(q, next_d)[0]:
+                    res.d_meta_skipped += 1
+                    d_cur.advance()
+                    continue
+            record = _mismatch_record(field_name, qv, dv, q, d, context)
+            res.mismatches.append(record)
+            if on_mismatch is not None:
+                on_mismatch(record)
+            if mode == "failfast":
+                stopped_early = True
+                break
+        if context is not None:
+            context.append((q, d))
+        res.compared += 1
+        q_cur.advance()
+        d_cur.advance()
+
+    if stopped_early and not drain_on_failfast:
+        # Streaming failfast: the first divergence is the verdict, so do not
+        # read the remainder of either trace just to size its tail.
+        res.tail_checked = False
+        res.q_rows = q_cur.rows_read
+        res.d_rows = d_cur.rows_read
+        return res
+
+    res.q_tail = q_cur.drain_nonmeta()
+    res.d_tail = d_cur.drain_nonmeta()
+    res.q_rows = q_cur.rows_read
+    res.d_rows = d_cur.rows_read
+    res.last_q = last_q
+    res.last_d = last_d
+    if not check_tail:
+        return res
+    q_rem_nonmeta = res.q_tail
+    d_rem_nonmeta = res.d_tail
+    if compare_limit is None:
+        if q_rem_nonmeta != 0 or d_rem_nonmeta != 0:
+            res.mismatches.append(_trace_length_record(res.compared, q_rem_nonmeta, d_rem_nonmeta, last_q, last_d))
+    else:
+        # Bounded compare window: QEMU can legitimately have extra tail rows
+        # because DUT halts at MAX_COMMITS while QEMU is sampled asynchronously.
+        # Only fail for DUT overflow or DUT early termination while QEMU still
+        # has architectural rows. If both metadata-filtered streams end
+        # together before `max_commits`, the caller provided a finite trace
+        # window and the compared prefix is complete.
+        dut_overflow = d_rem_nonmeta > 0
+        dut_terminated_before_qemu = q_rem_nonmeta > 0 and d_rem_nonmeta == 0 and res.compared < compare_limit
+        if dut_overflow or dut_terminated_before_qemu:
+            res.mismatches.append(_trace_length_record(res.compared, q_rem_nonmeta, d_rem_nonmeta, last_q, last_d))
+    return res
+
+
+# Sharded compare: both traces are cut at block-start rows ("anchors") that
+# sit at the same architectural position. An anchor pair is accepted only if
+# the bstart PCs agree and the next ANCHOR_VERIFY_ROWS architectural rows
+# compare clean, so every shard pair starts in lockstep.
+ANCHOR_PROBE = 16
+ANCHOR_WINDOW = 64
+ANCHOR_VERIFY_ROWS = 16
+# Rows a shard compares between checks of the failfast stop index.
+SHARD_STOP_CHECK_ROWS = 4096
+
+# Per-worker shared stop index (set by `_init_shard_worker`): in failfast mode
+# it holds the lowest shard seen to mismatch, and later shards give up.
+_SHARD_STOP: Any = None
+
+
+class _ShardCancelled(Exception):
+    pass
+
+
+def _init_shard_worker(stop: Any) -> None:
+    global _SHARD_STOP
+    _SHARD_STOP = stop
+
+
+def _is_bstart_commit(r: Commit) -> bool:
+    insn = _mask_insn(r.insn, r.length)
+    return (
+        (r.length == 2 and _is_bstart16(insn))
+        or (r.length == 4 and _is_bstart32(insn))
+        or (r.length == 6 and _is_bstart48(insn))
+    )
+
+
+def _iter_span(path: Path, start: int, end: int | None, row_base: int) -> Iterator[tuple[int, int, Commit]]:
+    """Yield `(byte_offset, global_row, commit)` for JSONL rows in `[start, end)`."""
+    for offset, row, values in commit_reader().iter_file(path, start=start, end=end, row_base=row_base):
+        yield offset, row, Commit(*values)
+
+
+def _scan_chunk(path: Path, start: int, end: int) -> dict[str, Any]:
+    rows = 0
+    nonmeta = 0
+    anchors: list[tuple[int, int, int, int]] = []
+    for offset, local_row, r in _iter_span(path, start, end, 0):
+        rows += 1
+        if not _is_metadata_commit(r):
+            nonmeta += 1
+        elif len(anchors) < ANCHOR_PROBE and _is_bstart_commit(r):
+            anchors.append((nonmeta, local_row, offset, r.pc))
+    return {"start": start, "rows": rows, "nonmeta": nonmeta, "anchors": anchors}
+
+
+def _locate_anchors(
+    path: Path, start: int, row_base: int, ord_base: int, pcs: frozenset[int], lo: int, hi: int
+) -> list[tuple[int, int, int, int]]:
+    found: list[tuple[int, int, int, int]] = []
+    ordinal = ord_base
+    for offset, row, r in _iter_span(path, start, None, row_base):
+        if ordinal > hi:
+            break
+        if not _is_metadata_commit(r):
+            ordinal += 1
+        elif ordinal >= lo and r.pc in pcs and _is_bstart_commit(r):
+            found.append((ordinal, row, offset, r.pc))
+    return found
+
+
+def _anchor_rows_agree(q_path: Path, q_off: int, d_path: Path, d_off: int) -> bool:
+    def _arch(path: Path, off: int) -> list[Commit]:
+        out: list[Commit] = []
+        for _, _, r in _iter_span(path, off, None, 0):
+            if not _is_metadata_commit(r):
+                out.append(r)
+                if len(out) >= ANCHOR_VERIFY_ROWS:
+                    break
+        return out
+
+    q_rows = _arch(q_path, q_off)
+    d_rows = _arch(d_path, d_off)
+    if len(q_rows) != len(d_rows):
+        return False
+    return all(_cmp_commit(q, d)[0] for q, d in zip(q_rows, d_rows))
+
+
+def _compare_shard(
+    shard: int,
+    q_path: Path,
+    d_path: Path,
+    q_span: tuple[int, int | None, int],
+    d_span: tuple[int, int | None, int],
+    mode: str,
+    context_rows: int,
+) -> CompareResult | None:
+    """Compare one shard pair; None when an earlier shard's failfast mismatch made it moot."""
+
+    def _rows(path: Path, span: tuple[int, int | None, int]) -> Iterator[Commit]:
+        for n, (_, _, r) in enumerate(_iter_span(path, *span)):
+            if n % SHARD_STOP_CHECK_ROWS == 0 and _SHARD_STOP is not None and _SHARD_STOP.value < shard:
+                raise _ShardCancelled
+            yield r
+
+    q_cur = TraceCursor(_rows(q_path, q_span))
+    d_cur = TraceCursor(_rows(d_path, d_span))
+    try:
+        return compare_streams(q_cur, d_cur, limit=0, mode=mode, context_rows=context_rows, check_tail=False)
+    except _ShardCancelled:
+        return None
+
+
+def compare_sharded(
+    q_path: Path, d_path: Path, *, jobs: int, mode: str, context_rows: int = 0
+) -> tuple[CompareResult, int]:
+    """Full-trace compare split into anchor-aligned shards over a process pool.
+
+    Returns the merged result (mismatches in sequence order) and the number of
+    shards actually used. Boundaries whose anchors cannot be verified are
+    dropped, so a badly diverged pair degrades to fewer shards, not to a
+    misaligned compare. In failfast mode the first mismatching shard cancels
+    every later one: queued shards never start and running ones stop at their
+    next stop-index check.
+    """
+    stop = multiprocessing.RawValue("q", 1 << 62)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_shard_worker, initargs=(stop,)) as pool:
+        q_bounds = line_aligned_bounds(q_path, jobs)
+        d_bounds = line_aligned_bounds(d_path, jobs * 4)
+        q_scans = list(pool.map(_scan_chunk, [q_path] * (len(q_bounds) - 1), q_bounds[:-1], q_bounds[1:]))
+        d_scans = list(pool.map(_scan_chunk, [d_path] * (len(d_bounds) - 1), d_bounds[:-1], d_bounds[1:]))
+
+        def _prefix(scans: list[dict[str, Any]]) -> tuple[list[int], list[int]]:
+            row_base = [0]
+            ord_base = [0]
+            for scan in scans:
+                row_base.append(row_base[-1] + scan["rows"])
+                ord_base.append(ord_base[-1] + scan["nonmeta"])
+            return row_base, ord_base
+
+        q_row_base, q_ord_base = _prefix(q_scans)
+        d_row_base, d_ord_base = _prefix(d_scans)
+
+        locate_jobs = []
+        for c in range(1, len(q_scans)):
+            candidates = [
+                (q_ord_base[c] + local_ord, q_row_base[c] + local_row, offset, pc)
+                for local_ord, local_row, offset, pc in q_scans[c]["anchors"]
+            ]
+            if not candidates:
+                continue
+            lo = max(min(cand[0] for cand in candidates) - ANCHOR_WINDOW, 0)
+            hi = max(cand[0] for cand in candidates) + ANCHOR_WINDOW
+            dc = min(max(bisect.bisect_right(d_ord_base, lo) - 1, 0), len(d_scans) - 1)
+            future = pool.submit(
+                _locate_anchors,
+                d_path,
+                d_scans[dc]["start"],
+                d_row_base[dc],
+                d_ord_base[dc],
+                frozenset(cand[3] for cand in candidates),
+                lo,
+                hi,
+            )
+            locate_jobs.append((candidates, future))
+
+        # (q_offset, q_row, d_offset, d_row, q_ordinal, d_ordinal) per accepted boundary.
+        boundaries: list[tuple[int, int, int, int, int, int]] = []
+        for candidates, future in locate_jobs:
+            d_found = future.result()
+            accepted = None
+            for q_ord, q_row, q_off, q_pc in candidates:
+                matches = sorted(
+                    (abs(d_ord - q_ord), d_off, d_row, d_ord) for d_ord, d_row, d_off, d_pc in d_found if d_pc == q_pc
+                )
+                for _, d_off, d_row, d_ord in matches:
+                    if boundaries and (q_off <= boundaries[-1][0] or d_off <= boundaries[-1][2]):
+                        continue
+                    if _anchor_rows_agree(q_path, q_off, d_path, d_off):
+                        accepted = (q_off, q_row, d_off, d_row, q_ord, d_ord)
+                        break
+                if accepted is not None:
+                    break
+            if accepted is not None:
+                boundaries.append(accepted)
+
+        cuts = [(0, 0, 0, 0, 0, 0)] + boundaries
+        futures = []
+        for i, (q_off, q_row, d_off, d_row, _, _) in enumerate(cuts):
+            q_end = cuts[i + 1][0] if i + 1 < len(cuts) else None
+            d_end = cuts[i + 1][2] if i + 1 < len(cuts) else None
+            futures.append(
+                pool.submit(
+                    _compare_shard,
+                    i,
+                    q_path,
+                    d_path,
+                    (q_off, q_end, q_row),
+                    (d_off, d_end, d_row),
+                    mode,
+                    context_rows,
+                )
+            )
+        shard_of = {future: i for i, future in enumerate(futures)}
+        shard_results: list[CompareResult | None] = [None] * len(futures)
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            i = shard_of[future]
+            res = shard_results[i] = future.result()
+            if mode == "failfast" and res is not None and res.mismatches and i < stop.value:
+                stop.value = i
+                for later in futures[i + 1 :]:
+                    later.cancel()
+
+    # Shards leave their length checks to the merge, which emits one
+    # `trace_length` record after the last mismatch just like the serial
+    # compare: on a failfast stop the tail is the stopping shard's remainder
+    # plus every later shard's rows, otherwise the per-shard remainders sum.
+    q_nonmeta = q_ord_base[-1]
+    d_nonmeta = d_ord_base[-1]
+    merged = CompareResult(q_rows=q_row_base[-1], d_rows=d_row_base[-1])
+    for i, res in enumerate(shard_results):
+        # Only shards after a failfast mismatch are cancelled; the loop stops
+        # at the first mismatching shard before reaching them.
+        assert res is not None
+        merged.compared += res.compared
+        merged.q_meta_skipped += res.q_meta_skipped
+        merged.d_meta_skipped += res.d_meta_skipped
+        merged.q_cbstop += res.q_cbstop
+        merged.d_cbstop += res.d_cbstop
+        merged.q_tail += res.q_tail
+        merged.d_tail += res.d_tail
+        if res.last_q is not None:
+            merged.last_q = res.last_q
+            merged.last_d = res.last_d
+        if mode == "failfast" and res.mismatches:
+            # Match the sequential failfast verdict: later shards never ran.
+            merged.mismatches.append(res.mismatches[0])
+            if i + 1 < len(cuts):
+                merged.q_tail += q_nonmeta - cuts[i + 1][4]
+                merged.d_tail += d_nonmeta - cuts[i + 1][5]
+            break
+        merged.mismatches.extend(res.mismatches)
+    if merged.q_tail != 0 or merged.d_tail != 0:
+        merged.mismatches.append(
+            _trace_length_record(merged.compared, merged.q_tail, merged.d_tail, merged.last_q, merged.last_d)
+        )
+    return merged, len(shard_results)
+
+
+def _print_first_mismatch(first_mm: dict[str, Any]) -> None:
+    print("first_mismatch:")
+    print(
+        f"  seq={first_mm['seq']} field={first_mm['field']} "
+        f"qemu={_hex(int(first_mm['qemu']))} dut={_hex(int(first_mm['dut']))}"
+    )
+    if isinstance(first_mm.get("qemu_row"), dict) and first_mm["qemu_row"]:
+        print(f"  qemu_row={json.dumps(first_mm['qemu_row'], sort_keys=True)}")
+    if isinstance(first_mm.get("dut_row"), dict) and first_mm["dut_row"]:
+        print(f"  dut_row={json.dumps(first_mm['dut_row'], sort_keys=True)}")
+    sys.stdout.flush()
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="Cross-check QEMU and LinxCore commit traces.")
-    ap.add_argument("--qemu-trace", required=True, help="QEMU JSONL trace path")
-    ap.add_argument("--dut-trace", required=True, help="LinxCore TB JSONL trace path")
+    ap.add_argument("--qemu-trace", required=True, help="QEMU JSONL (or columnar .lxct) trace path")
+    ap.add_argument("--dut-trace", required=True, help="LinxCore TB JSONL (or columnar .lxct) trace path")
     ap.add_argument("--mode", choices=("diagnostic", "failfast"), default="diagnostic")
     ap.add_argument("--max-commits", type=int, default=1000)
     ap.add_argument("--report-dir", default="", help="Output directory for report files")
@@ -369,14 +880,83 @@ def main() -> int:
         default=8.0,
         help="Warn when DUT C.BSTOP count exceeds threshold * QEMU count in compared window",
     )
+    ap.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Walk both traces with generator cursors instead of loading them; memory stays flat and the first "
+            "mismatch is printed as soon as it is found (failfast stops reading at that row)"
+        ),
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Compare anchor-aligned shards in N worker processes (full JSONL compares with --max-commits 0 only; "
+            "0 = one per CPU)"
+        ),
+    )
+    ap.add_argument(
+        "--context-rows",
+        type=int,
+        default=0,
+        help="Attach the last N compared row pairs to each mismatch record (0 disables)",
+    )
+    ap.add_argument(
+        "--follow",
+        action="store_true",
+        help=(
+            "Tail both JSONL traces while the producers are still writing them and compare rows as they appear "
+            "(implies --stream). A trace ends when its --qemu-pid/--dut-pid writer exits, or after --follow-idle "
+            "seconds without growth when no pid is given"
+        ),
+    )
+    ap.add_argument("--qemu-pid", type=int, default=0, help="--follow: process writing the QEMU trace file")
+    ap.add_argument("--dut-pid", type=int, default=0, help="--follow: process writing the DUT trace file")
+    ap.add_argument(
+        "--follow-idle",
+        type=float,
+        default=IDLE_TIMEOUT,
+        help=(
+            "--follow: seconds without growth that end a trace with no writer pid "
+            f"(default: {IDLE_TIMEOUT:g}; 0 waits forever)"
+        ),
+    )
+    ap.add_argument(
+        "--stop-pid",
+        type=int,
+        action="append",
+        default=[],
+        help=(
+            "--mode failfast with --follow/--stream: signal this producer (and its children) at the first "
+            "mismatch; repeatable"
+        ),
+    )
+    ap.add_argument(
+        "--stop-signal",
+        choices=("TERM", "INT", "KILL"),
+        default="TERM",
+        help="Signal sent to --stop-pid processes (default: TERM)",
+    )
+    ap.add_argument(
+        "--triage",
+        action="store_true",
+        help=(
+            "On mismatch, classify all divergences with numpy (per-field first divergence, opcode/PC/register "
+            "groups, row misalignment, earliest causal write) into crosscheck_triage.json and the report"
+        ),
+    )
     args = ap.parse_args()
 
     qemu_trace = Path(args.qemu_trace)
     dut_trace = Path(args.dut_trace)
-    if not qemu_trace.is_file():
+    # Followed traces may not have been created yet; follow_lines waits for them.
+    if not args.follow and not qemu_trace.is_file():
         raise SystemExit(f"error: missing qemu trace: {qemu_trace}")
-    if not dut_trace.is_file():
+    if not args.follow and not dut_trace.is_file():
         raise SystemExit(f"error: missing dut trace: {dut_trace}")
+    stream = args.stream or args.follow
 
     report_dir = Path(args.report_dir) if args.report_dir else dut_trace.parent
     report_dir.mkdir(parents=True, exist_ok=True)
@@ -385,122 +965,67 @@ def main() -> int:
     mismatch_json = report_dir / "crosscheck_mismatches.json"
 
     limit = max(args.max_commits, 0)
-    raw_limit = 0
-    if limit > 0:
-        # Metadata rows are filtered before compare. Read a wider raw window so
-        # the compare window can still reach `max_commits` architectural rows.
-        raw_limit = limit * 32 + 1024
-    q_rows = _load_trace(qemu_trace, raw_limit)
-    d_rows = _load_trace(dut_trace, raw_limit)
-    mismatches: list[dict[str, Any]] = []
-    q_idx = 0
-    d_idx = 0
-    compared = 0
-    q_meta_skipped = 0
-    d_meta_skipped = 0
-    q_compared_rows: list[Commit] = []
-    d_compared_rows: list[Commit] = []
+    raw_limit = _raw_window(limit)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    shards = 1
+    reported_live = False
 
-    compare_limit = limit if limit > 0 else None
-    while q_idx < len(q_rows) and d_idx < len(d_rows):
-        while q_idx < len(q_rows) and _is_metadata_commit(q_rows[q_idx]):
-            q_meta_skipped += 1
-            q_idx += 1
-        while d_idx < len(d_rows) and _is_metadata_commit(d_rows[d_idx]):
-            d_meta_skipped += 1
-            d_idx += 1
-        if q_idx >= len(q_rows) or d_idx >= len(d_rows):
-            break
-        if compare_limit is not None and compared >= compare_limit:
-            break
-        q = q_rows[q_idx]
-        d = d_rows[d_idx]
-        q_compared_rows.append(q)
-        d_compared_rows.append(d)
-        ok, field, qv, dv = _cmp_commit(q, d)
-        if not ok:
-            # Bounded, local resync: skip known side-effect-free marker rows if
-            # the next row aligns exactly. This keeps compare strict for
-            # architectural WB/MEM/TRAP effects.
-            if _is_sideeffect_free_sysreg_marker(q) and (q_idx + 1) < len(q_rows):
-                next_q = q_rows[q_idx + 1]
-                ok_next, _, _, _ = _cmp_commit(next_q, d)
-                if ok_next:
-                    q_meta_skipped += 1
-                    q_idx += 1
-                    continue
-            if _is_sideeffect_free_sysreg_marker(d) and (d_idx + 1) < len(d_rows):
-                next_d = d_rows[d_idx + 1]
-                ok_next, _, _, _ = _cmp_commit(q, next_d)
-                if ok_next:
-                    d_meta_skipped += 1
-                    d_idx += 1
-                    continue
-            mismatches.append(
-                {
-                    "seq": d.seq,
-                    "field": field,
-                    "qemu": qv,
-                    "dut": dv,
-                    "qemu_pc": q.pc,
-                    "dut_pc": d.pc,
-                    "qemu_insn": _mask_insn(q.insn, q.length),
-                    "dut_insn": _mask_insn(d.insn, d.length),
-                    "qemu_row": _row_dict(q),
-                    "dut_row": _row_dict(d),
-                }
-            )
+    def _report_live(record: dict[str, Any]) -> None:
+        nonlocal reported_live
+        if not reported_live:
+            reported_live = True
+            _print_first_mismatch(record)
             if args.mode == "failfast":
-                break
-        compared += 1
-        q_idx += 1
-        d_idx += 1
+                # The verdict is in; stop the producers instead of letting
+                # them simulate past the divergence.
+                for pid in args.stop_pid:
+                    signal_tree(pid, getattr(signal, f"SIG{args.stop_signal}"))
 
-    q_rem_nonmeta = sum(1 for r in q_rows[q_idx:] if not _is_metadata_commit(r))
-    d_rem_nonmeta = sum(1 for r in d_rows[d_idx:] if not _is_metadata_commit(r))
-    if compare_limit is None:
-        if q_rem_nonmeta != 0 or d_rem_nonmeta != 0:
-            mismatches.append(
-                {
-                    "seq": compared if not d_compared_rows else d_compared_rows[-1].seq,
-                    "field": "trace_length",
-                    "qemu": q_rem_nonmeta,
-                    "dut": d_rem_nonmeta,
-                    "qemu_pc": q_compared_rows[-1].pc if q_compared_rows else 0,
-                    "dut_pc": d_compared_rows[-1].pc if d_compared_rows else 0,
-                    "qemu_insn": 0,
-                    "dut_insn": 0,
-                    "qemu_row": _row_dict(q_compared_rows[-1]) if q_compared_rows else {},
-                    "dut_row": _row_dict(d_compared_rows[-1]) if d_compared_rows else {},
-                }
-            )
+    sharded = (
+        jobs > 1
+        and limit == 0
+        and not args.follow
+        and not is_columnar_trace(qemu_trace)
+        and not is_columnar_trace(dut_trace)
+    )
+    if jobs > 1 and not sharded:
+        print(
+            "note: --jobs needs --max-commits 0, complete JSONL traces and no --follow; comparing sequentially",
+            file=sys.stderr,
+        )
+    if sharded:
+        result, shards = compare_sharded(
+            qemu_trace, dut_trace, jobs=jobs, mode=args.mode, context_rows=max(args.context_rows, 0)
+        )
     else:
-        # Bounded compare window: QEMU can legitimately have extra tail rows
-        # because DUT halts at MAX_COMMITS while QEMU is sampled asynchronously.
-        # Only fail for DUT overflow or DUT early termination while QEMU still
-        # has architectural rows. If both metadata-filtered streams end
-        # together before `max_commits`, the caller provided a finite trace
-        # window and the compared prefix is complete.
-        dut_overflow = d_rem_nonmeta > 0
-        dut_terminated_before_qemu = q_rem_nonmeta > 0 and d_rem_nonmeta == 0 and compared < compare_limit
-        if dut_overflow or dut_terminated_before_qemu:
-            mismatches.append(
-                {
-                    "seq": compared if not d_compared_rows else d_compared_rows[-1].seq,
-                    "field": "trace_length",
-                    "qemu": q_rem_nonmeta,
-                    "dut": d_rem_nonmeta,
-                    "qemu_pc": q_compared_rows[-1].pc if q_compared_rows else 0,
-                    "dut_pc": d_compared_rows[-1].pc if d_compared_rows else 0,
-                    "qemu_insn": 0,
-                    "dut_insn": 0,
-                    "qemu_row": _row_dict(q_compared_rows[-1]) if q_compared_rows else {},
-                    "dut_row": _row_dict(d_compared_rows[-1]) if d_compared_rows else {},
-                }
+        if args.follow:
+            idle = max(args.follow_idle, 0.0)
+            q_cur = TraceCursor(
+                _iter_follow(qemu_trace, raw_limit, writer_pid=args.qemu_pid or None, idle_timeout=idle)
             )
+            d_cur = TraceCursor(_iter_follow(dut_trace, raw_limit, writer_pid=args.dut_pid or None, idle_timeout=idle))
+        elif args.stream:
+            q_cur = TraceCursor(_iter_trace(qemu_trace, raw_limit))
+            d_cur = TraceCursor(_iter_trace(dut_trace, raw_limit))
+        else:
+            q_cur = TraceCursor(_load_trace(qemu_trace, raw_limit))
+            d_cur = TraceCursor(_load_trace(dut_trace, raw_limit))
+        result = compare_streams(
+            q_cur,
+            d_cur,
+            limit=limit,
+            mode=args.mode,
+            context_rows=max(args.context_rows, 0),
+            drain_on_failfast=not stream,
+            on_mismatch=_report_live if stream else None,
+        )
+    mismatches = result.mismatches
+    compared = result.compared
+    q_meta_skipped = result.q_meta_skipped
+    d_meta_skipped = result.d_meta_skipped
+    q_cbstop = result.q_cbstop
+    d_cbstop = result.d_cbstop
 
-    q_cbstop = _cbstop_count(q_compared_rows)
-    d_cbstop = _cbstop_count(d_compared_rows)
     if q_cbstop == 0:
         inflation = math.inf if d_cbstop > 0 else 1.0
     else:
@@ -518,9 +1043,13 @@ def main() -> int:
         "max_commits": limit,
         "qemu_trace": str(qemu_trace),
         "dut_trace": str(dut_trace),
-        "qemu_rows": len(q_rows),
-        "dut_rows": len(d_rows),
+        "qemu_rows": result.q_rows,
+        "dut_rows": result.d_rows,
         "compared_rows": compared,
+        "stream": stream,
+        "follow": bool(args.follow),
+        "shards": shards,
+        "tail_checked": result.tail_checked,
         "qemu_meta_skipped": q_meta_skipped,
         "dut_meta_skipped": d_meta_skipped,
         "mismatch_count": len(mismatches),
@@ -537,6 +1066,15 @@ def main() -> int:
     report_json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
     mismatch_json.write_text(json.dumps(mismatches, indent=2) + "\n", encoding="utf-8")
 
+    triage_json = report_dir / "crosscheck_triage.json"
+    triage: dict[str, Any] | None = None
+    if args.triage and mismatches:
+        # Imported lazily: the triage module builds on this one and needs numpy.
+        from crosscheck_triage import render_markdown, triage_traces
+
+        triage = triage_traces(qemu_trace, dut_trace, max_commits=limit)
+        triage_json.write_text(json.dumps(triage, indent=2) + "\n", encoding="utf-8")
+
     md = []
     md.append("# QEMU vs LinxCore Cross-Check Report")
     md.append("")
@@ -544,8 +1082,8 @@ def main() -> int:
     md.append("")
     md.append(f"- Mode: `{args.mode}`")
     md.append(f"- Compared commits: `{compared}`")
-    md.append(f"- QEMU rows loaded: `{len(q_rows)}`")
-    md.append(f"- LinxCore rows loaded: `{len(d_rows)}`")
+    md.append(f"- QEMU rows loaded: `{result.q_rows}`")
+    md.append(f"- LinxCore rows loaded: `{result.d_rows}`")
     md.append(f"- Metadata skipped (QEMU): `{q_meta_skipped}`")
     md.append(f"- Metadata skipped (LinxCore): `{d_meta_skipped}`")
     md.append(f"- Mismatches: `{len(mismatches)}`")
@@ -575,27 +1113,22 @@ def main() -> int:
         if isinstance(first.get("dut_row"), dict) and first["dut_row"]:
             md.append(f"- dut_row: `{json.dumps(first['dut_row'], sort_keys=True)}`")
     md.append("")
+    if triage is not None:
+        md.extend(render_markdown(triage))
     md.append("## Files")
     md.append("")
     md.append(f"- Report JSON: `{report_json}`")
     md.append(f"- Mismatches JSON: `{mismatch_json}`")
+    if triage is not None:
+        md.append(f"- Triage JSON: `{triage_json}`")
     report_md.write_text("\n".join(md) + "\n", encoding="utf-8")
 
     print(f"report_json={report_json}")
     print(f"report_md={report_md}")
     print(f"mismatch_json={mismatch_json}")
     print(f"compared={compared} mismatches={len(mismatches)} cbstop_qemu={q_cbstop} cbstop_dut={d_cbstop}")
-    if mismatches:
-        first_mm = mismatches[0]
-        print("first_mismatch:")
-        print(
-            f"  seq={first_mm['seq']} field={first_mm['field']} "
-            f"qemu={_hex(int(first_mm['qemu']))} dut={_hex(int(first_mm['dut']))}"
-        )
-        if isinstance(first_mm.get("qemu_row"), dict) and first_mm["qemu_row"]:
-            print(f"  qemu_row={json.dumps(first_mm['qemu_row'], sort_keys=True)}")
-        if isinstance(first_mm.get("dut_row"), dict) and first_mm["dut_row"]:
-            print(f"  dut_row={json.dumps(first_mm['dut_row'], sort_keys=True)}")
+    if mismatches and not reported_live:
+        _print_first_mismatch(mismatches[0])
 
     if mismatches:
         if args.mode == "failfast":
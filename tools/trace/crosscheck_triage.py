@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""Divergence triage for QEMU vs LinxCore commit traces.
+
+A post-pass over the same two traces `crosscheck_qemu_linxcore.py` compares.
+Both are loaded into numpy u64 column arrays, metadata rows are dropped with a
+vectorized form of `_is_metadata_commit`, and the remaining rows are paired in
+lockstep exactly as `compare_streams` pairs them. Every `_cmp_commit` check then
+becomes one boolean column, so the whole trace is classified at once:
+
+    first divergence   earliest row where each field differs
+    by_field           mismatching rows by the first failing field
+    by_opcode/pc/reg   where the mismatches cluster (opcode from decode metadata)
+    misalignment       a constant row shift (dropped or extra retire rows) that
+                       makes the PCs line up again after the first PC mismatch
+    causal             the earliest wrong register write whose value reaches
+                       later mismatches through the register dataflow
+
+Causal roots follow QEMU's register dataflow: a mismatching row whose source
+register was last written by a mismatching write inherits that write's root.
+After a detected misalignment the pairing is meaningless, so causal analysis
+stops at the shift.
+
+Requires numpy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional for the rest of tools/trace
+    np = None  # type: ignore[assignment]
+
+from commit_columnar import U64_MASK, is_columnar_trace, open_columnar
+from crosscheck_qemu_linxcore import (
+    _is_bstart16,
+    _is_bstart32,
+    _is_bstart48,
+    _raw_window,
+)
+from common.decode16 import decode16_meta
+from common.decode32 import decode32_meta
+from common.decode48 import decode48_meta
+from common.decode64 import decode64_meta
+from trace_reader import COMMIT_FIELDS, commit_reader
+
+# `_cmp_commit` check order: the first failing entry names a row's mismatch.
+CHECK_FIELDS = (
+    "pc",
+    "len",
+    "insn",
+    "wb_valid",
+    "mem_valid",
+    "trap_valid",
+    "next_pc",
+    "wb_rd",
+    "wb_data",
+    "src0_valid",
+    "src0_reg",
+    "src0_data",
+    "src1_valid",
+    "src1_reg",
+    "src1_data",
+    "dst_valid",
+    "dst_reg",
+    "dst_data",
+    "mem_is_store",
+    "mem_addr",
+    "mem_size",
+    "mem_wdata",
+    "mem_rdata",
+    "trap_cause",
+    "traparg0",
+)
+# Register named by a register-carrying field (QEMU side).
+FIELD_REGISTER = {
+    "wb_rd": "wb_rd",
+    "wb_data": "wb_rd",
+    "src0_valid": "src0_reg",
+    "src0_reg": "src0_reg",
+    "src0_data": "src0_reg",
+    "src1_valid": "src1_reg",
+    "src1_reg": "src1_reg",
+    "src1_data": "src1_reg",
+    "dst_valid": "dst_reg",
+    "dst_reg": "dst_reg",
+    "dst_data": "dst_reg",
+}
+WRITE_FIELDS = ("wb_rd", "wb_data", "dst_valid", "dst_reg", "dst_data")
+MAX_SHIFT = 8
+SHIFT_WINDOW = 4096
+SHIFT_MIN_RATE = 0.9
+TOP = 10
+
+Columns = Dict[str, Any]
+
+
+def _need_numpy() -> None:
+    if np is None:
+        raise SystemExit("error: crosscheck triage needs numpy (pip install numpy)")
+
+
+def load_columns(path: Path, limit: int = 0) -> Columns:
+    """Commit trace as `{field: u64 array}` in `COMMIT_FIELDS` order (first `limit` rows when > 0)."""
+    _need_numpy()
+    if is_columnar_trace(path):
+        with open_columnar(path) as trace:
+            stop = min(limit, trace.rows) if limit > 0 else trace.rows
+            return {
+                name: np.array(trace.column(name)[:stop], dtype=np.uint64)
+                if name in trace.fields
+                else np.arange(stop, dtype=np.uint64)
+                for name in COMMIT_FIELDS
+            }
+    flat = array("Q")
+    for _, _, values in commit_reader().iter_file(path, limit=limit):
+        mark = len(flat)
+        try:
+            flat.extend(values)
+        except OverflowError:
+            del flat[mark:]
+            flat.extend(v & U64_MASK for v in values)
+    table = np.frombuffer(flat, dtype=np.uint64).reshape(-1, len(COMMIT_FIELDS))
+    return {name: table[:, i] for i, name in enumerate(COMMIT_FIELDS)}
+
+
+def _masked_insn(cols: Columns) -> Any:
+    length, insn = cols["len"], cols["insn"]
+    return np.where(
+        length == 2,
+        insn & 0xFFFF,
+        np.where(length == 4, insn & 0xFFFFFFFF, np.where(length == 6, insn & 0xFFFFFFFFFFFF, insn)),
+    )
+
+
+def _per_unique(mask: Any, values: Any, fn: Any) -> Any:
+    out = np.zeros(len(values), dtype=bool)
+    if mask.any():
+        uniq, inverse = np.unique(values[mask], return_inverse=True)
+        out[mask] = np.array([bool(fn(int(v))) for v in uniq], dtype=bool)[inverse]
+    return out
+
+
+def metadata_mask(cols: Columns) -> Any:
+    """Vectorized `crosscheck_qemu_linxcore._is_metadata_commit`."""
+    length, pc = cols["len"], cols["pc"]
+    insn = _masked_insn(cols)
+    no_effect = (
+        (cols["wb_valid"] == 0) & (cols["dst_valid"] == 0) & (cols["mem_valid"] == 0) & (cols["trap_valid"] == 0)
+    )
+    sequential = cols["next_pc"] == pc + length
+    zero = (length == 0) & (cols["insn"] == 0) & (pc == 0)
+    macro = (length == 4) & np.isin(insn & 0x707F, np.array([0x41, 0x1041, 0x2041, 0x3041], dtype=np.uint64))
+    cbstop = (length == 2) & (insn == 0)
+    sysreg = (length == 4) & ((insn & 0x7F) == 0x3B)
+    candidate = no_effect & sequential
+    bstart = (
+        _per_unique(candidate & (length == 2), insn, _is_bstart16)
+        | _per_unique(candidate & (length == 4), insn, _is_bstart32)
+        | _per_unique(candidate & (length == 6), insn, _is_bstart48)
+    )
+    return zero | (no_effect & ((sequential & (bstart | macro)) | cbstop | sysreg))
+
+
+def field_masks(q: Columns, d: Columns) -> Dict[str, Any]:
+    """One boolean column per `_cmp_commit` check, gated the way `_cmp_commit` gates it."""
+    qv = {
+        name: q[name] != 0
+        for name in ("wb_valid", "src0_valid", "src1_valid", "dst_valid", "mem_valid", "mem_is_store", "trap_valid")
+    }
+    dv = {name: d[name] != 0 for name in ("src0_valid", "src1_valid")}
+
+    def ne(name: str) -> Any:
+        return q[name] != d[name]
+
+    both0 = qv["src0_valid"] & dv["src0_valid"]
+    both1 = qv["src1_valid"] & dv["src1_valid"]
+    mem = qv["mem_valid"]
+    return {
+        "pc": ne("pc"),
+        "len": ne("len"),
+        "insn": _masked_insn(q) != _masked_insn(d),
+        "wb_valid": ne("wb_valid"),
+        "mem_valid": ne("mem_valid"),
+        "trap_valid": ne("trap_valid"),
+        "next_pc": ne("next_pc"),
+        "wb_rd": qv["wb_valid"] & ne("wb_rd"),
+        "wb_data": qv["wb_valid"] & ne("wb_data"),
+        "src0_valid": qv["src0_valid"] & ~dv["src0_valid"],
+        "src0_reg": both0 & ne("src0_reg"),
+        "src0_data": both0 & ne("src0_data"),
+        "src1_valid": qv["src1_valid"] & ~dv["src1_valid"],
+        "src1_reg": both1 & ne("src1_reg"),
+        "src1_data": both1 & ne("src1_data"),
+        "dst_valid": ne("dst_valid"),
+        "dst_reg": qv["dst_valid"] & ne("dst_reg"),
+        "dst_data": qv["dst_valid"] & ne("dst_data"),
+        "mem_is_store": mem & ne("mem_is_store"),
+        "mem_addr": mem & ne("mem_addr"),
+        "mem_size": mem & ne("mem_size"),
+        "mem_wdata": mem & qv["mem_is_store"] & ne("mem_wdata"),
+        "mem_rdata": mem & ~qv["mem_is_store"] & ne("mem_rdata"),
+        "trap_cause": qv["trap_valid"] & ne("trap_cause"),
+        "traparg0": qv["trap_valid"] & ne("traparg0"),
+    }
+
+
+def _opcode(insn: int, length: int) -> str:
+    decode = {2: decode16_meta, 4: decode32_meta, 6: decode48_meta, 8: decode64_meta}.get(length)
+    meta = decode(insn) if decode is not None else None
+    return meta.mnemonic if meta is not None else f"unknown{length * 8}"
+
+
+def _field_value(cols: Columns, field_name: str, row: int, insn: Any) -> int:
+    return int(insn[row]) if field_name == "insn" else int(cols[field_name][row])
+
+
+def _misalignment(q_pc: Any, d_pc: Any, start: int) -> Optional[Dict[str, Any]]:
+    """Best constant shift `k` with `q_pc[i] == d_pc[i + k]` from `start` on, if it clearly beats 0."""
+    end = min(len(q_pc), start + SHIFT_WINDOW)
+    rows = np.arange(start, end)
+    rates = {}
+    for k in range(-MAX_SHIFT, MAX_SHIFT + 1):
+        sel = rows[(rows + k >= 0) & (rows + k < len(d_pc))]
+        rates[k] = float(np.mean(q_pc[sel] == d_pc[sel + k])) if len(sel) else 0.0
+    best = max(sorted(rates, key=abs), key=lambda k: rates[k])
+    if best == 0 or rates[best] < SHIFT_MIN_RATE or rates[best] - rates[0] < 0.5:
+        return None
+    return {"shift": best, "start_row": start, "match_rate": rates[best], "unshifted_match_rate": rates[0]}
+
+
+def _producers(q: Columns, reads: Any, reg_field: str, valid_field: str) -> Any:
+    """Row of the last QEMU register write before each row in `reads` to its `reg_field` register (-1: none)."""
+    n = len(q["pc"])
+    writes = np.flatnonzero(q["dst_valid"] != 0)
+    out = np.full(len(reads), -1, dtype=np.int64)
+    if not len(writes) or not len(reads):
+        return out
+    regs, codes = np.unique(q["dst_reg"][writes], return_inverse=True)
+    keys = np.sort(codes.astype(np.int64) * (n + 1) + writes)
+    want = q[reg_field][reads]
+    pos = np.minimum(np.searchsorted(regs, want), len(regs) - 1)
+    known = (regs[pos] == want) & (q[valid_field][reads] != 0)
+    query = pos.astype(np.int64) * (n + 1) + reads.astype(np.int64)
+    hit = np.searchsorted(keys, query, side="left") - 1
+    found = known & (hit >= 0)
+    hit = np.maximum(hit, 0)
+    found &= keys[hit] // (n + 1) == pos
+    out[found] = keys[hit][found] % (n + 1)
+    return out
+
+
+def triage(q_all: Columns, d_all: Columns, *, max_commits: int = 0, top: int = TOP) -> Dict[str, Any]:
+    """Classify every lockstep mismatch between two loaded traces."""
+    _need_numpy()
+    q_keep = np.flatnonzero(~metadata_mask(q_all))
+    d_keep = np.flatnonzero(~metadata_mask(d_all))
+    n = min(len(q_keep), len(d_keep))
+    if max_commits > 0:
+        n = min(n, max_commits)
+    q = {name: col[q_keep[:n]] for name, col in q_all.items()}
+    d = {name: col[d_keep[:n]] for name, col in d_all.items()}
+    q_insn, d_insn = _masked_insn(q), _masked_insn(d)
+
+    masks = field_masks(q, d)
+    first_field = np.full(n, -1, dtype=np.int16)
+    for k, name in enumerate(CHECK_FIELDS):
+        first_field[(first_field < 0) & masks[name]] = k
+    rows = np.flatnonzero(first_field >= 0)
+    row_field = [CHECK_FIELDS[k] for k in first_field[rows].tolist()]
+
+    def describe(row: int, field_name: str) -> Dict[str, Any]:
+        return {
+            "row": row,
+            "seq": int(d["seq"][row]),
+            "pc": int(q["pc"][row]),
+            "opcode": _opcode(int(q_insn[row]), int(q["len"][row])),
+            "field": field_name,
+            "qemu": _field_value(q, field_name, row, q_insn),
+            "dut": _field_value(d, field_name, row, d_insn),
+        }
+
+    first_divergence = {}
+    for name in CHECK_FIELDS:
+        hits = np.flatnonzero(masks[name])
+        if len(hits):
+            first_divergence[name] = dict(describe(int(hits[0]), name), rows=int(len(hits)))
+
+    opcode_of = {}
+    for insn, length in set(zip(q_insn[rows].tolist(), q["len"][rows].tolist())):
+        opcode_of[insn, length] = _opcode(insn, length)
+    row_opcode = [opcode_of[key] for key in zip(q_insn[rows].tolist(), q["len"][rows].tolist())]
+    row_pc = q["pc"][rows].tolist()
+
+    by_opcode: Dict[str, Counter] = {}
+    by_pc: Dict[int, Counter] = {}
+    by_reg: Dict[int, Counter] = {}
+    for i, (row, name) in enumerate(zip(rows.tolist(), row_field)):
+        by_opcode.setdefault(row_opcode[i], Counter())[name] += 1
+        by_pc.setdefault(row_pc[i], Counter())[name] += 1
+        reg_field = FIELD_REGISTER.get(name)
+        if reg_field is not None:
+            by_reg.setdefault(int(q[reg_field][row]), Counter())[name] += 1
+
+    def ranked(groups: Dict[Any, Counter], key: str) -> List[Dict[str, Any]]:
+        out = [{key: k, "count": sum(c.values()), "fields": dict(c.most_common())} for k, c in groups.items()]
+        out.sort(key=lambda g: (-g["count"], g[key]))
+        return out[:top]
+
+    by_pc_list = ranked(by_pc, "pc")
+    pc_opcode = dict(zip(row_pc, row_opcode))
+    for group in by_pc_list:
+        group["opcode"] = pc_opcode[group["pc"]]
+
+    misalignment = None
+    pc_rows = np.flatnonzero(masks["pc"])
+    if len(pc_rows):
+        misalignment = _misalignment(q_all["pc"][q_keep], d_all["pc"][d_keep], int(pc_rows[0]))
+    if misalignment is not None:
+        start, shift = misalignment["start_row"], misalignment["shift"]
+        misalignment["start_seq"] = int(d["seq"][start])
+        if shift > 0:
+            extra = d_keep[start : start + shift]
+            misalignment["dut_extra_pcs"] = [int(v) for v in d_all["pc"][extra]]
+        else:
+            dropped = q_keep[start : start - shift]
+            misalignment["dut_missing_pcs"] = [int(v) for v in q_all["pc"][dropped]]
+
+    # Causal roots over the aligned prefix.
+    causal_end = misalignment["start_row"] if misalignment is not None else n
+    causal_rows = rows[rows < causal_end]
+    bad_write = np.zeros(n, dtype=bool)
+    for name in WRITE_FIELDS:
+        bad_write |= masks[name]
+    prod0 = _producers(q, causal_rows, "src0_reg", "src0_valid").tolist()
+    prod1 = _producers(q, causal_rows, "src1_reg", "src1_valid").tolist()
+    root: Dict[int, int] = {}
+    for row, p0, p1 in zip(causal_rows.tolist(), prod0, prod1):
+        r = row
+        for p in (p0, p1):
+            if p >= 0 and bad_write[p]:
+                r = min(r, root[p])
+        root[row] = r
+    downstream = Counter(r for row, r in root.items() if r != row)
+    field_at = dict(zip(rows.tolist(), row_field))
+    roots = [
+        dict(describe(r, field_at[r]), downstream=count)
+        for r, count in sorted(downstream.items(), key=lambda kv: (-kv[1], kv[0]))[:top]
+    ]
+    causal = None
+    feeding = [r for r in sorted(downstream) if bad_write[r]]
+    writes = [r for r in causal_rows.tolist() if bad_write[r]]
+    if feeding or writes:
+        r = feeding[0] if feeding else writes[0]
+        name = next(f for f in WRITE_FIELDS if masks[f][r])
+        causal = dict(describe(r, name), downstream=downstream.get(r, 0))
+        reg_field = FIELD_REGISTER[name]
+        causal["reg"] = int(q[reg_field][r])
+
+    return {
+        "qemu_rows": int(len(q_all["pc"])),
+        "dut_rows": int(len(d_all["pc"])),
+        "compared_rows": int(n),
+        "qemu_meta_skipped": int(len(q_all["pc"]) - len(q_keep)),
+        "dut_meta_skipped": int(len(d_all["pc"]) - len(d_keep)),
+        "mismatch_rows": int(len(rows)),
+        "by_field": dict(Counter(row_field).most_common()),
+        "first_divergence": first_divergence,
+        "by_opcode": ranked(by_opcode, "opcode"),
+        "by_pc": by_pc_list,
+        "by_register": ranked(by_reg, "reg"),
+        "misalignment": misalignment,
+        "causal": causal,
+        "roots": roots,
+    }
+
+
+def triage_traces(qemu_trace: Path, dut_trace: Path, *, max_commits: int = 0, top: int = TOP) -> Dict[str, Any]:
+    raw_limit = _raw_window(max_commits)
+    summary = triage(
+        load_columns(qemu_trace, raw_limit), load_columns(dut_trace, raw_limit), max_commits=max_commits, top=top
+    )
+    summary["qemu_trace"] = str(qemu_trace)
+    summary["dut_trace"] = str(dut_trace)
+    return summary
+
+
+def _hex(v: int) -> str:
+    return f"0x{v:x}"
+
+
+def _row_line(info: Dict[str, Any]) -> str:
+    return (
+        f"row `{info['row']}` seq `{info['seq']}` pc `{_hex(info['pc'])}` `{info['opcode']}` "
+        f"`{info['field']}` qemu=`{_hex(info['qemu'])}` dut=`{_hex(info['dut'])}`"
+    )
+
+
+def _fields_text(fields: Dict[str, int]) -> str:
+    return ", ".join(f"{name}={count}" for name, count in fields.items())
+
+
+def render_markdown(summary: Dict[str, Any]) -> List[str]:
+    """`## Divergence Triage` section for `crosscheck_report.md`."""
+    md = ["## Divergence Triage", ""]
+    md.append(f"- Compared rows: `{summary['compared_rows']}`")
+    md.append(f"- Mismatching rows: `{summary['mismatch_rows']}`")
+    if summary["by_field"]:
+        md.append(f"- By first failing field: {_fields_text(summary['by_field'])}")
+    mis = summary["misalignment"]
+    if mis is not None:
+        pcs = mis.get("dut_extra_pcs", mis.get("dut_missing_pcs", []))
+        what = "extra DUT rows" if mis["shift"] > 0 else "QEMU rows missing from DUT"
+        md.append(
+            f"- Misalignment: shift `{mis['shift']:+d}` from row `{mis['start_row']}` (seq `{mis['start_seq']}`), "
+            f"match rate `{mis['match_rate']:.3f}` vs `{mis['unshifted_match_rate']:.3f}` unshifted; "
+            f"{what}: {', '.join(f'`{_hex(pc)}`' for pc in pcs)}"
+        )
+    else:
+        md.append("- Misalignment: none detected")
+    causal = summary["causal"]
+    if causal is not None:
+        md.append(
+            f"- Earliest causal write: {_row_line(causal)} reg `{causal['reg']}`, "
+            f"feeds `{causal['downstream']}` later mismatches"
+        )
+    else:
+        md.append("- Earliest causal write: none (no register write differs in the aligned prefix)")
+    if summary["first_divergence"]:
+        md.append("")
+        md.append("### First Divergence Per Field")
+        md.append("")
+        for name, info in summary["first_divergence"].items():
+            md.append(f"- `{name}` ({info['rows']} rows): {_row_line(info)}")
+    for title, key, label in (
+        ("By Opcode", "by_opcode", lambda g: f"`{g['opcode']}`"),
+        ("By PC", "by_pc", lambda g: f"`{_hex(g['pc'])}` `{g['opcode']}`"),
+        ("By Register", "by_register", lambda g: f"r`{g['reg']}`"),
+    ):
+        if summary[key]:
+            md.append("")
+            md.append(f"### {title}")
+            md.append("")
+            for group in summary[key]:
+                md.append(f"- {label(group)}: `{group['count']}` ({_fields_text(group['fields'])})")
+    if summary["roots"]:
+        md.append("")
+        md.append("### Causal Roots")
+        md.append("")
+        for info in summary["roots"]:
+            md.append(f"- {_row_line(info)} -> `{info['downstream']}` downstream")
+    md.append("")
+    return md
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Classify QEMU vs LinxCore commit trace divergences (needs numpy).")
+    ap.add_argument("--qemu-trace", required=True, help="QEMU JSONL (or columnar .lxct) trace path")
+    ap.add_argument("--dut-trace", required=True, help="LinxCore TB JSONL (or columnar .lxct) trace path")
+    ap.add_argument("--max-commits", type=int, default=0, help="Compared-row window (0 = whole trace)")
+    ap.add_argument("--report-dir", default="", help="Output directory (default: DUT trace directory)")
+    ap.add_argument("--top", type=int, default=TOP, help=f"Groups listed per table (default: {TOP})")
+    args = ap.parse_args(argv)
+
+    _need_numpy()
+    qemu_trace = Path(args.qemu_trace)
+    dut_trace = Path(args.dut_trace)
+    for label, path in (("qemu", qemu_trace), ("dut", dut_trace)):
+        if not path.is_file():
+            raise SystemExit(f"error: missing {label} trace: {path}")
+    report_dir = Path(args.report_dir) if args.report_dir else dut_trace.parent
+    report_dir.mkdir(parents=True, exist_ok=True)
+    summary = triage_traces(qemu_trace, dut_trace, max_commits=max(args.max_commits, 0), top=max(args.top, 1))
+    out_json = report_dir / "crosscheck_triage.json"
+    out_md = report_dir / "crosscheck_triage.md"
+    out_json.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    md = ["# QEMU vs LinxCore Divergence Triage", ""] + render_markdown(summary)
+    out_md.write_text("\n".join(md), encoding="utf-8")
+    print(f"triage_json={out_json}")
+    print(f"triage_md={out_md}")
+    print(f"compared={summary['compared_rows']} mismatch_rows={summary['mismatch_rows']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
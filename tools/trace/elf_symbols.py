@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""Shared ELF symbolization for trace tools, cached on disk by ELF content.
+
+`load_elf_symbols(elf)` runs `objdump -d` and `nm -n` once per distinct ELF and
+tool build, then keeps the parsed tables under the cache root as
+`<key>.lxsym`, where the key covers the ELF's SHA-256 and the identity (path,
+size, mtime) of both tools. Layout (all integers little-endian):
+
+    magic      8 bytes   b"LXELFSYM"
+    version    u32       container version (currently 1)
+    hdr_len    u32       byte length of the JSON header that follows
+    header     hdr_len   UTF-8 JSON: schema, key inputs, section list
+    sections   back to back, in header order; `u64`/`u32` sections are packed
+               integer arrays, `text` sections are newline-joined UTF-8
+
+The tables are sorted by address and looked up with `bisect`, so a large SPEC
+ELF costs a few flat arrays instead of per-PC dicts. ELF hashes are memoized by
+path, size and mtime in `hashes.json`, so a warm lookup never rereads the ELF.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"LXELFSYM"
+VERSION = 1
+SCHEMA_ID = "linxcore.elf_symbols.v1"
+SUFFIX = ".lxsym"
+ENV_DIR = "LINXCORE_ELF_SYMBOL_CACHE"
+_DISABLED_VALUES = {"0", "off", "none", "false"}
+_PREAMBLE = struct.Struct("<8sII")
+_HASH_CHUNK = 1 << 20
+
+_SYMBOL_LINE = re.compile(r"^\s*([0-9A-Fa-f]+)\s+<([^>]+)>:\s*$")
+_INSN_LINE = re.compile(r"^\s*([0-9a-fA-F]+):\s*(.*)$")
+_HEX_TOKEN = re.compile(r"[0-9a-fA-F]+")
+_NM_LINE = re.compile(r"^\s*([0-9A-Fa-f]+)\s+[A-Za-z]\s+(\S+)\s*$")
+_WIDE_ALIAS_PREFIXES = ("FENTRY", "FEXIT", "FRET")
+
+
+def _fmt_hex(v: int) -> str:
+    return f"0x{int(v):X}"
+
+
+class AddrTable:
+    """Sorted address -> text table with dict-style `get`."""
+
+    def __init__(self, addrs: array, texts: List[str]) -> None:
+        self.addrs = addrs
+        self.texts = texts
+
+    @classmethod
+    def from_dict(cls, values: Dict[int, str]) -> "AddrTable":
+        addrs = sorted(values)
+        return cls(array("Q", addrs), [values[addr] for addr in addrs])
+
+    def __len__(self) -> int:
+        return len(self.addrs)
+
+    def __contains__(self, addr: object) -> bool:
+        return isinstance(addr, int) and self._find(addr) >= 0
+
+    def _find(self, addr: int) -> int:
+        if addr < 0:
+            return -1
+        idx = bisect.bisect_left(self.addrs, addr)
+        if idx < len(self.addrs) and self.addrs[idx] == addr:
+            return idx
+        return -1
+
+    def get(self, addr: int, default: str = "") -> str:
+        idx = self._find(addr)
+        return self.texts[idx] if idx >= 0 else default
+
+    def items(self) -> Iterator[Tuple[int, str]]:
+        return zip(self.addrs, self.texts)
+
+
+class AliasSpans:
+    """Halfword-aligned PCs inside an instruction, stored as [lo, hi) spans of one text."""
+
+    def __init__(self, lo: array, hi: array, text_ids: array, texts: List[str]) -> None:
+        self.lo = lo
+        self.hi = hi
+        self.text_ids = text_ids
+        self.texts = texts
+
+    @classmethod
+    def from_dict(cls, values: Dict[int, str]) -> "AliasSpans":
+        lo, hi, text_ids = array("Q"), array("Q"), array("I")
+        texts: List[str] = []
+        text_index: Dict[str, int] = {}
+        for addr in sorted(values):
+            text_id = text_index.setdefault(values[addr], len(texts))
+            if text_id == len(texts):
+                texts.append(values[addr])
+            if hi and hi[-1] == addr and text_ids[-1] == text_id:
+                hi[-1] = addr + 2
+            else:
+                lo.append(addr)
+                hi.append(addr + 2)
+                text_ids.append(text_id)
+        return cls(lo, hi, text_ids, texts)
+
+    def __len__(self) -> int:
+        return sum((hi - lo) // 2 for lo, hi in zip(self.lo, self.hi))
+
+    def get(self, addr: int, default: str = "") -> str:
+        if addr < 0:
+            return default
+        idx = bisect.bisect_right(self.lo, addr) - 1
+        if idx < 0 or addr >= self.hi[idx] or (addr - self.lo[idx]) & 1:
+            return default
+        return self.texts[self.text_ids[idx]]
+
+
+class ElfSymbols:
+    """Symbols and disassembly of one ELF."""
+
+    def __init__(
+        self,
+        sym_exact: Dict[int, str],
+        sym_sorted: List[Tuple[int, str]],
+        disasm: AddrTable,
+        disasm_alias: AliasSpans,
+    ) -> None:
+        self.sym_exact = sym_exact
+        self.sym_sorted = sym_sorted
+        self.sym_addrs = [addr for addr, _ in sym_sorted]
+        self.disasm = disasm
+        self.disasm_alias = disasm_alias
+
+    @classmethod
+    def empty(cls) -> "ElfSymbols":
+        return cls({}, [], AddrTable(array("Q"), []), AliasSpans(array("Q"), array("Q"), array("I"), []))
+
+    def pc_label(self, pc: int) -> str:
+        if pc < 0:
+            return "?"
+        pc_txt = _fmt_hex(pc)
+        if not self.sym_sorted:
+            return pc_txt
+        idx = bisect.bisect_right(self.sym_addrs, int(pc)) - 1
+        if idx < 0:
+            return pc_txt
+        base, name = self.sym_sorted[idx]
+        off = int(pc) - base
+        if off == 0:
+            return f"{pc_txt} <{name}>"
+        return f"{pc_txt} <{name}+0x{off:X}>"
+
+
+# -- tools -------------------------------------------------------------------
+
+
+def _resolve_tool(candidates: List[str]) -> Optional[str]:
+    for candidate in candidates:
+        if not candidate:
+            continue
+        path = Path(candidate)
+        if path.exists() and path.is_file():
+            return str(path)
+        resolved = shutil.which(candidate)
+        if resolved:
+            return resolved
+    return None
+
+
+def _in_repo_llvm_tool(name: str) -> str:
+    p = Path(__file__).resolve()
+    for _ in range(12):
+        cand = p / "compiler/llvm/build-linxisa-clang/bin" / name
+        if cand.is_file():
+            return str(cand)
+        if p.parent == p:
+            break
+        p = p.parent
+    return ""
+
+
+def _default_tool(env_name: str, llvm_name: str, gnu_name: str) -> Optional[str]:
+    return _resolve_tool(
+        [
+            (os.environ.get(env_name) or "").strip(),
+            _in_repo_llvm_tool(llvm_name),
+            str(Path.home() / "llvm-project/build-linxisa-clang/bin" / llvm_name),
+            llvm_name,
+            gnu_name,
+        ]
+    )
+
+
+def default_objdump() -> Optional[str]:
+    return _default_tool("LLVM_OBJDUMP", "llvm-objdump", "objdump")
+
+
+def default_nm() -> Optional[str]:
+    return _default_tool("LLVM_NM", "llvm-nm", "nm")
+
+
+def _tool_identity(tool: Optional[str]) -> List[Any]:
+    if not tool:
+        return []
+    try:
+        st = Path(tool).stat()
+    except OSError:
+        return [tool]
+    return [str(Path(tool).resolve()), st.st_size, st.st_mtime_ns]
+
+
+# -- parsing -------------------------------------------------------------------
+
+
+def _run_tool(cmd: List[str]) -> Optional[str]:
+    try:
+        return subprocess.check_output(cmd, text=True, stderr=subprocess.DEVNULL, errors="ignore")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_objdump(out: str) -> Tuple[Dict[int, str], Dict[int, str], Dict[int, str]]:
+    """Return (symbol labels, disasm by PC, alias PCs covered by an instruction's bytes)."""
+    sym_exact: Dict[int, str] = {}
+    disasm_by_pc: Dict[int, str] = {}
+    disasm_alias_by_pc: Dict[int, str] = {}
+    for line in out.splitlines():
+        match = _SYMBOL_LINE.match(line)
+        if match:
+            name = match.group(2).strip()
+            if name:
+                sym_exact[int(match.group(1), 16)] = name
+            continue
+        match = _INSN_LINE.match(line)
+        if not match:
+            continue
+        rest = match.group(2).strip()
+        if not rest:
+            continue
+        addr = int(match.group(1), 16)
+        toks = rest.split()
+        i = 0
+        while i < len(toks) and _HEX_TOKEN.fullmatch(toks[i]):
+            i += 1
+        if i >= len(toks):
+            continue
+        text = " ".join(toks[i:]).strip()
+        if text:
+            disasm_by_pc[addr] = text
+            for alias_addr in range(addr + 2, addr + i, 2):
+                disasm_alias_by_pc.setdefault(alias_addr, text)
+    return sym_exact, disasm_by_pc, disasm_alias_by_pc
+
+
+def parse_nm(out: str) -> List[Tuple[int, str]]:
+    sym_sorted: List[Tuple[int, str]] = []
+    for line in out.splitlines():
+        match = _NM_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(2).strip()
+        if name:
+            sym_sorted.append((int(match.group(1), 16), name))
+    return sym_sorted
+
+
+def _extend_aliases(disasm_by_pc: Dict[int, str], disasm_alias_by_pc: Dict[int, str]) -> None:
+    """Alias the halfwords up to the next instruction (8 bytes, 12 for block markers)."""
+    disasm_addrs = sorted(disasm_by_pc)
+    for idx, addr in enumerate(disasm_addrs):
+        text = disasm_by_pc[addr]
+        upper_mn = text.upper()
+        upper = addr + 8
+        if upper_mn.startswith(_WIDE_ALIAS_PREFIXES) or "BSTART" in upper_mn or "BSTOP" in upper_mn:
+            upper = addr + 12
+        if idx + 1 < len(disasm_addrs):
+            upper = min(upper, disasm_addrs[idx + 1])
+        for alias_addr in range(addr + 2, upper, 2):
+            if alias_addr not in disasm_by_pc:
+                disasm_alias_by_pc.setdefault(alias_addr, text)
+
+
+def build_elf_symbols(elf: Path, objdump: Optional[str], nm: Optional[str]) -> Tuple[ElfSymbols, bool]:
+    """Symbolize `elf` from scratch; the flag is False when a tool failed to run."""
+    ok = True
+    sym_exact: Dict[int, str] = {}
+    disasm_by_pc: Dict[int, str] = {}
+    disasm_alias_by_pc: Dict[int, str] = {}
+    sym_sorted: List[Tuple[int, str]] = []
+    if objdump:
+        out = _run_tool([objdump, "-d", str(elf)])
+        if out is None:
+            ok = False
+        else:
+            sym_exact, disasm_by_pc, disasm_alias_by_pc = parse_objdump(out)
+    if nm:
+        out = _run_tool([nm, "-n", "--defined-only", str(elf)])
+        if out is None:
+            ok = False
+        else:
+            sym_sorted = parse_nm(out)
+            for addr, name in sym_sorted:
+                sym_exact.setdefault(addr, name)
+    if not sym_sorted and sym_exact:
+        sym_sorted = sorted(sym_exact.items())
+    else:
+        sym_sorted.sort(key=lambda item: item[0])
+    _extend_aliases(disasm_by_pc, disasm_alias_by_pc)
+    symbols = ElfSymbols(
+        sym_exact, sym_sorted, AddrTable.from_dict(disasm_by_pc), AliasSpans.from_dict(disasm_alias_by_pc)
+    )
+    return symbols, ok
+
+
+# -- container -----------------------------------------------------------------
+
+
+def _u64(values: Any) -> bytes:
+    buf = array("Q", values)
+    if sys.byteorder != "little":
+        buf.byteswap()
+    return buf.tobytes()
+
+
+def _u32(values: Any) -> bytes:
+    buf = array("I", values)
+    if sys.byteorder != "little":
+        buf.byteswap()
+    return buf.tobytes()
+
+
+def _text(values: List[str]) -> bytes:
+    return "\n".join(values).encode("utf-8")
+
+
+def write_symbols(path: Path, symbols: ElfSymbols, key_inputs: Dict[str, Any]) -> None:
+    exact_addrs = sorted(symbols.sym_exact)
+    sections = [
+        ("disasm_addrs", "u64", len(symbols.disasm), _u64(symbols.disasm.addrs)),
+        ("disasm_texts", "text", len(symbols.disasm), _text(symbols.disasm.texts)),
+        ("alias_lo", "u64", len(symbols.disasm_alias.lo), _u64(symbols.disasm_alias.lo)),
+        ("alias_hi", "u64", len(symbols.disasm_alias.hi), _u64(symbols.disasm_alias.hi)),
+        ("alias_text_ids", "u32", len(symbols.disasm_alias.text_ids), _u32(symbols.disasm_alias.text_ids)),
+        ("alias_texts", "text", len(symbols.disasm_alias.texts), _text(symbols.disasm_alias.texts)),
+        ("exact_addrs", "u64", len(exact_addrs), _u64(exact_addrs)),
+        ("exact_names", "text", len(exact_addrs), _text([symbols.sym_exact[addr] for addr in exact_addrs])),
+        ("sorted_addrs", "u64", len(symbols.sym_sorted), _u64(addr for addr, _ in symbols.sym_sorted)),
+        ("sorted_names", "text", len(symbols.sym_sorted), _text([name for _, name in symbols.sym_sorted])),
+    ]
+    header = {
+        "schema": SCHEMA_ID,
+        "key": key_inputs,
+        "sections": [{"name": name, "kind": kind, "count": count, "bytes": len(data)} for name, kind, count, data in sections],
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    with os.fdopen(fd, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for _, _, _, data in sections:
+            f.write(data)
+    os.replace(tmp, path)
+
+
+def read_symbols(path: Path) -> ElfSymbols:
+    data = path.read_bytes()
+    if len(data) < _PREAMBLE.size:
+        raise ValueError(f"{path}: truncated symbol table")
+    magic, version, header_len = _PREAMBLE.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a v{VERSION} ELF symbol table")
+    header = json.loads(data[_PREAMBLE.size : _PREAMBLE.size + header_len].decode("utf-8"))
+    if header.get("schema") != SCHEMA_ID:
+        raise ValueError(f"{path}: unexpected schema {header.get('schema')!r}")
+    pos = _PREAMBLE.size + header_len
+    sections: Dict[str, Any] = {}
+    for section in header["sections"]:
+        end = pos + int(section["bytes"])
+        if end > len(data):
+            raise ValueError(f"{path}: truncated section {section['name']}")
+        raw = data[pos:end]
+        kind, count = section["kind"], int(section["count"])
+        if kind == "text":
+            value: Any = raw.decode("utf-8").split("\n") if count else []
+        else:
+            value = array("Q" if kind == "u64" else "I")
+            value.frombytes(raw)
+            if sys.byteorder != "little":
+                value.byteswap()
+        if len(value) != count:
+            raise ValueError(f"{path}: section {section['name']} holds {len(value)} items, expected {count}")
+        sections[section["name"]] = value
+        pos = end
+    return ElfSymbols(
+        dict(zip(sections["exact_addrs"], sections["exact_names"])),
+        list(zip(sections["sorted_addrs"], sections["sorted_names"])),
+        AddrTable(sections["disasm_addrs"], sections["disasm_texts"]),
+        AliasSpans(sections["alias_lo"], sections["alias_hi"], sections["alias_text_ids"], sections["alias_texts"]),
+    )
+
+
+# -- cache ---------------------------------------------------------------------
+
+
+def default_cache_dir() -> Path:
+    xdg = os.environ.get("XDG_CACHE_HOME", "").strip()
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "linxcore" / "elf-symbols"
+
+
+def cache_dir_from_env(cache_dir: str | Path | None = None) -> Optional[Path]:
+    """`cache_dir`, else $LINXCORE_ELF_SYMBOL_CACHE, else ~/.cache; None when disabled."""
+    if cache_dir is None or str(cache_dir) == "":
+        env_dir = os.environ.get(ENV_DIR, "").strip()
+        if env_dir.lower() in _DISABLED_VALUES:
+            return None
+        cache_dir = Path(env_dir) if env_dir else default_cache_dir()
+    return Path(os.path.expanduser(str(cache_dir)))
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _elf_sha256(cache_dir: Path, elf: Path) -> str:
+    """SHA-256 of `elf`, memoized by resolved path, size and mtime in `hashes.json`."""
+    resolved = elf.resolve()
+    st = resolved.stat()
+    stamp = [st.st_size, st.st_mtime_ns]
+    memo_path = cache_dir / "hashes.json"
+    try:
+        memo = json.loads(memo_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        memo = {}
+    known = memo.get(str(resolved))
+    if isinstance(known, dict) and known.get("stamp") == stamp:
+        return str(known["sha256"])
+    digest = file_sha256(resolved)
+    memo[str(resolved)] = {"stamp": stamp, "sha256": digest}
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".hashes.", dir=str(cache_dir))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(memo, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, memo_path)
+    except OSError:
+        pass
+    return digest
+
+
+def symbol_cache_path(cache_dir: Path, elf: Path, objdump: Optional[str], nm: Optional[str]) -> Tuple[Path, Dict[str, Any]]:
+    key_inputs = {
+        "elf_sha256": _elf_sha256(cache_dir, elf),
+        "objdump": _tool_identity(objdump),
+        "nm": _tool_identity(nm),
+    }
+    key = hashlib.sha256(json.dumps([SCHEMA_ID, key_inputs], sort_keys=True).encode("utf-8")).hexdigest()
+    return cache_dir / f"{key}{SUFFIX}", key_inputs
+
+
+def load_elf_symbols(
+    elf: Optional[Path],
+    *,
+    objdump: Optional[str] = None,
+    nm: Optional[str] = None,
+    cache_dir: str | Path | None = None,
+    use_cache: bool = True,
+) -> ElfSymbols:
+    """Symbols and disassembly for `elf`, from the cache when this ELF and toolchain were seen before.
+
+    `objdump`/`nm` override the default tool search ($LLVM_OBJDUMP/$LLVM_NM, the
+    in-repo LLVM build, ~/llvm-project, then PATH).
+    """
+    if elf is None or not Path(elf).is_file():
+        return ElfSymbols.empty()
+    elf = Path(elf)
+    objdump = (_resolve_tool([objdump]) or objdump) if objdump else default_objdump()
+    nm = (_resolve_tool([nm]) or nm) if nm else default_nm()
+    if not objdump and not nm:
+        return ElfSymbols.empty()
+    root = cache_dir_from_env(cache_dir) if use_cache else None
+    if root is None:
+        return build_elf_symbols(elf, objdump, nm)[0]
+    path, key_inputs = symbol_cache_path(root, elf, objdump, nm)
+    try:
+        return read_symbols(path)
+    except (OSError, ValueError, KeyError):
+        pass
+    symbols, ok = build_elf_symbols(elf, objdump, nm)
+    if ok:
+        try:
+            write_symbols(path, symbols, key_inputs)
+        except OSError:
+            pass
+    return symbols
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--elf", required=True, help="ELF to symbolize (warms the cache)")
+    ap.add_argument("--objdump", default="", help="objdump binary (default: LLVM_OBJDUMP, in-repo LLVM, PATH)")
+    ap.add_argument("--nm", default="", help="nm binary (default: LLVM_NM, in-repo LLVM, PATH)")
+    ap.add_argument("--cache-dir", default="", help=f"Cache root (default: ${ENV_DIR} or ~/.cache/linxcore/elf-symbols)")
+    ap.add_argument("--no-cache", action="store_true", help="Symbolize without reading or writing the cache")
+    args = ap.parse_args()
+
+    elf = Path(args.elf)
+    if not elf.is_file():
+        raise SystemExit(f"error: missing ELF: {elf}")
+    symbols = load_elf_symbols(
+        elf,
+        objdump=args.objdump or None,
+        nm=args.nm or None,
+        cache_dir=args.cache_dir or None,
+        use_cache=not args.no_cache,
+    )
+    print(
+        f"elf symbols: symbols={len(symbols.sym_sorted)} insns={len(symbols.disasm)} "
+        f"alias_spans={len(symbols.disasm_alias.lo)} elf={elf}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
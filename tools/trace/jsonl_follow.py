@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Tail JSONL traces while their writer is still running.
+
+`follow_lines` yields complete lines from a file that another process is
+appending to (the file may not exist yet). A trace is finished when its writer
+process has exited and every byte it wrote has been read, or - without a writer
+pid - when the file has not grown for `idle_timeout` seconds. Polling backs off
+from `POLL_MIN` to `POLL_MAX` seconds while the file is idle, so a slow
+simulator costs a few wakeups per second and a fast one is read at disk speed.
+
+`signal_tree` stops a producer together with its children: the simulators are
+launched through wrapper shells, which defer signals until their foreground
+child exits.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+POLL_MIN = 0.01
+POLL_MAX = 0.25
+IDLE_TIMEOUT = 30.0
+_CHUNK = 1 << 16
+
+
+def pid_alive(pid: int) -> bool:
+    """True while `pid` runs; an exited but unreaped (zombie) process counts as gone."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    # Wrapper shells reap their pipeline members only at `wait`, so the writer
+    # of a finished trace can linger as a zombie that still accepts signal 0.
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+        return stat.rsplit(")", 1)[1].split()[0] != "Z"
+    except (OSError, IndexError):
+        pass
+    try:
+        out = subprocess.run(["ps", "-o", "stat=", "-p", str(pid)], stdout=subprocess.PIPE, text=True, check=False)
+    except OSError:
+        return True
+    state = out.stdout.strip()
+    return bool(state) and not state.startswith("Z")
+
+
+def follow_lines(
+    path: Path,
+    *,
+    writer_pid: Optional[int] = None,
+    idle_timeout: float = IDLE_TIMEOUT,
+) -> Iterator[bytes]:
+    """Yield lines of `path` (without the newline) as they are appended."""
+    path = Path(path)
+    delay = POLL_MIN
+    idle_since = time.monotonic()
+
+    def finished() -> bool:
+        if writer_pid is not None:
+            return not pid_alive(writer_pid)
+        return idle_timeout > 0 and time.monotonic() - idle_since >= idle_timeout
+
+    while not path.exists():
+        if finished():
+            raise SystemExit(f"error: trace never appeared: {path}")
+        time.sleep(delay)
+        delay = min(delay * 2, POLL_MAX)
+
+    pending = b""
+    with path.open("rb") as f:
+        while True:
+            # Sample liveness before reading: whatever the writer produced
+            # before exiting is then guaranteed to be seen by this read.
+            done = finished()
+            chunk = f.read(_CHUNK)
+            if chunk:
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                yield from lines
+                delay = POLL_MIN
+                idle_since = time.monotonic()
+                continue
+            if done:
+                if pending:
+                    yield pending
+                return
+            time.sleep(delay)
+            delay = min(delay * 2, POLL_MAX)
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        out = subprocess.run(["pgrep", "-P", str(pid)], stdout=subprocess.PIPE, text=True, check=False).stdout
+    except OSError:
+        return []
+    return [int(tok) for tok in out.split()]
+
+
+def signal_tree(pid: int, sig: int = signal.SIGTERM) -> None:
+    """Send `sig` to `pid` and all of its descendants (children first)."""
+    order: List[int] = []
+    stack = [pid]
+    while stack:
+        cur = stack.pop()
+        order.append(cur)
+        stack.extend(_children(cur))
+    for cur in reversed(order):
+        try:
+            os.kill(cur, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
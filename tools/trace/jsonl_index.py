@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Line-offset sidecar index for random-access windows over JSONL traces.
+
+A trace `foo.jsonl` gets a sidecar `foo.jsonl.idx` (all integers little-endian):
+
+    magic        8 bytes   b"LXJSONIX"
+    version      u32       index version (currently 1)
+    flags        u32       bit 0: dense (the source has no blank lines)
+    source_size  u64       byte size of the source when the index was built
+    source_mtime u64       st_mtime_ns of the source when the index was built
+    rows         u64       number of non-blank lines
+    end          u64       byte offset just past the last non-blank line
+    padding      to 64 bytes
+    offsets      `rows` u64 byte offsets, one per non-blank line
+
+Rows are counted the way the trace tools already count them: blank lines are
+skipped. The index is rebuilt whenever the source size or mtime no longer
+match, so a trace rewritten in place is never served from a stale sidecar.
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGIC = b"LXJSONIX"
+VERSION = 1
+SUFFIX = ".idx"
+FLAG_DENSE = 1
+_HEADER = struct.Struct("<8sIIQQQQ")
+_HEADER_BYTES = 64
+_COPY_CHUNK = 1 << 24
+
+
+def index_path(source: Path) -> Path:
+    return source.with_name(source.name + SUFFIX)
+
+
+def _u64_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array("Q", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class JsonlIndex:
+    """Row offsets of one JSONL trace, loaded from (or written to) its sidecar."""
+
+    def __init__(self, source: Path, offsets: array | memoryview, end: int, dense: bool) -> None:
+        self.source = Path(source)
+        self.offsets = offsets
+        self.end = end
+        self.dense = dense
+
+    @property
+    def rows(self) -> int:
+        return len(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @classmethod
+    def open(cls, source: Path, *, persist: bool = True) -> "JsonlIndex":
+        """Load the sidecar for `source`, rebuilding it when missing or stale.
+
+        With `persist`, a rebuilt index is written next to the source; a
+        read-only trace directory just keeps the index in memory.
+        """
+        source = Path(source)
+        st = source.stat()
+        loaded = cls._load(source, st)
+        if loaded is not None:
+            return loaded
+        index = cls.build(source)
+        if persist:
+            try:
+                index.write(st)
+            except OSError:
+                pass
+        return index
+
+    @classmethod
+    def build(cls, source: Path) -> "JsonlIndex":
+        offsets = array("Q")
+        pos = 0
+        end = 0
+        dense = True
+        with Path(source).open("rb") as f:
+            for line in f:
+                if line.strip():
+                    offsets.append(pos)
+                    end = pos + len(line)
+                else:
+                    dense = False
+                pos += len(line)
+        return cls(source, offsets, end, dense)
+
+    @classmethod
+    def _load(cls, source: Path, st: os.stat_result) -> "JsonlIndex | None":
+        path = index_path(source)
+        try:
+            with path.open("rb") as f:
+                header = f.read(_HEADER_BYTES)
+                if len(header) < _HEADER_BYTES:
+                    return None
+                magic, version, flags, size, mtime_ns, rows, end = _HEADER.unpack_from(header)
+                if magic != MAGIC or version != VERSION or size != st.st_size or mtime_ns != st.st_mtime_ns:
+                    return None
+                if os.fstat(f.fileno()).st_size != _HEADER_BYTES + rows * 8:
+                    return None
+                if rows == 0:
+                    return cls(source, array("Q"), end, bool(flags & FLAG_DENSE))
+                if sys.byteorder != "little":
+                    offsets = array("Q")
+                    offsets.frombytes(f.read())
+                    offsets.byteswap()
+                    return cls(source, offsets, end, bool(flags & FLAG_DENSE))
+                # Map the offsets instead of reading them: a window only touches two.
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return None
+        return cls(source, memoryview(mm)[_HEADER_BYTES:].cast("Q"), end, bool(flags & FLAG_DENSE))
+
+    def write(self, st: os.stat_result | None = None) -> Path:
+        st = st or self.source.stat()
+        path = index_path(self.source)
+        header = _HEADER.pack(
+            MAGIC,
+            VERSION,
+            FLAG_DENSE if self.dense else 0,
+            st.st_size,
+            st.st_mtime_ns,
+            len(self.offsets),
+            self.end,
+        )
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            f.write(header.ljust(_HEADER_BYTES, b"\0"))
+            f.write(_u64_bytes(self.offsets))
+        os.replace(tmp, path)
+        return path
+
+    def _row_end(self, mm: mmap.mmap, row: int) -> int:
+        if self.dense:
+            return self.offsets[row + 1] if row + 1 < len(self.offsets) else self.end
+        newline = mm.find(b"\n", self.offsets[row])
+        return len(mm) if newline < 0 else newline + 1
+
+    def byte_ranges(self, mm: mmap.mmap, start: int, count: int) -> list[tuple[int, int]]:
+        """Coalesced [lo, hi) byte ranges holding rows [start, start + count)."""
+        stop = min(len(self.offsets), start + count)
+        if start >= stop:
+            return []
+        if self.dense:
+            return [(self.offsets[start], self._row_end(mm, stop - 1))]
+        ranges: list[tuple[int, int]] = []
+        for row in range(start, stop):
+            lo, hi = self.offsets[row], self._row_end(mm, row)
+            if ranges and ranges[-1][1] == lo:
+                ranges[-1] = (ranges[-1][0], hi)
+            else:
+                ranges.append((lo, hi))
+        return ranges
+
+    def copy_window(self, output: Path, *, start: int, count: int) -> int:
+        """Write rows [start, start + count) of the source to `output`; return rows written."""
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        rows = max(0, min(len(self.offsets), start + count) - start)
+        with self.source.open("rb") as src, output.open("wb") as dst:
+            if rows == 0:
+                return 0
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for lo, hi in self.byte_ranges(mm, start, count):
+                    _copy_range(src.fileno(), dst, mm, lo, hi)
+        return rows
+
+
+def _copy_range(src_fd: int, dst, mm: mmap.mmap, lo: int, hi: int) -> None:
+    """Copy source bytes [lo, hi) with `os.sendfile`, or from the mapping where it is unsupported."""
+    sendfile = getattr(os, "sendfile", None)
+    if sendfile is not None:
+        dst.flush()
+        pos = lo
+        try:
+            while pos < hi:
+                sent = sendfile(dst.fileno(), src_fd, pos, min(hi - pos, _COPY_CHUNK))
+                if sent == 0:
+                    raise OSError(errno.EIO, f"short sendfile at byte {pos}")
+                pos += sent
+        except OSError as exc:
+            # Platforms whose sendfile only targets sockets fail before copying anything.
+            if pos != lo or exc.errno not in (errno.EINVAL, errno.ENOTSOCK, errno.ENOSYS, errno.EOPNOTSUPP):
+                raise
+        else:
+            # sendfile advances the descriptor offset behind the buffered writer's back.
+            dst.seek(0, os.SEEK_END)
+            return
+    for pos in range(lo, hi, _COPY_CHUNK):
+        dst.write(mm[pos : min(hi, pos + _COPY_CHUNK)])
+
+
+def line_aligned_bounds(path: Path, parts: int) -> list[int]:
+    """Split `path` into up to `parts` byte ranges that start on line boundaries.
+
+    Returns ascending offsets `[0, ..., size]`; empty ranges are dropped, so a
+    small file may yield fewer parts.
+    """
+    size = path.stat().st_size
+    bounds = [0]
+    with path.open("rb") as f:
+        for i in range(1, max(parts, 1)):
+            f.seek(size * i // parts)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return bounds
+
+
+def row_count(path: Path) -> int:
+    """Number of non-blank lines in `path`, answered from its sidecar when current."""
+    return JsonlIndex.open(path).rows
+
+
+def copy_window(source: Path, output: Path, *, start: int, count: int) -> int:
+    return JsonlIndex.open(source).copy_window(output, start=start, count=count)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--input", required=True, help="Input JSONL trace")
+    ap.add_argument("--start", type=int, default=-1, help="First row of a window to extract")
+    ap.add_argument("--count", type=int, default=0, help="Rows in the window to extract")
+    ap.add_argument("--output", default="", help="Write the window here (requires --start)")
+    args = ap.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.is_file():
+        raise SystemExit(f"error: missing input trace: {input_path}")
+    index = JsonlIndex.open(input_path)
+    if args.start < 0:
+        print(f"jsonl index rows={index.rows} dense={int(index.dense)} index={index_path(input_path)}")
+        return 0
+    if not args.output:
+        raise SystemExit("error: --output is required with --start")
+    rows = index.copy_window(Path(args.output), start=args.start, count=args.count)
+    print(f"jsonl window rows={rows} start={args.start} output={args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
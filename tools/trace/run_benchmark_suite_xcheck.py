@@ -4,16 +4,25 @@ from __future__ import annotations
 import argparse
 import datetime as dt
 import json
+import math
 import os
 import shlex
 import shutil
+import signal
 import subprocess
 import sys
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX hosts
+    resource = None  # type: ignore[assignment]
+
 SCRIPT_DIR = Path(__file__).resolve().parent
 LINXCORE_ROOT = SCRIPT_DIR.parents[1]
 REPO_ROOT = LINXCORE_ROOT.parents[1]
@@ -23,31 +32,80 @@ QEMU_TRACE_RUNNER = LINXCORE_ROOT / "tools" / "qemu" / "run_qemu_commit_trace.sh
 TB_RUNNER = LINXCORE_ROOT / "tools" / "generate" / "run_linxcore_top_cpp.sh"
 CROSSCHECK = LINXCORE_ROOT / "tools" / "trace" / "crosscheck_qemu_linxcore.py"
 
+QEMU_TOOLS = LINXCORE_ROOT / "tools" / "qemu"
+if str(QEMU_TOOLS) not in sys.path:
+    sys.path.insert(0, str(QEMU_TOOLS))
+
+from qemu_trace_cache import QemuTraceCache, default_qemu_bin  # noqa: E402
+
 DEFAULT_BOOT_SP = 0x0000000007FEFFF0
+WALL_TIMES_SCHEMA = "linxcore-benchmark-suite-wall-times-v1"
 
 
 @dataclass
 class CommandResult:
     returncode: int
     log_path: Path
+    timed_out: bool = False
+
+
+@dataclass
+class ResourceCaps:
+    """Per-case limits: wall deadline (0 = none), address-space cap, CPU set."""
+
+    timeout_sec: float = 0.0
+    mem_mb: int = 0
+    cpus: tuple[int, ...] = ()
 
 
 def _utc_now() -> str:
     return dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%SZ")
 
 
-def _run_and_log(cmd: list[str], log_path: Path, *, env: dict[str, str] | None = None) -> CommandResult:
+def _apply_mem_cap(pid: int, mem_mb: int) -> None:
+    # Set on the spawned top-level process right away; everything it starts
+    # afterwards inherits the limit. Hosts without prlimit (macOS) skip it.
+    if mem_mb <= 0 or resource is None or not hasattr(resource, "prlimit"):
+        return
+    limit = mem_mb * 1024 * 1024
+    try:
+        resource.prlimit(pid, resource.RLIMIT_AS, (limit, limit))
+    except (OSError, ValueError):
+        pass
+
+
+def _run_and_log(
+    cmd: list[str],
+    log_path: Path,
+    *,
+    env: dict[str, str] | None = None,
+    timeout: float | None = None,
+    mem_mb: int = 0,
+) -> CommandResult:
     log_path.parent.mkdir(parents=True, exist_ok=True)
-    proc = subprocess.run(
+    timed_out = False
+    process = subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
-        check=False,
         env=env,
         text=True,
+        start_new_session=True,
     )
-    log_path.write_text(proc.stdout, encoding="utf-8")
-    return CommandResult(returncode=proc.returncode, log_path=log_path)
+    _apply_mem_cap(process.pid, mem_mb)
+    try:
+        stdout, _ = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            stdout, _ = process.communicate(timeout=5)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            stdout, _ = process.communicate()
+        stdout += f"\n[run_benchmark_suite_xcheck] killed after {timeout:.1f}s timeout\n"
+    log_path.write_text(stdout, encoding="utf-8")
+    return CommandResult(returncode=process.returncode, log_path=log_path, timed_out=timed_out)
 
 
 def _find_llvm_readelf() -> Path:
@@ -179,6 +237,368 @@ def _write_summary_md(path: Path, summary: dict[str, Any]) -> None:
     path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
 
+@dataclass
+class CaseJob:
+    index: int
+    case_id: str
+    row: dict[str, Any]
+    elf: Path
+    memh_path: Path
+    qemu_trace: Path
+    dut_trace: Path
+    report_dir: Path
+    qemu_args: list[str]
+    tb_env: dict[str, str] = field(default_factory=dict)
+
+
+def _prepare_case(idx: int, raw_case: Any, args: argparse.Namespace, out_dir: Path, readelf: Path) -> CaseJob:
+    if not isinstance(raw_case, dict):
+        raise SystemExit(f"error: suite case[{idx - 1}] must be object")
+
+    case_id = str(raw_case.get("id", "")).strip() or f"case_{idx:03d}"
+    bench = str(raw_case.get("bench", "")).strip() or case_id
+    case_dir = out_dir / case_id
+    report_dir = case_dir / "report"
+    logs_dir = case_dir / "logs"
+    case_dir.mkdir(parents=True, exist_ok=True)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    logs_dir.mkdir(parents=True, exist_ok=True)
+
+    elf_raw = raw_case.get("elf")
+    if not isinstance(elf_raw, str) or not elf_raw:
+        raise SystemExit(f"error: case {case_id}: missing elf path")
+    elf = Path(os.path.expanduser(elf_raw)).resolve()
+    if not elf.is_file():
+        raise SystemExit(f"error: case {case_id}: elf not found: {elf}")
+
+    boot_pc_raw = raw_case.get("boot_pc", "auto")
+    if isinstance(boot_pc_raw, str) and boot_pc_raw.lower() == "auto":
+        boot_pc = _entry_from_elf(readelf, elf)
+    else:
+        boot_pc = _parse_u64(f"{case_id}.boot_pc", boot_pc_raw)
+
+    boot_sp = _parse_u64(f"{case_id}.boot_sp", raw_case.get("boot_sp", DEFAULT_BOOT_SP))
+    case_max_commits = _parse_u64(
+        f"{case_id}.max_commits",
+        raw_case.get("max_commits", args.max_commits),
+    )
+    case_tb_max_cycles = _parse_u64(
+        f"{case_id}.tb_max_cycles",
+        raw_case.get("tb_max_cycles", args.tb_max_cycles),
+    )
+
+    qemu_args = _parse_qemu_args(raw_case.get("qemu_args"), elf)
+
+    memh_path = case_dir / "program.memh"
+    qemu_trace = case_dir / "qemu_trace.jsonl"
+    dut_trace = case_dir / "dut_trace.jsonl"
+
+    row: dict[str, Any] = {
+        "id": case_id,
+        "bench": bench,
+        "elf": str(elf),
+        "boot_pc": f"0x{boot_pc:x}",
+        "boot_sp": f"0x{boot_sp:x}",
+        "mode": args.mode,
+        "max_commits": case_max_commits,
+        "tb_max_cycles": case_tb_max_cycles,
+        "tags": raw_case.get("tags", []),
+        "status": "infra_fail",
+        "ok": False,
+        "parity_ok": False,
+        "infra_ok": False,
+        "compared_rows": 0,
+        "mismatch_count": 0,
+        "infra_reasons": [],
+        "artifacts": {
+            "case_dir": str(case_dir),
+            "memh": str(memh_path),
+            "qemu_trace": str(qemu_trace),
+            "dut_trace": str(dut_trace),
+            "crosscheck_report_json": str(report_dir / "crosscheck_report.json"),
+            "crosscheck_report_md": str(report_dir / "crosscheck_report.md"),
+            "crosscheck_mismatches_json": str(report_dir / "crosscheck_mismatches.json"),
+        },
+        "logs": {
+            "elf_to_memh": str(logs_dir / "elf_to_memh.log"),
+            "qemu_trace": str(logs_dir / "qemu_trace.log"),
+            "tb": str(logs_dir / "tb.log"),
+            "crosscheck": str(logs_dir / "crosscheck.log"),
+        },
+    }
+
+    tb_env = dict(os.environ)
+    tb_env.update(
+        {
+            "PYC_BOOT_PC": f"0x{boot_pc:x}",
+            "PYC_BOOT_SP": f"0x{boot_sp:x}",
+            "PYC_MAX_COMMITS": str(case_max_commits),
+            "PYC_MAX_CYCLES": str(case_tb_max_cycles),
+            "PYC_COMMIT_TRACE": str(dut_trace),
+            "PYC_QEMU_TRACE": str(qemu_trace),
+            "PYC_XCHECK_MODE": args.mode,
+            "PYC_XCHECK_MAX_COMMITS": str(case_max_commits),
+            "PYC_XCHECK_REPORT": str(report_dir / "crosscheck"),
+        }
+    )
+    if args.jobs != 1:
+        # Cases already run side by side; keep each text-trace conversion to one process.
+        tb_env.setdefault("PYC_TRACE_TEXT_JOBS", "1")
+    return CaseJob(
+        index=idx,
+        case_id=case_id,
+        row=row,
+        elf=elf,
+        memh_path=memh_path,
+        qemu_trace=qemu_trace,
+        dut_trace=dut_trace,
+        report_dir=report_dir,
+        qemu_args=qemu_args,
+        tb_env=tb_env,
+    )
+
+
+def _run_case(job: CaseJob, args: argparse.Namespace, caps: ResourceCaps) -> dict[str, Any]:
+    """Run one case's memh/QEMU/TB/crosscheck steps and classify the result."""
+    if caps.cpus and hasattr(os, "sched_setaffinity"):
+        # Affinity is per thread on Linux and inherited by children forked
+        # from this worker thread.
+        os.sched_setaffinity(0, caps.cpus)
+    row = job.row
+    max_commits = int(row["max_commits"])
+    t0 = time.monotonic()
+    deadline = t0 + caps.timeout_sec if caps.timeout_sec > 0 else None
+    infra_reasons: list[str] = []
+
+    def run_step(step: str, cmd: list[str], env: dict[str, str] | None = None) -> CommandResult | None:
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                infra_reasons.append(f"{step}_timeout")
+                return None
+        res = _run_and_log(cmd, Path(row["logs"][step]), env=env, timeout=timeout, mem_mb=caps.mem_mb)
+        if res.timed_out:
+            infra_reasons.append(f"{step}_timeout")
+        return res
+
+    memh_res = run_step("elf_to_memh", ["bash", str(ELF_TO_MEMH), str(job.elf), str(job.memh_path)])
+    if memh_res is not None:
+        row["elf_to_memh_rc"] = memh_res.returncode
+        if memh_res.returncode != 0 or not job.memh_path.is_file():
+            infra_reasons.append("elf_to_memh_failed")
+
+    cache: QemuTraceCache | None = args.qemu_cache
+    qemu_bin = default_qemu_bin()
+    qemu_key = None
+    row["qemu_cache"] = "off"
+    if not infra_reasons and cache is not None and qemu_bin.is_file():
+        qemu_key = cache.trace_key(elf=job.elf, qemu_args=job.qemu_args, qemu_bin=qemu_bin)
+        cached_rows = cache.fetch(qemu_key, job.qemu_trace)
+        row["qemu_cache"] = "miss" if cached_rows is None else "hit"
+        if cached_rows is not None:
+            Path(row["logs"]["qemu_trace"]).write_text(
+                f"qemu-trace-cache hit key={qemu_key} rows={cached_rows} root={cache.root}\n",
+                encoding="utf-8",
+            )
+            row["qemu_rc"] = 0
+            row["qemu_args"] = job.qemu_args
+
+    if not infra_reasons and row["qemu_cache"] != "hit":
+        qemu_cmd = [
+            "bash",
+            str(QEMU_TRACE_RUNNER),
+            "--elf",
+            str(job.elf),
+            "--out",
+            str(job.qemu_trace),
+        ]
+        if args.qemu_max_seconds > 0:
+            qemu_cmd.extend(["--max-seconds", str(args.qemu_max_seconds)])
+        qemu_cmd.append("--")
+        qemu_cmd.extend(job.qemu_args)
+        qemu_res = run_step("qemu_trace", qemu_cmd)
+        if qemu_res is not None:
+            row["qemu_rc"] = qemu_res.returncode
+            row["qemu_args"] = job.qemu_args
+            if qemu_res.returncode != 0:
+                infra_reasons.append("qemu_trace_failed")
+            if not job.qemu_trace.is_file() or job.qemu_trace.stat().st_size == 0:
+                infra_reasons.append("qemu_trace_missing")
+            elif qemu_key is not None and qemu_res.returncode == 0 and not qemu_res.timed_out:
+                # A clean exit means QEMU ran the program to completion.
+                cache.store(qemu_key, job.qemu_trace, complete=True)
+
+    tb_rc: int | None = None
+    if not infra_reasons:
+        tb_res = run_step("tb", ["bash", str(TB_RUNNER), str(job.memh_path)], env=job.tb_env)
+        if tb_res is not None:
+            tb_rc = tb_res.returncode
+            row["tb_rc"] = tb_rc
+            if not job.dut_trace.is_file() or job.dut_trace.stat().st_size == 0:
+                infra_reasons.append("dut_trace_missing")
+
+    compare_report_json = Path(row["artifacts"]["crosscheck_report_json"])
+    compare_rc = None
+    mismatch_count = 0
+    compared_rows = 0
+
+    if not infra_reasons:
+        compare_cmd = [
+            sys.executable,
+            str(CROSSCHECK),
+            "--qemu-trace",
+            str(job.qemu_trace),
+            "--dut-trace",
+            str(job.dut_trace),
+            "--mode",
+            args.mode,
+            "--max-commits",
+            str(max_commits),
+            "--report-dir",
+            str(job.report_dir),
+        ]
+        compare_res = run_step("crosscheck", compare_cmd)
+        if compare_res is not None:
+            compare_rc = compare_res.returncode
+            row["crosscheck_rc"] = compare_rc
+
+            if compare_report_json.is_file():
+                try:
+                    report_obj = json.loads(compare_report_json.read_text(encoding="utf-8"))
+                except json.JSONDecodeError:
+                    infra_reasons.append("crosscheck_report_invalid")
+                    report_obj = {}
+
+                mismatch_count = int(report_obj.get("mismatch_count", 0)) if report_obj else 0
+                compared_rows = int(report_obj.get("compared_rows", report_obj.get("compared", 0))) if report_obj else 0
+            else:
+                infra_reasons.append("crosscheck_report_missing")
+
+            if compare_rc not in {0, None} and mismatch_count == 0:
+                infra_reasons.append("crosscheck_failed")
+
+            if tb_rc not in {0, None} and mismatch_count == 0:
+                infra_reasons.append("tb_failed")
+
+    parity_fail = mismatch_count > 0
+    infra_fail = len(infra_reasons) > 0
+
+    row["compared_rows"] = compared_rows
+    row["mismatch_count"] = mismatch_count
+    row["infra_reasons"] = infra_reasons
+    row["wall_sec"] = round(time.monotonic() - t0, 3)
+
+    if infra_fail:
+        row["status"] = "infra_fail"
+        row["ok"] = False
+        row["infra_ok"] = False
+        row["parity_ok"] = False
+    elif parity_fail:
+        row["status"] = "parity_fail"
+        row["ok"] = False
+        row["infra_ok"] = True
+        row["parity_ok"] = False
+    else:
+        row["status"] = "ok"
+        row["ok"] = True
+        row["infra_ok"] = True
+        row["parity_ok"] = True
+    return row
+
+
+def _load_wall_times(path: Path) -> dict[str, float]:
+    if not path.is_file():
+        return {}
+    try:
+        obj = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    cases = obj.get("cases", {}) if isinstance(obj, dict) else {}
+    out: dict[str, float] = {}
+    for case_id, value in cases.items() if isinstance(cases, dict) else []:
+        if isinstance(value, (int, float)) and value >= 0:
+            out[str(case_id)] = float(value)
+    return out
+
+
+def _store_wall_times(path: Path, history: dict[str, float], rows: list[dict[str, Any]]) -> None:
+    merged = dict(history)
+    for row in rows:
+        if "wall_sec" in row:
+            merged[str(row["id"])] = float(row["wall_sec"])
+    payload = {"schema_version": WALL_TIMES_SCHEMA, "updated_at_utc": _utc_now(), "cases": merged}
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _schedule_order(jobs: list[CaseJob], history: dict[str, float]) -> list[CaseJob]:
+    """Longest-first by historical wall time; cases never timed go first, in suite order."""
+    return sorted(jobs, key=lambda job: (-history.get(job.case_id, math.inf), job.index))
+
+
+def _cpu_slots(workers: int, pin: bool) -> list[tuple[int, ...]]:
+    if not pin or not hasattr(os, "sched_getaffinity"):
+        return [() for _ in range(workers)]
+    cpus = sorted(os.sched_getaffinity(0))
+    if workers >= len(cpus):
+        return [(cpus[i % len(cpus)],) for i in range(workers)]
+    per = len(cpus) // workers
+    return [tuple(cpus[i * per : (i + 1) * per]) for i in range(workers)]
+
+
+def _run_jobs(
+    jobs: list[CaseJob],
+    args: argparse.Namespace,
+    caps: ResourceCaps,
+    workers: int,
+) -> list[dict[str, Any]]:
+    """Run `jobs` on `workers` threads in the given order and stream progress.
+
+    Rows come back in suite order. Without --continue-on-fail the first
+    failing case stops new launches; cases already running still finish and
+    are reported.
+    """
+    slots = _cpu_slots(workers, args.pin_cpus)
+    free_slots = list(range(workers))
+    slot_lock = threading.Lock()
+    rows: dict[int, dict[str, Any]] = {}
+    total = len(jobs)
+    pending = list(jobs)
+    stop = False
+
+    def run(job: CaseJob) -> dict[str, Any]:
+        with slot_lock:
+            slot = free_slots.pop()
+        try:
+            job_caps = ResourceCaps(timeout_sec=caps.timeout_sec, mem_mb=caps.mem_mb, cpus=slots[slot])
+            return _run_case(job, args, job_caps)
+        finally:
+            with slot_lock:
+                free_slots.append(slot)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running: dict[Future[dict[str, Any]], CaseJob] = {}
+        while pending or running:
+            while pending and not stop and len(running) < workers:
+                job = pending.pop(0)
+                running[pool.submit(run, job)] = job
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                row = future.result()
+                rows[job.index] = row
+                print(
+                    f"[{len(rows)}/{total}] {job.case_id}: {row['status']} "
+                    f"wall={row.get('wall_sec', 0.0):.1f}s running={len(running)}",
+                    flush=True,
+                )
+                if row["status"] != "ok" and not args.continue_on_fail:
+                    stop = True
+    return [rows[index] for index in sorted(rows)]
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(description="Run generic benchmark suite QEMU<->LinxCore xcheck.")
     ap.add_argument("--suite", required=True, help="Suite JSON path")
@@ -189,6 +609,26 @@ def main(argv: list[str]) -> int:
     ap.add_argument("--mode", choices=("failfast", "diagnostic"), default="failfast")
     ap.add_argument("--report-only", action="store_true")
     ap.add_argument("--continue-on-fail", action="store_true")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Cases run concurrently (0 = CPU count). With >1, cases start longest-first by recorded wall time.",
+    )
+    ap.add_argument("--job-timeout", type=float, default=0.0, help="Per-case wall-time budget in seconds (0 = none)")
+    ap.add_argument("--job-mem-mb", type=int, default=0, help="Per-process address-space cap in MiB (0 = none)")
+    ap.add_argument("--pin-cpus", action="store_true", help="Give each worker a disjoint slice of the allowed CPUs")
+    ap.add_argument(
+        "--wall-times",
+        default="",
+        help="Historical per-case wall times used for ordering (default: <out-dir>/wall_times.json)",
+    )
+    ap.add_argument(
+        "--qemu-cache-dir",
+        default="",
+        help="QEMU reference-trace cache root (default: $LINXCORE_QEMU_TRACE_CACHE or ~/.cache/linxcore/qemu-traces)",
+    )
+    ap.add_argument("--no-qemu-cache", action="store_true", help="Always rerun QEMU; do not read or fill the trace cache")
     args = ap.parse_args(argv)
 
     if args.max_commits <= 0:
@@ -197,6 +637,12 @@ def main(argv: list[str]) -> int:
         raise SystemExit("error: --tb-max-cycles must be > 0")
     if args.qemu_max_seconds < 0:
         raise SystemExit("error: --qemu-max-seconds must be >= 0")
+    if args.jobs < 0:
+        raise SystemExit("error: --jobs must be >= 0")
+    if args.job_timeout < 0:
+        raise SystemExit("error: --job-timeout must be >= 0")
+    if args.job_mem_mb < 0:
+        raise SystemExit("error: --job-mem-mb must be >= 0")
 
     for required in (ELF_TO_MEMH, QEMU_TRACE_RUNNER, TB_RUNNER, CROSSCHECK):
         if not required.is_file():
@@ -213,219 +659,27 @@ def main(argv: list[str]) -> int:
 
     out_dir = Path(os.path.expanduser(args.out_dir)).resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
+    wall_times_path = Path(os.path.expanduser(args.wall_times)).resolve() if args.wall_times else out_dir / "wall_times.json"
 
     readelf = _find_llvm_readelf()
+    args.qemu_cache = QemuTraceCache.from_env(args.qemu_cache_dir or None, disabled=args.no_qemu_cache)
 
     started = _utc_now()
     t0 = time.monotonic()
 
-    case_rows: list[dict[str, Any]] = []
-    parity_failed = 0
-    infra_failed = 0
-    passed = 0
-
-    for idx, raw_case in enumerate(cases, start=1):
-        if not isinstance(raw_case, dict):
-            raise SystemExit(f"error: suite case[{idx - 1}] must be object")
-
-        case_id = str(raw_case.get("id", "")).strip() or f"case_{idx:03d}"
-        bench = str(raw_case.get("bench", "")).strip() or case_id
-        case_dir = out_dir / case_id
-        report_dir = case_dir / "report"
-        logs_dir = case_dir / "logs"
-        case_dir.mkdir(parents=True, exist_ok=True)
-        report_dir.mkdir(parents=True, exist_ok=True)
-        logs_dir.mkdir(parents=True, exist_ok=True)
-
-        elf_raw = raw_case.get("elf")
-        if not isinstance(elf_raw, str) or not elf_raw:
-            raise SystemExit(f"error: case {case_id}: missing elf path")
-        elf = Path(os.path.expanduser(elf_raw)).resolve()
-        if not elf.is_file():
-            raise SystemExit(f"error: case {case_id}: elf not found: {elf}")
-
-        boot_pc_raw = raw_case.get("boot_pc", "auto")
-        if isinstance(boot_pc_raw, str) and boot_pc_raw.lower() == "auto":
-            boot_pc = _entry_from_elf(readelf, elf)
-        else:
-            boot_pc = _parse_u64(f"{case_id}.boot_pc", boot_pc_raw)
-
-        boot_sp = _parse_u64(f"{case_id}.boot_sp", raw_case.get("boot_sp", DEFAULT_BOOT_SP))
-        case_max_commits = _parse_u64(
-            f"{case_id}.max_commits",
-            raw_case.get("max_commits", args.max_commits),
-        )
-        case_tb_max_cycles = _parse_u64(
-            f"{case_id}.tb_max_cycles",
-            raw_case.get("tb_max_cycles", args.tb_max_cycles),
-        )
-
-        qemu_args = _parse_qemu_args(raw_case.get("qemu_args"), elf)
-
-        memh_path = case_dir / "program.memh"
-        qemu_trace = case_dir / "qemu_trace.jsonl"
-        dut_trace = case_dir / "dut_trace.jsonl"
-
-        row: dict[str, Any] = {
-            "id": case_id,
-            "bench": bench,
-            "elf": str(elf),
-            "boot_pc": f"0x{boot_pc:x}",
-            "boot_sp": f"0x{boot_sp:x}",
-            "mode": args.mode,
-            "max_commits": case_max_commits,
-            "tb_max_cycles": case_tb_max_cycles,
-            "tags": raw_case.get("tags", []),
-            "status": "infra_fail",
-            "ok": False,
-            "parity_ok": False,
-            "infra_ok": False,
-            "compared_rows": 0,
-            "mismatch_count": 0,
-            "infra_reasons": [],
-            "artifacts": {
-                "case_dir": str(case_dir),
-                "memh": str(memh_path),
-                "qemu_trace": str(qemu_trace),
-                "dut_trace": str(dut_trace),
-                "crosscheck_report_json": str(report_dir / "crosscheck_report.json"),
-                "crosscheck_report_md": str(report_dir / "crosscheck_report.md"),
-                "crosscheck_mismatches_json": str(report_dir / "crosscheck_mismatches.json"),
-            },
-            "logs": {
-                "elf_to_memh": str(logs_dir / "elf_to_memh.log"),
-                "qemu_trace": str(logs_dir / "qemu_trace.log"),
-                "tb": str(logs_dir / "tb.log"),
-                "crosscheck": str(logs_dir / "crosscheck.log"),
-            },
-        }
-
-        infra_reasons: list[str] = []
-
-        memh_cmd = ["bash", str(ELF_TO_MEMH), str(elf), str(memh_path)]
-        memh_res = _run_and_log(memh_cmd, Path(row["logs"]["elf_to_memh"]))
-        row["elf_to_memh_rc"] = memh_res.returncode
-        if memh_res.returncode != 0 or not memh_path.is_file():
-            infra_reasons.append("elf_to_memh_failed")
-
-        if not infra_reasons:
-            qemu_cmd = [
-                "bash",
-                str(QEMU_TRACE_RUNNER),
-                "--elf",
-                str(elf),
-                "--out",
-                str(qemu_trace),
-            ]
-            if args.qemu_max_seconds > 0:
-                qemu_cmd.extend(["--max-seconds", str(args.qemu_max_seconds)])
-            qemu_cmd.append("--")
-            qemu_cmd.extend(qemu_args)
-            qemu_res = _run_and_log(qemu_cmd, Path(row["logs"]["qemu_trace"]))
-            row["qemu_rc"] = qemu_res.returncode
-            row["qemu_args"] = qemu_args
-            if qemu_res.returncode != 0:
-                infra_reasons.append("qemu_trace_failed")
-            if not qemu_trace.is_file() or qemu_trace.stat().st_size == 0:
-                infra_reasons.append("qemu_trace_missing")
-
-        tb_env = dict(os.environ)
-        tb_env.update(
-            {
-                "PYC_BOOT_PC": f"0x{boot_pc:x}",
-                "PYC_BOOT_SP": f"0x{boot_sp:x}",
-                "PYC_MAX_COMMITS": str(case_max_commits),
-                "PYC_MAX_CYCLES": str(case_tb_max_cycles),
-                "PYC_COMMIT_TRACE": str(dut_trace),
-                "PYC_QEMU_TRACE": str(qemu_trace),
-                "PYC_XCHECK_MODE": args.mode,
-                "PYC_XCHECK_MAX_COMMITS": str(case_max_commits),
-                "PYC_XCHECK_REPORT": str(report_dir / "crosscheck"),
-            }
-        )
-
-        tb_rc: int | None = None
-        if not infra_reasons:
-            tb_cmd = ["bash", str(TB_RUNNER), str(memh_path)]
-            tb_res = _run_and_log(tb_cmd, Path(row["logs"]["tb"]), env=tb_env)
-            tb_rc = tb_res.returncode
-            row["tb_rc"] = tb_rc
-            if not dut_trace.is_file() or dut_trace.stat().st_size == 0:
-                infra_reasons.append("dut_trace_missing")
-
-        compare_report_json = Path(row["artifacts"]["crosscheck_report_json"])
-        compare_rc = None
-        mismatch_count = 0
-        compared_rows = 0
-
-        if not infra_reasons:
-            compare_cmd = [
-                sys.executable,
-                str(CROSSCHECK),
-                "--qemu-trace",
-                str(qemu_trace),
-                "--dut-trace",
-                str(dut_trace),
-                "--mode",
-                args.mode,
-                "--max-commits",
-                str(case_max_commits),
-                "--report-dir",
-                str(report_dir),
-            ]
-            compare_res = _run_and_log(compare_cmd, Path(row["logs"]["crosscheck"]))
-            compare_rc = compare_res.returncode
-            row["crosscheck_rc"] = compare_rc
-
-            if compare_report_json.is_file():
-                try:
-                    report_obj = json.loads(compare_report_json.read_text(encoding="utf-8"))
-                except json.JSONDecodeError:
-                    infra_reasons.append("crosscheck_report_invalid")
-                    report_obj = {}
-
-                mismatch_count = int(report_obj.get("mismatch_count", 0)) if report_obj else 0
-                compared_rows = int(report_obj.get("compared_rows", report_obj.get("compared", 0))) if report_obj else 0
-            else:
-                infra_reasons.append("crosscheck_report_missing")
-
-            if compare_rc not in {0, None} and mismatch_count == 0:
-                infra_reasons.append("crosscheck_failed")
-
-            if tb_rc not in {0, None} and mismatch_count == 0:
-                infra_reasons.append("tb_failed")
+    jobs = [_prepare_case(idx, raw_case, args, out_dir, readelf) for idx, raw_case in enumerate(cases, start=1)]
+    workers = min(args.jobs or (os.cpu_count() or 1), len(jobs))
+    history = _load_wall_times(wall_times_path)
+    order = _schedule_order(jobs, history) if workers > 1 else jobs
+    caps = ResourceCaps(timeout_sec=args.job_timeout, mem_mb=args.job_mem_mb)
+    print(f"scheduling cases={len(jobs)} jobs={workers}", flush=True)
 
-        parity_fail = mismatch_count > 0
-        infra_fail = len(infra_reasons) > 0
-
-        row["compared_rows"] = compared_rows
-        row["mismatch_count"] = mismatch_count
-        row["infra_reasons"] = infra_reasons
-
-        if infra_fail:
-            row["status"] = "infra_fail"
-            row["ok"] = False
-            row["infra_ok"] = False
-            row["parity_ok"] = False
-            infra_failed += 1
-        elif parity_fail:
-            row["status"] = "parity_fail"
-            row["ok"] = False
-            row["infra_ok"] = True
-            row["parity_ok"] = False
-            parity_failed += 1
-        else:
-            row["status"] = "ok"
-            row["ok"] = True
-            row["infra_ok"] = True
-            row["parity_ok"] = True
-            passed += 1
-
-        case_rows.append(row)
-
-        if row["status"] != "ok" and not args.continue_on_fail:
-            break
+    case_rows = _run_jobs(order, args, caps, workers)
+    _store_wall_times(wall_times_path, history, case_rows)
 
+    passed = sum(1 for row in case_rows if row["status"] == "ok")
+    parity_failed = sum(1 for row in case_rows if row["status"] == "parity_fail")
+    infra_failed = sum(1 for row in case_rows if row["status"] == "infra_fail")
     total = len(case_rows)
     summary_ok = (parity_failed == 0) and (infra_failed == 0)
     infra_ok = infra_failed == 0
@@ -438,6 +692,8 @@ def main(argv: list[str]) -> int:
         "mode": args.mode,
         "report_only": bool(args.report_only),
         "continue_on_fail": bool(args.continue_on_fail),
+        "jobs": workers,
+        "qemu_cache_dir": str(args.qemu_cache.root) if args.qemu_cache is not None else "",
         "started_at_utc": started,
         "finished_at_utc": _utc_now(),
         "elapsed_sec": round(time.monotonic() - t0, 3),
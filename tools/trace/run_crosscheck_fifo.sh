@@ -23,6 +23,7 @@ else
 fi
 QEMU_MAX_SECONDS="${QEMU_MAX_SECONDS:-0}"
 QEMU_MEMORY="${QEMU_MEMORY:-128M}"
+FOLLOW=0
 LLVM_READELF="${LLVM_READELF:-${LINX_ROOT}/compiler/llvm/build-linxisa-clang/bin/llvm-readelf}"
 
 usage() {
@@ -40,9 +41,11 @@ Options:
   --qemu-bin <path>         QEMU binary path
   --qemu-max-seconds <int>  Timeout passed to QEMU trace runner (0 disables)
   --qemu-memory <size>      QEMU RAM size for direct-boot ELF images (default: 128M)
+  --follow                  Compare while both producers run; in failfast mode the
+                            first mismatch stops QEMU and the DUT
 
 Runs QEMU and LinxCore simultaneously using FIFOs, captures both traces,
-then runs tools/trace/crosscheck_qemu_linxcore.py.
+then runs tools/trace/crosscheck_qemu_linxcore.py (with --follow, alongside them).
 USAGE
 }
 
@@ -59,6 +62,7 @@ while [[ $# -gt 0 ]]; do
     --qemu-bin) QEMU_BIN="$2"; shift 2 ;;
     --qemu-max-seconds) QEMU_MAX_SECONDS="$2"; shift 2 ;;
     --qemu-memory) QEMU_MEMORY="$2"; shift 2 ;;
+    --follow) FOLLOW=1; shift ;;
     -h|--help) usage; exit 0 ;;
     *)
       echo "error: unknown arg: $1" >&2
@@ -162,6 +166,7 @@ cleanup() {
   if [[ -n "${dut_pid:-}" ]]; then kill "${dut_pid}" >/dev/null 2>&1 || true; fi
   if [[ -n "${reader_q_pid:-}" ]]; then kill "${reader_q_pid}" >/dev/null 2>&1 || true; fi
   if [[ -n "${reader_d_pid:-}" ]]; then kill "${reader_d_pid}" >/dev/null 2>&1 || true; fi
+  if [[ -n "${xcheck_pid:-}" ]]; then kill "${xcheck_pid}" >/dev/null 2>&1 || true; fi
   rm -f "${QEMU_FIFO}" "${DUT_FIFO}"
   if [[ "${created_tmp}" -eq 1 && ${rc} -eq 0 ]]; then
     :
@@ -204,6 +209,25 @@ PYC_TB_CXXFLAGS="${PYC_TB_CXXFLAGS:--O2 -g0}" \
   bash "${ROOT_DIR}/tools/generate/run_linxcore_top_cpp.sh" "${MEMH}" >/dev/null &
 dut_pid=$!
 
+xcheck_pid=""
+if [[ "${FOLLOW}" -eq 1 ]]; then
+  # The tee/head readers write the trace files, so their exit marks the end
+  # of each trace; the producers are what a failfast verdict stops.
+  mkdir -p "${REPORT_DIR}"
+  python3 "${ROOT_DIR}/tools/trace/crosscheck_qemu_linxcore.py" \
+    --qemu-trace "${QEMU_TRACE}" \
+    --dut-trace "${DUT_TRACE}" \
+    --mode "${MODE}" \
+    --max-commits "${MAX_COMMITS}" \
+    --report-dir "${REPORT_DIR}" \
+    --follow \
+    --qemu-pid "${reader_q_pid}" \
+    --dut-pid "${reader_d_pid}" \
+    --stop-pid "${dut_pid}" \
+    --stop-pid "${qemu_pid}" &
+  xcheck_pid=$!
+fi
+
 set +e
 wait "${dut_pid}"
 dut_rc=$?
@@ -229,6 +253,11 @@ wait "${reader_q_pid}"
 reader_q_rc=$?
 wait "${reader_d_pid}"
 reader_d_rc=$?
+xcheck_rc=0
+if [[ -n "${xcheck_pid}" ]]; then
+  wait "${xcheck_pid}"
+  xcheck_rc=$?
+fi
 set -e
 
 if [[ ! -s "${QEMU_TRACE}" ]]; then
@@ -250,22 +279,30 @@ if [[ "${reader_q_rc}" -ne 0 || "${reader_d_rc}" -ne 0 ]]; then
   echo "warn: FIFO reader exit status qemu=${reader_q_rc} dut=${reader_d_rc}" >&2
 fi
 
-mkdir -p "${REPORT_DIR}"
-python3 "${ROOT_DIR}/tools/trace/crosscheck_qemu_linxcore.py" \
-  --qemu-trace "${QEMU_TRACE}" \
-  --dut-trace "${DUT_TRACE}" \
-  --mode "${MODE}" \
-  --max-commits "${MAX_COMMITS}" \
-  --report-dir "${REPORT_DIR}"
+if [[ "${FOLLOW}" -eq 1 ]]; then
+  if [[ "${xcheck_rc}" -ne 0 ]]; then
+    exit "${xcheck_rc}"
+  fi
+else
+  mkdir -p "${REPORT_DIR}"
+  python3 "${ROOT_DIR}/tools/trace/crosscheck_qemu_linxcore.py" \
+    --qemu-trace "${QEMU_TRACE}" \
+    --dut-trace "${DUT_TRACE}" \
+    --mode "${MODE}" \
+    --max-commits "${MAX_COMMITS}" \
+    --report-dir "${REPORT_DIR}"
+fi
 
 python3 "${ROOT_DIR}/tools/trace/commit_jsonl_to_text.py" \
   --input "${QEMU_TRACE}" \
   --output "${QEMU_TRACE_TXT}" \
-  --objdump-elf "${ELF}" >/dev/null || true
+  --objdump-elf "${ELF}" \
+  --jobs "${PYC_TRACE_TEXT_JOBS:-0}" >/dev/null || true
 python3 "${ROOT_DIR}/tools/trace/commit_jsonl_to_text.py" \
   --input "${DUT_TRACE}" \
   --output "${DUT_TRACE_TXT}" \
-  --objdump-elf "${ELF}" >/dev/null || true
+  --objdump-elf "${ELF}" \
+  --jobs "${PYC_TRACE_TEXT_JOBS:-0}" >/dev/null || true
 
 echo "qemu_trace=${QEMU_TRACE}"
 echo "dut_trace=${DUT_TRACE}"
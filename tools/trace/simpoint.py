@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""SimPoint phase analysis over committed control-flow edges.
+
+One streaming pass turns a commit trace into per-interval basic-block vectors
+(BBVs). Each distinct ``(pc, next_pc)`` edge gets a dense integer id. When an
+interval closes, its sparse edge counts are normalized and random-projected to
+``dim`` dimensions. Memory therefore grows with the number of intervals and
+distinct edges, never with trace length. The projected points are clustered
+with k-means for k = 1..max_k; the smallest k whose BIC reaches
+``bic_threshold`` of the observed BIC range wins, and the interval nearest each
+centroid becomes that phase's simulation point, weighted by its cluster's
+share of commits.
+
+numpy is used when installed: columnar traces are consumed in vectorized
+chunks and k-means runs on matrices. Without numpy the same algorithm runs in
+pure Python, which is fine for short traces.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Sequence, TextIO
+
+from commit_columnar import is_columnar_trace, open_columnar
+from trace_reader import TypedRowReader
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None  # type: ignore[assignment]
+
+DEFAULT_DIM = 15
+DEFAULT_MAX_K = 30
+DEFAULT_BIC_THRESHOLD = 0.9
+KMEANS_INIT_SEEDS = 5
+KMEANS_MAX_ITERS = 100
+CHUNK_ROWS = 1 << 18
+_ASSIGN_BLOCK = 1 << 16
+_MIN_VARIANCE = 1e-12
+
+
+def _vectorized(use_numpy: bool | None) -> bool:
+    if use_numpy and np is None:
+        raise RuntimeError("numpy is not installed")
+    return np is not None if use_numpy is None else use_numpy
+
+
+def _unique_edges(pc: Any, next_pc: Any) -> tuple[Any, Any]:
+    """First-occurrence index per distinct (pc, next_pc) pair and each row's pair index."""
+    # Sorting one mixed u64 key is far cheaper than a structured-dtype unique;
+    # the exact pair check below catches (astronomically rare) key collisions.
+    with np.errstate(over="ignore"):
+        key = (pc * np.uint64(0x9E3779B97F4A7C15)) ^ next_pc
+    _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    rep = first[inverse]
+    if np.array_equal(pc[rep], pc) and np.array_equal(next_pc[rep], next_pc):
+        return first, inverse
+    pairs = np.empty(len(pc), dtype=[("pc", "<u8"), ("next_pc", "<u8")])
+    pairs["pc"] = pc
+    pairs["next_pc"] = next_pc
+    _, first, inverse = np.unique(pairs, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
+
+class BbvBuilder:
+    """Streams commits into projected per-interval BBVs.
+
+    ``points`` holds ``dim`` floats per closed interval; the ``start_*``,
+    ``end_*`` and ``commits`` arrays hold one entry per interval. With
+    ``bbv_out`` the sparse vectors are also written in SimPoint's
+    ``T:id:count`` frequency-vector format (1-based edge ids).
+    """
+
+    def __init__(self, interval: int, *, dim: int = DEFAULT_DIM, seed: int = 1, bbv_out: TextIO | None = None) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+        if dim <= 0:
+            raise ValueError("dim must be > 0")
+        self.interval = interval
+        self.dim = dim
+        self.edge_ids: dict[tuple[int, int], int] = {}
+        self.points = array("d")
+        self.start_seq = array("Q")
+        self.end_seq = array("Q")
+        self.start_pc = array("Q")
+        self.end_pc = array("Q")
+        self.commits = array("Q")
+        self.rows = 0
+        self._rng = random.Random(seed)
+        self._proj = array("d")
+        self._proj_np: Any = None
+        self._proj_np_rows = 0
+        self._bbv_out = bbv_out
+        self._counts: dict[int, int] = {}
+        self._n = 0
+        self._last = (0, 0)
+        self._sealed = False
+
+    @property
+    def intervals(self) -> int:
+        return len(self.commits)
+
+    def _edge_id(self, key: tuple[int, int]) -> int:
+        eid = self.edge_ids.get(key)
+        if eid is None:
+            eid = len(self.edge_ids)
+            self.edge_ids[key] = eid
+            # Projection rows are drawn in id order, so ids (first-seen order)
+            # fully determine the projection for a given seed.
+            self._proj.extend(self._rng.uniform(-1.0, 1.0) for _ in range(self.dim))
+        return eid
+
+    def _write_bbv(self, items: Sequence[tuple[int, int]]) -> None:
+        assert self._bbv_out is not None
+        self._bbv_out.write("T" + "".join(f":{eid + 1}:{count} " for eid, count in items) + "\n")
+
+    def add(self, seq: int, pc: int, next_pc: int) -> None:
+        if self._sealed:
+            raise ValueError("BBV stream already ended with a partial interval")
+        eid = self._edge_id((pc, next_pc))
+        if self._n == 0:
+            self.start_seq.append(seq)
+            self.start_pc.append(pc)
+        self._counts[eid] = self._counts.get(eid, 0) + 1
+        self._n += 1
+        self._last = (seq, pc)
+        if self._n == self.interval:
+            self._close()
+
+    def _close(self) -> None:
+        dim = self.dim
+        proj = self._proj
+        vec = [0.0] * dim
+        for eid, count in self._counts.items():
+            base = eid * dim
+            for d in range(dim):
+                vec[d] += count * proj[base + d]
+        n = self._n
+        self.points.extend(v / n for v in vec)
+        self.end_seq.append(self._last[0])
+        self.end_pc.append(self._last[1])
+        self.commits.append(n)
+        if self._bbv_out is not None:
+            self._write_bbv(sorted(self._counts.items()))
+        self.rows += n
+        self._counts = {}
+        self._n = 0
+
+    def _projection_matrix(self) -> Any:
+        known = len(self.edge_ids)
+        mat = self._proj_np
+        if mat is None or len(mat) < known:
+            grown = np.empty((max(known, 1024, 0 if mat is None else 2 * len(mat)), self.dim))
+            if mat is not None:
+                grown[: self._proj_np_rows] = mat[: self._proj_np_rows]
+            mat = self._proj_np = grown
+        if self._proj_np_rows < known:
+            fresh = self._proj[self._proj_np_rows * self.dim : known * self.dim]
+            mat[self._proj_np_rows : known] = np.frombuffer(fresh, dtype=np.float64).reshape(-1, self.dim)
+            self._proj_np_rows = known
+        return mat
+
+    def add_chunk(self, seq: Any, pc: Any, next_pc: Any) -> None:
+        """Vectorized ``add`` for numpy u64 columns; must start on an interval boundary."""
+        if self._sealed:
+            raise ValueError("BBV stream already ended with a partial interval")
+        if self._n:
+            raise ValueError("add_chunk must start on an interval boundary")
+        n = len(pc)
+        if n == 0:
+            return
+        pc = np.asarray(pc, dtype=np.uint64)
+        next_pc = np.asarray(next_pc, dtype=np.uint64)
+        first, inverse = _unique_edges(pc, next_pc)
+        local = np.empty(len(first), dtype=np.int64)
+        uniq_pc = pc[first].tolist()
+        uniq_next = next_pc[first].tolist()
+        for j in np.argsort(first, kind="stable").tolist():
+            local[j] = self._edge_id((uniq_pc[j], uniq_next[j]))
+        gid = local[inverse]
+        mat = self._projection_matrix()
+
+        iv = np.arange(n, dtype=np.int64) // self.interval
+        lengths = np.bincount(iv)
+        n_iv = len(lengths)
+        weights = mat[gid]
+        pts = np.empty((n_iv, self.dim))
+        for d in range(self.dim):
+            pts[:, d] = np.bincount(iv, weights=weights[:, d], minlength=n_iv)
+        pts /= lengths[:, None]
+        self.points.extend(pts.ravel().tolist())
+
+        heads = np.arange(0, n, self.interval)
+        tails = np.minimum(heads + self.interval, n) - 1
+        self.start_seq.extend(np.asarray(seq)[heads].tolist())
+        self.end_seq.extend(np.asarray(seq)[tails].tolist())
+        self.start_pc.extend(pc[heads].tolist())
+        self.end_pc.extend(pc[tails].tolist())
+        self.commits.extend(lengths.tolist())
+        if self._bbv_out is not None:
+            known = len(self.edge_ids)
+            keys, counts = np.unique(iv * known + gid, return_counts=True)
+            bounds = np.searchsorted(keys // known, np.arange(n_iv + 1)).tolist()
+            eids = (keys % known).tolist()
+            counts = counts.tolist()
+            for i in range(n_iv):
+                lo, hi = bounds[i], bounds[i + 1]
+                self._write_bbv(list(zip(eids[lo:hi], counts[lo:hi])))
+        self.rows += n
+        if n % self.interval:
+            self._sealed = True
+
+    def finish(self) -> None:
+        if self._n:
+            self._close()
+        self._sealed = True
+
+
+def _iter_jsonl_edges(path: Path, max_commits: int) -> Iterator[tuple[int, int, int]]:
+    reader = TypedRowReader(("seq", "pc", "next_pc"), index_field="seq", kind="commit")
+    for _, _, edge in reader.iter_file(path, limit=max_commits):
+        yield edge
+
+
+def build_bbvs(
+    path: Path,
+    interval: int,
+    *,
+    max_commits: int = 0,
+    dim: int = DEFAULT_DIM,
+    seed: int = 1,
+    bbv_out: TextIO | None = None,
+    use_numpy: bool | None = None,
+) -> BbvBuilder:
+    """Read a commit JSONL or columnar trace once and return its projected BBVs."""
+    builder = BbvBuilder(interval, dim=dim, seed=seed, bbv_out=bbv_out)
+    if is_columnar_trace(path):
+        with open_columnar(path) as trace:
+            stop = min(max_commits, trace.rows) if max_commits > 0 else trace.rows
+            has_seq = "seq" in trace.fields
+            if _vectorized(use_numpy):
+                pc, next_pc = trace.column("pc"), trace.column("next_pc")
+                seq = trace.column("seq") if has_seq else None
+                step = max(1, CHUNK_ROWS // interval) * interval
+                for start in range(0, stop, step):
+                    end = min(start + step, stop)
+                    seq_chunk = seq[start:end] if seq is not None else np.arange(start, end, dtype=np.uint64)
+                    builder.add_chunk(seq_chunk, pc[start:end], next_pc[start:end])
+            else:
+                for index, obj in enumerate(trace.iter_rows(0, stop)):
+                    builder.add(obj["seq"] if has_seq else index, obj["pc"], obj["next_pc"])
+    else:
+        for seq, pc, next_pc in _iter_jsonl_edges(path, max_commits):
+            builder.add(seq, pc, next_pc)
+    builder.finish()
+    return builder
+
+
+class _PyKMeans:
+    def __init__(self, points: array, dim: int) -> None:
+        self.rows = [list(points[i : i + dim]) for i in range(0, len(points), dim)]
+        self.count = len(self.rows)
+        self.dim = dim
+
+    def take(self, indices: Sequence[int]) -> list[list[float]]:
+        return [list(self.rows[i]) for i in indices]
+
+    def assign(self, centers: list[list[float]]) -> tuple[list[int], list[float]]:
+        labels: list[int] = []
+        dists: list[float] = []
+        dist = math.dist
+        for row in self.rows:
+            best = 0
+            best_d = math.inf
+            for c, center in enumerate(centers):
+                d = dist(row, center)
+                if d < best_d:
+                    best, best_d = c, d
+            labels.append(best)
+            dists.append(best_d * best_d)
+        return labels, dists
+
+    def centroids(self, labels: list[int], k: int, prev: list[list[float]]) -> list[list[float]]:
+        sums = [[0.0] * self.dim for _ in range(k)]
+        sizes = [0] * k
+        for row, label in zip(self.rows, labels):
+            sizes[label] += 1
+            acc = sums[label]
+            for d, v in enumerate(row):
+                acc[d] += v
+        return [[v / sizes[c] for v in sums[c]] if sizes[c] else prev[c] for c in range(k)]
+
+    @staticmethod
+    def same(a: list[int], b: list[int]) -> bool:
+        return a == b
+
+    @staticmethod
+    def tolist(values: Any) -> list[Any]:
+        return list(values)
+
+
+class _NumpyKMeans:
+    def __init__(self, points: array, dim: int) -> None:
+        self.x = np.array(points, dtype=np.float64).reshape(-1, dim)
+        self.sq = np.einsum("ij,ij->i", self.x, self.x)
+        self.count = len(self.x)
+        self.dim = dim
+
+    def take(self, indices: Sequence[int]) -> Any:
+        return self.x[list(indices)].copy()
+
+    def assign(self, centers: Any) -> tuple[Any, Any]:
+        labels = np.empty(self.count, dtype=np.int64)
+        dists = np.empty(self.count)
+        csq = np.einsum("ij,ij->i", centers, centers)
+        for lo in range(0, self.count, _ASSIGN_BLOCK):
+            hi = min(lo + _ASSIGN_BLOCK, self.count)
+            d2 = self.sq[lo:hi, None] - 2.0 * (self.x[lo:hi] @ centers.T) + csq[None, :]
+            labels[lo:hi] = d2.argmin(axis=1)
+            dists[lo:hi] = np.maximum(d2[np.arange(hi - lo), labels[lo:hi]], 0.0)
+        return labels, dists
+
+    def centroids(self, labels: Any, k: int, prev: Any) -> Any:
+        sizes = np.bincount(labels, minlength=k)
+        out = prev.copy()
+        filled = sizes > 0
+        for d in range(self.dim):
+            sums = np.bincount(labels, weights=self.x[:, d], minlength=k)
+            out[filled, d] = sums[filled] / sizes[filled]
+        return out
+
+    @staticmethod
+    def same(a: Any, b: Any) -> bool:
+        return bool(np.array_equal(a, b))
+
+    @staticmethod
+    def tolist(values: Any) -> list[Any]:
+        return values.tolist()
+
+
+@dataclass
+class KMeansRun:
+    k: int
+    labels: list[int]
+    dist2: list[float]
+    distortion: float
+    bic: float
+
+
+def _kmeans(ops: Any, k: int, rng: random.Random) -> tuple[Any, Any, float]:
+    best: tuple[Any, Any, float] | None = None
+    tries = KMEANS_INIT_SEEDS if 1 < k < ops.count else 1
+    for _ in range(tries):
+        centers = ops.take(rng.sample(range(ops.count), k))
+        labels, dists = ops.assign(centers)
+        for _ in range(KMEANS_MAX_ITERS):
+            centers = ops.centroids(labels, k, centers)
+            new_labels, dists = ops.assign(centers)
+            converged = ops.same(new_labels, labels)
+            labels = new_labels
+            if converged:
+                break
+        distortion = float(sum(dists))
+        if best is None or distortion < best[2]:
+            best = (labels, dists, distortion)
+    assert best is not None
+    return best
+
+
+def bic_score(sizes: Sequence[int], dim: int, distortion: float) -> float:
+    """BIC of a spherical-Gaussian k-means model (Pelleg & Moore), as used by SimPoint."""
+    total = sum(sizes)
+    k = len(sizes)
+    variance = max(distortion / (dim * max(total - k, 1)), _MIN_VARIANCE)
+    loglike = sum(n * math.log(n / total) for n in sizes if n)
+    loglike -= total * dim / 2.0 * math.log(2.0 * math.pi * variance)
+    loglike -= distortion / (2.0 * variance)
+    params = (k - 1) + k * dim + 1
+    return loglike - params / 2.0 * math.log(total)
+
+
+def cluster_points(
+    points: array,
+    dim: int,
+    *,
+    max_k: int = DEFAULT_MAX_K,
+    seed: int = 1,
+    bic_threshold: float = DEFAULT_BIC_THRESHOLD,
+    use_numpy: bool | None = None,
+) -> tuple[KMeansRun, dict[int, float]]:
+    """Cluster projected BBVs for k = 1..max_k and return the BIC-selected run plus every k's BIC."""
+    count = len(points) // dim
+    if count == 0:
+        raise ValueError("no intervals to cluster")
+    if max_k <= 0:
+        raise ValueError("max_k must be > 0")
+    ops = _NumpyKMeans(points, dim) if _vectorized(use_numpy) else _PyKMeans(points, dim)
+    runs: dict[int, KMeansRun] = {}
+    # k = count puts every interval in its own zero-variance cluster, which
+    # BIC would always prefer, so it is never a candidate.
+    for k in range(1, min(max_k, max(1, count - 1)) + 1):
+        labels, dists, distortion = _kmeans(ops, k, random.Random(seed * 1_000_003 + k))
+        labels = ops.tolist(labels)
+        sizes = [0] * k
+        for label in labels:
+            sizes[label] += 1
+        runs[k] = KMeansRun(k, labels, ops.tolist(dists), distortion, bic_score(sizes, dim, distortion))
+    bics = {k: run.bic for k, run in runs.items()}
+    lo, hi = min(bics.values()), max(bics.values())
+    cutoff = lo + bic_threshold * (hi - lo)
+    chosen = min(k for k, value in bics.items() if value >= cutoff)
+    return runs[chosen], bics
+
+
+def pick_simpoints(builder: BbvBuilder, run: KMeansRun) -> list[dict[str, Any]]:
+    """One representative window per non-empty cluster, heaviest first."""
+    members: dict[int, list[int]] = {}
+    for index, label in enumerate(run.labels):
+        members.setdefault(label, []).append(index)
+    picks: list[dict[str, Any]] = []
+    for cluster, indices in members.items():
+        rep = min(indices, key=lambda i: (run.dist2[i], i))
+        commits = sum(builder.commits[i] for i in indices)
+        start = rep * builder.interval
+        picks.append(
+            {
+                "cluster": cluster,
+                "interval_index": rep,
+                "start_index": start,
+                "end_index_exclusive": start + builder.commits[rep],
+                "commits": builder.commits[rep],
+                "start_seq": builder.start_seq[rep],
+                "end_seq": builder.end_seq[rep],
+                "start_pc": builder.start_pc[rep],
+                "end_pc": builder.end_pc[rep],
+                "weight": commits / builder.rows,
+                "cluster_intervals": len(indices),
+                "distance": math.sqrt(run.dist2[rep]),
+            }
+        )
+    picks.sort(key=lambda p: (-p["weight"], p["interval_index"]))
+    return picks
+
+
+def select_simpoints(
+    path: Path,
+    interval: int,
+    *,
+    max_commits: int = 0,
+    max_k: int = DEFAULT_MAX_K,
+    dim: int = DEFAULT_DIM,
+    seed: int = 1,
+    bic_threshold: float = DEFAULT_BIC_THRESHOLD,
+    bbv_out: TextIO | None = None,
+    use_numpy: bool | None = None,
+) -> dict[str, Any]:
+    builder = build_bbvs(
+        path, interval, max_commits=max_commits, dim=dim, seed=seed, bbv_out=bbv_out, use_numpy=use_numpy
+    )
+    result: dict[str, Any] = {
+        "rows": builder.rows,
+        "intervals": builder.intervals,
+        "edges": len(builder.edge_ids),
+        "k": 0,
+        "bic": {},
+        "picked_windows": [],
+    }
+    if builder.intervals == 0:
+        return result
+    run, bics = cluster_points(
+        builder.points, dim, max_k=max_k, seed=seed, bic_threshold=bic_threshold, use_numpy=use_numpy
+    )
+    result["k"] = run.k
+    result["bic"] = {str(k): value for k, value in sorted(bics.items())}
+    result["picked_windows"] = pick_simpoints(builder, run)
+    return result
@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+"""Top-down stall attribution over LinxCore raw OCC traces.
+
+Input is the raw event JSONL the C++ testbench writes (`PYC_RAW_TRACE`) or its
+columnar form (`--convert` writes `<raw>.lxoc`). Every core's cycles between
+its first and last event are split into four top-down buckets:
+
+    retiring         at least one commit this cycle
+    backend_bound    no commit, but a uop that later commits occupies a
+                     backend stage (anything past IB other than CMT/FLS/XCHK)
+    bad_speculation  no committing work in the backend, but the pipeline
+                     holds uops that end at FLS/XCHK, or the core is still
+                     refilling after such a flush
+    frontend_bound   everything else: the backend waits for the frontend
+
+Backend-bound cycles are blamed on the oldest (lowest uid) committing uop in
+the backend; its stage, PC and block are what the per-stage, per-PC and
+per-block tables aggregate. Per-stage occupancy distributions and `stall`/
+`stall_cause` counts come straight from the OCC records.
+
+The attribution is per cycle, not per issue slot: the raw trace does not
+carry the machine width.
+
+The `.lxoc` container uses the `commit_columnar` layout (magic b"LXRAWOCC",
+u32 version, u32 header length, JSON header, 64-byte aligned u64 columns).
+numpy is used when installed; the pure-Python engine produces the same report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from common.stage_tokens import LINXTRACE_STAGE_ID_ORDER  # noqa: E402
+from elf_symbols import load_elf_symbols  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None  # type: ignore[assignment]
+
+MAGIC = b"LXRAWOCC"
+VERSION = 1
+SCHEMA_ID = "linxcore.raw_occ_columnar.v1"
+REPORT_SCHEMA_ID = "linxcore.stall_attribution.v1"
+SUFFIX = ".lxoc"
+ALIGN = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+COLUMNS = ("type", "cycle", "core_id", "uop_uid", "block_uid", "pc", "stage", "lane", "stall", "stall_cause", "kind")
+EV_OCC = 0
+EV_COMMIT = 1
+NO_STAGE = (1 << 64) - 1
+FRONTEND_STAGES = {"F0", "F1", "F2", "F3", "F4", "IB"}
+TERMINAL_STAGES = {"CMT", "FLS", "XCHK"}
+FLUSH_STAGES = {"FLS", "XCHK"}
+CATEGORIES = ("retiring", "frontend_bound", "backend_bound", "bad_speculation")
+DEFAULT_TOP = 20
+
+
+def _vectorized(use_numpy: bool | None) -> bool:
+    if use_numpy and np is None:
+        raise RuntimeError("numpy is not installed")
+    return np is not None if use_numpy is None else use_numpy
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+class RawEvents:
+    """OCC and commit records of a raw trace as parallel u64 columns."""
+
+    def __init__(self, stages: List[str], columns: Dict[str, Any], source: str = "") -> None:
+        self.stages = stages
+        self.columns = columns
+        self.source = source
+
+    def __len__(self) -> int:
+        return len(self.columns["cycle"])
+
+    @classmethod
+    def from_jsonl(cls, path: Path) -> "RawEvents":
+        stages = list(LINXTRACE_STAGE_ID_ORDER)
+        stage_ids = {name: i for i, name in enumerate(stages)}
+        cols = {name: array("Q") for name in COLUMNS}
+        append = [cols[name].append for name in COLUMNS]
+        with path.open("r", encoding="utf-8", errors="ignore") as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    raise SystemExit(f"error: {path}:{lineno}: invalid JSON ({exc})") from exc
+                rtype = rec.get("type")
+                uid = int(rec.get("uop_uid", 0))
+                if uid == 0 or rtype not in ("occ", "commit"):
+                    continue
+                if rtype == "occ":
+                    kind = int(rec.get("kind", 0))
+                    if kind == 5:  # non-canonical sample; the LinxTrace builder drops these too
+                        continue
+                    name = str(rec.get("stage", "")).upper()
+                    stage = stage_ids.get(name)
+                    if stage is None:
+                        stage = stage_ids[name] = len(stages)
+                        stages.append(name)
+                    row = (EV_OCC, stage, int(rec.get("lane", 0)), int(rec.get("stall", 0)))
+                    cause = rec.get("stall_cause", 0)
+                else:
+                    kind = 0
+                    row = (EV_COMMIT, NO_STAGE, int(rec.get("slot", 0)), 0)
+                    cause = 0
+                try:
+                    cause = int(cause)
+                except (TypeError, ValueError):
+                    cause = 0
+                values = (
+                    row[0],
+                    int(rec.get("cycle", 0)),
+                    int(rec.get("core_id", 0)),
+                    uid,
+                    int(rec.get("block_uid", 0)),
+                    int(rec.get("pc", 0)),
+                    row[1],
+                    row[2],
+                    row[3],
+                    cause,
+                    kind,
+                )
+                for push, value in zip(append, values):
+                    push(value & NO_STAGE)
+        return cls(stages, cols, str(path))
+
+    @classmethod
+    def from_columnar(cls, path: Path) -> "RawEvents":
+        with path.open("rb") as f:
+            preamble = f.read(_PREAMBLE.size)
+            if len(preamble) != _PREAMBLE.size:
+                raise ValueError(f"{path}: truncated raw OCC container")
+            magic, version, header_len = _PREAMBLE.unpack(preamble)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: not a v{VERSION} raw OCC container")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            if header.get("schema") != SCHEMA_ID:
+                raise ValueError(f"{path}: unexpected schema {header.get('schema')!r}")
+            rows = int(header["rows"])
+            start = _align(_PREAMBLE.size + header_len)
+            stride = _align(rows * 8)
+            cols: Dict[str, Any] = {}
+            if np is not None:
+                for i, name in enumerate(header["fields"]):
+                    cols[name] = np.memmap(path, dtype="<u8", mode="r", offset=start + i * stride, shape=(rows,))
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for i, name in enumerate(header["fields"]):
+                        buf = array("Q", mm[start + i * stride : start + i * stride + rows * 8])
+                        if sys.byteorder != "little":
+                            buf.byteswap()
+                        cols[name] = buf
+        return cls(list(header["stages"]), cols, str(header.get("source", path)))
+
+    def write_columnar(self, out: Path) -> None:
+        header = {
+            "schema": SCHEMA_ID,
+            "byteorder": "little",
+            "dtype": "<u8",
+            "rows": len(self),
+            "fields": list(COLUMNS),
+            "stages": self.stages,
+            "source": self.source,
+        }
+        header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(f".{out.name}.tmp")
+        with tmp.open("wb") as f:
+            f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b"\0" * (_align(_PREAMBLE.size + len(header_bytes)) - _PREAMBLE.size - len(header_bytes)))
+            for name in COLUMNS:
+                buf = array("Q", self.columns[name])
+                if sys.byteorder != "little":
+                    buf.byteswap()
+                data = buf.tobytes()
+                f.write(data)
+                f.write(b"\0" * (_align(len(data)) - len(data)))
+        tmp.replace(out)
+
+
+def load_events(path: Path) -> RawEvents:
+    with path.open("rb") as f:
+        is_columnar = f.read(len(MAGIC)) == MAGIC
+    return RawEvents.from_columnar(path) if is_columnar else RawEvents.from_jsonl(path)
+
+
+class _Tally:
+    """Engine-independent accumulator the report is rendered from."""
+
+    def __init__(self, stages: List[str]) -> None:
+        self.stages = stages
+        self.cores: Dict[int, Dict[str, Any]] = {}
+        self.occupancy: Dict[str, Counter] = {}
+        self.stall_occ: Counter = Counter()
+        self.stall_causes: Dict[str, Counter] = {}
+        self.pc_blamed: Counter = Counter()
+        self.pc_stall: Counter = Counter()
+        self.pc_blamed_stage: Dict[int, Counter] = {}
+        self.block_pc: Dict[int, int] = {}
+        self.block_blamed: Counter = Counter()
+        self.block_stall: Counter = Counter()
+
+
+def _stage_ids(stages: List[str], names: Iterable[str]) -> set[int]:
+    wanted = set(names)
+    return {i for i, name in enumerate(stages) if name in wanted}
+
+
+def _backend_stage_ids(stages: List[str]) -> set[int]:
+    return {i for i, name in enumerate(stages) if name not in FRONTEND_STAGES and name not in TERMINAL_STAGES}
+
+
+def _analyze_python(events: RawEvents) -> _Tally:
+    cols = {
+        name: col if isinstance(col, array) else array("Q", col.tobytes() if hasattr(col, "tobytes") else col)
+        for name, col in events.columns.items()
+    }
+    stages = events.stages
+    tally = _Tally(stages)
+    typ, cycle, core, uid = cols["type"], cols["cycle"], cols["core_id"], cols["uop_uid"]
+    block, pc, stage, stall, cause = cols["block_uid"], cols["pc"], cols["stage"], cols["stall"], cols["stall_cause"]
+    n = len(events)
+    cmt_ids = _stage_ids(stages, {"CMT"})
+    flush_ids = _stage_ids(stages, FLUSH_STAGES)
+    frontend_ids = _stage_ids(stages, FRONTEND_STAGES)
+    backend_ids = _backend_stage_ids(stages)
+
+    has_commit = any(typ[i] == EV_COMMIT for i in range(n))
+    # Without commit records, CMT occupancy stands in for retirement.
+    retire_rows = [i for i in range(n) if (typ[i] == EV_COMMIT if has_commit else stage[i] in cmt_ids)]
+    committed = {uid[i] for i in retire_rows}
+    flushed = {uid[i] for i in range(n) if typ[i] == EV_OCC and stage[i] in flush_ids} - committed
+
+    span: Dict[int, List[int]] = {}
+    for i in range(n):
+        lo_hi = span.get(core[i])
+        if lo_hi is None:
+            span[core[i]] = [cycle[i], cycle[i]]
+        else:
+            lo_hi[0] = min(lo_hi[0], cycle[i])
+            lo_hi[1] = max(lo_hi[1], cycle[i])
+
+    commits: Dict[int, Counter] = {c: Counter() for c in span}
+    for i in retire_rows:
+        commits[core[i]][cycle[i]] += 1
+    oldest: Dict[Tuple[int, int], int] = {}
+    frontend_good: Dict[int, set] = {c: set() for c in span}
+    bad_busy: Dict[int, set] = {c: set() for c in span}
+    flush_cycles: Dict[int, set] = {c: set() for c in span}
+    occ_per_cycle: Dict[Tuple[int, int], Counter] = {}
+    block_first: Dict[int, int] = {}
+    for i in range(n):
+        if typ[i] != EV_OCC:
+            continue
+        c, cyc, s, u = core[i], cycle[i], stage[i], uid[i]
+        occ_per_cycle.setdefault((c, s), Counter())[cyc] += 1
+        if stall[i]:
+            name = stages[s]
+            tally.stall_occ[name] += 1
+            tally.stall_causes.setdefault(name, Counter())[str(cause[i])] += 1
+            tally.pc_stall[pc[i]] += 1
+        if block[i]:
+            j = block_first.get(block[i])
+            if j is None or u < uid[j]:
+                block_first[block[i]] = i
+        if u in committed:
+            if s in backend_ids:
+                key = (c, cyc)
+                j = oldest.get(key)
+                if j is None or u < uid[j]:
+                    oldest[key] = i
+            elif s in frontend_ids:
+                frontend_good[c].add(cyc)
+        elif u in flushed:
+            bad_busy[c].add(cyc)
+            if s in flush_ids:
+                flush_cycles[c].add(cyc)
+    for blk, i in block_first.items():
+        tally.block_pc[blk] = pc[i]
+    for i in range(n):
+        if typ[i] == EV_OCC and stall[i] and block[i]:
+            tally.block_stall[block[i]] += 1
+
+    for c, (lo, hi) in sorted(span.items()):
+        buckets = Counter({name: 0 for name in CATEGORIES})
+        fe_detail = Counter({"fetch_starved": 0, "delivery_stalled": 0})
+        be_stage: Counter = Counter()
+        last_flush = last_good = -1
+        for cyc in range(lo, hi + 1):
+            j = oldest.get((c, cyc))
+            if j is not None:
+                last_good = cyc
+            if cyc in flush_cycles[c]:
+                last_flush = cyc
+            if commits[c][cyc]:
+                buckets["retiring"] += 1
+            elif j is not None:
+                buckets["backend_bound"] += 1
+                name = stages[stage[j]]
+                be_stage[name] += 1
+                tally.pc_blamed[pc[j]] += 1
+                tally.pc_blamed_stage.setdefault(pc[j], Counter())[name] += 1
+                if block[j]:
+                    tally.block_blamed[block[j]] += 1
+            elif cyc in bad_busy[c] or last_flush > last_good:
+                buckets["bad_speculation"] += 1
+            else:
+                buckets["frontend_bound"] += 1
+                fe_detail["delivery_stalled" if cyc in frontend_good[c] else "fetch_starved"] += 1
+        tally.cores[c] = {
+            "cycles": hi - lo + 1,
+            "first_cycle": lo,
+            "last_cycle": hi,
+            "commits": sum(commits[c].values()),
+            "top_down": buckets,
+            "frontend_bound_detail": fe_detail,
+            "backend_bound_by_stage": be_stage,
+        }
+        for s in range(len(stages)):
+            per_cycle = occ_per_cycle.get((c, s))
+            if not per_cycle:
+                continue
+            dist = tally.occupancy.setdefault(stages[s], Counter())
+            dist.update(per_cycle.values())
+            dist[0] += (hi - lo + 1) - len(per_cycle)
+    return tally
+
+
+def _analyze_numpy(events: RawEvents) -> _Tally:
+    cols = {name: np.asarray(events.columns[name], dtype=np.uint64) for name in COLUMNS}
+    stages = events.stages
+    tally = _Tally(stages)
+    typ, cycle, core, uid = cols["type"], cols["cycle"], cols["core_id"], cols["uop_uid"]
+    block, pc, stage, stall, cause = cols["block_uid"], cols["pc"], cols["stage"], cols["stall"], cols["stall_cause"]
+    is_occ = typ == EV_OCC
+    flush_ids = np.array(sorted(_stage_ids(stages, FLUSH_STAGES)), dtype=np.uint64)
+    frontend_ids = np.array(sorted(_stage_ids(stages, FRONTEND_STAGES)), dtype=np.uint64)
+    backend_ids = np.array(sorted(_backend_stage_ids(stages)), dtype=np.uint64)
+
+    retire = typ == EV_COMMIT
+    if not retire.any():
+        retire = is_occ & np.isin(stage, np.array(sorted(_stage_ids(stages, {"CMT"})), dtype=np.uint64))
+    committed = np.unique(uid[retire])
+    good = np.isin(uid, committed)
+    is_flush_occ = is_occ & np.isin(stage, flush_ids)
+    bad = np.isin(uid, np.setdiff1d(np.unique(uid[is_flush_occ]), committed)) & is_occ
+    backend_good = is_occ & good & np.isin(stage, backend_ids)
+    frontend_good = is_occ & good & np.isin(stage, frontend_ids)
+    stalled = is_occ & (stall != 0)
+
+    for name_idx in np.unique(stage[stalled]):
+        name = stages[int(name_idx)]
+        sel = stalled & (stage == name_idx)
+        tally.stall_occ[name] += int(sel.sum())
+        values, counts = np.unique(cause[sel], return_counts=True)
+        tally.stall_causes.setdefault(name, Counter()).update({str(int(v)): int(k) for v, k in zip(values, counts)})
+    values, counts = np.unique(pc[stalled], return_counts=True)
+    tally.pc_stall.update({int(v): int(k) for v, k in zip(values, counts)})
+    blk_rows = np.nonzero(is_occ & (block != 0))[0]
+    if len(blk_rows):
+        order = blk_rows[np.lexsort((uid[blk_rows], block[blk_rows]))]
+        blocks, first = np.unique(block[order], return_index=True)
+        tally.block_pc = {int(b): int(p) for b, p in zip(blocks, pc[order[first]])}
+        values, counts = np.unique(block[stalled & (block != 0)], return_counts=True)
+        tally.block_stall.update({int(v): int(k) for v, k in zip(values, counts)})
+
+    for c in np.unique(core):
+        in_core = core == c
+        lo = int(cycle[in_core].min())
+        hi = int(cycle[in_core].max())
+        n = hi - lo + 1
+        off = (cycle - np.uint64(lo)).astype(np.int64)
+        commits = np.bincount(off[retire & in_core], minlength=n)
+        has_good = np.zeros(n, dtype=bool)
+        has_good[off[backend_good & in_core]] = True
+        fe_good = np.zeros(n, dtype=bool)
+        fe_good[off[frontend_good & in_core]] = True
+        bad_busy = np.zeros(n, dtype=bool)
+        bad_busy[off[bad & in_core]] = True
+        flushes = np.zeros(n, dtype=bool)
+        flushes[off[bad & is_flush_occ & in_core]] = True
+        ticks = np.arange(n)
+        last_flush = np.maximum.accumulate(np.where(flushes, ticks, -1))
+        last_good = np.maximum.accumulate(np.where(has_good, ticks, -1))
+
+        retiring = commits > 0
+        backend = ~retiring & has_good
+        badspec = ~retiring & ~has_good & (bad_busy | (last_flush > last_good))
+        frontend = ~retiring & ~has_good & ~badspec
+        buckets = Counter(
+            {
+                "retiring": int(retiring.sum()),
+                "frontend_bound": int(frontend.sum()),
+                "backend_bound": int(backend.sum()),
+                "bad_speculation": int(badspec.sum()),
+            }
+        )
+        fe_detail = Counter(
+            {
+                "fetch_starved": int((frontend & ~fe_good).sum()),
+                "delivery_stalled": int((frontend & fe_good).sum()),
+            }
+        )
+
+        # Oldest committing uop in the backend per cycle: sort by (cycle, uid), take the first.
+        rows = np.nonzero(backend_good & in_core)[0]
+        rows = rows[np.lexsort((uid[rows], off[rows]))]
+        cyc_of, first = np.unique(off[rows], return_index=True)
+        blame = rows[first][backend[cyc_of]]
+        be_stage: Counter = Counter()
+        values, counts = np.unique(stage[blame], return_counts=True)
+        be_stage.update({stages[int(v)]: int(k) for v, k in zip(values, counts)})
+        values, counts = np.unique(pc[blame], return_counts=True)
+        tally.pc_blamed.update({int(v): int(k) for v, k in zip(values, counts)})
+        pairs, counts = np.unique(np.stack([pc[blame], stage[blame]]), axis=1, return_counts=True)
+        for (p, s), k in zip(pairs.T, counts):
+            tally.pc_blamed_stage.setdefault(int(p), Counter())[stages[int(s)]] += int(k)
+        blamed_blocks = block[blame]
+        values, counts = np.unique(blamed_blocks[blamed_blocks != 0], return_counts=True)
+        tally.block_blamed.update({int(v): int(k) for v, k in zip(values, counts)})
+
+        tally.cores[int(c)] = {
+            "cycles": n,
+            "first_cycle": lo,
+            "last_cycle": hi,
+            "commits": int(commits.sum()),
+            "top_down": buckets,
+            "frontend_bound_detail": fe_detail,
+            "backend_bound_by_stage": be_stage,
+        }
+        occ_core = is_occ & in_core
+        for s in np.unique(stage[occ_core]):
+            per_cycle = np.bincount(off[occ_core & (stage == s)], minlength=n)
+            dist = np.bincount(per_cycle)
+            tally.occupancy.setdefault(stages[int(s)], Counter()).update(
+                {k: int(v) for k, v in enumerate(dist) if v}
+            )
+    return tally
+
+
+def _ratio(num: int, den: int) -> float:
+    return round(num / den, 6) if den else 0.0
+
+
+def _stage_sort_key(stages: List[str]) -> Any:
+    rank = {name: i for i, name in enumerate(stages)}
+    return lambda name: (rank.get(name, len(rank)), name)
+
+
+def _render(tally: _Tally, *, source: str, engine: str, top: int, label: Any) -> Dict[str, Any]:
+    stage_key = _stage_sort_key(tally.stages)
+    total = {
+        "cycles": 0,
+        "commits": 0,
+        "top_down": Counter({name: 0 for name in CATEGORIES}),
+        "frontend_bound_detail": Counter(),
+        "backend_bound_by_stage": Counter(),
+    }
+    cores: Dict[str, Any] = {}
+    for c, info in sorted(tally.cores.items()):
+        for key in ("cycles", "commits"):
+            total[key] += info[key]
+        for key in ("top_down", "frontend_bound_detail", "backend_bound_by_stage"):
+            total[key].update(info[key])
+        cores[str(c)] = _core_section(info, stage_key)
+    stages_out: Dict[str, Any] = {}
+    for name in sorted(set(tally.occupancy) | set(tally.stall_occ), key=stage_key):
+        dist = tally.occupancy.get(name, Counter())
+        cycles = sum(dist.values())
+        occupied = sum(k * v for k, v in dist.items())
+        stages_out[name] = {
+            "occupancy": occupied,
+            "occupied_cycles": cycles - dist.get(0, 0),
+            "mean_occupancy": _ratio(occupied, cycles),
+            "max_occupancy": max((k for k, v in dist.items() if v), default=0),
+            "distribution": {str(k): dist[k] for k in sorted(dist) if dist[k]},
+            "stall_occ": tally.stall_occ.get(name, 0),
+            "stall_causes": dict(sorted(tally.stall_causes.get(name, Counter()).items())),
+        }
+
+    pcs = sorted(set(tally.pc_blamed) | set(tally.pc_stall), key=lambda p: (-tally.pc_blamed[p], -tally.pc_stall[p], p))
+    pc_rows = []
+    for p in pcs[:top]:
+        by_stage = tally.pc_blamed_stage.get(p, Counter())
+        pc_rows.append(
+            {
+                "pc": f"0x{p:x}",
+                "label": label(p),
+                "blamed_cycles": tally.pc_blamed[p],
+                "stall_occ": tally.pc_stall[p],
+                "blamed_by_stage": {k: by_stage[k] for k in sorted(by_stage, key=stage_key)},
+            }
+        )
+    per_block: Dict[int, Counter] = {}
+    for blk, entry in tally.block_pc.items():
+        agg = per_block.setdefault(entry, Counter())
+        agg["instances"] += 1
+        agg["blamed_cycles"] += tally.block_blamed.get(blk, 0)
+        agg["stall_occ"] += tally.block_stall.get(blk, 0)
+    block_rows = [
+        {"block_pc": f"0x{entry:x}", "label": label(entry), **{k: agg[k] for k in ("instances", "blamed_cycles", "stall_occ")}}
+        for entry, agg in sorted(per_block.items(), key=lambda kv: (-kv[1]["blamed_cycles"], -kv[1]["stall_occ"], kv[0]))[:top]
+    ]
+    return {
+        "schema": REPORT_SCHEMA_ID,
+        "source": source,
+        "engine": engine,
+        "total": _core_section(total, stage_key),
+        "cores": cores,
+        "stages": stages_out,
+        "pcs": pc_rows,
+        "blocks": block_rows,
+    }
+
+
+def _core_section(info: Dict[str, Any], stage_key: Any) -> Dict[str, Any]:
+    cycles = info["cycles"]
+    buckets = info["top_down"]
+    out = {
+        "cycles": cycles,
+        "commits": info["commits"],
+        "ipc": _ratio(info["commits"], cycles),
+        "cpi": _ratio(cycles, info["commits"]),
+        "top_down": {name: buckets.get(name, 0) for name in CATEGORIES},
+        "top_down_pct": {name: round(100.0 * buckets.get(name, 0) / cycles, 2) if cycles else 0.0 for name in CATEGORIES},
+        "frontend_bound_detail": {k: info["frontend_bound_detail"].get(k, 0) for k in ("fetch_starved", "delivery_stalled")},
+        "backend_bound_by_stage": {
+            k: info["backend_bound_by_stage"][k] for k in sorted(info["backend_bound_by_stage"], key=stage_key)
+        },
+    }
+    if "first_cycle" in info:
+        out["first_cycle"] = info["first_cycle"]
+        out["last_cycle"] = info["last_cycle"]
+    return out
+
+
+def analyze(
+    events: RawEvents,
+    *,
+    top: int = DEFAULT_TOP,
+    elf: Optional[Path] = None,
+    use_numpy: bool | None = None,
+) -> Dict[str, Any]:
+    """Compute the stall-attribution report for `events`."""
+    if len(events) == 0:
+        raise SystemExit("error: raw trace has no occ/commit records with a uop_uid")
+    vectorized = _vectorized(use_numpy)
+    tally = _analyze_numpy(events) if vectorized else _analyze_python(events)
+    symbols = load_elf_symbols(elf) if elf is not None else None
+    label = symbols.pc_label if symbols is not None else (lambda pc: f"0x{pc:x}")
+    return _render(tally, source=events.source, engine="numpy" if vectorized else "python", top=top, label=label)
+
+
+def render_markdown(report: Dict[str, Any]) -> str:
+    total = report["total"]
+    md = [
+        "# LinxCore Stall Attribution",
+        "",
+        f"- Source: `{report['source']}`",
+        f"- Cycles: {total['cycles']}  commits: {total['commits']}  IPC: {total['ipc']}  CPI: {total['cpi']}",
+        "",
+        "## Top-Down (cycles)",
+        "",
+        "| core | cycles | retiring | frontend_bound | backend_bound | bad_speculation |",
+        "| --- | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for name, section in [("all", total)] + list(report["cores"].items()):
+        cells = [f"{section['top_down'][k]} ({section['top_down_pct'][k]}%)" for k in CATEGORIES]
+        md.append(f"| {name} | {section['cycles']} | " + " | ".join(cells) + " |")
+    fe = total["frontend_bound_detail"]
+    md += [
+        "",
+        f"Frontend-bound: fetch_starved={fe['fetch_starved']} delivery_stalled={fe['delivery_stalled']}",
+        "",
+        "Backend-bound cycles by stage of the oldest committing uop:",
+        "",
+    ]
+    md += [f"- {stage}: {n}" for stage, n in total["backend_bound_by_stage"].items()] or ["- (none)"]
+    md += [
+        "",
+        "## Stages",
+        "",
+        "| stage | mean occ | max occ | occupied cycles | stalled occ | stall causes |",
+        "| --- | ---: | ---: | ---: | ---: | --- |",
+    ]
+    for stage, info in report["stages"].items():
+        causes = ", ".join(f"{k}:{v}" for k, v in info["stall_causes"].items()) or "-"
+        md.append(
+            f"| {stage} | {info['mean_occupancy']} | {info['max_occupancy']} | {info['occupied_cycles']} "
+            f"| {info['stall_occ']} | {causes} |"
+        )
+    md += ["", "## Top PCs", "", "| pc | blamed cycles | stalled occ | stages |", "| --- | ---: | ---: | --- |"]
+    for row in report["pcs"]:
+        stages = ", ".join(f"{k}:{v}" for k, v in row["blamed_by_stage"].items()) or "-"
+        md.append(f"| `{row['label']}` | {row['blamed_cycles']} | {row['stall_occ']} | {stages} |")
+    md += ["", "## Top Blocks", "", "| block entry | instances | blamed cycles | stalled occ |", "| --- | ---: | ---: | ---: |"]
+    for row in report["blocks"]:
+        md.append(f"| `{row['label']}` | {row['instances']} | {row['blamed_cycles']} | {row['stall_occ']} |")
+    return "\n".join(md) + "\n"
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--raw", required=True, help=f"Raw event JSONL (PYC_RAW_TRACE) or its {SUFFIX} columnar form")
+    ap.add_argument("--convert", default="", help=f"Also write the columnar form here (e.g. <raw>{SUFFIX})")
+    ap.add_argument("--json-out", default="", help="Report JSON path (default: <raw>.stalls.json)")
+    ap.add_argument("--md-out", default="", help="Report markdown path (default: <raw>.stalls.md)")
+    ap.add_argument("--elf", default="", help="Optional ELF used to symbolize PCs")
+    ap.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"Rows in the PC/block tables (default: {DEFAULT_TOP})")
+    engine = ap.add_mutually_exclusive_group()
+    engine.add_argument("--numpy", dest="use_numpy", action="store_true", default=None, help="Require numpy")
+    engine.add_argument("--no-numpy", dest="use_numpy", action="store_false", help="Use the pure-Python engine")
+    args = ap.parse_args(list(argv) if argv is not None else None)
+
+    raw_path = Path(args.raw)
+    if not raw_path.is_file():
+        raise SystemExit(f"error: missing raw trace: {raw_path}")
+    events = load_events(raw_path)
+    if args.convert:
+        events.write_columnar(Path(args.convert))
+    try:
+        report = analyze(
+            events, top=max(0, args.top), elf=Path(args.elf) if args.elf else None, use_numpy=args.use_numpy
+        )
+    except RuntimeError as exc:
+        raise SystemExit(f"error: {exc}") from exc
+    json_out = Path(args.json_out) if args.json_out else raw_path.with_name(raw_path.name + ".stalls.json")
+    md_out = Path(args.md_out) if args.md_out else raw_path.with_name(raw_path.name + ".stalls.md")
+    json_out.parent.mkdir(parents=True, exist_ok=True)
+    md_out.parent.mkdir(parents=True, exist_ok=True)
+    json_out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    md_out.write_text(render_markdown(report), encoding="utf-8")
+    pct = report["total"]["top_down_pct"]
+    print(
+        f"stall-attribution ipc={report['total']['ipc']} "
+        + " ".join(f"{name}={pct[name]}%" for name in CATEGORIES)
+        + f" json={json_out} md={md_out}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Schema-aware fast JSONL reader for commit traces.
+
+Trace writers emit every row with the same keys in the same order and plain
+integer (or `"0x..."`) values. Instead of building a dict per row, a line is
+flattened with one `bytes.translate` (`:` becomes `,`; quotes, braces and the
+newline are dropped) and split on `,`, giving `key, value, key, value, ...`.
+When the keys equal a known row shape, the wanted values are picked by an
+`itemgetter` and converted with `int(value, 0)` straight from bytes.
+
+The first row of each shape goes through `json.loads`, is validated against the
+required fields and teaches the shape only if its flattened keys reproduce the
+parsed keys exactly. A later line whose keys differ, or whose wanted values do
+not parse as integers (bools, nulls, floats, strings with commas or escapes),
+takes the same `json.loads` path, so both paths yield identical tuples and
+callers never see which one ran.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+CHISEL_TOOLS = ROOT / "tools" / "chisel"
+if str(CHISEL_TOOLS) not in sys.path:
+    sys.path.insert(0, str(CHISEL_TOOLS))
+
+from trace_schema_adapter import REQUIRED_TRACE_FIELDS  # noqa: E402
+
+COMMIT_FIELDS: Tuple[str, ...] = ("seq", *REQUIRED_TRACE_FIELDS)
+# Commit rows without dst_* fall back to the wb_* fields.
+COMMIT_FALLBACKS = {"dst_valid": "wb_valid", "dst_reg": "wb_rd", "dst_data": "wb_data"}
+MAX_SHAPES = 16
+
+_FLATTEN = bytes.maketrans(b":", b",")
+_DROP = b'{}"\r\n'
+
+
+def to_int(value: Any, default: int = 0) -> int:
+    """Integer value of a JSON scalar: ints as-is, strings via `int(v, 0)`, anything else `default`."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value, 0)
+        except ValueError:
+            return default
+    return default
+
+
+class RowShape:
+    """Value positions for one key spelling.
+
+    `layout` is None when every field is present in the row; otherwise it lists,
+    per field, the index into the picked values or a `("idx",)` / `("const", v)`
+    placeholder.
+    """
+
+    def __init__(self, getter: itemgetter, width: int, layout: Optional[List[Any]]) -> None:
+        self.getter = getter
+        self.bases = (0,) * width
+        self.layout = layout
+
+
+class TypedRowReader:
+    """Decode a fixed list of integer fields from JSONL rows into tuples.
+
+    `fields` are returned in order as `int` (see `to_int`). A missing field takes
+    `fallbacks[name]` when that field is present, else the row index for
+    `index_field`, else `defaults.get(name, 0)`. Rows missing any of `required`
+    are fatal, as are rows carrying a key from `reject_extra` that `fields` does
+    not list. A row with a new key set always takes the slow path first, so the
+    `reject_extra` check costs nothing on the fast path.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        *,
+        required: Sequence[str] = (),
+        fallbacks: Optional[Mapping[str, str]] = None,
+        defaults: Optional[Mapping[str, int]] = None,
+        index_field: Optional[str] = None,
+        kind: str = "trace",
+        reject_extra: Sequence[str] = (),
+    ) -> None:
+        self.fields = tuple(fields)
+        self.required = tuple(required)
+        self.reject_extra = tuple(name for name in reject_extra if name not in self.fields)
+        self.fallbacks = dict(fallbacks or {})
+        self.defaults = {name: int((defaults or {}).get(name, 0)) for name in self.fields}
+        self.index_field = index_field
+        self.kind = kind
+        self._shapes: Dict[Tuple[bytes, ...], Optional[RowShape]] = {}
+        self._hot_keys: List[bytes] = []
+        self._hot: Optional[RowShape] = None
+
+    def _source(self, name: str, keys: Mapping[str, Any]) -> Optional[str]:
+        if name in keys:
+            return name
+        fallback = self.fallbacks.get(name)
+        return fallback if fallback in keys else None
+
+    # -- slow path ---------------------------------------------------------
+
+    def _from_obj(self, obj: Mapping[str, Any], idx: int) -> tuple:
+        out = []
+        for name in self.fields:
+            key = self._source(name, obj)
+            if name == self.index_field:
+                out.append(to_int(obj[key], idx) if key is not None else idx)
+            elif key is not None:
+                out.append(to_int(obj[key], self.defaults[name]))
+            else:
+                out.append(self.defaults[name])
+        return tuple(out)
+
+    def _learn(self, obj: Mapping[str, Any], parts: List[bytes]) -> None:
+        keys = parts[0::2]
+        spelled = tuple(keys)
+        if spelled in self._shapes or len(self._shapes) >= MAX_SHAPES:
+            return
+        names = list(obj)
+        shape = None
+        if len(parts) == 2 * len(names) and [k.strip() for k in keys] == [n.encode("utf-8") for n in names]:
+            positions = {name: i for i, name in enumerate(names)}
+            picks: List[int] = []
+            layout: List[Any] = []
+            for name in self.fields:
+                key = self._source(name, positions)
+                if key is not None:
+                    layout.append(len(picks))
+                    picks.append(positions[key])
+                elif name == self.index_field:
+                    layout.append(("idx",))
+                else:
+                    layout.append(("const", self.defaults[name]))
+            if picks:
+                getter = itemgetter(*picks) if len(picks) > 1 else (lambda values, i=picks[0]: (values[i],))
+                complete = len(picks) == len(self.fields)
+                shape = RowShape(getter, len(picks), None if complete else layout)
+        self._shapes[spelled] = shape
+        if shape is not None:
+            self._hot_keys, self._hot = keys, shape
+
+    def _slow(self, line: bytes, parts: List[bytes], idx: int, where: str) -> tuple:
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise SystemExit(f"error: {where}: invalid JSON ({exc})") from exc
+        if not isinstance(obj, dict):
+            raise SystemExit(f"error: {where}: expected a JSON object")
+        missing = [name for name in self.required if name not in obj]
+        if missing:
+            raise SystemExit(f"error: {where} missing mandatory {self.kind} fields: {', '.join(missing)}")
+        extra = [name for name in self.reject_extra if name in obj]
+        if extra:
+            raise SystemExit(f"error: {where} has {self.kind} fields outside the reader's field set: {', '.join(extra)}")
+        if b"\\" not in line:
+            self._learn(obj, parts)
+        return self._from_obj(obj, idx)
+
+    # -- public ------------------------------------------------------------
+
+    def decode(self, line: bytes, idx: int, where: str) -> tuple:
+        """Decode one stripped, non-empty line; `where` prefixes error messages."""
+        parts = line.translate(_FLATTEN, _DROP).split(b",")
+        keys = parts[0::2]
+        if keys == self._hot_keys:
+            shape = self._hot
+        else:
+            shape = self._shapes.get(tuple(keys))
+            if shape is not None:
+                self._hot_keys, self._hot = keys, shape
+        if shape is not None and b"\\" not in line:
+            try:
+                values = tuple(map(int, shape.getter(parts[1::2]), shape.bases))
+            except ValueError:
+                pass
+            else:
+                if shape.layout is None:
+                    return values
+                return tuple(
+                    values[slot] if type(slot) is int else (idx if slot[0] == "idx" else slot[1])
+                    for slot in shape.layout
+                )
+        return self._slow(line, parts, idx, where)
+
+    def iter_file(
+        self,
+        path: Path,
+        *,
+        start: int = 0,
+        end: Optional[int] = None,
+        row_base: int = 0,
+        limit: int = 0,
+    ) -> Iterator[Tuple[int, int, tuple]]:
+        """Yield `(byte_offset, row_index, values)` for non-blank rows starting in `[start, end)`."""
+        row = row_base
+        stop = row_base + limit if limit > 0 else None
+        decode = self.decode
+        with Path(path).open("rb") as f:
+            f.seek(start)
+            offset = start
+            for raw in f:
+                line_offset = offset
+                offset += len(raw)
+                if end is not None and line_offset >= end:
+                    break
+                line = raw.strip()
+                if not line:
+                    continue
+                yield line_offset, row, decode(line, row, f"{path}: row {row}")
+                row += 1
+                if stop is not None and row >= stop:
+                    break
+
+    def iter_lines(self, lines: Iterable[bytes], *, name: str, limit: int = 0) -> Iterator[Tuple[int, tuple]]:
+        """Yield `(row_index, values)` for non-blank `lines` (e.g. a live tail); `name` labels errors."""
+        row = 0
+        decode = self.decode
+        for raw in lines:
+            line = raw.strip()
+            if not line:
+                continue
+            yield row, decode(line, row, f"{name}: row {row}")
+            row += 1
+            if limit > 0 and row >= limit:
+                break
+
+
+def commit_reader(extra_fields: Sequence[str] = (), *, reject_extra: Sequence[str] = ()) -> TypedRowReader:
+    """Reader for canonical commit rows in `COMMIT_FIELDS` order (missing `seq` = row index)."""
+    return TypedRowReader(
+        COMMIT_FIELDS + tuple(name for name in extra_fields if name not in COMMIT_FIELDS),
+        required=REQUIRED_TRACE_FIELDS,
+        fallbacks=COMMIT_FALLBACKS,
+        index_field="seq",
+        kind="commit",
+        reject_extra=reject_extra,
+    )